@@ -20,6 +20,7 @@ setup(
         "psutil",
         "requests", 
         "tabulate", 
+        "numpy",
     ],
     extras_require={
         "dev": ["pytest", "black", "isort"],
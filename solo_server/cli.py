@@ -1,13 +1,22 @@
 import typer
-from .commands import run, stop, status
+from .commands import run, stop, status, serve, benchmark, tune, topology, fit, exporter, pull
 from .start import start    
+from .gateway import gateway
 app = typer.Typer()
 
 # Commands
 app.command()(run.run)
 app.command()(stop.stop)
 app.command()(status.status)
+app.command()(serve.serve)
 app.command()(start)
+app.command()(gateway)
+app.command()(tune.tune)
+app.command()(topology.topology)
+app.command()(fit.fit)
+app.command()(exporter.exporter)
+app.command()(pull.pull)
+app.add_typer(benchmark.app, name="benchmark")
 
 if __name__ == "__main__":
     app()
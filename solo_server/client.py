@@ -0,0 +1,365 @@
+import json
+import time
+from typing import Dict, Iterator, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from solo_server.utils.cache import ResponseCache, chunks_to_reply, is_complete
+from solo_server.utils.hardware import hardware_fingerprint
+from solo_server.utils.http import AsyncConnectionPool, split_url
+from solo_server.utils.replicas import load_replicas
+from solo_server.utils.semantic_cache import SemanticCache, generation_settings, partition_name, prompt_text
+from solo_server.utils.stream import NDJSONDecoder, StreamStats
+from solo_server.utils.tuner import has_profiles, load_profile, split_candidate
+from solo_server.utils.usage import record_usage
+
+DEFAULT_BASE_URL = "http://localhost:11434"
+
+
+def build_chat_payload(model: str, messages: List[Dict], stream: bool = False,
+                       options: Optional[Dict] = None, **extra) -> Dict:
+    """Builds an Ollama /api/chat request body."""
+    payload = {"model": model, "messages": messages, "stream": stream}
+    if options:
+        payload["options"] = options
+    payload.update({key: value for key, value in extra.items() if value is not None})
+    return payload
+
+
+def _observe(stats: Optional[StreamStats], objects: List[Dict]) -> List[Dict]:
+    if stats is not None:
+        now = time.perf_counter()  # one timestamp per socket read
+        for obj in objects:
+            stats.observe(obj, now)
+    return objects
+
+
+class _CachingClient:
+    """
+    Cache bookkeeping shared by the sync and async clients.
+
+    The exact-match :class:`ResponseCache` is consulted first; with
+    ``semantic=True`` a per-model :class:`SemanticCache` is tried next.
+    """
+
+    def _init_caches(self, cache: Optional[ResponseCache], semantic: bool):
+        self.cache = cache
+        self.semantic = semantic
+        self._semantic_caches = {}
+        self._profiles = None
+        self._fingerprint = None
+        self._placement = {}
+
+    def _tuned_options(self, model: str, options: Optional[Dict]) -> Optional[Dict]:
+        """
+        Fills in the options `solo tune` saved for this model and host, on top of
+        the replica's pinned ``num_thread``; explicit options win.
+        """
+        if self._profiles is None:
+            self._profiles = {}
+            self._fingerprint = hardware_fingerprint() if has_profiles() else None
+            self._placement = self._replica_options()
+        if model not in self._profiles:
+            profile = load_profile(model, self._fingerprint) if self._fingerprint else None
+            self._profiles[model] = {**self._placement, **split_candidate(profile or {})[0]}
+        tuned = self._profiles[model]
+        return {**tuned, **(options or {})} if tuned else options
+
+    def _replica_options(self) -> Dict:
+        """``num_thread`` matching the CPUs `solo start` pinned the local replica to."""
+        host, port, _ = split_url(self.base_url)
+        if host not in ("localhost", "127.0.0.1"):
+            return {}
+        for replica in load_replicas():
+            if replica["port"] == port and replica.get("num_thread"):
+                return {"num_thread": replica["num_thread"]}
+        return {}
+
+    def _exact_lookup(self, payload: Dict):
+        key = self.cache.key_for(payload) if self.cache else None
+        return key, (self.cache.get(key) if key else None)
+
+    def _semantic_cache(self, payload: Dict) -> Optional[SemanticCache]:
+        if not self.semantic:
+            return None
+        settings = generation_settings(payload)
+        name = partition_name(payload["model"], settings)
+        if name not in self._semantic_caches:
+            self._semantic_caches[name] = SemanticCache(payload["model"], settings=settings)
+        return self._semantic_caches[name]
+
+    def _remember(self, key: Optional[str], semantic: Optional[SemanticCache], vector,
+                  chunks: List[Dict]):
+        if not chunks:
+            return
+        record_usage(chunks[-1], time.time())
+        if key:
+            self.cache.put(key, chunks)
+        if semantic is not None and vector is not None and is_complete(chunks):
+            semantic.add(vector, chunks_to_reply(chunks))
+
+    def _flush_caches(self):
+        for semantic in self._semantic_caches.values():
+            semantic.flush()
+
+
+class SoloClient(_CachingClient):
+    """
+    Synchronous Ollama chat client that reuses keep-alive connections.
+
+    A single instance should be shared for many requests; every call goes
+    through the same pooled ``requests.Session``. When a
+    :class:`ResponseCache` is given, deterministic requests are answered
+    from it and fresh answers are written back.
+    """
+
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, pool_size: int = 10,
+                 timeout: Optional[float] = None, cache: Optional[ResponseCache] = None,
+                 semantic: bool = False):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self._init_caches(cache, semantic)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+
+    def _post(self, path: str, payload: Dict, stream: bool = False) -> requests.Response:
+        response = self.session.post(
+            f"{self.base_url}{path}", json=payload, stream=stream, timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response
+
+    def embed(self, model: str, inputs) -> List[List[float]]:
+        """Returns one embedding per input string via /api/embed."""
+        return self._post("/api/embed", {"model": model, "input": inputs}).json()["embeddings"]
+
+    def ping(self, timeout: float = 2.0) -> bool:
+        """True when the Ollama server answers on its root URL."""
+        try:
+            return self.session.get(self.base_url, timeout=timeout).ok
+        except requests.RequestException:
+            return False
+
+    def _get(self, path: str) -> Dict:
+        response = self.session.get(f"{self.base_url}{path}", timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def ps(self) -> List[Dict]:
+        """Models currently loaded in memory, from /api/ps."""
+        return self._get("/api/ps").get("models", [])
+
+    def tags(self) -> List[Dict]:
+        """Models available locally, from /api/tags."""
+        return self._get("/api/tags").get("models", [])
+
+    def _set_keep_alive(self, model: str, keep_alive, options: Optional[Dict] = None) -> Dict:
+        # Embedding-only models reject /api/generate, so they go through /api/embed.
+        payload = {"model": model, "keep_alive": keep_alive}
+        if options:
+            payload["options"] = options
+        try:
+            return self._post("/api/generate", payload).json()
+        except requests.HTTPError as e:
+            if e.response is None or e.response.status_code != 400:
+                raise
+            return self._post("/api/embed", {**payload, "input": ""}).json()
+
+    def load(self, model: str, keep_alive="30m") -> Dict:
+        """
+        Loads ``model`` into memory without generating anything, with the
+        options chat requests will send; Ollama reloads a model whose runner
+        options (such as ``num_thread``) differ.
+        """
+        return self._set_keep_alive(model, keep_alive, self._tuned_options(model, None))
+
+    def unload(self, model: str) -> Dict:
+        """Evicts ``model`` from memory by setting its keep_alive to zero."""
+        return self._set_keep_alive(model, 0)
+
+    def pull_stream(self, model: str) -> Iterator[Dict]:
+        """Asks the server to pull ``model`` and yields its progress updates."""
+        decoder = NDJSONDecoder()
+        with self._post("/api/pull", {"model": model, "stream": True}, stream=True) as response:
+            for raw in response.iter_content(chunk_size=None):
+                yield from decoder.feed(raw)
+            yield from decoder.close()
+
+    def _semantic_lookup(self, payload: Dict):
+        semantic = self._semantic_cache(payload)
+        if semantic is None:
+            return None, None, None
+        try:
+            vector = self.embed(semantic.embed_model, prompt_text(payload["messages"]))[0]
+        except (requests.RequestException, KeyError, IndexError):
+            return None, None, None
+        return semantic, vector, semantic.lookup(vector)
+
+    def chat(self, model: str, messages: List[Dict], options: Optional[Dict] = None,
+             stats: Optional[StreamStats] = None, **extra) -> Dict:
+        """Sends a non-streaming chat request and returns the decoded reply."""
+        options = self._tuned_options(model, options)
+        payload = build_chat_payload(model, messages, False, options, **extra)
+        if stats is not None:
+            stats.begin()
+        key, cached = self._exact_lookup(payload)
+        if cached:
+            return _observe(stats, [chunks_to_reply(cached)])[0]
+        semantic, vector, hit = self._semantic_lookup(payload)
+        if hit:
+            return _observe(stats, [hit])[0]
+        reply = self._post("/api/chat", payload).json()
+        _observe(stats, [reply])
+        self._remember(key, semantic, vector, [reply])
+        return reply
+
+    def chat_stream(self, model: str, messages: List[Dict], options: Optional[Dict] = None,
+                    stats: Optional[StreamStats] = None, batched: bool = False,
+                    **extra) -> Iterator:
+        """
+        Sends a streaming chat request and yields each decoded chunk.
+
+        With ``batched=True`` a list is yielded per socket read instead, so
+        callers can flush their output once per read rather than per token.
+        """
+        options = self._tuned_options(model, options)
+        payload = build_chat_payload(model, messages, True, options, **extra)
+        if stats is not None:
+            stats.begin()
+        key, cached = self._exact_lookup(payload)
+        semantic = vector = None
+        if not cached:
+            semantic, vector, hit = self._semantic_lookup(payload)
+            cached = [hit] if hit else None
+        if cached:
+            batches = [[chunk] for chunk in cached]
+        else:
+            batches = self._stream_batches(payload)
+        recorded = []
+        for objects in batches:
+            _observe(stats, objects)
+            if not cached:
+                recorded.extend(objects)
+            if batched:
+                yield objects
+            else:
+                yield from objects
+        self._remember(key, semantic, vector, recorded)
+
+    def _stream_batches(self, payload: Dict) -> Iterator[List[Dict]]:
+        decoder = NDJSONDecoder()
+        with self._post("/api/chat", payload, stream=True) as response:
+            for raw in response.iter_content(chunk_size=None):
+                objects = decoder.feed(raw)
+                if objects:
+                    yield objects
+            objects = decoder.close()
+            if objects:
+                yield objects
+
+    def close(self):
+        self._flush_caches()
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class AsyncSoloClient(_CachingClient):
+    """
+    asyncio variant of :class:`SoloClient` backed by a keep-alive pool.
+
+    ``max_connections`` bounds both the pool and the number of requests
+    in flight, so it doubles as the concurrency limit.
+    """
+
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, max_connections: int = 10,
+                 timeout: Optional[float] = None, cache: Optional[ResponseCache] = None,
+                 semantic: bool = False):
+        host, port, self.prefix = split_url(base_url)
+        self.base_url = base_url.rstrip("/")
+        self._init_caches(cache, semantic)
+        self.pool = AsyncConnectionPool(host, port, max_connections, timeout)
+
+    async def _post_json(self, path: str, payload: Dict) -> Dict:
+        body = json.dumps(payload).encode()
+        async with self.pool.request("POST", f"{self.prefix}{path}", body,
+                                     {"Content-Type": "application/json"}) as response:
+            await response.raise_for_status()
+            return await response.json()
+
+    async def embed(self, model: str, inputs) -> List[List[float]]:
+        return (await self._post_json("/api/embed", {"model": model, "input": inputs}))["embeddings"]
+
+    async def _semantic_lookup(self, payload: Dict):
+        semantic = self._semantic_cache(payload)
+        if semantic is None:
+            return None, None, None
+        try:
+            vector = (await self.embed(semantic.embed_model, prompt_text(payload["messages"])))[0]
+        except (OSError, ValueError, KeyError, IndexError):
+            return None, None, None
+        return semantic, vector, semantic.lookup(vector)
+
+    async def chat(self, model: str, messages: List[Dict], options: Optional[Dict] = None,
+                   stats: Optional[StreamStats] = None, **extra) -> Dict:
+        options = self._tuned_options(model, options)
+        payload = build_chat_payload(model, messages, False, options, **extra)
+        if stats is not None:
+            stats.begin()
+        key, cached = self._exact_lookup(payload)
+        if cached:
+            return _observe(stats, [chunks_to_reply(cached)])[0]
+        semantic, vector, hit = await self._semantic_lookup(payload)
+        if hit:
+            return _observe(stats, [hit])[0]
+        reply = await self._post_json("/api/chat", payload)
+        _observe(stats, [reply])
+        self._remember(key, semantic, vector, [reply])
+        return reply
+
+    async def chat_stream(self, model: str, messages: List[Dict],
+                          options: Optional[Dict] = None,
+                          stats: Optional[StreamStats] = None, **extra):
+        options = self._tuned_options(model, options)
+        payload = build_chat_payload(model, messages, True, options, **extra)
+        if stats is not None:
+            stats.begin()
+        key, cached = self._exact_lookup(payload)
+        semantic = vector = None
+        if not cached:
+            semantic, vector, hit = await self._semantic_lookup(payload)
+            cached = [hit] if hit else None
+        if cached:
+            for obj in _observe(stats, cached):
+                yield obj
+            return
+        body = json.dumps(payload).encode()
+        decoder = NDJSONDecoder()
+        recorded = []
+        async with self.pool.request("POST", f"{self.prefix}/api/chat", body,
+                                     {"Content-Type": "application/json"}) as response:
+            await response.raise_for_status()
+            async for raw in response.iter_chunks():
+                for obj in _observe(stats, decoder.feed(raw)):
+                    recorded.append(obj)
+                    yield obj
+            for obj in _observe(stats, decoder.close()):
+                recorded.append(obj)
+                yield obj
+        self._remember(key, semantic, vector, recorded)
+
+    async def close(self):
+        self._flush_caches()
+        await self.pool.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
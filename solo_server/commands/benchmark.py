@@ -1,21 +1,760 @@
-import typer
-import subprocess
+import asyncio
+import collections
+import itertools
 import json
+import os
+import random
+import re
+import sys
+import time
+import typer
+import numpy as np
+from typing import Dict, List, Optional
+from tabulate import tabulate
+from typer.core import TyperGroup
+from requests import RequestException
+from solo_server.client import AsyncSoloClient, SoloClient, DEFAULT_BASE_URL
+from solo_server.config import get_config_value
+from solo_server.utils.balancer import normalize_model
+from solo_server.utils.bench_store import DEFAULT_TOLERANCE, BenchStore, compare_samples
+from solo_server.utils.capture import CaptureRecord, read_capture
+from solo_server.utils.hardware import hardware_fingerprint
+from solo_server.utils.bootstrap import bootstrap_ci
+from solo_server.utils.histogram import LatencyHistogram
+from solo_server.utils.scoring import CHOICE_LETTERS, exact_match, multiple_choice, token_f1
+from solo_server.utils.stream import StreamStats
+
+DEFAULT_SLO_P99_TTFT_MS = 1000
+EVAL_METRICS = ("exact", "mc", "f1")
+DEFAULT_EVAL_SYSTEM = "Answer with only the final answer. Do not explain."
+# Roughly one token each, so a prompt of N words is close to N prompt tokens.
+PROMPT_WORDS = ("the", "cat", "sat", "on", "mat", "and", "dog", "ran", "far", "sun", "sky", "sea",
+                "red", "old", "new", "big", "low", "map", "key", "box", "car", "road", "tree", "city")
+
+
+class DefaultCommandGroup(TyperGroup):
+    """Runs ``run`` when the first argument is not a subcommand, so `solo benchmark <model>` works."""
+
+    default_command = "run"
+
+    def parse_args(self, ctx, args):
+        if args and args[0] not in self.commands and args[0] not in ctx.help_option_names:
+            args.insert(0, self.default_command)
+        return super().parse_args(ctx, args)
+
 
-def benchmark(model: str, output_format: str = "md"):
+app = typer.Typer(cls=DefaultCommandGroup, help="Benchmark the served chat endpoint.")
+
+
+def parse_length_spec(spec: str):
     """
-    Runs Llama-Bench with specified parameters.
+    Parses a token-length distribution and returns a sampler ``f(rng) -> int``.
+
+    Accepted forms: ``128`` (fixed), ``64-512`` (uniform) and
+    ``normal:256,64`` (mean, standard deviation).
     """
-    typer.echo(f"⏳ Running Llama-Bench for model: {model}")
+    spec = spec.strip()
+    if re.fullmatch(r"\d+", spec):
+        value = int(spec)
+        return lambda rng: value
+    match = re.fullmatch(r"(\d+)-(\d+)", spec)
+    if match:
+        low, high = sorted((int(match.group(1)), int(match.group(2))))
+        return lambda rng: rng.randint(low, high)
+    match = re.fullmatch(r"normal:(\d+(?:\.\d+)?),(\d+(?:\.\d+)?)", spec)
+    if match:
+        mean, std = float(match.group(1)), float(match.group(2))
+        return lambda rng: max(1, int(round(rng.gauss(mean, std))))
+    raise ValueError(f"Invalid length distribution {spec!r}; use N, A-B or normal:MEAN,STD")
+
+
+def make_prompt(rng: random.Random, index: int, tokens: int) -> str:
+    """A synthetic prompt of about ``tokens`` tokens, unique per request to defeat prefix caching."""
+    words = [rng.choice(PROMPT_WORDS) for _ in range(max(0, tokens - 8))]
+    return f"Request {index}: continue this text at length. " + " ".join(words)
+
+
+class LoadRecorder:
+    """Collects the latency histograms, per-request samples and errors of a load run."""
+
+    def __init__(self):
+        self.hists = {"ttft": LatencyHistogram(), "itl": LatencyHistogram(), "e2e": LatencyHistogram()}
+        self.samples: List[Dict] = []
+        self.errors: List[str] = []
+
+    async def send(self, client, model: str, messages: List[Dict], options: Optional[Dict],
+                   record: bool = True) -> Optional[str]:
+        """Streams one chat request, records its timings and returns the reply text (None on error)."""
+        stats = StreamStats()
+        parts = []
+        try:
+            async for obj in client.chat_stream(model, messages, options, stats=stats):
+                parts.append(obj.get("message", {}).get("content", ""))
+        except Exception as e:
+            if record:
+                self.errors.append(str(e) or type(e).__name__)
+            return None
+        if not record or stats.elapsed is None:
+            return "".join(parts)
+        if stats.ttft is not None:
+            self.hists["ttft"].record(stats.ttft)
+        self.hists["itl"].record_all(stats.gaps)
+        self.hists["e2e"].record(stats.elapsed)
+        self.samples.append({
+            "ttft_ms": round(stats.ttft * 1000, 3) if stats.ttft is not None else None,
+            "e2e_ms": round(stats.elapsed * 1000, 3),
+            "tokens": stats.server.get("eval_count", stats.tokens),
+        })
+        return "".join(parts)
+
+    def result(self, elapsed: float) -> Dict:
+        return {"hists": self.hists, "samples": self.samples, "errors": self.errors, "duration_s": elapsed}
+
+
+async def run_load(model: str, base_url: str = DEFAULT_BASE_URL, concurrency: int = 4,
+                   rate: Optional[float] = None, requests: Optional[int] = 32,
+                   duration: Optional[float] = None, prompt_tokens: str = "128",
+                   output_tokens: str = "128", seed: int = 0, warmup: int = 1,
+                   options: Optional[Dict] = None) -> Dict:
+    """
+    Drives the chat endpoint and returns the raw measurements.
+
+    Closed loop (``rate=None``): ``concurrency`` workers each send their next
+    request as soon as the previous one finishes. Open loop: requests
+    arrive as a Poisson process at ``rate`` per second regardless of how
+    fast the server answers, so queueing shows up in the latencies. The run
+    stops after ``requests`` requests or ``duration`` seconds, whichever
+    comes first. ``options`` are sent with every request.
+    """
+    rng = random.Random(seed)
+    prompt_len = parse_length_spec(prompt_tokens)
+    output_len = parse_length_spec(output_tokens)
+    recorder = LoadRecorder()
+    counter = iter(range(requests)) if requests else itertools.count()
+    deadline = None
+
+    def next_job():
+        if deadline is not None and time.perf_counter() >= deadline:
+            return None
+        index = next(counter, None)
+        if index is None:
+            return None
+        return index, make_prompt(rng, index, prompt_len(rng)), output_len(rng)
+
+    def one_request(client, index, prompt, num_predict, record=True):
+        messages = [{"role": "user", "content": prompt}]
+        return recorder.send(client, model, messages, {**(options or {}), "num_predict": num_predict}, record)
+
+    max_connections = concurrency if rate is None else max(concurrency, 64)
+    async with AsyncSoloClient(base_url, max_connections=max_connections) as client:
+        # Warm-up requests absorb the cold load and are not measured.
+        for i in range(warmup):
+            await one_request(client, -1 - i, make_prompt(rng, -1 - i, prompt_len(rng)), 8, record=False)
+
+        started = time.perf_counter()
+        if duration:
+            deadline = started + duration
+        if rate is None:
+            async def worker():
+                job = next_job()
+                while job is not None:
+                    await one_request(client, *job)
+                    job = next_job()
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+        else:
+            tasks = []
+            arrival = started
+            job = next_job()
+            while job is not None:
+                tasks.append(asyncio.ensure_future(one_request(client, *job)))
+                arrival += rng.expovariate(rate)
+                await asyncio.sleep(max(0.0, arrival - time.perf_counter()))
+                job = next_job()
+            await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+    return recorder.result(elapsed)
+
+
+def parse_speed(speed: str) -> float:
+    """Parses a replay speed such as ``2x``, ``0.5x`` or ``3``."""
+    value = float(speed.strip().lower().rstrip("x"))
+    if value <= 0:
+        raise ValueError("speed must be positive")
+    return value
+
+
+async def replay_trace(records: List[CaptureRecord], base_url: str = DEFAULT_BASE_URL,
+                       speed: float = 1.0, model: Optional[str] = None,
+                       max_connections: int = 64, seed: int = 0) -> Dict:
+    """
+    Re-issues captured requests with their original inter-arrival gaps
+    divided by ``speed``.
+
+    Captured prompts are sent as-is; traces without prompt text get a
+    synthetic prompt of the recorded length. Each request asks for as many
+    tokens as the original produced so the generated load matches too.
+    """
+    rng = random.Random(seed)
+    recorder = LoadRecorder()
+    records = sorted(records, key=lambda r: r.arrival)
+    async with AsyncSoloClient(base_url, max_connections=max_connections) as client:
+        tasks = []
+        started = time.perf_counter()
+        for index, record in enumerate(records):
+            due = started + (record.arrival - records[0].arrival) / speed
+            await asyncio.sleep(max(0.0, due - time.perf_counter()))
+            messages = record.messages or [{"role": "user", "content": make_prompt(rng, index, record.prompt_tokens)}]
+            options = dict(record.options)
+            if record.output_tokens:
+                options["num_predict"] = record.output_tokens
+            tasks.append(asyncio.ensure_future(
+                recorder.send(client, model or record.model, messages, options)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+    return recorder.result(elapsed)
+
+
+def summarize(model: str, result: Dict, config: Dict) -> Dict:
+    """Turns :func:`run_load` measurements into the JSON-serialisable report."""
+    elapsed = result["duration_s"] or 1e-9
+    completed = len(result["samples"])
+    tokens = sum(sample["tokens"] or 0 for sample in result["samples"])
+    return {
+        "model": model,
+        "config": config,
+        "completed": completed,
+        "errors": len(result["errors"]),
+        "duration_s": round(elapsed, 3),
+        "requests_per_s": round(completed / elapsed, 3),
+        "tokens_per_s": round(tokens / elapsed, 2),
+        "ttft_ms": result["hists"]["ttft"].summary(),
+        "itl_ms": result["hists"]["itl"].summary(),
+        "e2e_ms": result["hists"]["e2e"].summary(),
+    }
+
+
+def format_report(report: Dict) -> str:
+    rows = []
+    for label, key in (("TTFT", "ttft_ms"), ("Inter-token", "itl_ms"), ("End-to-end", "e2e_ms")):
+        stats = report[key]
+        rows.append([label] + [stats.get(col, "-") for col in ("p50", "p90", "p99", "p99.9", "mean", "max")])
+    table = tabulate(rows, headers=["LATENCY (ms)", "P50", "P90", "P99", "P99.9", "MEAN", "MAX"], tablefmt="grid")
+    totals = (f"{report['completed']} requests ({report['errors']} errors) in {report['duration_s']:.1f}s · "
+              f"{report['requests_per_s']:.2f} req/s · {report['tokens_per_s']:.1f} tok/s")
+    return f"{table}\n{totals}"
+
+
+def meets_slo(step: Dict, slo_ms: float) -> bool:
+    return not step["errors"] and step["ttft_p99_ms"] is not None and step["ttft_p99_ms"] <= slo_ms
+
+
+def find_knee(measure, slo_ms: float, max_concurrency: int = 64) -> Dict:
+    """
+    Locates the highest concurrency whose p99 TTFT stays within ``slo_ms``.
+
+    ``measure(concurrency)`` runs one closed-loop step and returns its
+    throughput and tail latency. Concurrency doubles until the SLO is
+    breached (or a step has errors), then the gap between the last passing
+    and the first failing level is bisected.
+    """
+    curve = {}
+
+    def passes(concurrency):
+        if concurrency not in curve:
+            curve[concurrency] = measure(concurrency)
+        step = curve[concurrency]
+        return meets_slo(step, slo_ms)
+
+    good, bad, concurrency = 0, None, 1
+    while True:
+        if not passes(concurrency):
+            bad = concurrency
+            break
+        good = concurrency
+        if concurrency >= max_concurrency:
+            break
+        concurrency = min(concurrency * 2, max_concurrency)
+    while bad is not None and bad - good > 1:
+        middle = (good + bad) // 2
+        if passes(middle):
+            good = middle
+        else:
+            bad = middle
+
+    best = curve.get(good, {})
+    return {
+        "slo_p99_ttft_ms": slo_ms,
+        "max_concurrency": good,
+        "max_requests_per_s": best.get("requests_per_s", 0.0),
+        "max_tokens_per_s": best.get("tokens_per_s", 0.0),
+        "curve": [curve[c] for c in sorted(curve)],
+    }
+
+
+def measure_step(model: str, url: str, concurrency: int, requests: int, prompt_tokens: str,
+                 output_tokens: str, seed: int, warmup: int) -> Dict:
+    """One closed-loop step of the knee search."""
+    result = asyncio.run(run_load(model, url, concurrency, requests=max(requests, 4 * concurrency),
+                                  prompt_tokens=prompt_tokens, output_tokens=output_tokens,
+                                  seed=seed, warmup=warmup))
+    report = summarize(model, result, {})
+    return {
+        "concurrency": concurrency,
+        "requests_per_s": report["requests_per_s"],
+        "tokens_per_s": report["tokens_per_s"],
+        "ttft_p99_ms": report["ttft_ms"].get("p99"),
+        "e2e_p99_ms": report["e2e_ms"].get("p99"),
+        "errors": report["errors"],
+    }
+
+
+def parse_eval_line(line: str) -> Dict:
+    """
+    Turns one labelled JSONL line into an eval item.
+
+    Free-form items carry ``prompt`` (or ``question``/``messages``) and
+    ``answer`` or ``answers``. Multiple-choice items add ``choices`` and
+    give ``answer`` as a letter, an index or the choice text.
+    """
+    record = json.loads(line)
+    question = record.get("prompt") or record.get("question") or ""
+    choices = record.get("choices")
+    item = {"id": record.get("id"), "choices": choices}
+    if choices:
+        answer = record.get("answer")
+        if isinstance(answer, int):
+            index = answer
+        elif isinstance(answer, str) and len(answer.strip()) == 1 and answer.strip().upper() in CHOICE_LETTERS:
+            index = CHOICE_LETTERS.index(answer.strip().upper())
+        else:
+            index = choices.index(answer)
+        if not 0 <= index < len(choices):
+            raise ValueError(f"answer {answer!r} is not one of the {len(choices)} choices")
+        lines = [question] + [f"{CHOICE_LETTERS[i]}. {choice}" for i, choice in enumerate(choices)]
+        question = "\n".join(lines) + "\nAnswer with the letter of the correct choice."
+        item.update(answer_index=index, golds=[CHOICE_LETTERS[index]])
+    else:
+        answers = record.get("answers")
+        if answers is None:
+            answers = [record["answer"]]
+        item["golds"] = [str(a) for a in answers]
+    item["messages"] = record.get("messages") or [{"role": "user", "content": question}]
+    return item
+
 
-    command = [
-        "./llama-bench",
-        "-m", model,
-        "-o", output_format
-    ]
+def score_batch(items: List[Dict], responses: List[str], metric: str):
+    if metric == "mc":
+        return multiple_choice(responses, [i["answer_index"] for i in items], [len(i["choices"]) for i in items])
+    if metric == "f1":
+        return token_f1(responses, [i["golds"] for i in items])
+    return exact_match(responses, [i["golds"] for i in items])
 
+
+async def run_eval(source, model: str, base_url: str = DEFAULT_BASE_URL, concurrency: int = 8,
+                   batch_size: int = 100, metric: Optional[str] = None, options: Optional[Dict] = None,
+                   system: Optional[str] = DEFAULT_EVAL_SYSTEM, limit: Optional[int] = None,
+                   on_batch=None) -> Dict:
+    """
+    Streams a labelled dataset through the model in batches and scores each batch.
+
+    Within a batch at most ``concurrency`` requests are in flight; scores
+    are computed per batch with the vectorised scorers in
+    :mod:`solo_server.utils.scoring`. ``metric`` defaults to ``mc`` when
+    the first item has choices and ``exact`` otherwise.
+    """
+    recorder = LoadRecorder()
+    scores, batches, predictions = [], [], []
+    failed = 0
+    lines = ((number, line) for number, line in enumerate(source, 1) if line.strip())
+    if limit:
+        lines = itertools.islice(lines, limit)
+    prefix = [{"role": "system", "content": system}] if system else []
+
+    def parse(number, line):
+        try:
+            return parse_eval_line(line)
+        except (ValueError, KeyError) as e:
+            raise ValueError(f"line {number}: {e}") from e
+
+    async with AsyncSoloClient(base_url, max_connections=concurrency) as client:
+        started = time.perf_counter()
+        while True:
+            items = [parse(number, line) for number, line in itertools.islice(lines, batch_size)]
+            if not items:
+                break
+            if metric is None:
+                metric = "mc" if items[0]["choices"] else "exact"
+            responses = [None] * len(items)
+            queue = iter(range(len(items)))
+
+            async def worker():
+                for index in queue:
+                    responses[index] = await recorder.send(client, model, prefix + items[index]["messages"], options)
+
+            await asyncio.gather(*(worker() for _ in range(min(concurrency, len(items)))))
+            # Failed requests are counted apart rather than scored as wrong answers.
+            answered = [i for i, response in enumerate(responses) if response is not None]
+            failed += len(items) - len(answered)
+            predictions.extend({"id": item["id"], "response": None, "golds": item["golds"], "score": None}
+                               for item, response in zip(items, responses) if response is None)
+            if not answered:
+                continue
+            items, responses = [items[i] for i in answered], [responses[i] for i in answered]
+            batch_scores = score_batch(items, responses, metric)
+            scores.append(batch_scores)
+            batches.append(float(batch_scores.mean()))
+            predictions.extend({"id": item["id"], "response": response, "golds": item["golds"], "score": float(score)}
+                               for item, response, score in zip(items, responses, batch_scores))
+            if on_batch is not None:
+                on_batch(len(batches) - 1, batches[-1], len(items))
+        elapsed = time.perf_counter() - started
+    result = recorder.result(elapsed)
+    result.update(metric=metric or "exact", scores=np.concatenate(scores) if scores else np.zeros(0),
+                  batches=batches, predictions=predictions, failed=failed)
+    return result
+
+
+def model_quantization(url: str, model: str) -> str:
+    """Quantization level reported by /api/tags, or "unknown" (e.g. behind the gateway)."""
+    try:
+        with SoloClient(url, timeout=5) as client:
+            for entry in client.tags():
+                if normalize_model(entry.get("name", "")) == normalize_model(model):
+                    return entry.get("details", {}).get("quantization_level") or "unknown"
+    except (RequestException, ValueError):
+        pass
+    return "unknown"
+
+
+@app.command("run")
+def benchmark(
+    model: str = typer.Argument(..., help="Model to benchmark"),
+    url: str = typer.Option(DEFAULT_BASE_URL, "--url", help="Ollama server or solo gateway to drive"),
+    concurrency: int = typer.Option(4, "--concurrency", "-c", min=1, help="Closed loop: requests in flight"),
+    rate: Optional[float] = typer.Option(None, "--rate", help="Open loop: Poisson arrival rate in requests/s"),
+    requests: int = typer.Option(32, "--requests", "-n", min=0, help="Requests to send (0 = until --duration)"),
+    duration: Optional[float] = typer.Option(None, "--duration", "-d", help="Stop after this many seconds"),
+    prompt_tokens: str = typer.Option("128", "--prompt-tokens", help="Prompt length: N, A-B or normal:MEAN,STD"),
+    output_tokens: str = typer.Option("128", "--output-tokens", help="Output length (num_predict): N, A-B or normal:MEAN,STD"),
+    seed: int = typer.Option(0, "--seed", help="Seed for prompts, lengths and arrivals"),
+    warmup: int = typer.Option(1, "--warmup", min=0, help="Unmeasured requests sent first"),
+    as_json: bool = typer.Option(False, "--json", help="Print the report as JSON"),
+    output: Optional[str] = typer.Option(None, "--output", "-o", help="Also write the JSON report to this file"),
+    knee: bool = typer.Option(False, "--find-knee", help="Ramp concurrency until the p99 TTFT SLO is breached"),
+    max_concurrency: int = typer.Option(64, "--max-concurrency", min=1, help="Upper bound of the --find-knee ramp"),
+    slo_ttft_ms: Optional[float] = typer.Option(None, "--slo-ttft-ms", help="p99 TTFT SLO (default: SLO_P99_TTFT_MS in solo.conf or 1000)"),
+):
+    """
+    Load-tests the live chat API and reports TTFT, inter-token and end-to-end latency.
+    """
+    if knee:
+        slo_ms = slo_ttft_ms or float(get_config_value("slo_p99_ttft_ms", DEFAULT_SLO_P99_TTFT_MS))
+        return run_find_knee(model, url, slo_ms, max_concurrency, requests or 32, prompt_tokens,
+                             output_tokens, seed, warmup, as_json, output)
+    if not requests and not duration:
+        typer.echo("❌ Pass --requests or --duration.", err=True)
+        raise typer.Exit(code=1)
+    try:
+        parse_length_spec(prompt_tokens), parse_length_spec(output_tokens)
+    except ValueError as e:
+        typer.echo(f"❌ {e}", err=True)
+        raise typer.Exit(code=1)
+
+    config = {"url": url, "mode": "open" if rate else "closed", "concurrency": concurrency, "rate": rate,
+              "requests": requests, "duration": duration, "prompt_tokens": prompt_tokens,
+              "output_tokens": output_tokens, "seed": seed}
+    if not as_json:
+        load = f"{rate} req/s (open loop)" if rate else f"concurrency {concurrency} (closed loop)"
+        typer.echo(f"⏳ Benchmarking {model} at {load}...", err=True)
+    result = asyncio.run(run_load(model, url, concurrency, rate, requests or None, duration,
+                                  prompt_tokens, output_tokens, seed, warmup))
+    report = summarize(model, result, config)
+    if result["samples"]:
+        store = BenchStore()
+        report["run_id"] = store.record(report, result["samples"], model_quantization(url, model),
+                                        hardware_fingerprint())
+        store.close()
+
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if as_json:
+        typer.echo(json.dumps(report, indent=2))
+    else:
+        typer.echo(format_report(report))
+        if "run_id" in report:
+            typer.echo(f"📊 Saved as run #{report['run_id']}")
+    if result["errors"]:
+        typer.echo(f"⚠️  First error: {result['errors'][0]}", err=True)
+
+
+def run_find_knee(model, url, slo_ms, max_concurrency, requests, prompt_tokens, output_tokens,
+                  seed, warmup, as_json, output):
+    """`solo benchmark --find-knee`: ramps concurrency and stores the curve."""
+    def measure(concurrency):
+        step = measure_step(model, url, concurrency, requests, prompt_tokens, output_tokens, seed, warmup)
+        if not as_json:
+            typer.echo(f"  c={concurrency:<4} {step['requests_per_s']:8.2f} req/s {step['tokens_per_s']:9.1f} tok/s"
+                       f"  p99 TTFT {step['ttft_p99_ms'] or 0:.0f} ms", err=True)
+        return step
+
+    if not as_json:
+        typer.echo(f"⏳ Ramping concurrency on {model} against p99 TTFT ≤ {slo_ms:.0f} ms...", err=True)
+    knee = find_knee(measure, slo_ms, max_concurrency)
+    hardware = hardware_fingerprint()
+    store = BenchStore()
+    knee["knee_id"] = store.record_knee(model, knee, model_quantization(url, model), hardware)
+    store.close()
+    knee.update(model=model, hardware=hardware)
+
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(knee, f, indent=2)
+    if as_json:
+        typer.echo(json.dumps(knee, indent=2))
+        return
+    rows = [[step["concurrency"], step["requests_per_s"], step["tokens_per_s"], step["ttft_p99_ms"],
+             step["e2e_p99_ms"], step["errors"],
+             "✅" if meets_slo(step, slo_ms) else "❌"] for step in knee["curve"]]
+    print(tabulate(rows, headers=["CONCURRENCY", "REQ/S", "TOK/S", "TTFT P99 (ms)", "E2E P99 (ms)",
+                                  "ERRORS", "SLO"], tablefmt="grid"))
+    if knee["max_concurrency"]:
+        typer.secho(f"✅ Max sustainable concurrency {knee['max_concurrency']} · "
+                    f"{knee['max_requests_per_s']:.2f} req/s · {knee['max_tokens_per_s']:.1f} tok/s "
+                    f"(hardware {hardware})", fg=typer.colors.BRIGHT_CYAN)
+    else:
+        typer.echo(f"❌ Even a single request breaches the {slo_ms:.0f} ms p99 TTFT SLO.", err=True)
+
+
+@app.command("replay")
+def replay(
+    capture_file: str = typer.Argument(..., help="Capture written by `solo serve --capture`"),
+    url: str = typer.Option(DEFAULT_BASE_URL, "--url", help="Ollama server or solo gateway to replay against"),
+    speed: str = typer.Option("1x", "--speed", help="Time compression, e.g. 2x replays twice as fast"),
+    model: Optional[str] = typer.Option(None, "--model", "-m", help="Send every request to this model instead"),
+    max_connections: int = typer.Option(64, "--max-connections", min=1, help="Upper bound on requests in flight"),
+    as_json: bool = typer.Option(False, "--json", help="Print the report as JSON"),
+    output: Optional[str] = typer.Option(None, "--output", "-o", help="Also write the JSON report to this file"),
+):
+    """
+    Replays captured traffic with its original inter-arrival timing.
+    """
+    try:
+        factor = parse_speed(speed)
+        records = list(read_capture(capture_file))
+    except (OSError, ValueError) as e:
+        typer.echo(f"❌ {e}", err=True)
+        raise typer.Exit(code=1)
+    if not records:
+        typer.echo(f"❌ {capture_file} contains no requests", err=True)
+        raise typer.Exit(code=1)
+
+    span = records[-1].arrival - records[0].arrival
+    if not as_json:
+        typer.echo(f"⏳ Replaying {len(records)} requests spanning {span:.1f}s at {factor:g}x...", err=True)
+    result = asyncio.run(replay_trace(records, url, factor, model, max_connections))
+    report_model = model or collections.Counter(r.model for r in records).most_common(1)[0][0]
+    config = {"url": url, "mode": "replay", "trace": os.path.basename(capture_file), "speed": factor,
+              "requests": len(records), "model_override": model}
+    report = summarize(report_model, result, config)
+    captured = LatencyHistogram()
+    captured.record_all(r.e2e_ms / 1000 for r in records if r.status == 200)
+    report["captured_e2e_ms"] = captured.summary()
+    if result["samples"]:
+        store = BenchStore()
+        report["run_id"] = store.record(report, result["samples"], model_quantization(url, report_model),
+                                        hardware_fingerprint())
+        store.close()
+
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if as_json:
+        typer.echo(json.dumps(report, indent=2))
+        return
+    typer.echo(format_report(report))
+    original = report["captured_e2e_ms"]
+    if original.get("count"):
+        typer.echo(f"Captured end-to-end: p50 {original['p50']:.1f} ms · p99 {original['p99']:.1f} ms")
+    if "run_id" in report:
+        typer.echo(f"📊 Saved as run #{report['run_id']}")
+    if result["errors"]:
+        typer.echo(f"⚠️  First error: {result['errors'][0]}", err=True)
+
+
+@app.command("eval")
+def evaluate(
+    model: str = typer.Argument(..., help="Model to evaluate"),
+    dataset: str = typer.Argument(..., help="Labelled JSONL dataset ('-' for stdin)"),
+    url: str = typer.Option(DEFAULT_BASE_URL, "--url", help="Ollama server or solo gateway to evaluate"),
+    metric: Optional[str] = typer.Option(None, "--metric", help="exact, mc or f1 (default: mc when items have choices, else exact)"),
+    concurrency: int = typer.Option(8, "--concurrency", "-c", min=1, help="Requests in flight"),
+    batch_size: int = typer.Option(100, "--batch-size", min=1, help="Items scored together"),
+    max_tokens: int = typer.Option(32, "--max-tokens", min=1, help="num_predict for each answer"),
+    limit: Optional[int] = typer.Option(None, "--limit", "-n", help="Only evaluate the first N items"),
+    system: str = typer.Option(DEFAULT_EVAL_SYSTEM, "--system", help="System prompt sent with every item"),
+    confidence: float = typer.Option(0.95, "--confidence", help="Confidence level of the accuracy interval"),
+    predictions: Optional[str] = typer.Option(None, "--predictions", help="Write per-item responses and scores to this JSONL file"),
+    as_json: bool = typer.Option(False, "--json", help="Print the report as JSON"),
+    output: Optional[str] = typer.Option(None, "--output", "-o", help="Also write the JSON report to this file"),
+):
+    """
+    Scores a model on a labelled dataset and reports accuracy with throughput.
+    """
+    if metric is not None and metric not in EVAL_METRICS:
+        typer.echo(f"❌ Unknown metric {metric!r}; use one of {', '.join(EVAL_METRICS)}", err=True)
+        raise typer.Exit(code=1)
+
+    def on_batch(index, accuracy, size):
+        if not as_json:
+            typer.echo(f"🔹 Batch {index} Accuracy: {accuracy:.4f} ({size} items)")
+
+    if not as_json:
+        typer.echo(f"⏳ Evaluating {model} on {dataset}...", err=True)
+    source = sys.stdin if dataset == "-" else open(dataset, "r", encoding="utf-8")
     try:
-        result = subprocess.run(command, check=True, capture_output=True, text=True)
-        typer.echo(result.stdout)
-    except subprocess.CalledProcessError as e:
-        typer.echo(f"❌ Benchmark failed: {e.stderr}", err=True)
+        result = asyncio.run(run_eval(source, model, url, concurrency, batch_size, metric,
+                                      {"temperature": 0, "num_predict": max_tokens}, system or None,
+                                      limit, on_batch))
+    except (ValueError, KeyError) as e:
+        typer.echo(f"❌ Invalid dataset, {e}", err=True)
+        raise typer.Exit(code=1)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+    scores = result["scores"]
+    config = {"url": url, "mode": "eval", "dataset": os.path.basename(dataset), "metric": result["metric"],
+              "concurrency": concurrency, "batch_size": batch_size, "max_tokens": max_tokens, "limit": limit}
+    report = summarize(model, result, config)
+    if len(scores):
+        point, low, high = bootstrap_ci(scores, lambda s: s.mean(axis=-1), confidence=confidence)
+        report["accuracy"] = {"metric": result["metric"], "items": len(scores), "mean": round(point, 4),
+                              "ci_low": round(low, 4), "ci_high": round(high, 4), "confidence": confidence,
+                              "failed": result["failed"],
+                              "batches": [round(b, 4) for b in result["batches"]]}
+    if result["samples"]:
+        store = BenchStore()
+        report["run_id"] = store.record(report, result["samples"], model_quantization(url, model),
+                                        hardware_fingerprint())
+        store.close()
+
+    if predictions:
+        with open(predictions, "w", encoding="utf-8") as f:
+            for row in result["predictions"]:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if as_json:
+        typer.echo(json.dumps(report, indent=2))
+        return
+    accuracy = report.get("accuracy")
+    if accuracy:
+        typer.secho(f"✅ {accuracy['metric']} score {accuracy['mean']:.4f} "
+                    f"({confidence:.0%} CI {accuracy['ci_low']:.4f}-{accuracy['ci_high']:.4f}, "
+                    f"{accuracy['items']} items)", fg=typer.colors.BRIGHT_CYAN)
+        if accuracy["failed"]:
+            typer.echo(f"⚠️  {accuracy['failed']} items were not scored because their request failed", err=True)
+    typer.echo(f"{report['requests_per_s']:.2f} req/s · {report['tokens_per_s']:.1f} tok/s · "
+               f"p99 latency {report['e2e_ms'].get('p99', 0):.0f} ms")
+    if "run_id" in report:
+        typer.echo(f"📊 Saved as run #{report['run_id']}")
+    if result["errors"]:
+        typer.echo(f"⚠️  {len(result['errors'])} requests failed; first error: {result['errors'][0]}", err=True)
+
+
+@app.command("capacity")
+def capacity(
+    model: Optional[str] = typer.Argument(None, help="Only show this model"),
+):
+    """
+    Shows the latest --find-knee result per hardware fingerprint and model.
+    """
+    store = BenchStore()
+    knees = store.knees(model)
+    store.close()
+    rows = [[k["hardware"], k["model"], k["quantization"], k["slo_p99_ttft_ms"], k["max_concurrency"],
+             k["max_requests_per_s"], k["max_tokens_per_s"],
+             time.strftime("%Y-%m-%d", time.localtime(k["created"]))] for k in knees]
+    print(tabulate(rows, headers=["HARDWARE", "MODEL", "QUANT", "SLO (ms)", "MAX CONCURRENCY", "REQ/S",
+                                  "TOK/S", "MEASURED"], tablefmt="grid"))
+
+
+@app.command("list")
+def list_runs(
+    model: Optional[str] = typer.Argument(None, help="Only show runs of this model"),
+    limit: int = typer.Option(20, "--limit", "-n", help="Number of runs to show"),
+):
+    """
+    Shows recorded benchmark runs, newest first.
+    """
+    store = BenchStore()
+    runs = store.list_runs(model, limit)
+    store.close()
+    rows = [[run["id"], time.strftime("%Y-%m-%d %H:%M", time.localtime(run["created"])), run["model"],
+             run["quantization"], run["solo_version"], run["hardware"], run["config_hash"],
+             run["report"].get("tokens_per_s"), run["report"].get("e2e_ms", {}).get("p99")]
+            for run in runs]
+    print(tabulate(rows, headers=["RUN", "DATE", "MODEL", "QUANT", "VERSION", "HARDWARE", "CONFIG",
+                                  "TOK/S", "E2E P99 (ms)"], tablefmt="grid"))
+
+
+@app.command("startup")
+def startup_history(
+    limit: int = typer.Option(20, "--limit", "-n", help="Number of starts to show"),
+):
+    """
+    Shows recorded `solo start` times from cold to ready, newest first.
+    """
+    store = BenchStore()
+    starts = store.startups(limit)
+    store.close()
+    rows = [[s["id"], time.strftime("%Y-%m-%d %H:%M", time.localtime(s["created"])), s["solo_version"],
+             s["hardware"], s["replicas"], s["containers_created"], "yes" if s["image_pulled"] else "no",
+             f"{s['total_ms']:.0f}", ", ".join(f"{name} {ms:.0f}" for name, ms in s["phases"].items())]
+            for s in starts]
+    print(tabulate(rows, headers=["START", "DATE", "VERSION", "HARDWARE", "REPLICAS", "CREATED", "PULLED",
+                                  "TOTAL (ms)", "PHASES (ms)"], tablefmt="grid"))
+
+
+@app.command("compare")
+def compare(
+    baseline: int = typer.Argument(..., help="Run id of the baseline"),
+    candidate: int = typer.Argument(..., help="Run id to check against the baseline"),
+    tolerance: float = typer.Option(DEFAULT_TOLERANCE, "--tolerance", help="Relative change treated as noise"),
+    confidence: float = typer.Option(0.95, "--confidence", help="Confidence level of the bootstrap intervals"),
+    fail_on_regression: bool = typer.Option(False, "--fail-on-regression", help="Exit with status 1 if any metric regressed"),
+):
+    """
+    Compares two recorded runs and flags significant throughput or tail-latency regressions.
+    """
+    store = BenchStore()
+    runs = [store.get(baseline), store.get(candidate)]
+    if None in runs:
+        store.close()
+        typer.echo(f"❌ Run #{baseline if runs[0] is None else candidate} not found", err=True)
+        raise typer.Exit(code=1)
+    samples = [store.samples(baseline), store.samples(candidate)]
+    store.close()
+
+    for field in ("model", "quantization", "hardware", "config_hash"):
+        if runs[0][field] != runs[1][field]:
+            typer.echo(f"⚠️  Runs differ in {field}: {runs[0][field]} vs {runs[1][field]}", err=True)
+
+    results = compare_samples(samples[0], samples[1], tolerance, confidence=confidence)
+    rows = []
+    for r in results:
+        verdict = "❌ regression" if r["regression"] else ("changed" if r["significant"] else "no change")
+        rows.append([r["metric"], f"{r['baseline']:.2f}", f"{r['candidate']:.2f}", f"{r['change'] * 100:+.1f}%",
+                     f"[{r['ci_low'] * 100:+.1f}%, {r['ci_high'] * 100:+.1f}%]", verdict])
+    typer.echo(f"Run #{baseline} → run #{candidate} ({confidence:.0%} bootstrap CI)")
+    print(tabulate(rows, headers=["METRIC", "BASELINE", "CANDIDATE", "CHANGE", "CI", "VERDICT"], tablefmt="grid"))
+
+    if any(r["regression"] for r in results):
+        typer.echo("❌ Regression detected.", err=True)
+        if fail_on_regression:
+            raise typer.Exit(code=1)
+    else:
+        typer.echo("✅ No significant regressions.")
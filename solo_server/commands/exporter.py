@@ -0,0 +1,111 @@
+import asyncio
+import time
+import typer
+from typing import Optional
+from solo_server.config import get_config_value
+from solo_server.utils.hardware import detect_hardware
+from solo_server.utils.http import HTTPError, format_head, read_request, write_json
+from solo_server.utils.metrics import CONTENT_TYPE, MetricsCollector, render_metrics
+from solo_server.utils.replicas import load_replicas
+
+DEFAULT_EXPORTER_PORT = 9400
+DEFAULT_REFRESH_SECONDS = 5.0
+
+
+class Exporter:
+    """
+    Serves ``/metrics`` from a snapshot that a background task refreshes
+    every ``interval`` seconds.
+
+    A scrape only copies the last rendered body, so scraping every second
+    adds no probe latency and no Docker or Ollama calls.
+    """
+
+    def __init__(self, collector: MetricsCollector, interval: float = DEFAULT_REFRESH_SECONDS):
+        self.collector = collector
+        self.interval = interval
+        self.body = b""
+        self.scrapes = 0
+        self.refreshed = asyncio.Event()
+
+    async def refresh(self):
+        started = time.perf_counter()
+        samples = await self.collector.collect()
+        samples.append(("solo_exporter_refresh_seconds", {}, round(time.perf_counter() - started, 6)))
+        samples.append(("solo_exporter_last_refresh_timestamp_seconds", {}, round(time.time(), 3)))
+        self.body = render_metrics(samples)
+        self.refreshed.set()
+
+    async def _refresh_forever(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:  # keep serving the last good snapshot
+                typer.echo(f"⚠️  Metrics refresh failed: {e}", err=True)
+            await asyncio.sleep(self.interval)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except HTTPError as e:
+                    await write_json(writer, e.status, {"error": e.body.decode()}, {"Connection": "close"})
+                    break
+                if request is None:
+                    break
+                method, path, headers, _ = request
+                if path.split("?", 1)[0] == "/metrics":
+                    self.scrapes += 1
+                    body = self.body
+                    writer.write(format_head(200, {"Content-Type": CONTENT_TYPE,
+                                                   "Content-Length": str(len(body))}))
+                    if method != "HEAD":
+                        writer.write(body)
+                    await writer.drain()
+                else:
+                    await write_json(writer, 404, {"error": f"Unknown route {path}"})
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str, port: int, ready: Optional[asyncio.Event] = None):
+        refresher = asyncio.ensure_future(self._refresh_forever())
+        server = await asyncio.start_server(self.handle, host, port)
+        self.sockets = server.sockets
+        await self.refreshed.wait()  # never serve an empty first scrape
+        if ready is not None:
+            ready.set()
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            refresher.cancel()
+            await self.collector.close()
+
+
+def exporter(
+    host: str = typer.Option("0.0.0.0", "--host", help="Interface to listen on"),
+    port: Optional[int] = typer.Option(None, "--port", "-p", help="Port to listen on (default: EXPORTER_PORT in solo.conf or 9400)"),
+    interval: Optional[float] = typer.Option(None, "--interval", help="Seconds between background refreshes (default: EXPORTER_INTERVAL in solo.conf or 5)"),
+):
+    """
+    Serves host, container, model and token metrics for Prometheus at /metrics.
+    """
+    if port is None:
+        port = int(get_config_value("exporter_port", DEFAULT_EXPORTER_PORT))
+    if interval is None:
+        interval = float(get_config_value("exporter_interval", DEFAULT_REFRESH_SECONDS))
+    typer.echo(f"📈 Solo exporter listening on http://{host}:{port}/metrics (refresh every {interval:g}s)")
+
+    async def run():
+        collector = MetricsCollector(load_replicas(), detect_hardware())
+        await Exporter(collector, max(0.1, interval)).serve(host, port)
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        typer.echo("🛑 Exporter stopped.")
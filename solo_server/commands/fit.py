@@ -0,0 +1,73 @@
+import json
+import typer
+from typing import Optional
+from tabulate import tabulate
+from solo_server.config import get_config_value
+from solo_server.utils.fit import (DEFAULT_NUM_CTX, KV_CACHE_TYPES, estimate, find_model_file, read_shape,
+                                   recommend)
+from solo_server.utils.gguf import GGUFError
+from solo_server.utils.hardware import GIB, detect_hardware
+from solo_server.utils.residency import DEFAULT_BUDGET_FRACTION
+
+
+def _gb(value) -> str:
+    return f"{value / GIB:.2f}GB" if value is not None else "-"
+
+
+def fit(
+    model: str = typer.Argument(..., help="Pulled model name (e.g. llama3.2:3b) or path to a .gguf file"),
+    num_ctx: int = typer.Option(DEFAULT_NUM_CTX, "--num-ctx", min=1, help="Context length per request slot"),
+    parallel: int = typer.Option(1, "--parallel", min=1, help="Parallel request slots (OLLAMA_NUM_PARALLEL)"),
+    kv_cache_type: str = typer.Option("f16", "--kv-cache-type", help="OLLAMA_KV_CACHE_TYPE: f16, q8_0 or q4_0"),
+    models_dir: Optional[str] = typer.Option(None, "--models-dir", help="Ollama models directory to look in"),
+    as_json: bool = typer.Option(False, "--json", help="Print the estimate as JSON"),
+):
+    """
+    Estimates whether a model fits in GPU memory or RAM, from its GGUF header.
+    """
+    if kv_cache_type not in KV_CACHE_TYPES:
+        typer.echo(f"❌ Unknown KV cache type {kv_cache_type}; use one of {', '.join(KV_CACHE_TYPES)}", err=True)
+        raise typer.Exit(code=1)
+    try:
+        shape = read_shape(find_model_file(model, [models_dir] if models_dir else None))
+    except (OSError, GGUFError) as e:
+        typer.echo(f"❌ {e}", err=True)
+        raise typer.Exit(code=1)
+
+    hardware = detect_hardware()
+    fraction = float(get_config_value("residency_budget_fraction", DEFAULT_BUDGET_FRACTION))
+    budgets = {}
+    if hardware.compute_backend != "CPU":
+        vram = sum(gpu.memory_gb for gpu in hardware.gpus if gpu.vendor == hardware.gpu_vendor) or hardware.gpu_memory
+        if vram:
+            budgets["GPU"] = int(vram * GIB * fraction)
+    budgets["RAM"] = int(hardware.memory_gb * GIB * fraction)
+
+    needed = estimate(shape, num_ctx, parallel, kv_cache_type)
+    rows = recommend(shape, budgets, num_ctx, parallel, kv_cache_type)
+    if as_json:
+        typer.echo(json.dumps({"model": model, "path": shape.path, "architecture": shape.architecture,
+                               "quantization": shape.file_type, "parameters": shape.parameters,
+                               "layers": shape.layers, "embedding": shape.embedding,
+                               "context_length": shape.context_length, "num_ctx": num_ctx,
+                               "parallel": parallel, "estimate": needed, "targets": rows}, indent=2))
+        return
+
+    typer.echo(f"📐 {model}: {shape.architecture}, {shape.parameters / 1e9:.2f}B parameters, {shape.file_type} "
+               f"({shape.bits_per_weight:.2f} bits/weight), {shape.layers} layers, "
+               f"trained context {shape.context_length}")
+    typer.echo(f"Weights {_gb(needed['weights'])} + KV cache {_gb(needed['kv_cache'])} "
+               f"({num_ctx} tokens x {parallel} slots, {kv_cache_type}) + runtime {_gb(needed['overhead'])} "
+               f"= {_gb(needed['total'])}")
+    table = []
+    for row in rows:
+        if row["fits"]:
+            advice = f"fits; up to num_ctx {row['max_ctx']}"
+        elif row["max_ctx"]:
+            advice = f"lower num_ctx to {row['max_ctx']}"
+        elif row["quantization"]:
+            advice = f"use a {row['quantization']} variant ({_gb(row['quantization_needed'])})"
+        else:
+            advice = "does not fit"
+        table.append([row["target"], _gb(row["budget"]), _gb(row["needed"]), "yes" if row["fits"] else "no", advice])
+    print(tabulate(table, headers=["TARGET", "BUDGET", "NEEDED", "FITS", "RECOMMENDATION"], tablefmt="grid"))
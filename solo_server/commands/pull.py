@@ -0,0 +1,76 @@
+import os
+import shutil
+import subprocess
+import time
+import typer
+from typing import Optional
+from solo_server.utils.docker_api import DockerError, volume_mountpoint
+from solo_server.utils.hardware import GIB
+from solo_server.utils.pull import OLLAMA_VOLUME, ModelPuller, PullError, import_into_volume, import_model
+
+
+def _gb(value) -> str:
+    return f"{value / GIB:.2f}GB"
+
+
+def import_into_ollama(model: str, store: str, models_dir: Optional[str] = None) -> str:
+    """
+    Makes a stored model visible to Ollama: written straight into
+    ``models_dir`` or the ``ollama`` volume's directory when the host can
+    reach it, otherwise copied in through a throwaway container.
+    """
+    if models_dir:
+        added = import_model(model, store, os.path.expanduser(models_dir))
+        return f"{models_dir} ({added} new blobs)"
+    mountpoint = volume_mountpoint(OLLAMA_VOLUME)
+    if mountpoint and os.access(mountpoint, os.W_OK):
+        added = import_model(model, store, os.path.join(mountpoint, "models"))
+        return f"the {OLLAMA_VOLUME} volume ({added} new blobs)"
+    import_into_volume(model, store)
+    return f"the {OLLAMA_VOLUME} volume"
+
+
+def pull(
+    model: str = typer.Argument(..., help="Model to download, e.g. llama3.2 or llama3.1:8b"),
+    registry: Optional[str] = typer.Option(None, "--registry", help="Registry base URL (default: REGISTRY_URL in solo.conf, or the model's own registry)"),
+    connections: Optional[int] = typer.Option(None, "--connections", "-c", min=1, help="Parallel ranged downloads (default: PULL_CONNECTIONS in solo.conf or 4)"),
+    models_dir: Optional[str] = typer.Option(None, "--models-dir", help="Import into this Ollama models directory instead of the ollama volume"),
+    import_model_: bool = typer.Option(True, "--import/--no-import", help="Import the model into the ollama volume used by `solo start`"),
+):
+    """
+    Downloads a model with resumable, parallel ranged requests into Solo's shared blob store.
+    """
+    last = [0.0]
+
+    def show(done, total):
+        now = time.monotonic()
+        if now - last[0] >= 0.5 or done >= total:
+            last[0] = now
+            typer.echo(f"\r⬇️  {_gb(done)} / {_gb(total)}", nl=False)
+
+    puller = ModelPuller(registry_url=registry, connections=connections, on_progress=show)
+    typer.echo(f"📥 Pulling {model} into {puller.store}")
+    started = time.perf_counter()
+    try:
+        stats = puller.pull(model)
+    except PullError as e:
+        typer.echo(f"\n❌ {e}", err=True)
+        typer.echo("Run the same command again to resume.", err=True)
+        raise typer.Exit(code=1)
+    if stats["blobs"]:
+        typer.echo("")
+    elapsed = time.perf_counter() - started
+    typer.echo(f"✅ {model} ({_gb(stats['size'])}): {_gb(stats['downloaded'])} downloaded in {elapsed:.1f}s, "
+               f"{_gb(stats['resumed'])} resumed, {_gb(stats['reused'])} already in the store")
+
+    if not import_model_:
+        return
+    if not models_dir and not shutil.which("docker"):
+        typer.echo("⚠️  Docker is not installed; the model stays in the store until imported.", err=True)
+        return
+    try:
+        target = import_into_ollama(model, puller.store, models_dir)
+    except (OSError, DockerError, subprocess.CalledProcessError) as e:
+        typer.echo(f"❌ Could not import {model}: {e}", err=True)
+        raise typer.Exit(code=1)
+    typer.echo(f"📦 Imported into {target}")
@@ -1,26 +1,144 @@
+import json
+import os
+import sys
+import time
 import typer
-import subprocess
+import requests
+from typing import Optional
+from solo_server.client import SoloClient
+from solo_server.config import SOLO_DIR, get_config_value
+from solo_server.utils.residency import ResidencyError, ResidencyManager, memory_budget
+from solo_server.utils.stream import StreamStats
 
-def run(model: str):
+SESSIONS_DIR = os.path.join(SOLO_DIR, "sessions")
+DEFAULT_KEEP_ALIVE = "30m"
+# A load_duration above this means the model was (re)loaded for the turn.
+COLD_LOAD_MS = 500
+
+def session_path(session_id: str) -> str:
+    return os.path.join(SESSIONS_DIR, f"{session_id}.json")
+
+def load_session(session_id: str) -> dict:
+    with open(session_path(session_id), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_session(session_id: str, session: dict):
+    os.makedirs(SESSIONS_DIR, exist_ok=True)
+    tmp_path = session_path(session_id) + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(session, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, session_path(session_id))
+
+def format_turn_stats(summary: dict) -> str:
+    """One-line per-turn report: tokens/s, TTFT and load time."""
+    parts = []
+    if "server_tokens_per_s" in summary:
+        parts.append(f"{summary['server_tokens_per_s']:.1f} tok/s")
+    if "ttft_ms" in summary:
+        parts.append(f"TTFT {summary['ttft_ms']:.0f} ms")
+    if "load_ms" in summary:
+        load = f"load {summary['load_ms']:.0f} ms"
+        if summary["load_ms"] > COLD_LOAD_MS:
+            load += " (cold load)"
+        parts.append(load)
+    return " · ".join(parts)
+
+def pull_model(client: SoloClient, model: str):
+    typer.echo(f"📥 Pulling {model}...")
+    for update in client.pull_stream(model):
+        total, completed = update.get("total"), update.get("completed")
+        if total and completed:
+            typer.echo(f"\r{update.get('status', '')} {completed * 100 // total}%", nl=False)
+        elif update.get("status"):
+            typer.echo(f"\r{update['status']}".ljust(40), nl=False)
+    typer.echo("")
+
+def chat_turn(client: SoloClient, model: str, messages: list, keep_alive: str):
+    """Streams one assistant reply to stdout and returns it with its stats."""
+    stats = StreamStats()
+    parts = []
+    for batch in client.chat_stream(model, messages, stats=stats, batched=True, keep_alive=keep_alive):
+        text = "".join(obj.get("message", {}).get("content", "") for obj in batch)
+        if text:
+            parts.append(text)
+            sys.stdout.write(text)
+            sys.stdout.flush()
+    print()
+    return {"role": "assistant", "content": "".join(parts)}, stats
+
+def run(
+    model: str,
+    resume: Optional[str] = typer.Option(None, "--resume", "-r", help="Continue a saved session"),
+    keep_alive: Optional[str] = typer.Option(None, "--keep-alive", help="How long the model stays loaded between turns (default: KEEP_ALIVE in solo.conf or 30m)"),
+):
     """
     Serves a model using Ollama and enables interactive chat.
     """
-    typer.echo(f"🚀 Starting model {model}...")
+    keep_alive = keep_alive or get_config_value("keep_alive", DEFAULT_KEEP_ALIVE)
+    if resume:
+        try:
+            session = load_session(resume)
+        except (OSError, ValueError):
+            typer.echo(f"❌ Session '{resume}' not found in {SESSIONS_DIR}", err=True)
+            raise typer.Exit(code=1)
+        session_id = resume
+        model = session.get("model", model)
+        typer.echo(f"🔁 Resuming session {session_id} ({len(session['messages'])} messages)")
+    else:
+        session_id = time.strftime("%Y%m%d-%H%M%S")
+        session = {"model": model, "created": time.time(), "messages": []}
 
-    # Check if Docker container is running
-    try:
-        check_cmd = ["docker", "ps", "-q", "-f", "name=solo"]
-        if not subprocess.run(check_cmd, capture_output=True, text=True).stdout:
+    typer.echo(f"🚀 Starting model {model}...")
+    with SoloClient() as client:
+        if not client.ping():
             typer.echo("❌ Solo server is not active. Please start solo server first.", err=True)
             return
+        try:
+            # Make room for the model up front so the first turn is not a surprise cold load.
+            ResidencyManager(client, memory_budget(), keep_alive).ensure(model)
+        except ResidencyError as e:
+            typer.echo(f"⚠️  {e}", err=True)
+        except requests.RequestException:
+            pass  # not pulled yet; the first turn pulls it
+        typer.echo("Type /bye to exit, /clear to forget the conversation.\n")
+
+        while True:
+            try:
+                prompt = input(">>> ")
+            except (EOFError, KeyboardInterrupt):
+                print()
+                break
+            if not prompt.strip():
+                continue
+            if prompt.strip() in ("/bye", "/exit"):
+                break
+            if prompt.strip() == "/clear":
+                session["messages"] = []
+                save_session(session_id, session)
+                typer.echo("🧹 Conversation cleared.")
+                continue
+
+            session["messages"].append({"role": "user", "content": prompt})
+            try:
+                try:
+                    reply, stats = chat_turn(client, model, session["messages"], keep_alive)
+                except requests.HTTPError as e:
+                    if e.response is None or e.response.status_code != 404:
+                        raise
+                    pull_model(client, model)
+                    reply, stats = chat_turn(client, model, session["messages"], keep_alive)
+            except KeyboardInterrupt:
+                print()
+                session["messages"].pop()
+                continue
+            except requests.RequestException as e:
+                session["messages"].pop()
+                typer.echo(f"❌ An error occurred: {e}", err=True)
+                continue
+
+            session["messages"].append(reply)
+            save_session(session_id, session)
+            typer.secho(format_turn_stats(stats.summary()), fg=typer.colors.BRIGHT_BLACK)
 
-        command = ["docker", "exec", "-it", "solo", "ollama", "run", model]
-        
-        # Use subprocess.run with shell=True for interactive terminal
-        process = subprocess.run(
-            " ".join(command),
-            shell=True,
-            text=True
-        )
-    except subprocess.CalledProcessError as e:
-        typer.echo(f"❌ An error occurred: {e}", err=True)
+    if session["messages"]:
+        typer.echo(f"💾 Session saved. Resume with: solo run {model} --resume {session_id}")
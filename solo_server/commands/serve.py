@@ -1,46 +1,158 @@
-import requests
+import asyncio
 import json
+import sys
+import time
+import requests
 import typer
+from typing import Optional
+from solo_server.client import SoloClient, AsyncSoloClient, DEFAULT_BASE_URL
+from solo_server.config import get_config_value
+from solo_server.utils.cache import ResponseCache
+from solo_server.utils.capture import CaptureWriter
+from solo_server.utils.stream import StreamStats
+
+def parse_prompt_line(line: str, default_model: str) -> dict:
+    """
+    Turns one JSONL line into a chat job. A line may be a bare JSON string,
+    or an object with either "prompt" or "messages" (plus optional "id",
+    "model" and "options").
+    """
+    record = json.loads(line)
+    if isinstance(record, str):
+        record = {"prompt": record}
+    messages = record.get("messages") or [{"role": "user", "content": record["prompt"]}]
+    return {
+        "id": record.get("id"),
+        "model": record.get("model", default_model),
+        "messages": messages,
+        "options": record.get("options"),
+    }
+
+async def run_batch(input_file, output, model: str, concurrency: int, base_url: str = DEFAULT_BASE_URL,
+                    options: Optional[dict] = None, cache: Optional[ResponseCache] = None,
+                    semantic: bool = False, capture: Optional[CaptureWriter] = None):
+    """
+    Sends every prompt in ``input_file`` through one pooled client with at
+    most ``concurrency`` requests in flight and writes one JSONL result per
+    prompt to ``output`` as soon as it completes. ``options`` are defaults
+    that per-line options override. Each request is appended to ``capture``
+    when given.
+    """
+    lines = enumerate(input_file)
+    counts = {"ok": 0, "error": 0}
+
+    async def worker(client):
+        for index, line in lines:
+            if not line.strip():
+                continue
+            result = {"index": index}
+            job = None
+            arrival, timings = time.time(), StreamStats()
+            try:
+                job = parse_prompt_line(line, model)
+                result.update(id=job["id"], model=job["model"])
+                job_options = {**(options or {}), **(job["options"] or {})}
+                reply = await client.chat(job["model"], job["messages"], job_options or None, stats=timings)
+                result["response"] = reply.get("message", {}).get("content", "")
+                for key in ("eval_count", "eval_duration", "total_duration"):
+                    if key in reply:
+                        result[key] = reply[key]
+                counts["ok"] += 1
+            except Exception as e:
+                result["error"] = str(e)
+                counts["error"] += 1
+            if capture is not None and job is not None:
+                capture.record(arrival, job["model"], job["messages"], job_options, timings, "error" not in result)
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+
+    async with AsyncSoloClient(base_url, max_connections=concurrency, cache=cache,
+                               semantic=semantic) as client:
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+    return counts
 
 def serve(
     model: str = typer.Option("llama3.2", "--model", "-m", help="Model to use"),
     input: str = typer.Option("Hello", "--input", "-i", help="Input text for inference"),
-    stream: bool = typer.Option(False, "--stream", "-s", help="Enable streaming mode")
+    stream: bool = typer.Option(False, "--stream", "-s", help="Enable streaming mode"),
+    input_file: Optional[str] = typer.Option(None, "--input-file", "-f", help="JSONL file of prompts to run in batch ('-' for stdin)"),
+    concurrency: int = typer.Option(4, "--concurrency", "-c", help="Requests in flight in batch mode"),
+    output: Optional[str] = typer.Option(None, "--output", "-o", help="Write batch results here instead of stdout"),
+    stats: bool = typer.Option(False, "--stats", help="Print TTFT, inter-token latency and server eval timings"),
+    temperature: Optional[float] = typer.Option(None, "--temperature", "-t", help="Sampling temperature"),
+    seed: Optional[int] = typer.Option(None, "--seed", help="Fixed sampling seed"),
+    cache: bool = typer.Option(True, "--cache/--no-cache", help="Reuse cached answers for deterministic requests"),
+    semantic_cache: Optional[bool] = typer.Option(None, "--semantic-cache/--no-semantic-cache", help="Answer near-duplicate prompts from the embedding cache (default: SEMANTIC_CACHE in solo.conf)"),
+    capture: Optional[str] = typer.Option(None, "--capture", help="Append request timings to this capture file for `solo benchmark replay`"),
+    capture_prompts: bool = typer.Option(False, "--capture-prompts", help="Also store the prompt text in the capture file"),
 ):
-    # API Endpoint
-    url = "http://localhost:11434/api/chat"
-
-    # Chat request payload
-    data = {
-        "model": model, 
-        "messages": [
-            {
-                "role": "user",
-                "content": input
-            }
-        ],
-        "stream": stream  # Set to True for streaming
-    }
+    """
+    Sends chat requests to the running Solo server.
+    """
+    options = {}
+    if temperature is not None:
+        options["temperature"] = temperature
+    if seed is not None:
+        options["seed"] = seed
+    response_cache = ResponseCache() if cache else None
+    if semantic_cache is None:
+        semantic_cache = get_config_value("semantic_cache", "false").lower() in ("1", "true", "yes", "on")
+
+    capture_writer = CaptureWriter(capture, capture_prompts) if capture else None
 
-    if data["stream"] == False:
-        # Sending POST request
-        response = requests.post(url, json=data)
-        # Check if response is valid JSON
+    if input_file:
+        source = sys.stdin if input_file == "-" else open(input_file, "r", encoding="utf-8")
+        sink = open(output, "w", encoding="utf-8") if output else sys.stdout
         try:
-            response_json = response.json()
-            if "message" in response_json and "content" in response_json["message"]:
-                print("Assistant Response:", response_json["message"]["content"])
+            counts = asyncio.run(run_batch(source, sink, model, max(1, concurrency),
+                                           options=options, cache=response_cache,
+                                           semantic=semantic_cache, capture=capture_writer))
+        finally:
+            if source is not sys.stdin:
+                source.close()
+            if sink is not sys.stdout:
+                sink.close()
+            if capture_writer is not None:
+                capture_writer.close()
+        typer.echo(f"✅ Completed {counts['ok']} prompts ({counts['error']} failed)", err=True)
+        return
+
+    messages = [{"role": "user", "content": input}]
+    timings = StreamStats() if stats or capture_writer else None
+    arrival = time.time()
+    try:
+        with SoloClient(cache=response_cache, semantic=semantic_cache) as client:
+            if not stream:
+                try:
+                    response_json = client.chat(model, messages, options or None, stats=timings)
+                except json.JSONDecodeError:
+                    print("Error: API did not return valid JSON.")
+                    return
+                except requests.RequestException as e:
+                    typer.echo(f"❌ Request failed: {e}", err=True)
+                    if capture_writer is not None:
+                        capture_writer.record(arrival, model, messages, options, timings, ok=False)
+                    return
+                if "message" in response_json and "content" in response_json["message"]:
+                    print("Assistant Response:", response_json["message"]["content"])
+                else:
+                    print("Unexpected Response:", json.dumps(response_json, indent=2))
             else:
-                print("Unexpected Response:", json.dumps(response_json, indent=2))
-        except json.JSONDecodeError:
-            print("Error: API did not return valid JSON.")
-            print("Raw Response:", response.text)
-
-
-    else:
-        with requests.post(url, json=data, stream=True) as response:
-            for line in response.iter_lines():
-                if line:
-                    json_obj = json.loads(line)
-                    if "message" in json_obj and "content" in json_obj["message"]:
-                        print(json_obj["message"]["content"], end="", flush=True)  # Streaming output
+                # One write and flush per socket read rather than per token
+                for batch in client.chat_stream(model, messages, options or None, stats=timings, batched=True):
+                    text = "".join(obj.get("message", {}).get("content", "") for obj in batch)
+                    if text:
+                        sys.stdout.write(text)
+                        sys.stdout.flush()
+                print()
+
+        if capture_writer is not None:
+            capture_writer.record(arrival, model, messages, options, timings, stream=stream)
+    finally:
+        if capture_writer is not None:
+            capture_writer.close()
+
+    if stats:
+        typer.echo("\n📊 Stream Stats", err=True)
+        for key, value in timings.summary().items():
+            typer.echo(f"{key}: {value}", err=True)
@@ -1,46 +1,141 @@
+import asyncio
 import typer
-import subprocess
-from solo_server.utils.hardware import display_hardware_info
+import time
+from typing import Optional
+from solo_server.utils.docker_api import AsyncDockerClient, docker_socket, list_containers
+from solo_server.utils.hardware import detect_hardware, display_hardware_info
+from solo_server.utils.http import AsyncConnectionPool, split_url
+from solo_server.utils.replicas import BASE_NAME, load_replicas, replica_urls
+from solo_server.utils.residency import residency_summary
+from solo_server.utils.semantic_cache import semantic_cache_summary
+from solo_server.utils.telemetry import TelemetrySampler, render_watch
 from tabulate import tabulate
-import json
+
+STATUS_TIMEOUT = 2
 
 app = typer.Typer()
 
+def format_size(size: int) -> str:
+    """Decimal units, as `ollama list` prints them."""
+    if size < 1000:
+        return f"{size} B"
+    for unit in ("KB", "MB", "GB"):
+        size /= 1000
+        if size < 1000 or unit == "GB":
+            return f"{size:.1f} {unit}"
+
+
+async def _ollama_get(pool: AsyncConnectionPool, path: str):
+    async with pool.request("GET", path) as response:
+        await response.raise_for_status()
+        return await response.json()
+
+
+async def probe_status(replicas):
+    """
+    Running containers (Docker Engine API) plus every replica's models and
+    loaded models (Ollama /api/tags and /api/ps), all fetched concurrently.
+    """
+    async def containers():
+        if not docker_socket():
+            return await asyncio.to_thread(list_containers, BASE_NAME, False)
+        client = AsyncDockerClient(timeout=STATUS_TIMEOUT)
+        try:
+            return await client.containers(BASE_NAME, all=False)
+        finally:
+            await client.close()
+
+    pools = []
+    probes = [containers()]
+    for url in replica_urls(replicas):
+        host, port, prefix = split_url(url)
+        pool = AsyncConnectionPool(host, port, max_connections=2, timeout=STATUS_TIMEOUT)
+        pools.append(pool)
+        probes += [_ollama_get(pool, f"{prefix}/api/tags"), _ollama_get(pool, f"{prefix}/api/ps")]
+    try:
+        results = await asyncio.gather(*probes, return_exceptions=True)
+    finally:
+        await asyncio.gather(*(pool.close() for pool in pools))
+
+    def ok(result):
+        return not isinstance(result, BaseException)
+
+    tags = [r for r in results[1::2] if ok(r)]
+    ps = [r for r in results[2::2] if ok(r)]
+    return {
+        "containers": results[0] if ok(results[0]) else [],
+        "models": tags[0].get("models", []) if tags else [],
+        "resident": {m["name"] for r in ps for m in r.get("models", [])},
+    }
+
+
+def watch_status(interval: Optional[float] = None, dump: Optional[str] = None, frames: Optional[int] = None):
+    """
+    Redraws live sparklines until interrupted (or for ``frames`` redraws).
+    Every frame reads the sampler's buffers; only the sampler probes the host.
+    """
+    hardware = detect_hardware()
+    sampler = TelemetrySampler(interval, hardware=hardware)
+    sampler.start()
+    drawn = 0
+    try:
+        while frames is None or drawn < frames:
+            time.sleep(sampler.interval)
+            typer.echo("\033[H\033[J", nl=False)  # clear the screen
+            typer.echo(f"🖥️  {hardware.cpu_model} | {hardware.memory_gb}GB | {hardware.gpu_model} "
+                       f"(every {sampler.interval:g}s, last {sampler.capacity} samples, Ctrl+C to stop)\n")
+            typer.echo("\n".join(render_watch(sampler.snapshot())))
+            drawn += 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sampler.stop()
+        if dump:
+            sampler.dump(dump)
+            typer.echo(f"💾 Telemetry written to {dump}")
+
+
 @app.command()
-def status():
+def status(
+    watch: bool = typer.Option(False, "--watch", "-w", help="Show live host metrics with sparklines and rolling p95"),
+    interval: Optional[float] = typer.Option(None, "--interval", help="Seconds between samples (default: TELEMETRY_INTERVAL in solo.conf, or 1)"),
+    dump: Optional[str] = typer.Option(None, "--dump", help="With --watch, write the sampled buffers to this .npz file on exit"),
+):
     """Check running models and system status."""
+    if watch:
+        watch_status(interval, dump)
+        return
     display_hardware_info(typer)
-    
-    # Check for running solo container
-    container_result = subprocess.run(["docker", "ps", "-f", "name=solo", "--format", "{{json .}}"],
-                                    capture_output=True, text=True, check=True)
-    
-    if container_result.stdout.strip():
+    replicas = load_replicas()
+    probe = asyncio.run(probe_status(replicas))
+    running_containers = probe["containers"]
+
+    if running_containers and probe["models"]:
         # Container is running, show available models
         typer.echo("\n🔍 Available Models:")
-        models_result = subprocess.run(["docker", "exec", "solo", "ollama", "list"], 
-                                     capture_output=True, text=True, check=True)
-        models = []
-        for line in models_result.stdout.strip().split('\n'):
-            parts = line.split()
-            if len(parts) >= 7:
-                size = f"{parts[2]} {parts[3]}"
-                modified = f"{parts[4]} {parts[5]} {parts[6]}"
-                models.append([parts[0], parts[1], size, modified])
-
-        if models:
-            print(tabulate(models, headers=['NAME', 'ID', 'SIZE', 'MODIFIED'], tablefmt='grid'))
-    
+        models = [[m['name'], m.get('digest', '')[:12], format_size(m.get('size', 0)),
+                   m.get('modified_at', '')[:16].replace('T', ' ')] for m in probe["models"]]
+        print(tabulate(models, headers=['NAME', 'ID', 'SIZE', 'MODIFIED'], tablefmt='grid'))
+
     # Show running containers section (will be empty if none running)
     typer.echo("\n🔍 Running Containers:")
-    containers = []
-    if container_result.stdout.strip():
-        for line in container_result.stdout.strip().split('\n'):
-            container = json.loads(line)
-            containers.append([
-                container['Names'],
-                container['Status'],
-                container['Ports']
-            ])
-    
+    containers = [[c['name'], c['status'], c['ports']] for c in running_containers]
     print(tabulate(containers, headers=['NAME', 'STATUS', 'PORTS'], tablefmt='grid'))
+
+    if len(replicas) > 1:
+        typer.echo("\n🧩 Replica Set:")
+        running = {row[0]: row[1] for row in containers}
+        rows = [[r['name'], r['port'], r.get('cpuset') or 'all', running.get(r['name'], 'stopped')]
+                for r in replicas]
+        print(tabulate(rows, headers=['NAME', 'PORT', 'CPUSET', 'STATUS'], tablefmt='grid'))
+
+    semantic_rows = semantic_cache_summary()
+    if semantic_rows:
+        typer.echo("\n🧠 Semantic Cache:")
+        print(tabulate(semantic_rows, headers=['MODEL', 'ENTRIES', 'INDEX SIZE', 'HIT RATE', 'AVG LOOKUP'], tablefmt='grid'))
+
+    resident = probe["resident"] if running_containers else None
+    residency_rows = residency_summary(resident=resident)
+    if residency_rows:
+        typer.echo("\n📦 Model Residency:")
+        print(tabulate(residency_rows, headers=['MODEL', 'LOADED', 'SIZE', 'COLD LOADS', 'AVG LOAD', 'MAX LOAD'], tablefmt='grid'))
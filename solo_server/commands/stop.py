@@ -1,5 +1,7 @@
 import typer
 import subprocess
+from solo_server.utils.docker_api import DockerError, stop_containers
+from solo_server.utils.replicas import load_replicas
 
 def stop(name: str = ""):
     """
@@ -7,15 +9,12 @@ def stop(name: str = ""):
     """
     typer.echo("🛑 Stopping Solo Server...")
 
+    names = [name] if name else [replica["name"] for replica in load_replicas()]
     try:
-        # Stop the Docker container
-        subprocess.run(
-            ["docker", "stop", "solo"],
-            check=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
+        # Stop the Docker container(s)
+        stop_containers(names)
+        if len(names) > 1:
+            typer.echo(f"✅ Stopped {len(names)} replicas: {', '.join(names)}")
         typer.echo("✅ Solo server stopped successfully.")
 
         # # Remove the container
@@ -30,5 +29,7 @@ def stop(name: str = ""):
 
     except subprocess.CalledProcessError as e:
         typer.echo(f"❌ Failed to stop Solo Server: {e.stderr}", err=True)
+    except DockerError as e:
+        typer.echo(f"❌ Failed to stop Solo Server: {e}", err=True)
     except Exception as e:
         typer.echo(f"⚠️ Unexpected error: {e}", err=True)
@@ -0,0 +1,43 @@
+import typer
+from tabulate import tabulate
+from solo_server.utils.gpus import gpu_inventory
+from solo_server.utils.hardware import GIB
+from solo_server.utils.replicas import format_cpuset, load_replicas, plan_replicas
+from solo_server.utils.topology import physical_cores, plan_placement, read_topology
+
+
+def topology(
+    replicas: int = typer.Option(0, "--replicas", "-r", min=0, help="Show the placement for this many replicas instead of the running set"),
+):
+    """Show CPU/NUMA topology and how Solo pins its containers to it."""
+    topo = read_topology()
+    typer.echo("🧬 CPU Topology")
+    typer.echo(f"Sockets: {len(topo.sockets)}  NUMA nodes: {len(topo.nodes)}  L3 domains: {len(topo.l3_domains)}")
+    typer.echo(f"Logical CPUs: {len(topo.cpus)}  Physical cores: {physical_cores(topo.cpus)}  "
+               f"SMT: {'yes' if topo.smt else 'no'}  Hybrid P/E cores: {'yes' if topo.hybrid else 'no'}")
+
+    rows = []
+    for node in topo.nodes:
+        cpus = [cpu for cpu in topo.cpus if cpu.node == node]
+        kinds = ""
+        if topo.hybrid:
+            kinds = f"{sum(c.kind == 'P' for c in cpus)}P/{sum(c.kind == 'E' for c in cpus)}E"
+        rows.append([node, format_cpuset([c.id for c in cpus]), physical_cores(cpus), kinds,
+                     f"{topo.node_memory_gb[node]}GB" if node in topo.node_memory_gb else "-"])
+    print(tabulate(rows, headers=["NODE", "CPUS", "CORES", "P/E", "MEMORY"], tablefmt="grid"))
+
+    devices = gpu_inventory()
+    if devices:
+        typer.echo("\n🎮 GPUs")
+        rows = [[d.index, d.vendor, d.model, f"{d.memory_bytes / GIB:.1f}GB", f"{d.used_bytes / GIB:.1f}GB",
+                 f"{d.load:.0f}%"] for d in devices]
+        print(tabulate(rows, headers=["INDEX", "VENDOR", "MODEL", "MEMORY", "USED", "LOAD"], tablefmt="grid"))
+
+    plan = plan_replicas(replicas, placement=plan_placement(topo, replicas)) if replicas else load_replicas()
+    typer.echo("\n📌 Placement" + (" (planned)" if replicas else ""))
+    rows = [[r["name"], r["port"], r.get("cpuset") or "all", r.get("cpuset_mems") or "all",
+             r.get("num_thread") or "auto", r.get("shm_size") or "-",
+             ",".join(map(str, r["gpus"])) if r.get("gpus") else "all" if devices else "-",
+             ", ".join(r.get("models") or [])] for r in plan]
+    print(tabulate(rows, headers=["NAME", "PORT", "CPUSET", "MEMS", "NUM_THREAD", "SHM", "GPUS", "MODELS"],
+                   tablefmt="grid"))
@@ -0,0 +1,123 @@
+import asyncio
+import subprocess
+import time
+import typer
+from typing import Dict, List
+from tabulate import tabulate
+from solo_server.client import SoloClient, DEFAULT_BASE_URL
+from solo_server.commands.benchmark import run_load
+from solo_server.start import build_run_command
+from solo_server.utils.docker_api import DockerError, container_env, remove_container
+from solo_server.utils.hardware import detect_hardware, hardware_fingerprint
+from solo_server.utils.nvidia import check_nvidia_toolkit
+from solo_server.utils.replicas import load_replicas
+from solo_server.utils.tuner import (ENV_KNOBS, candidate_grid, default_space, save_profile,
+                                     split_candidate, successive_halving)
+
+READY_TIMEOUT = 60
+
+
+def relaunch_server(env: Dict[str, str], hardware, url: str):
+    """
+    Recreates the Solo container with ``env`` and waits until it answers.
+    """
+    replica = load_replicas()[0]
+    gpu_vendor = hardware.gpu_vendor
+    use_gpu = gpu_vendor == "NVIDIA" and check_nvidia_toolkit(hardware.os)
+    remove_container(replica["name"])
+    subprocess.run(build_run_command(replica, gpu_vendor, use_gpu, env), check=True, capture_output=True)
+    with SoloClient(url) as client:
+        deadline = time.time() + READY_TIMEOUT
+        while not client.ping(timeout=1):
+            if time.time() > deadline:
+                raise RuntimeError(f"Server did not come back within {READY_TIMEOUT}s")
+            time.sleep(0.5)
+
+
+def describe(candidate: Dict) -> str:
+    return " ".join(f"{k}={v}" for k, v in candidate.items())
+
+
+def tune(
+    model: str = typer.Argument(..., help="Model to tune"),
+    url: str = typer.Option(DEFAULT_BASE_URL, "--url", help="Ollama server to tune"),
+    restart: bool = typer.Option(False, "--restart", help="Also sweep OLLAMA_NUM_PARALLEL and OLLAMA_FLASH_ATTENTION, recreating the container for each"),
+    yes: bool = typer.Option(False, "--yes", "-y", help="Recreate the container without asking"),
+    max_candidates: int = typer.Option(12, "--max-candidates", min=1, help="Configurations sampled from the full grid"),
+    min_requests: int = typer.Option(4, "--min-requests", min=1, help="Requests per configuration in the first round"),
+    eta: int = typer.Option(2, "--eta", min=2, help="Keep 1/eta of the configurations after each round"),
+    concurrency: int = typer.Option(2, "--concurrency", "-c", min=1, help="Requests in flight when OLLAMA_NUM_PARALLEL is not swept"),
+    prompt_tokens: str = typer.Option("128", "--prompt-tokens", help="Prompt length of the synthetic workload"),
+    output_tokens: str = typer.Option("64", "--output-tokens", help="Output length of the synthetic workload"),
+    seed: int = typer.Option(0, "--seed", help="Seed for sampling configurations and prompts"),
+):
+    """
+    Finds the fastest runtime settings for a model and saves them to solo.conf.
+    """
+    if restart:
+        replicas = load_replicas()
+        if len(replicas) > 1:
+            typer.echo(f"❌ --restart recreates a single container, but {len(replicas)} replicas are running. "
+                       "Run `solo start --replicas 1` first, or tune without --restart.", err=True)
+            raise typer.Exit(code=1)
+        if not yes:
+            typer.confirm(f"--restart will remove and recreate the {replicas[0]['name']} container "
+                          "several times. Continue?", abort=True)
+        # Put back if the sweep fails or is interrupted
+        original_env = {k: v for k, v in container_env(replicas[0]["name"]).items() if k in ENV_KNOBS}
+    hardware = detect_hardware()
+    fingerprint = hardware_fingerprint(hardware)
+    space = default_space(hardware.cpu_cores)
+    if not restart:
+        for key in ENV_KNOBS:
+            space.pop(key)
+    candidates = candidate_grid(space, max_candidates, seed)
+    typer.echo(f"🔧 Tuning {model} over {len(candidates)} configurations (hardware {fingerprint})")
+    current_env = None
+
+    def evaluate(rung: List[Dict], budget: int) -> List[float]:
+        nonlocal current_env
+        scores = {}
+        # Group by server environment so each one costs a single restart.
+        order = sorted(range(len(rung)), key=lambda i: sorted(split_candidate(rung[i])[1].items()))
+        for i in order:
+            options, env = split_candidate(rung[i])
+            if restart and env != current_env:
+                relaunch_server(env, hardware, url)
+                current_env = env
+            streams = int(env.get("OLLAMA_NUM_PARALLEL", concurrency))
+            result = asyncio.run(run_load(model, url, streams, requests=budget * streams,
+                                          prompt_tokens=prompt_tokens, output_tokens=output_tokens,
+                                          seed=seed, options=options))
+            tokens = sum(s["tokens"] or 0 for s in result["samples"])
+            scores[i] = 0.0 if result["errors"] else tokens / (result["duration_s"] or 1e-9)
+            typer.echo(f"  {scores[i]:8.1f} tok/s  {describe(rung[i])}")
+        return [scores[i] for i in range(len(rung))]
+
+    final_env = original_env if restart else {}
+    try:
+        try:
+            best, score, history = successive_halving(candidates, evaluate, min_requests, eta)
+        except (subprocess.CalledProcessError, DockerError, RuntimeError) as e:
+            typer.echo(f"❌ Tuning failed: {e}", err=True)
+            raise typer.Exit(code=1)
+
+        if score <= 0:
+            typer.echo("❌ Every configuration failed; nothing saved.", err=True)
+            raise typer.Exit(code=1)
+
+        rows = [[rung, budget, describe(candidate), f"{s:.1f}"] for rung, budget, candidate, s in history]
+        print(tabulate(rows, headers=["ROUND", "REQUESTS", "CONFIGURATION", "TOK/S"], tablefmt="grid"))
+        save_profile(model, fingerprint, best, score)
+        typer.secho(f"✅ Best: {describe(best)} ({score:.1f} tok/s), saved to solo.conf", fg=typer.colors.BRIGHT_CYAN)
+        _, final_env = split_candidate(best)
+    finally:
+        # Every exit leaves the container on the winner or on its pre-tune settings.
+        if restart and current_env is not None and final_env != current_env:
+            try:
+                relaunch_server(final_env, hardware, url)
+            except (subprocess.CalledProcessError, DockerError, RuntimeError) as e:
+                typer.echo(f"❌ Could not relaunch the server with {describe(final_env) or 'default settings'}: {e}",
+                           err=True)
+    if final_env and not restart:
+        typer.echo("Run `solo start` to apply the server settings.")
@@ -1,7 +1,8 @@
 import os
 import configparser
 
-CONFIG_FILE = os.path.expanduser("~/.solo/solo.conf")
+SOLO_DIR = os.path.expanduser("~/.solo")
+CONFIG_FILE = os.path.join(SOLO_DIR, "solo.conf")
 
 def load_config():
     """Loads configuration from solo.conf."""
@@ -18,5 +19,6 @@ def get_config_value(key, default=None):
 
 def save_config(config):
     """Saves configuration to solo.conf."""
+    os.makedirs(SOLO_DIR, exist_ok=True)
     with open(CONFIG_FILE, "w") as configfile:
         config.write(configfile)
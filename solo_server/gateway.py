@@ -0,0 +1,308 @@
+import asyncio
+import hashlib
+import json
+import time
+import typer
+from typing import Dict, List, Optional
+from solo_server.client import DEFAULT_BASE_URL
+from solo_server.config import get_config_value
+from solo_server.utils.balancer import LeastOutstandingBalancer
+from solo_server.utils.http import (
+    AsyncConnectionPool, HTTPError, format_chunk, format_head, read_request, split_url, write_json,
+)
+from solo_server.utils.replicas import replica_urls
+from solo_server.utils.scheduler import Overloaded, Scheduler, estimate_cost
+from solo_server.utils.usage import openai_usage, record_usage
+
+DEFAULT_GATEWAY_PORT = 5070
+
+# OpenAI-compatible routes forwarded to Ollama, which serves the same paths.
+FORWARDED_PATHS = ("/v1/chat/completions", "/v1/embeddings", "/v1/models")
+COALESCED_PATHS = ("/v1/chat/completions", "/v1/embeddings")
+LOADED_REFRESH_SECONDS = 5.0
+
+
+def request_key(path: str, body: bytes) -> str:
+    """Identity of a request for coalescing; JSON bodies are canonicalised."""
+    try:
+        canonical = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")).encode()
+    except ValueError:
+        canonical = body
+    return hashlib.sha256(path.encode() + b"\0" + canonical).hexdigest()
+
+
+class UpstreamCall:
+    """
+    One upstream request whose response is fanned out to every subscriber.
+
+    Chunks are kept for the lifetime of the call so that a caller who joins
+    after the first tokens were sent still receives the whole body. Once
+    every subscriber has disconnected the call is cancelled, so Ollama
+    stops generating tokens nobody will read.
+    """
+
+    def __init__(self, key: Optional[str] = None):
+        self.key = key
+        self.task = None
+        self.status = None
+        self.headers = {}
+        self.chunks = []
+        self.done = False
+        self.error = None
+        self.subscribers = 0
+        self.ready = asyncio.Event()
+        self._changed = asyncio.Event()
+
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def start(self, status: int, headers: Dict[str, str]):
+        self.status = status
+        self.headers = headers
+        self.ready.set()
+
+    def publish(self, chunk: bytes):
+        self.chunks.append(chunk)
+        self._notify()
+
+    def finish(self, error: Optional[Exception] = None):
+        self.error = error
+        self.done = True
+        self.ready.set()
+        self._notify()
+
+    async def follow(self):
+        index = 0
+        while True:
+            changed = self._changed
+            while index < len(self.chunks):
+                yield self.chunks[index]
+                index += 1
+            if self.done:
+                return
+            await changed.wait()
+
+
+class Gateway:
+    """
+    asyncio HTTP server exposing Ollama's OpenAI-compatible API.
+
+    Identical requests that arrive while one is already in flight are
+    attached to that upstream call instead of starting a new generation.
+    With a :class:`Scheduler`, every request is charged to its API key's
+    rate limit and each upstream generation waits for a scheduler slot.
+    With several upstreams (``solo start --replicas N``) each call is
+    routed by :class:`LeastOutstandingBalancer`.
+    """
+
+    def __init__(self, upstream: str = DEFAULT_BASE_URL, max_connections: int = 32,
+                 scheduler: Optional[Scheduler] = None, upstreams: Optional[List[str]] = None):
+        self.upstreams = []
+        for url in upstreams or [upstream]:
+            host, port, prefix = split_url(url)
+            self.upstreams.append((prefix, AsyncConnectionPool(host, port, max_connections)))
+        self.balancer = LeastOutstandingBalancer(len(self.upstreams))
+        self.scheduler = scheduler
+        self.inflight: Dict[str, UpstreamCall] = {}
+        self._tasks = set()
+        self.counters = {"requests": 0, "upstream_requests": 0, "coalesced": 0, "errors": 0, "abandoned": 0}
+
+    async def _fetch(self, call: UpstreamCall, method: str, path: str, body: bytes,
+                     key: Optional[str], priority: str, model: Optional[str]):
+        error = None
+        slot = False
+        replica = None
+        try:
+            if self.scheduler is not None and key is not None:
+                try:
+                    await self.scheduler.acquire(priority)
+                    slot = True
+                except Overloaded as e:
+                    call.start(429, {"Content-Type": "application/json",
+                                     "Retry-After": str(max(1, round(e.retry_after)))})
+                    call.publish(json.dumps({"error": {"message": str(e)}}).encode())
+                    return
+            self.counters["upstream_requests"] += 1
+            replica = self.balancer.acquire(model)
+            prefix, pool = self.upstreams[replica]
+            async with pool.request(method, f"{prefix}{path}", body,
+                                    {"Content-Type": "application/json"}) as response:
+                call.start(response.status, {
+                    "Content-Type": response.headers.get("content-type", "application/json"),
+                })
+                async for chunk in response.iter_chunks():
+                    call.publish(chunk)
+            if path == "/v1/chat/completions" and call.status == 200:
+                # Once per upstream generation, however many callers shared it.
+                reply = openai_usage(b"".join(call.chunks))
+                if reply is not None:
+                    record_usage(reply, time.time())
+        except asyncio.CancelledError:
+            error = ConnectionAbortedError("Every caller disconnected")
+            raise
+        except Exception as e:
+            error = e
+            self.counters["errors"] += 1
+        finally:
+            if replica is not None:
+                self.balancer.release(replica, model, error is None and (call.status or 500) < 400)
+            if slot:
+                self.scheduler.release()
+            if key is not None and self.inflight.get(key) is call:
+                del self.inflight[key]
+            call.finish(error)
+
+    def _upstream(self, method: str, path: str, body: bytes,
+                  priority: str = "interactive", model: Optional[str] = None) -> UpstreamCall:
+        key = request_key(path, body) if method == "POST" and path in COALESCED_PATHS else None
+        call = self.inflight.get(key) if key else None
+        if call is not None:
+            self.counters["coalesced"] += 1
+        else:
+            call = UpstreamCall(key)
+            if key:
+                self.inflight[key] = call
+            # Hold a reference so the fetch outlives any single subscriber.
+            call.task = asyncio.ensure_future(self._fetch(call, method, path, body, key, priority, model))
+            self._tasks.add(call.task)
+            call.task.add_done_callback(self._tasks.discard)
+        call.subscribers += 1
+        return call
+
+    def _unsubscribe(self, call: UpstreamCall):
+        call.subscribers -= 1
+        if call.subscribers > 0 or call.done:
+            return
+        # Nobody is left to read the reply; stop new requests from joining it.
+        if call.key is not None and self.inflight.get(call.key) is call:
+            del self.inflight[call.key]
+        self.counters["abandoned"] += 1
+        call.task.cancel()
+
+    async def _relay(self, writer: asyncio.StreamWriter, call: UpstreamCall):
+        try:
+            await call.ready.wait()
+            if call.status is None:
+                await write_json(writer, 502, {"error": {"message": f"Upstream unavailable: {call.error}"}})
+                return
+            headers = dict(call.headers, **{"Transfer-Encoding": "chunked"})
+            writer.write(format_head(call.status, headers))
+            async for chunk in call.follow():
+                writer.write(format_chunk(chunk))
+                await writer.drain()
+            if call.error is not None:
+                raise ConnectionResetError("Upstream failed mid-response")
+            writer.write(format_chunk(b""))
+            await writer.drain()
+        finally:
+            self._unsubscribe(call)
+
+    def stats(self) -> Dict:
+        stats = dict(self.counters, inflight=len(self.inflight))
+        if self.scheduler is not None:
+            stats["scheduler"] = self.scheduler.snapshot()
+        stats["replicas"] = self.balancer.snapshot()
+        return stats
+
+    def _admit(self, headers: Dict[str, str], payload: Dict):
+        """Charges the request to its tenant; raises :class:`Overloaded` when over limit."""
+        if self.scheduler is None:
+            return
+        auth = headers.get("authorization", "")
+        tenant = auth[7:].strip() if auth.lower().startswith("bearer ") else "anonymous"
+        self.scheduler.check_rate(tenant, estimate_cost(payload))
+
+    @staticmethod
+    async def _loaded_models(prefix: str, pool: AsyncConnectionPool) -> List[str]:
+        async with pool.request("GET", f"{prefix}/api/ps") as response:
+            return [m.get("name", "") for m in (await response.json()).get("models", [])]
+
+    async def _refresh_loaded(self):
+        """Keeps the balancer's view of which replica has which model loaded current."""
+        while True:
+            for index, (prefix, pool) in enumerate(self.upstreams):
+                try:
+                    models = await asyncio.wait_for(self._loaded_models(prefix, pool), 2.0)
+                    self.balancer.update_loaded(index, models)
+                except (OSError, ValueError, asyncio.TimeoutError):
+                    self.balancer.update_loaded(index, [], healthy=False)
+            await asyncio.sleep(LOADED_REFRESH_SECONDS)
+
+    async def dispatch(self, writer: asyncio.StreamWriter, method: str, path: str,
+                       headers: Dict[str, str], body: bytes):
+        path = path.split("?", 1)[0]
+        if path == "/health":
+            return await write_json(writer, 200, {"status": "ok"})
+        if path == "/solo/stats":
+            return await write_json(writer, 200, self.stats())
+        if path == "/solo/scheduler" and self.scheduler is not None:
+            return await write_json(writer, 200, self.scheduler.snapshot())
+        if path not in FORWARDED_PATHS:
+            return await write_json(writer, 404, {"error": {"message": f"Unknown route {path}"}})
+        try:
+            payload = json.loads(body) if body else {}
+        except ValueError:
+            payload = {}
+        payload = payload if isinstance(payload, dict) else {}
+        if method == "POST":
+            try:
+                self._admit(headers, payload)
+            except Overloaded as e:
+                return await write_json(writer, 429, {"error": {"message": str(e)}},
+                                        {"Retry-After": str(max(1, round(e.retry_after)))})
+        priority = headers.get("x-solo-priority", "interactive").lower()
+        call = self._upstream(method, path, body, priority, payload.get("model"))
+        await self._relay(writer, call)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except HTTPError as e:
+                    await write_json(writer, e.status, {"error": {"message": e.body.decode()}},
+                                     {"Connection": "close"})
+                    break
+                if request is None:
+                    break
+                self.counters["requests"] += 1
+                method, path, headers, body = request
+                await self.dispatch(writer, method, path, headers, body)
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str, port: int, ready: Optional[asyncio.Event] = None):
+        server = await asyncio.start_server(self.handle, host, port)
+        self.sockets = server.sockets
+        if len(self.upstreams) > 1:
+            refresher = asyncio.ensure_future(self._refresh_loaded())
+            self._tasks.add(refresher)
+        if ready is not None:
+            ready.set()
+        async with server:
+            await server.serve_forever()
+
+
+def gateway(
+    host: str = typer.Option("127.0.0.1", "--host", help="Interface to listen on"),
+    port: Optional[int] = typer.Option(None, "--port", "-p", help="Port to listen on (default: GATEWAY_PORT in solo.conf or 5070)"),
+    upstream: Optional[List[str]] = typer.Option(None, "--upstream", "-u", help="Ollama server(s) to forward to (default: the replicas from `solo start`)"),
+    admission: bool = typer.Option(True, "--admission/--no-admission", help="Apply per-key rate limits and priority queueing"),
+):
+    """
+    Runs an OpenAI-compatible gateway in front of the Solo server.
+    """
+    if port is None:
+        port = int(get_config_value("gateway_port", DEFAULT_GATEWAY_PORT))
+    upstreams = upstream or replica_urls()
+    typer.echo(f"🚪 Solo gateway listening on http://{host}:{port}/v1 → {', '.join(upstreams)}")
+    try:
+        scheduler = Scheduler.from_config() if admission else None
+        asyncio.run(Gateway(scheduler=scheduler, upstreams=upstreams).serve(host, port))
+    except KeyboardInterrupt:
+        typer.echo("🛑 Gateway stopped.")
@@ -1,10 +1,30 @@
 import typer
 import subprocess
 import shutil
-import time
 import platform
-from solo_server.utils.hardware import detect_hardware, display_hardware_info
+import sqlite3
+import requests
+from typing import Optional
+from solo_server.client import SoloClient
+from solo_server.config import get_config_value
+from solo_server.utils.balancer import normalize_model
+from solo_server.utils.bench_store import BenchStore
+from solo_server.utils.docker_api import (DockerError, container_env, engine_running, image_exists, inspect_container,
+                                          list_containers, pull_image, remove_container, start_container,
+                                          stop_containers)
+from solo_server.utils.fit import estimate_model_bytes
+from solo_server.utils.gpus import gpu_inventory, gpu_run_args, plan_gpu_placement, split_devices
+from solo_server.utils.hardware import detect_hardware, display_hardware_info, hardware_fingerprint
 from solo_server.utils.nvidia import check_nvidia_toolkit, install_nvidia_toolkit_linux, install_nvidia_toolkit_windows
+from solo_server.utils.replicas import BASE_NAME, load_replicas, plan_replicas, replica_urls, save_replicas
+from solo_server.utils.topology import plan_placement, read_topology
+from solo_server.utils.residency import (DEFAULT_BUDGET_FRACTION, ResidencyError, ResidencyManager,
+                                         known_model_sizes, memory_budget)
+from solo_server.utils.startup import (ENGINE_TIMEOUT, PhaseTimer, PullProgress, port_in_use, run_steps, wait_for,
+                                       wait_until_ready)
+from solo_server.utils.tuner import tuned_env
+
+PULL_POLICIES = ("missing", "always", "never")
 
 def start_docker_engine(os_name):
     """
@@ -54,21 +74,200 @@ def start_docker_engine(os_name):
 
         elif os_name == "Darwin":  # macOS
             subprocess.run(["open", "/Applications/Docker.app"], check=True, capture_output=True)
-        time.sleep(5) # Wait for Docker to start
     except subprocess.CalledProcessError:
         typer.echo("❌ Failed to start Docker. Please start Docker with admin privileges manually.", err=True)
         return False
     return True
 
-def start():
+def ollama_image(gpu_vendor):
+    """The Ollama image for this GPU vendor (ROCm builds are tagged separately)."""
+    return "ollama/ollama:rocm" if gpu_vendor == "AMD" else "ollama/ollama"
+
+def ensure_engine(os_name):
+    """
+    Starts the Docker engine if it is not running and waits for it.
+    """
+    if engine_running():
+        return
+    typer.echo("Docker daemon is not running. Attempting to start Docker...", err=True)
+    if not start_docker_engine(os_name):
+        raise typer.Exit(code=1)
+    # Wait for the daemon to come up
+    if not wait_for(engine_running, ENGINE_TIMEOUT):
+        typer.echo("❌ Docker commands are not working as expected.", err=True)
+        typer.echo("Try running the terminal with admin privileges.", err=True)
+        raise typer.Exit(code=1)
+
+def ensure_image(reference, pull="missing"):
+    """
+    Pulls ``reference`` unless it is already present (``missing``); returns
+    whether a pull ran. Progress is printed per layer.
+    """
+    if pull == "never" or (pull == "missing" and image_exists(reference)):
+        return False
+    typer.echo(f"📥 Pulling {reference}...")
+    progress = PullProgress(reference)
+
+    def show(event):
+        for line in progress.feed(event):
+            typer.echo(line)
+
+    pull_image(reference, show)
+    return True
+
+def record_startup(timer, hardware, replicas, created, pulled):
+    """Adds this start's cold-to-ready time to the startup history in bench.db."""
+    try:
+        store = BenchStore()
+        try:
+            store.record_startup(timer.total() * 1000, {k: v * 1000 for k, v in timer.phases.items()},
+                                 hardware_fingerprint(hardware), replicas, created, pulled)
+        finally:
+            store.close()
+    except (sqlite3.Error, OSError):
+        pass
+
+def build_run_command(replica, gpu_vendor, use_gpu, env=None):
+    """
+    Builds the `docker run` command for one Ollama replica.
+    """
+    port = replica["port"]
+    docker_run_cmd = ["docker", "run", "-d", "--name", replica["name"], "-v", "ollama:/root/.ollama",
+                      "-p", f"{port}:11434"]
+    for key, value in sorted((env or {}).items()):
+        docker_run_cmd += ["-e", f"{key}={value}"]
+    if replica.get("gpus") and gpu_vendor == "AMD":
+        docker_run_cmd += gpu_run_args(gpu_vendor, replica["gpus"])
+    if replica.get("cpuset"):
+        docker_run_cmd += ["--cpuset-cpus", replica["cpuset"]]
+    if replica.get("cpuset_mems"):
+        docker_run_cmd += ["--cpuset-mems", replica["cpuset_mems"]]
+    if replica.get("shm_size"):
+        docker_run_cmd += ["--shm-size", replica["shm_size"]]
+    for ulimit in replica.get("ulimits") or []:
+        docker_run_cmd += ["--ulimit", ulimit]
+    if gpu_vendor == "NVIDIA" and use_gpu:
+        docker_run_cmd += gpu_run_args(gpu_vendor, replica.get("gpus")) or ["--gpus", "all"]
+    elif gpu_vendor == "AMD":
+        docker_run_cmd += ["--device", "/dev/kfd", "--device", "/dev/dri"]
+    docker_run_cmd.append(ollama_image(gpu_vendor))
+    return docker_run_cmd
+
+def _gpu_request(host_config):
+    """The GPUs a container was given with --gpus: "all", a list of device ids, or None."""
+    for request in host_config.get("DeviceRequests") or []:
+        if request.get("DeviceIDs"):
+            return sorted(request["DeviceIDs"])
+        if request.get("Count") == -1:
+            return "all"
+    return None
+
+def replica_drift(details, replica, gpu_vendor, use_gpu, env=None):
+    """
+    Settings of an existing replica container that differ from the plan
+    (CPU and memory node pins, GPU devices, tuned environment).
+    """
+    host_config = details.get("HostConfig") or {}
+    current_env = container_env(replica["name"], details)
+    drift = []
+    if (host_config.get("CpusetCpus") or "") != (replica.get("cpuset") or ""):
+        drift.append("CPU set")
+    if (host_config.get("CpusetMems") or "") != (replica.get("cpuset_mems") or ""):
+        drift.append("memory nodes")
+    if gpu_vendor == "NVIDIA" and use_gpu:
+        wanted = sorted(str(i) for i in replica["gpus"]) if replica.get("gpus") else "all"
+        if _gpu_request(host_config) != wanted:
+            drift.append("GPUs")
+    elif gpu_vendor == "AMD":
+        wanted = ",".join(str(i) for i in replica.get("gpus") or []) or None
+        if current_env.get("ROCR_VISIBLE_DEVICES") != wanted:
+            drift.append("GPUs")
+    if env and any(current_env.get(k) != v for k, v in env.items()):
+        drift.append("tuned settings")
+    return drift
+
+def assign_gpus(devices, replicas, models):
+    """
+    GPU devices (and models) per replica on multi-GPU hosts.
+
+    With ``--preload`` and a single requested replica, the models are
+    bin-packed onto devices and every device group gets its own replica;
+    if any model's size is unknown, one replica keeps every device.
+    Otherwise devices are dealt round-robin across the replicas.
+    """
+    if len(devices) < 2:
+        return []
+    fraction = float(get_config_value("residency_budget_fraction", DEFAULT_BUDGET_FRACTION))
+    memory = {d.index: d.memory_bytes for d in devices}
+    if models and replicas == 1:
+        sizes = known_model_sizes()
+        for model in models:
+            if normalize_model(model) not in sizes:
+                estimated = estimate_model_bytes(model)
+                if estimated:
+                    sizes[normalize_model(model)] = estimated
+        unknown = [m for m in models if normalize_model(m) not in sizes]
+        if unknown:
+            # Best fit would stack unsized models on one device.
+            typer.echo(f"⚠️  No size recorded yet for {', '.join(unknown)}; keeping every GPU in one replica")
+            return []
+        placement = plan_gpu_placement({m: sizes[normalize_model(m)] for m in models}, devices, fraction)
+        groups = placement["groups"]
+        if placement["unplaced"]:
+            typer.echo(f"⚠️  {', '.join(placement['unplaced'])} will not fit in GPU memory and will run partly on CPU")
+            if groups:
+                groups[0]["models"] += placement["unplaced"]
+            else:
+                groups = [{"devices": [d.index for d in devices], "models": placement["unplaced"]}]
+        for group in groups:
+            typer.echo(f"🎯 GPU {','.join(map(str, group['devices']))}: {', '.join(group['models'])}")
+        return [{"gpus": g["devices"], "models": g["models"],
+                 "budget": int(sum(memory[i] for i in g["devices"]) * fraction)} for g in groups]
+    if replicas == 1:
+        return []
+    groups = split_devices(devices, replicas)
+    # Replicas sharing a device split its memory budget.
+    sharing = {i: sum(i in group for group in groups) for i in memory}
+    return [{"gpus": group, "budget": int(sum(memory[i] / sharing[i] for i in group) * fraction)}
+            for group in groups]
+
+def preload_models(models, budget, plan=None):
+    """
+    Loads ``models`` into every replica, evicting least-recently-used
+    models whenever the memory budget would be exceeded. Replicas the GPU
+    planner assigned models to only load their own.
+    """
+    for replica in plan or load_replicas():
+        with SoloClient(replica_urls([replica])[0]) as client:
+            manager = ResidencyManager(client, replica.get("budget") or budget)
+            for model in replica.get("models") or models:
+                try:
+                    result = manager.ensure(model)
+                except (ResidencyError, requests.RequestException) as e:
+                    typer.echo(f"⚠️  Could not preload {model}: {e}", err=True)
+                    continue
+                note = f" (evicted {', '.join(result['evicted'])})" if result["evicted"] else ""
+                if result["cold"]:
+                    typer.echo(f"📦 Preloaded {result['model']} in {result['load_seconds']:.1f}s{note}")
+                else:
+                    typer.echo(f"📦 {result['model']} already resident")
+
+def start(
+    replicas: int = typer.Option(1, "--replicas", "-r", min=1, help="Number of Ollama containers, each pinned to its own CPU set"),
+    preload: Optional[str] = typer.Option(None, "--preload", help="Comma-separated models to load into memory once the server is ready"),
+    timings: bool = typer.Option(False, "--timings", help="Print how long each startup phase took"),
+    pull: str = typer.Option("missing", "--pull", help="Pull the Ollama image: missing (only if not present), always, or never"),
+):
     """Setup solo-server environment."""
-    display_hardware_info(typer)
-    cpu_model, cpu_cores, memory_gb, gpu_vendor, gpu_model, gpu_memory, compute_backend, os = detect_hardware()
+    timer = PhaseTimer()
+    if pull not in PULL_POLICIES:
+        typer.echo(f"❌ --pull must be one of: {', '.join(PULL_POLICIES)}", err=True)
+        raise typer.Exit(code=2)
+    preload_list = [m.strip() for m in (preload or "").split(",") if m.strip()]
     use_gpu = False
-    typer.echo("\n🚀 Setting up Solo Server...")
 
-    # Initialize container_exists flag
-    container_exists = False
+    # Containers touched by this run, stopped again on failure
+    started = []
     
     if not shutil.which("docker"):
         typer.echo(
@@ -81,25 +280,37 @@ def start():
         )
         raise typer.Exit(code=1)
     
+    def probe_hardware(done):
+        hardware = detect_hardware()
+        display_hardware_info(typer, hardware)
+        typer.echo("\n🚀 Setting up Solo Server...")
+        return hardware
+
+    # Independent steps run concurrently; each starts once its inputs are ready.
+    steps = {
+        "hardware": (probe_hardware, ()),
+        "engine check": (lambda done: ensure_engine(platform.system()), ()),
+        "topology": (lambda done: read_topology() if done["hardware"].os == "Linux" else None, ("hardware",)),
+        "gpu inventory": (lambda done: gpu_inventory(done["hardware"], replicas=load_replicas())
+                          if done["hardware"].gpu_vendor in ("NVIDIA", "AMD") else [], ("hardware",)),
+        "nvidia check": (lambda done: done["hardware"].gpu_vendor == "NVIDIA"
+                         and check_nvidia_toolkit(done["hardware"].os), ("hardware", "engine check")),
+        "container lookup": (lambda done: {c["name"]: c for c in list_containers(f"^{BASE_NAME}")},
+                             ("engine check",)),
+        "image": (lambda done: ensure_image(ollama_image(done["hardware"].gpu_vendor), pull),
+                  ("hardware", "engine check")),
+    }
+
     try:
-        # Check if Docker daemon is running
-        try:
-            subprocess.run(["docker", "info"], check=True, capture_output=True)
-        except subprocess.CalledProcessError:
-            typer.echo("Docker daemon is not running. Attempting to start Docker...", err=True)
-            if not start_docker_engine(os):
-                raise typer.Exit(code=1)
-            # Re-check if Docker is running
-            try:
-                subprocess.run(["docker", "info"], check=True, capture_output=True)
-            except subprocess.CalledProcessError:
-                typer.echo("❌ Docker commands are not working as expected.", err=True)
-                typer.echo("Try running the terminal with admin privileges.", err=True)
-                raise typer.Exit(code=1)
+        results = run_steps(steps, timer)
+        hardware = results["hardware"]
+        cpu_model, cpu_cores, memory_gb, gpu_vendor, gpu_model, gpu_memory, compute_backend, os = hardware
+        # Server settings found by `solo tune` on this hardware
+        env = tuned_env(hardware_fingerprint(hardware), preload_list)
 
         # Check for NVIDIA GPU
         if gpu_vendor == "NVIDIA":
-            if check_nvidia_toolkit(os):
+            if results["nvidia check"]:
                 typer.echo("✅ NVIDIA Toolkit is already installed.\n")
                 use_gpu = True
             else:
@@ -114,79 +325,108 @@ def start():
                 else:
                     typer.echo("⚠️  Falling back to CPU.\n")
 
-        # Check if container exists (running or stopped)
-        container_exists = subprocess.run(
-            ["docker", "ps", "-aq", "-f", "name=solo"], 
-            capture_output=True, 
-            text=True
-        ).stdout.strip()
-
-        if container_exists:
-            # Check if container is running
-            check_cmd = ["docker", "ps", "-q", "-f", "name=solo"]
-            is_running = subprocess.run(check_cmd, capture_output=True, text=True).stdout.strip()
-            if not is_running:
-                subprocess.run(["docker", "start", "solo"], check=True, capture_output=True)
-        else:
-            # Pull Ollama image
-            typer.echo("📥 Pulling Ollama Registry...")
-            subprocess.run(["docker", "pull", "ollama/ollama"], check=True)
+        devices = results["gpu inventory"]
+        gpu_groups = assign_gpus(devices, replicas, preload_list)
+        count = len(gpu_groups) if gpu_groups and replicas == 1 else replicas
+        topology = results["topology"]
+        plan = plan_replicas(count, placement=plan_placement(topology, count) if topology else None)
+        for replica, group in zip(plan, gpu_groups):
+            replica.update(group)
+        if count > 1:
+            typer.echo(f"🧩 Launching {len(plan)} replicas on ports {plan[0]['port']}-{plan[-1]['port']}")
 
-            # Check if port is available
+        # Stop replicas left over from a larger previous set
+        planned_names = {replica["name"] for replica in plan}
+        leftovers = [old["name"] for old in load_replicas() if old["name"] not in planned_names]
+        if leftovers:
             try:
-                subprocess.run(
-                    ["docker", "run", "--rm", "-p", "11434:11434", "alpine", "true"], 
-                    check=True, 
-                    capture_output=True
-                )
-            except subprocess.CalledProcessError:
-                typer.echo("❌ Port 11434 is already in use", err=True)
-                return
+                stop_containers(leftovers)
+            except (DockerError, subprocess.CalledProcessError):
+                pass
+        existing = results["container lookup"]
+
+        created = 0
+        blocked = []
+        for replica in plan:
+            name, port = replica["name"], replica["port"]
+            # Check if container exists (running or stopped)
+            container = existing.get(name)
+
+            # Recreate containers whose pins or settings no longer match the plan
+            details = inspect_container(name) if container else {}
+            drift = replica_drift(details, replica, gpu_vendor, use_gpu, env) if details else []
+            if drift:
+                typer.echo(f"🔧 Recreating {name} with new {', '.join(drift)}")
+                remove_container(name)
+                container = None
+
+            if container:
+                if container["state"] != "running":
+                    start_container(name)
+                started.append(name)
+                continue
+
+            # Check if port is available
+            if port_in_use(port):
+                typer.echo(f"❌ Port {port} is already in use, skipping {name}", err=True)
+                blocked.append(name)
+                continue
 
             # Start Ollama container
-            docker_run_cmd = ["docker", "run", "-d", "--name", "solo", "-v", "ollama:/root/.ollama", "-p", "11434:11434"]
-            if gpu_vendor == "NVIDIA" and use_gpu:
-                docker_run_cmd += ["--gpus", "all"]
-                docker_run_cmd.append("ollama/ollama")
-            elif gpu_vendor == "AMD":
-                docker_run_cmd += ["--device", "/dev/kfd", "--device", "/dev/dri"]
-                docker_run_cmd.append("ollama/ollama:rocm")
-            else:
-                docker_run_cmd.append("ollama/ollama")
+            typer.echo(f"🚀 Starting Solo Server ({name})...")
+            if env:
+                typer.echo("🔧 Applying tuned settings: " + " ".join(f"{k}={v}" for k, v in sorted(env.items())))
+            with timer.phase("container create"):
+                subprocess.run(build_run_command(replica, gpu_vendor, use_gpu, env), check=True)
+            started.append(name)
+            created += 1
 
-            typer.echo("🚀 Starting Solo Server...")
-            subprocess.run(docker_run_cmd, check=True)
+        # Record whatever did start so `solo stop` and the gateway can find it
+        plan = [replica for replica in plan if replica["name"] not in blocked]
+        save_replicas(plan)
+        if not plan:
+            return
 
-        # Wait for container to be ready with timeout
-        timeout = 30
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            try:
-                subprocess.run(
-                    ["docker", "exec", "solo", "ollama", "list"],
-                    check=True,
-                    stdout=subprocess.DEVNULL  # Only suppress stdout
-                )
-                typer.secho(
-                "✅ Solo server is ready!\nYou can now access the UI at: https://solo-chatbot.vercel.app/",
-                fg=typer.colors.BRIGHT_CYAN,
-                bold=True
-                )
+        # Wait for every replica's API to answer
+        with timer.phase("ready"):
+            pending = wait_until_ready(replica_urls(plan))
+
+        if not pending:
+            ready_seconds = timer.total()
+            record_startup(timer, hardware, len(plan), created, results["image"])
+            typer.secho(
+            f"✅ Solo server is ready in {ready_seconds:.1f}s!\nYou can now access the UI at: https://solo-chatbot.vercel.app/",
+            fg=typer.colors.BRIGHT_CYAN,
+            bold=True
+            )
+            if preload_list:
+                budget = memory_budget() // len(plan)
+                with timer.phase("preload"):
+                    preload_models(preload_list, budget, plan)
+            if len(plan) > 1:
+                typer.echo("Run `solo gateway` to balance requests across the replicas.")
+            return
 
-                return
-            except subprocess.CalledProcessError:
-                time.sleep(1)
-        
         typer.echo("❌ Solo server failed to start within timeout", err=True)
 
-    except subprocess.CalledProcessError as e:
+    except (subprocess.CalledProcessError, DockerError) as e:
         typer.echo(f"❌ Docker command failed: {e}", err=True)
         # Cleanup on failure
-        if container_exists:
-            subprocess.run(["docker", "stop", "solo"], check=False)
+        if started:
+            try:
+                stop_containers(started)
+            except (DockerError, subprocess.CalledProcessError):
+                pass
         raise typer.Exit(code=1)
+    except typer.Exit:
+        raise
     except Exception as e:
         typer.echo(f"❌ Unexpected error: {e}", err=True)
+    finally:
+        if timings:
+            typer.echo("\n⏱️  Startup timings")
+            for line in timer.report():
+                typer.echo(line)
 
 if __name__ == "__main__":
     start()
@@ -0,0 +1,256 @@
+import json
+import re
+import socketserver
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import pytest
+
+from solo_server.utils.residency import parse_keep_alive
+
+
+def letter_histogram(text):
+    """Toy embedding: near-duplicate strings get near-identical vectors."""
+    vector = [0.0] * 26
+    for ch in text.lower():
+        if "a" <= ch <= "z":
+            vector[ord(ch) - ord("a")] += 1.0
+    return vector
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    """Answers /api/chat like Ollama does, echoing the last user message."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self.server.peers.add(self.client_address)
+        if self.path == "/":
+            data = b"Ollama is running"
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
+        if self.path == "/api/tags":
+            return self._send_json(200, {"models": [{"name": name, "size": size}
+                                                    for name, size in self.server.local_models.items()]})
+        if self.path == "/api/ps":
+            return self._send_json(200, {"models": [
+                {"name": name, "size": size, "size_vram": size, "expires_at": datetime.fromtimestamp(
+                    self.server.expires.get(name, 0), timezone.utc).isoformat()}
+                for name, size in self.server.loaded.items()]})
+        self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        server = self.server
+        server.peers.add(self.client_address)
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server.requests.append((self.path, payload))
+        if self.path == "/api/pull":
+            server.missing_models.discard(payload["model"])
+            return self._send_json(200, {"status": "success"})
+        if self.path == "/api/embed":
+            inputs = payload["input"] if isinstance(payload["input"], list) else [payload["input"]]
+            return self._send_json(200, {"model": payload["model"],
+                                         "embeddings": [letter_histogram(text) for text in inputs]})
+        if self.path == "/api/generate" and "keep_alive" in payload:
+            name = payload["model"] if ":" in payload["model"] else payload["model"] + ":latest"
+            if payload["keep_alive"] == 0:
+                server.loaded.pop(name, None)
+                return self._send_json(200, {"model": name, "done_reason": "unload", "done": True})
+            if name not in server.local_models:
+                return self._send_json(404, {"error": f"model '{name}' not found"})
+            server.loaded[name] = server.local_models[name]
+            server.expires[name] = time.time() + parse_keep_alive(payload["keep_alive"])
+            return self._send_json(200, {"model": name, "done": True, "load_duration": 250_000_000})
+        if self.path == "/v1/chat/completions":
+            time.sleep(server.delay)
+            content = payload["messages"][-1]["content"]
+            return self._send_json(200, {"object": "chat.completion", "model": payload["model"],
+                                         "choices": [{"index": 0, "message": {"role": "assistant",
+                                                                              "content": content}}],
+                                         "usage": {"prompt_tokens": len(content.split()),
+                                                   "completion_tokens": len(content.split())}})
+        if self.path != "/api/chat":
+            return self._send_json(404, {"error": "not found"})
+        if payload["model"] in server.missing_models:
+            return self._send_json(404, {"error": f"model '{payload['model']}' not found"})
+        name = payload["model"] if ":" in payload["model"] else payload["model"] + ":latest"
+        if name in server.loaded:  # every request pushes the expiry forward
+            server.expires[name] = time.time() + parse_keep_alive(payload.get("keep_alive", 300))
+        words = payload["messages"][-1]["content"].split()
+        if not payload.get("stream"):
+            return self._send_json(200, {
+                "model": payload["model"],
+                "message": {"role": "assistant", "content": " ".join(words)},
+                "done": True,
+                "eval_count": len(words),
+                "eval_duration": 1000 * len(words),
+            })
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        lines = [{"model": payload["model"], "message": {"role": "assistant", "content": w + " "},
+                  "done": False} for w in words]
+        lines.append({"model": payload["model"], "message": {"role": "assistant", "content": ""},
+                      "done": True, "eval_count": len(words), "eval_duration": 1000 * len(words)})
+        for line in lines:
+            data = (json.dumps(line) + "\n").encode()
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.write(b"0\r\n\r\n")
+
+
+class FakeDockerHandler(BaseHTTPRequestHandler):
+    """The slice of the Docker Engine API solo uses, over a unix socket."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=None):
+        data = b"" if body is None else body if isinstance(body, bytes) else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _route(self, method):
+        parts = urlsplit(self.path)
+        query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        self.server.requests.append((method, parts.path, query))
+        containers = self.server.containers
+        if method == "GET" and parts.path == "/_ping":
+            return self._send(200, b"OK")
+        if method == "GET" and parts.path == "/info":
+            return self._send(200, {"Runtimes": self.server.runtimes})
+        if method == "GET" and parts.path == "/containers/json":
+            pattern = json.loads(query.get("filters", "{}")).get("name", [""])[0]
+            rows = [{"Id": c["Id"], "Names": [f"/{name}"], "Image": "ollama/ollama", "State": c["State"],
+                     "Status": "Up 1 minute" if c["State"] == "running" else "Exited (0)",
+                     "Ports": [{"IP": "0.0.0.0", "PrivatePort": 11434, "PublicPort": c.get("Port", 11434), "Type": "tcp"}]}
+                    for name, c in sorted(containers.items())
+                    if re.search(pattern, name) and (query.get("all") == "1" or c["State"] == "running")]
+            return self._send(200, rows)
+        match = re.fullmatch(r"/containers/([^/]+)(?:/(json|start|stop))?", parts.path)
+        if match:
+            name, action = unquote(match.group(1)), match.group(2)
+            container = containers.get(name)
+            if container is None:
+                return self._send(404, {"message": f"No such container: {name}"})
+            if method == "GET" and action == "json":
+                return self._send(200, {"Name": f"/{name}", "RestartCount": container.get("RestartCount", 0),
+                                        "State": {"Status": container["State"], "Running": container["State"] == "running"},
+                                        "Config": {"Env": container.get("Env", [])},
+                                        "HostConfig": container.get("HostConfig", {})})
+            wanted = {"start": "running", "stop": "exited"}.get(action)
+            if method == "POST" and wanted:
+                if container["State"] == wanted:
+                    return self._send(304)
+                container["State"] = wanted
+                return self._send(204)
+            if method == "DELETE" and action is None:
+                del containers[name]
+                return self._send(204)
+        if method == "POST" and parts.path == "/images/create":
+            self.server.images.add(f"{query['fromImage']}:{query.get('tag', 'latest')}")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for event in self.server.pull_events:
+                data = (json.dumps(event) + "\r\n").encode()
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            self.wfile.write(b"0\r\n\r\n")
+            return
+        match = re.fullmatch(r"/images/(.+)/json", parts.path)
+        if method == "GET" and match:
+            reference = unquote(match.group(1))
+            if ":" not in reference.rsplit("/", 1)[-1]:
+                reference += ":latest"
+            found = reference in self.server.images
+            return self._send(200 if found else 404, {"Id": "sha256:abc"} if found else {"message": "No such image"})
+        self._send(404, {"message": "page not found"})
+
+    def do_GET(self):
+        self._route("GET")
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self.body = self.rfile.read(length) if length else b""
+        self._route("POST")
+
+    def do_DELETE(self):
+        self._route("DELETE")
+
+
+class _UnixHTTPServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        request, _ = super().get_request()
+        return request, ("local", 0)
+
+
+@pytest.fixture
+def fake_docker(tmp_path, monkeypatch):
+    """A Docker Engine stand-in on a unix socket; DOCKER_HOST points at it."""
+    path = str(tmp_path / "docker.sock")
+    server = _UnixHTTPServer(path, FakeDockerHandler)
+    server.containers = {}
+    server.images = set()
+    server.runtimes = {"runc": {}}
+    server.pull_events = []
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    server.socket_path = path
+    monkeypatch.setenv("DOCKER_HOST", f"unix://{path}")
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def isolated_hardware_cache(tmp_path, monkeypatch):
+    """Keeps hardware detection and usage accounting from writing to the real ~/.solo."""
+    from solo_server.utils import hardware, usage
+    monkeypatch.setattr(hardware, "HARDWARE_FILE", str(tmp_path / "hardware.json"))
+    monkeypatch.setattr(usage, "USAGE_FILE", str(tmp_path / "usage.log"))
+
+
+@pytest.fixture
+def fake_ollama():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOllamaHandler)
+    server.daemon_threads = True
+    server.handle_error = lambda request, client_address: None
+    server.peers = set()
+    server.requests = []
+    server.delay = 0.0
+    server.missing_models = {"missing"}
+    server.local_models = {}
+    server.loaded = {}
+    server.expires = {}
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,197 @@
+import asyncio
+import json
+import random
+
+import pytest
+from typer.testing import CliRunner
+
+from solo_server.cli import app
+from solo_server.commands.benchmark import LoadRecorder, find_knee, parse_length_spec, run_load, summarize
+from solo_server.utils import bench_store
+from solo_server.utils.histogram import LatencyHistogram
+
+
+@pytest.fixture(autouse=True)
+def isolated_bench_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(bench_store, "BENCH_DB", str(tmp_path / "bench.db"))
+
+
+def test_histogram_is_exact_for_small_values_and_bounded_for_large():
+    hist = LatencyHistogram()
+    hist.record_all(i / 1e6 for i in range(1, 1001))  # 1..1000 us
+    assert hist.value_at(50) == pytest.approx(500e-6)
+    assert hist.value_at(99.9) == pytest.approx(999e-6)
+
+    big = LatencyHistogram()
+    for seconds in (1.234567, 12.34567, 123.4567):
+        big.record(seconds)
+        assert big.value_at(100) == pytest.approx(seconds, rel=1e-3)
+
+
+def test_histogram_merge_and_summary():
+    a, b = LatencyHistogram(), LatencyHistogram()
+    a.record_all([0.001] * 99)
+    b.record(0.5)
+    a.merge(b)
+    summary = a.summary()
+    assert summary["count"] == 100
+    assert summary["p50"] == pytest.approx(1.0) and summary["p99.9"] == pytest.approx(500, rel=1e-3)
+    assert summary["max"] == 500.0
+
+
+def test_length_specs():
+    rng = random.Random(1)
+    assert parse_length_spec("64")(rng) == 64
+    assert all(10 <= parse_length_spec("10-20")(rng) <= 20 for _ in range(50))
+    assert parse_length_spec("normal:100,0")(rng) == 100
+    with pytest.raises(ValueError):
+        parse_length_spec("lots")
+
+
+def test_closed_loop_runs_every_request(fake_ollama):
+    result = asyncio.run(run_load("llama3.2", fake_ollama.url, concurrency=3, requests=9,
+                                  prompt_tokens="20", output_tokens="16"))
+    report = summarize("llama3.2", result, {})
+    assert report["completed"] == 9 and report["errors"] == 0
+    assert report["ttft_ms"]["count"] == 9
+    assert report["e2e_ms"]["p50"] <= report["e2e_ms"]["p99"] <= report["e2e_ms"]["max"]
+    chats = [p for path, p in fake_ollama.requests if path == "/api/chat"]
+    assert len(chats) == 10  # one warm-up request
+    assert all(p["options"]["num_predict"] == 16 for p in chats[1:])
+    assert len({p["messages"][0]["content"] for p in chats}) == 10
+
+
+def test_open_loop_poisson_arrivals(fake_ollama):
+    result = asyncio.run(run_load("llama3.2", fake_ollama.url, rate=200, requests=8, warmup=0))
+    assert len(result["samples"]) == 8 and not result["errors"]
+
+
+def test_benchmark_model_is_the_default_subcommand(fake_ollama):
+    result = CliRunner().invoke(app, ["benchmark", "llama3.2", "--url", fake_ollama.url,
+                                      "-n", "4", "--json"])
+    assert result.exit_code == 0, result.output
+    report = json.loads(result.stdout)
+    assert report["completed"] == 4 and report["config"]["mode"] == "closed"
+    assert set(report["e2e_ms"]) >= {"p50", "p90", "p99", "p99.9"}
+
+    store = bench_store.BenchStore()
+    run = store.get(report["run_id"])
+    assert run["model"] == "llama3.2" and run["quantization"] == "unknown"
+    assert store.samples(report["run_id"]).shape == (4, 3)
+    store.close()
+
+
+def _record(store, e2e_ms, tokens=100, n=200, seed=0):
+    rng = random.Random(seed)
+    samples = [{"ttft_ms": 50 + rng.random() * 10, "e2e_ms": e2e_ms * (0.9 + rng.random() * 0.2),
+                "tokens": tokens} for _ in range(n)]
+    report = {"model": "llama3.2", "config": {"concurrency": 4}}
+    return store.record(report, samples, "Q4_K_M", "abc123", version="0.3.5")
+
+
+def test_compare_flags_only_real_regressions():
+    store = bench_store.BenchStore()
+    base = store.samples(_record(store, 1000, seed=1))
+    same = store.samples(_record(store, 1000, seed=2))
+    slow = store.samples(_record(store, 1300, seed=3))
+    store.close()
+
+    assert not any(r["regression"] for r in bench_store.compare_samples(base, same, resamples=500))
+    results = {r["metric"]: r for r in bench_store.compare_samples(base, slow, resamples=500)}
+    assert results["throughput_tok_s"]["regression"] and results["e2e_p99_ms"]["regression"]
+    assert results["throughput_tok_s"]["ci_high"] < 0 < results["e2e_p99_ms"]["ci_low"]
+    assert not results["ttft_p99_ms"]["regression"]
+
+
+def test_compare_command_gates_on_regression():
+    store = bench_store.BenchStore()
+    base, slow = _record(store, 1000, seed=1), _record(store, 1500, seed=2)
+    store.close()
+    runner = CliRunner()
+    assert runner.invoke(app, ["benchmark", "compare", str(base), str(base)]).exit_code == 0
+    result = runner.invoke(app, ["benchmark", "compare", str(base), str(slow), "--fail-on-regression"])
+    assert result.exit_code == 1
+    assert "regression" in result.output
+    assert runner.invoke(app, ["benchmark", "compare", str(base), "99"]).exit_code == 1
+
+
+def test_find_knee_doubles_then_bisects():
+    measured = []
+
+    def measure(concurrency):
+        measured.append(concurrency)
+        return {"concurrency": concurrency, "requests_per_s": concurrency * 1.5, "tokens_per_s": concurrency * 100.0,
+                "ttft_p99_ms": 100.0 * concurrency, "e2e_p99_ms": 1000.0, "errors": 0}
+
+    knee = find_knee(measure, slo_ms=550, max_concurrency=64)
+    assert measured == [1, 2, 4, 8, 6, 5]
+    assert knee["max_concurrency"] == 5 and knee["max_requests_per_s"] == 7.5
+    assert [step["concurrency"] for step in knee["curve"]] == [1, 2, 4, 5, 6, 8]
+    assert find_knee(measure, slo_ms=50)["max_concurrency"] == 0
+
+
+def test_find_knee_command_stores_curve_by_hardware(fake_ollama):
+    runner = CliRunner()
+    result = runner.invoke(app, ["benchmark", "--find-knee", "llama3.2", "--url", fake_ollama.url,
+                                 "-n", "4", "--max-concurrency", "4", "--slo-ttft-ms", "60000", "--json"])
+    assert result.exit_code == 0, result.output
+    knee = json.loads(result.stdout)
+    assert knee["max_concurrency"] == 4
+    assert [step["concurrency"] for step in knee["curve"]] == [1, 2, 4]
+
+    store = bench_store.BenchStore()
+    [stored] = store.knees("llama3.2")
+    store.close()
+    assert stored["hardware"] == knee["hardware"] and stored["max_concurrency"] == 4
+    assert "llama3.2" in runner.invoke(app, ["benchmark", "capacity"]).output
+
+
+def test_scorers_are_vectorised_over_the_batch():
+    from solo_server.utils.scoring import exact_match, multiple_choice, token_f1
+    assert exact_match(["The Paris.", "no"], [["paris"], ["yes", "No"]]).tolist() == [1.0, 1.0]
+    assert multiple_choice(["The answer is B.", "(c)", "I have a dog"], [1, 2, 0], [4, 4, 4]).tolist() == [1, 1, 0]
+    f1 = token_f1(["the cat sat", "paris", "", "x"], [["a cat sat down"], ["paris france", "Paris"], [""], ["y"]])
+    assert f1.tolist() == pytest.approx([0.8, 1.0, 1.0, 0.0])
+
+
+def test_eval_reports_accuracy_with_confidence_interval(fake_ollama, tmp_path):
+    dataset = tmp_path / "qa.jsonl"
+    rows = [{"prompt": "Paris", "answer": "paris"}, {"prompt": "Rome", "answers": ["Paris", "Lyon"]},
+            {"question": "Capital?", "choices": ["Paris", "Rome"], "answer": "Paris"}]
+    dataset.write_text("\n".join(json.dumps(r) for r in rows[:2] * 3) + "\n")
+    result = CliRunner().invoke(app, ["benchmark", "eval", "llama3.2", str(dataset), "--url", fake_ollama.url,
+                                      "--batch-size", "4", "--json", "--predictions", str(tmp_path / "p.jsonl")])
+    assert result.exit_code == 0, result.output
+    accuracy = json.loads(result.stdout)["accuracy"]
+    assert accuracy["metric"] == "exact" and accuracy["items"] == 6 and accuracy["mean"] == 0.5
+    assert accuracy["batches"] == [0.5, 0.5]
+    assert accuracy["ci_low"] < 0.5 < accuracy["ci_high"]
+    assert len((tmp_path / "p.jsonl").read_text().splitlines()) == 6
+
+    mc = tmp_path / "mc.jsonl"
+    mc.write_text(json.dumps(rows[2]) + "\n" + json.dumps({**rows[2], "answer": 1}) + "\n")
+    result = CliRunner().invoke(app, ["benchmark", "eval", "llama3.2", str(mc), "--url", fake_ollama.url, "--json"])
+    assert json.loads(result.stdout)["accuracy"]["metric"] == "mc"
+    assert json.loads(result.stdout)["accuracy"]["mean"] == 0.5
+
+
+def test_eval_reports_bad_lines_and_leaves_failed_requests_unscored(fake_ollama, tmp_path, monkeypatch):
+    dataset = tmp_path / "mc.jsonl"
+    dataset.write_text(json.dumps({"prompt": "Paris", "answer": "paris"}) + "\n\n"
+                       + json.dumps({"question": "Capital?", "choices": ["Paris", "Rome"], "answer": 5}) + "\n")
+    result = CliRunner().invoke(app, ["benchmark", "eval", "llama3.2", str(dataset), "--url", fake_ollama.url])
+    assert result.exit_code == 1 and "line 3: answer 5 is not one of the 2 choices" in result.output
+
+    rows = [{"prompt": "Paris", "answer": "paris"}, {"prompt": "Rome", "answer": "rome"}]
+    dataset.write_text("\n".join(json.dumps(r) for r in rows) + "\n")
+    sent = []
+
+    async def send(self, client, model, messages, options, record=True):
+        sent.append(messages[-1]["content"])
+        return None if messages[-1]["content"] == "Rome" else "Paris"
+
+    monkeypatch.setattr(LoadRecorder, "send", send)
+    result = CliRunner().invoke(app, ["benchmark", "eval", "llama3.2", str(dataset), "--url", fake_ollama.url,
+                                      "--json"])
+    accuracy = json.loads(result.stdout)["accuracy"]
+    assert len(sent) == 2 and accuracy["items"] == 1 and accuracy["failed"] == 1 and accuracy["mean"] == 1.0
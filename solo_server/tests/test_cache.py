@@ -0,0 +1,60 @@
+import os
+import time
+
+from solo_server.client import SoloClient
+from solo_server.utils.cache import ResponseCache, cache_key
+
+
+def test_cache_key_ignores_transport_fields():
+    base = {"model": "m", "messages": [{"role": "user", "content": "hi"}], "options": {"seed": 1}}
+    assert cache_key(base) == cache_key({**base, "stream": True, "keep_alive": "5m"})
+    assert cache_key(base) != cache_key({**base, "options": {"seed": 2}})
+
+
+def test_only_deterministic_requests_are_cached(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=1 << 20)
+    assert cache.key_for({"model": "m", "messages": [], "options": {"temperature": 0.7}}) is None
+    assert cache.key_for({"model": "m", "messages": []}) is None
+    assert cache.key_for({"model": "m", "messages": [], "options": {"temperature": 0}})
+
+
+def test_stream_replays_chunk_for_chunk(fake_ollama, tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=1 << 20)
+    messages = [{"role": "user", "content": "one two three"}]
+    with SoloClient(fake_ollama.url, cache=cache) as client:
+        first = list(client.chat_stream("llama3.2", messages, {"seed": 7}))
+        replay = list(client.chat_stream("llama3.2", messages, {"seed": 7}))
+        reply = client.chat("llama3.2", messages, {"seed": 7})
+    assert replay == first
+    assert reply["message"]["content"] == "one two three "
+    assert len(fake_ollama.requests) == 1
+    assert cache.hits == 2
+
+
+def test_lru_eviction_keeps_recent_entries(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=600)
+    chunk = [{"message": {"content": "x" * 150}, "done": True}]
+    keys = [f"{i:02d}" + "a" * 62 for i in range(3)]
+    for i, key in enumerate(keys):
+        cache.put(key, chunk)
+        os.utime(cache._path(key), (time.time() - 100 + i, time.time() - 100 + i))
+    cache.get(keys[0])  # touch the oldest so it becomes most recent
+    cache.put("ff" + "b" * 62, chunk)
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+    assert cache.stats()["bytes"] <= 600
+
+
+def test_failed_streams_are_not_stored_and_writes_skip_rescans(tmp_path, monkeypatch):
+    cache = ResponseCache(str(tmp_path), max_bytes=1 << 20)
+    cache.put("aa" + "0" * 62, [{"message": {"content": "par"}}, {"error": "model crashed"}])
+    cache.put("bb" + "0" * 62, [{"message": {"content": "cut off"}}])
+    cache.put("cc" + "0" * 62, [{"message": {"content": "x"}, "done": True, "error": "late"}])
+    assert cache.stats()["entries"] == 0
+
+    scans = []
+    entries = cache._entries
+    monkeypatch.setattr(cache, "_entries", lambda: scans.append(1) or entries())
+    for i in range(5):
+        cache.put(f"{i:02d}" + "d" * 62, [{"message": {"content": "ok"}, "done": True}])
+    assert len(scans) == 1
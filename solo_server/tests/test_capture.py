@@ -0,0 +1,101 @@
+import asyncio
+import io
+import json
+import time
+
+import pytest
+from typer.testing import CliRunner
+
+from solo_server.cli import app
+from solo_server.commands.benchmark import parse_speed, replay_trace
+from solo_server.commands.serve import run_batch
+from solo_server.utils import bench_store
+from solo_server.utils.capture import CaptureRecord, CaptureWriter, encode_record, read_capture
+from solo_server.utils.stream import StreamStats
+
+
+@pytest.fixture(autouse=True)
+def isolated_bench_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(bench_store, "BENCH_DB", str(tmp_path / "bench.db"))
+
+
+def _stats(tokens=3):
+    stats = StreamStats()
+    stats.observe({"message": {"content": "x"}}, now=1.0)
+    stats.started_at = 0.9
+    stats.observe({"done": True, "eval_count": tokens, "prompt_eval_count": 12}, now=1.5)
+    return stats
+
+
+def test_records_round_trip_and_torn_tail_is_ignored(tmp_path):
+    path = str(tmp_path / "trace.bin")
+    messages = [{"role": "user", "content": "héllo"}]
+    with CaptureWriter(path, include_prompts=True) as writer:
+        writer.record(1000.0, "llama3.2", messages, {"temperature": 0}, _stats(), stream=True)
+        writer.record(1000.5, "qwen", messages, None, _stats(7), ok=False)
+    with CaptureWriter(path) as writer:  # reopening appends, no second header
+        writer.record(1001.0, "llama3.2", messages, None, _stats())
+    with open(path, "ab") as f:
+        f.write(encode_record(CaptureRecord(1002.0, "cut", 1, 1, 1.0))[:10])
+
+    first, second, third = read_capture(path)
+    assert first.model == "llama3.2" and first.messages == messages and first.stream
+    assert first.prompt_tokens == 12 and first.output_tokens == 3 and first.options == {"temperature": 0}
+    assert first.e2e_ms == pytest.approx(600.0) and first.ttft_ms == pytest.approx(100.0)
+    assert second.status == 0 and second.output_tokens == 7
+    assert third.messages is None and third.arrival == 1001.0
+
+
+def test_long_model_names_are_cut_on_a_character_boundary(tmp_path):
+    path = str(tmp_path / "trace.bin")
+    name = "x" + "é" * 200  # the 255-byte cut falls inside a two-byte character
+    with CaptureWriter(path) as writer:
+        writer.record(1000.0, name, [{"role": "user", "content": "hi"}], None, _stats())
+    [record] = read_capture(path)
+    assert record.model == name[:128] and len(record.model.encode()) == 255
+
+
+def test_large_options_round_trip_and_unencodable_ones_are_skipped(tmp_path):
+    path = str(tmp_path / "trace.bin")
+    options = {"stop": ["x" * 40000, "y" * 40000]}
+    with CaptureWriter(path) as writer:
+        writer.record(1000.0, "llama3.2", [{"role": "user", "content": "hi"}], options, _stats())
+        writer.record(1001.0, "llama3.2", [{"role": "user", "content": "hi"}], {"bad": object()}, _stats())
+    [record] = read_capture(path)
+    assert record.options == options
+
+
+def test_batch_serving_appends_to_capture(fake_ollama, tmp_path):
+    path = str(tmp_path / "trace.bin")
+    source = io.StringIO('"one two"\n{"prompt": "three four five"}\n')
+    with CaptureWriter(path) as writer:
+        asyncio.run(run_batch(source, io.StringIO(), "llama3.2", 2, fake_ollama.url, capture=writer))
+    records = sorted(read_capture(path), key=lambda r: r.output_tokens)
+    assert [r.output_tokens for r in records] == [2, 3]
+    assert all(r.messages is None and r.e2e_ms > 0 for r in records)
+
+
+def test_replay_keeps_scaled_inter_arrival_gaps(fake_ollama):
+    records = [CaptureRecord(100.0 + 0.4 * i, "llama3.2", 16, 5, 10.0) for i in range(3)]
+    records[1].messages = [{"role": "user", "content": "captured prompt"}]
+    started = time.perf_counter()
+    result = asyncio.run(replay_trace(records, fake_ollama.url, speed=2.0))
+    assert time.perf_counter() - started >= 0.4
+    assert len(result["samples"]) == 3 and not result["errors"]
+    chats = [p for path, p in fake_ollama.requests if path == "/api/chat"]
+    assert all(p["options"]["num_predict"] == 5 for p in chats)
+    assert any(p["messages"] == records[1].messages for p in chats)
+
+
+def test_replay_command_reports_against_capture(fake_ollama, tmp_path):
+    path = str(tmp_path / "trace.bin")
+    with CaptureWriter(path) as writer:
+        for i in range(3):
+            writer.record(50.0 + i * 0.01, "llama3.2", [{"role": "user", "content": "a b c"}], None, _stats())
+    result = CliRunner().invoke(app, ["benchmark", "replay", path, "--url", fake_ollama.url,
+                                      "--speed", "4x", "--json"])
+    assert result.exit_code == 0, result.output
+    report = json.loads(result.stdout)
+    assert report["completed"] == 3 and report["config"]["mode"] == "replay"
+    assert report["captured_e2e_ms"]["count"] == 3 and "run_id" in report
+    assert parse_speed("0.5x") == 0.5 and parse_speed("3") == 3.0
@@ -0,0 +1,167 @@
+import asyncio
+import io
+import json
+
+import pytest
+
+from solo_server.client import AsyncSoloClient, SoloClient
+from solo_server.commands.serve import run_batch
+from solo_server.utils.http import AsyncConnectionPool, HTTPError
+from solo_server.utils.stream import NDJSONDecoder, StreamStats
+
+
+def test_sync_client_reuses_connection(fake_ollama):
+    with SoloClient(fake_ollama.url) as client:
+        for _ in range(5):
+            reply = client.chat("llama3.2", [{"role": "user", "content": "hi there"}])
+            assert reply["message"]["content"] == "hi there"
+    assert len(fake_ollama.peers) == 1
+
+
+def test_sync_client_stream(fake_ollama):
+    with SoloClient(fake_ollama.url) as client:
+        chunks = list(client.chat_stream("llama3.2", [{"role": "user", "content": "a b c"}]))
+    assert "".join(c["message"]["content"] for c in chunks) == "a b c "
+    assert chunks[-1]["done"]
+
+
+def test_async_client_pools_connections(fake_ollama):
+    async def main():
+        async with AsyncSoloClient(fake_ollama.url, max_connections=3) as client:
+            replies = await asyncio.gather(*(
+                client.chat("llama3.2", [{"role": "user", "content": f"n {i}"}]) for i in range(12)
+            ))
+            streamed = [c async for c in client.chat_stream("llama3.2", [{"role": "user", "content": "x y"}])]
+            return replies, streamed, client.pool.connections_opened
+
+    replies, streamed, opened = asyncio.run(main())
+    assert sorted(r["message"]["content"] for r in replies) == sorted(f"n {i}" for i in range(12))
+    assert [c["message"]["content"] for c in streamed] == ["x ", "y ", ""]
+    assert opened <= 3
+
+
+def test_async_client_raises_http_error(fake_ollama):
+    async def main():
+        async with AsyncSoloClient(fake_ollama.url) as client:
+            await client.chat("missing", [{"role": "user", "content": "hi"}])
+
+    with pytest.raises(HTTPError) as excinfo:
+        asyncio.run(main())
+    assert excinfo.value.status == 404
+
+
+def test_pool_retries_stale_connections_on_a_fresh_socket():
+    async def handle(reader, writer):
+        # Advertises keep-alive but closes after every reply.
+        await reader.readuntil(b"\r\n\r\n")
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok")
+        await writer.drain()
+        writer.close()
+
+    async def main():
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        pool = AsyncConnectionPool("127.0.0.1", server.sockets[0].getsockname()[1])
+        try:
+            async def get():
+                async with pool.request("GET", "/") as response:
+                    return await response.read()
+
+            assert await asyncio.gather(get(), get(), get()) == [b"ok"] * 3
+            await asyncio.sleep(0.05)  # let the server's closes arrive
+            assert len(pool._idle) == 3
+            assert await get() == b"ok"
+            server.close()
+            await server.wait_closed()
+            with pytest.raises(ConnectionError):
+                await get()
+        finally:
+            await pool.close()
+        return pool.connections_opened
+
+    assert asyncio.run(main()) == 5
+
+
+def test_pool_closes_connections_that_time_out_or_answer_garbage():
+    closed = []
+
+    async def handle(reader, writer):
+        request_line = await reader.readline()
+        await reader.readuntil(b"\r\n\r\n")
+        if b"/garbage" in request_line:
+            writer.write(b"HTTP/1.1 OK\r\n\r\n")
+        elif b"/stall-body" in request_line:
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 10\r\n\r\nabc")
+        else:
+            writer.write(b"HTTP/1.1 200 OK\r\n")  # never finishes the headers
+        await writer.drain()
+        closed.append(await reader.read() == b"")
+
+    async def main():
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        pool = AsyncConnectionPool("127.0.0.1", server.sockets[0].getsockname()[1], timeout=0.2)
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                async with pool.request("GET", "/stall-headers"):
+                    pass
+            with pytest.raises(ValueError):
+                async with pool.request("GET", "/garbage"):
+                    pass
+            with pytest.raises(asyncio.TimeoutError):
+                async with pool.request("GET", "/stall-body") as response:
+                    await response.read()
+            await asyncio.sleep(0.05)
+            assert pool._idle == []
+        finally:
+            await pool.close()
+            server.close()
+
+    asyncio.run(main())
+    assert closed == [True, True, True]
+
+
+def test_run_batch_writes_jsonl(fake_ollama):
+    prompts = io.StringIO(
+        '{"id": "a", "prompt": "one"}\n'
+        '"two words"\n'
+        '\n'
+        '{"id": "c", "model": "missing", "prompt": "three"}\n'
+    )
+    out = io.StringIO()
+    counts = asyncio.run(run_batch(prompts, out, "llama3.2", 2, fake_ollama.url))
+    results = {r["index"]: r for r in map(json.loads, out.getvalue().splitlines())}
+    assert counts == {"ok": 2, "error": 1}
+    assert results[0]["response"] == "one" and results[0]["id"] == "a"
+    assert results[1]["response"] == "two words"
+    assert "error" in results[3]
+
+
+def test_ndjson_decoder_handles_split_chunks():
+    decoder = NDJSONDecoder()
+    data = b'{"a": 1}\n{"b": [1, 2]}\n\n{"c": "x\\ny"}\n{"d"'
+    objects = []
+    for i in range(0, len(data), 5):
+        objects.extend(decoder.feed(data[i:i + 5]))
+    assert objects == [{"a": 1}, {"b": [1, 2]}, {"c": "x\ny"}]
+    decoder.feed(b": 4}")
+    assert decoder.close() == [{"d": 4}]
+
+
+def test_stream_stats_records_timing(fake_ollama):
+    stats = StreamStats()
+    with SoloClient(fake_ollama.url) as client:
+        list(client.chat_stream("llama3.2", [{"role": "user", "content": "a b c d"}], stats=stats))
+    summary = stats.summary()
+    assert stats.tokens == 4 and len(stats.gaps) <= 3  # reads may carry several tokens
+    assert summary["eval_count"] == 4
+    assert summary["ttft_ms"] >= 0
+
+
+def test_stream_stats_counts_gaps_between_reads_only():
+    stats = StreamStats(started_at=0.0)
+    token = {"message": {"content": "t"}}
+    for now, read in ((0.1, [token, token, token]), (0.3, [token]), (0.35, [token, token, dict(token, done=True)])):
+        for chunk in read:
+            stats.observe(chunk, now)
+    assert stats.tokens == 7
+    assert stats.gaps == pytest.approx([0.2, 0.05])
+    assert stats.summary()["ttft_ms"] == 100.0
@@ -0,0 +1,90 @@
+import asyncio
+import json
+
+import pytest
+from typer.testing import CliRunner
+
+from solo_server.cli import app
+from solo_server.utils import docker_api, replicas as replicas_module, residency
+from solo_server.utils.docker_api import AsyncDockerClient, DockerError
+
+
+def _container(state="running", port=11434, **extra):
+    return {"Id": "0123456789abcdef", "State": state, "Port": port, **extra}
+
+
+def test_client_reuses_one_connection(fake_docker):
+    fake_docker.containers = {"solo": _container(), "solo-1": _container("exited", 11435), "other": _container()}
+    fake_docker.images = {"ollama/ollama:latest"}
+
+    async def run():
+        client = AsyncDockerClient(fake_docker.socket_path)
+        try:
+            assert await client.ping()
+            running = await client.containers("^solo", all=False)
+            everything = await client.containers("^solo")
+            assert await client.image_exists("ollama/ollama:latest")
+            assert not await client.image_exists("ollama/ollama:rocm")
+            with pytest.raises(DockerError) as e:
+                await client.inspect("missing")
+            assert e.value.status == 404
+            return running, everything, client.pool.connections_opened
+        finally:
+            await client.close()
+
+    running, everything, opened = asyncio.run(run())
+    assert [c["name"] for c in running] == ["solo"]
+    assert [c["name"] for c in everything] == ["solo", "solo-1"]
+    assert running[0]["ports"] == "0.0.0.0:11434->11434/tcp" and running[0]["id"] == "0123456789ab"
+    assert opened == 1
+    _, path, query = next(r for r in fake_docker.requests if r[1] == "/containers/json")
+    assert query["all"] == "0" and json.loads(query["filters"]) == {"name": ["^solo"]}
+
+
+def test_sync_helpers_use_the_socket(fake_docker):
+    fake_docker.containers = {
+        "solo": _container(Env=["OLLAMA_NUM_PARALLEL=4", "PATH=/bin"]),
+        "solo-1": _container(),
+        "solo-2": _container("exited"),
+    }
+    assert docker_api.engine_running()
+    assert docker_api.container_env("solo")["OLLAMA_NUM_PARALLEL"] == "4"
+    assert docker_api.container_env("missing") == {}
+    assert docker_api.inspect_container("solo")["State"]["Running"] and docker_api.inspect_container("missing") == {}
+
+    docker_api.stop_containers(["solo", "solo-1"])
+    assert {n: c["State"] for n, c in fake_docker.containers.items()} == \
+        {"solo": "exited", "solo-1": "exited", "solo-2": "exited"}
+    docker_api.stop_containers(["solo"])  # already stopped: 304 is not an error
+    with pytest.raises(DockerError):
+        docker_api.stop_containers(["missing"])
+
+    docker_api.start_container("solo-2")
+    assert fake_docker.containers["solo-2"]["State"] == "running"
+    docker_api.remove_container("solo-1")
+    docker_api.remove_container("missing")
+    assert "solo-1" not in fake_docker.containers
+
+
+def test_docker_socket_resolution(monkeypatch, tmp_path):
+    monkeypatch.setenv("DOCKER_HOST", "tcp://10.0.0.2:2375")
+    assert docker_api.docker_socket() is None
+    monkeypatch.setenv("DOCKER_HOST", f"unix://{tmp_path}/d.sock")
+    assert docker_api.docker_socket() == f"{tmp_path}/d.sock"
+
+
+def test_status_probes_docker_and_replicas_concurrently(fake_docker, fake_ollama, tmp_path, monkeypatch):
+    port = int(fake_ollama.url.rsplit(":", 1)[1])
+    replicas_file = tmp_path / "replicas.json"
+    replicas_file.write_text(json.dumps([{"name": "solo", "port": port}]))
+    monkeypatch.setattr(replicas_module, "REPLICAS_FILE", str(replicas_file))
+    monkeypatch.setattr(residency, "RESIDENCY_FILE", str(tmp_path / "residency.json"))
+    fake_docker.containers = {"solo": _container(port=port)}
+    fake_ollama.local_models = {"llama3.2:latest": 2_019_000_000}
+    fake_ollama.loaded = {"llama3.2:latest": 2_019_000_000}
+
+    result = CliRunner().invoke(app, ["status"])
+    assert result.exit_code == 0, result.output
+    assert "llama3.2:latest" in result.output and "2.0 GB" in result.output
+    assert "Up 1 minute" in result.output and f"0.0.0.0:{port}->11434/tcp" in result.output
+    assert [r[1] for r in fake_docker.requests] == ["/containers/json"]
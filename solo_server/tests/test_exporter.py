@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import time
+
+import pytest
+import requests
+
+from solo_server.client import SoloClient
+from solo_server.commands.exporter import Exporter
+from solo_server.utils.metrics import MetricsCollector, render_metrics
+from solo_server.utils.usage import UsageTotals, openai_usage, record_usage
+
+
+def parse_metrics(text):
+    values = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            values[name] = float(value)
+    return values
+
+
+def test_render_groups_families_and_escapes_labels():
+    text = render_metrics([
+        ("solo_requests_total", {"model": 'a"b'}, 3),
+        ("solo_host_cpu_percent", {}, 12.5),
+        ("solo_requests_total", {"model": "c"}, 1),
+    ]).decode()
+    assert text.index("solo_host_cpu_percent 12.5") < text.index("# TYPE solo_requests_total counter")
+    assert 'solo_requests_total{model="a\\"b"} 3' in text
+    assert text.count("# HELP solo_requests_total") == 1
+
+
+def test_usage_totals_read_only_new_records(tmp_path):
+    path = str(tmp_path / "usage.log")
+    reply = {"model": "llama3.2", "done": True, "prompt_eval_count": 10, "eval_count": 5,
+             "eval_duration": 500_000_000, "total_duration": 2_000_000_000}
+    record_usage(reply, 1.0, path)
+    record_usage({"model": "llama3.2", "done": False, "eval_count": 99}, 1.0, path)  # not final
+    totals = UsageTotals(path)
+    assert totals.refresh()["llama3.2"]["output_tokens"] == 5
+    record_usage(reply, 2.0, path)
+    first_offset = totals.offset
+    model = totals.refresh()["llama3.2"]
+    assert totals.offset == 2 * first_offset
+    assert model["requests"] == 2 and model["prompt_tokens"] == 20
+    assert model["eval_seconds"] == pytest.approx(1.0) and model["total_seconds"] == pytest.approx(4.0)
+
+
+def test_openai_usage_reads_json_and_sse_bodies(tmp_path):
+    body = b'{"model": "m", "choices": [], "usage": {"prompt_tokens": 3, "completion_tokens": 7}}'
+    assert openai_usage(body)["eval_count"] == 7
+    stream = (b'data: {"model": "m", "choices": [{"delta": {"content": "hi"}}]}\n\n'
+              b'data: {"model": "m", "choices": [], "usage": {"prompt_tokens": 3, "completion_tokens": 2}}\n\n'
+              b'data: [DONE]\n\n')
+    assert openai_usage(stream) == {"model": "m", "done": True, "prompt_eval_count": 3, "eval_count": 2}
+    assert openai_usage(b'data: {"model": "m", "choices": []}\n\ndata: [DONE]\n\n') is None
+    path = str(tmp_path / "usage.log")
+    record_usage({"model": "é" * 200, "done": True, "eval_count": 1}, 1.0, path)
+    assert list(UsageTotals(path).refresh()) == ["é" * 127]
+
+
+@pytest.fixture
+def exporter_url(fake_docker, fake_ollama):
+    port = int(fake_ollama.url.rsplit(":", 1)[1])
+    fake_docker.containers = {"solo": {"Id": "abc", "State": "running", "Port": port, "RestartCount": 2},
+                              "solo-1": {"Id": "def", "State": "exited", "Port": port + 1}}
+    fake_ollama.loaded = {"llama3.2:latest": 3_000_000_000}
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    collector = MetricsCollector([{"name": "solo", "port": port}])
+    exporter = Exporter(collector, interval=60)
+    ready = asyncio.Event()
+    serving = asyncio.run_coroutine_threadsafe(exporter.serve("127.0.0.1", 0, ready), loop)
+    deadline = time.time() + 5
+    while not ready.is_set() and time.time() < deadline:
+        time.sleep(0.01)
+    exporter.loop = loop
+    yield f"http://127.0.0.1:{exporter.sockets[0].getsockname()[1]}/metrics", exporter
+    loop.call_soon_threadsafe(serving.cancel)
+    time.sleep(0.05)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=2)
+    loop.close()
+
+
+def test_scrapes_serve_the_cached_snapshot(exporter_url, fake_docker):
+    url, exporter = exporter_url
+    calls = len(fake_docker.requests)
+    responses = [requests.get(url, timeout=5) for _ in range(5)]
+    assert all(r.status_code == 200 for r in responses)
+    assert responses[0].headers["Content-Type"].startswith("text/plain; version=0.0.4")
+    assert len(fake_docker.requests) == calls  # no probes on the scrape path
+    assert exporter.scrapes == 5
+
+    metrics = parse_metrics(responses[-1].text)
+    assert metrics['solo_container_up{name="solo",image="ollama/ollama"}'] == 1
+    assert metrics['solo_container_up{name="solo-1",image="ollama/ollama"}'] == 0
+    assert metrics['solo_container_restarts_total{name="solo"}'] == 2
+    assert metrics['solo_model_memory_bytes{replica="solo",model="llama3.2:latest"}'] == 3e9
+    assert metrics["solo_host_memory_total_bytes"] > 0
+    assert all(metrics[f'solo_probe_up{{source="{s}"}}'] == 1 for s in ("host", "docker", "solo", "usage"))
+
+
+def test_token_counters_follow_client_traffic(exporter_url, fake_ollama):
+    url, exporter = exporter_url
+    with SoloClient(fake_ollama.url) as client:
+        client.chat("llama3.2", [{"role": "user", "content": "one two three"}])
+        list(client.chat_stream("llama3.2", [{"role": "user", "content": "four five"}]))
+    assert "solo_requests_total" not in requests.get(url, timeout=5).text  # until the next refresh
+
+    asyncio.run_coroutine_threadsafe(exporter.refresh(), exporter.loop).result(timeout=5)
+    metrics = parse_metrics(requests.get(url, timeout=5).text)
+    assert metrics['solo_requests_total{model="llama3.2"}'] == 2
+    assert metrics['solo_output_tokens_total{model="llama3.2"}'] == 5
+    assert metrics['solo_eval_seconds_total{model="llama3.2"}'] == pytest.approx(5e-6)
@@ -0,0 +1,132 @@
+import json
+import struct
+
+import numpy as np
+import pytest
+from typer.testing import CliRunner
+
+from solo_server.cli import app
+from solo_server.commands import fit as fit_module
+from solo_server.utils.fit import (RUNTIME_OVERHEAD, estimate, find_model_file, max_context, read_shape,
+                                   recommend)
+from solo_server.utils.gguf import GGUFError, GGUFReader
+from solo_server.utils.hardware import HardwareInfo
+
+GIB = 1024 ** 3
+
+
+def _string(text):
+    data = text.encode()
+    return struct.pack("<Q", len(data)) + data
+
+
+def _kv(key, kind, value):
+    out = _string(key) + struct.pack("<I", kind)
+    if kind == 8:
+        return out + _string(value)
+    if kind == 9:
+        item, values = value
+        out += struct.pack("<IQ", item, len(values))
+        if item == 8:
+            return out + b"".join(_string(v) for v in values)
+        return out + np.asarray(values, dtype="<f4").tobytes()
+    return out + struct.pack({4: "<I", 10: "<Q", 6: "<f"}[kind], value)
+
+
+def write_gguf(path, layers=2, embedding=256, heads=4, kv_heads=2, context=4096):
+    """A llama-shaped GGUF header: Q4_K attention weights and an F32 norm per layer."""
+    metadata = [
+        ("general.architecture", 8, "llama"),
+        ("general.file_type", 4, 15),
+        ("llama.block_count", 4, layers),
+        ("llama.embedding_length", 4, embedding),
+        ("llama.context_length", 4, context),
+        ("llama.attention.head_count", 4, heads),
+        ("llama.attention.head_count_kv", 4, kv_heads),
+        ("tokenizer.ggml.tokens", 9, (8, ["<s>", "</s>", "hello"])),
+        ("tokenizer.ggml.scores", 9, (6, [0.0, -1.0, -2.5])),
+    ]
+    tensors = [("token_embd.weight", (embedding, 512), 12)]
+    for layer in range(layers):
+        tensors += [(f"blk.{layer}.attn_q.weight", (embedding, embedding), 12),
+                    (f"blk.{layer}.attn_norm.weight", (embedding,), 0)]
+    header = b"GGUF" + struct.pack("<IQQ", 3, len(tensors), len(metadata))
+    header += b"".join(_kv(*item) for item in metadata)
+    for name, shape, kind in tensors:
+        header += _string(name) + struct.pack("<I", len(shape)) + struct.pack(f"<{len(shape)}Q", *shape)
+        header += struct.pack("<IQ", kind, 0)
+    with open(path, "wb") as f:
+        f.write(header + b"\0" * 64)
+    return str(path)
+
+
+def test_reader_parses_metadata_and_tensors(tmp_path):
+    with GGUFReader(write_gguf(tmp_path / "m.gguf")) as reader:
+        assert reader.version == 3 and reader.architecture == "llama"
+        assert reader.field("block_count") == 2 and reader.file_type == "Q4_K_M"
+        assert reader.metadata["tokenizer.ggml.tokens"].count == 3
+        assert reader.metadata["tokenizer.ggml.scores"].tolist() == [0.0, -1.0, -2.5]
+        assert len(reader.tensors) == 5 and reader.data_offset % 32 == 0
+        # Q4_K: 144 bytes per 256 weights; F32 norms: 4 bytes each
+        assert reader.weights_bytes() == (256 * 512 + 2 * 256 * 256) // 256 * 144 + 2 * 256 * 4
+        assert reader.quantization_types()["F32"] == 2048
+
+
+def test_rejects_non_gguf_and_truncated_files(tmp_path):
+    (tmp_path / "bad").write_bytes(b"NOPE" + b"\0" * 32)
+    with pytest.raises(GGUFError):
+        GGUFReader(str(tmp_path / "bad"))
+    path = write_gguf(tmp_path / "m.gguf")
+    with open(path, "rb") as f:
+        data = f.read()
+    (tmp_path / "cut").write_bytes(data[:100])
+    with pytest.raises(GGUFError):
+        GGUFReader(str(tmp_path / "cut"))
+    (tmp_path / "empty").write_bytes(b"")
+    with pytest.raises(GGUFError, match="empty"):
+        GGUFReader(str(tmp_path / "empty"))
+
+
+def test_estimates_kv_cache_and_largest_context(tmp_path):
+    shape = read_shape(write_gguf(tmp_path / "m.gguf"))
+    # 2 layers x 2 kv heads x (64 + 64) dims x 2 bytes
+    assert shape.kv_bytes_per_token() == 1024
+    needed = estimate(shape, num_ctx=2048, parallel=2)
+    assert needed["kv_cache"] == 1024 * 2048 * 2
+    assert needed["total"] == shape.weights_bytes + needed["kv_cache"] + RUNTIME_OVERHEAD
+
+    budget = shape.weights_bytes + RUNTIME_OVERHEAD + 1024 * 3000
+    assert max_context(shape, budget) == 2048
+    assert max_context(shape, 100 * GIB) == 4096  # capped at the trained context
+    assert max_context(shape, RUNTIME_OVERHEAD) == 0
+
+
+def test_recommends_a_smaller_quantization_when_weights_do_not_fit(tmp_path):
+    shape = read_shape(write_gguf(tmp_path / "m.gguf"))
+    shape.parameters = 8 * 10 ** 9
+    shape.weights_bytes = int(8e9 * 4.85 / 8)
+    row = recommend(shape, {"GPU": 5 * GIB}, num_ctx=2048)[0]
+    assert not row["fits"] and row["max_ctx"] == 0 and row["quantization"] == "Q3_K_M"
+
+
+def test_finds_blob_through_ollama_manifest(tmp_path):
+    models = tmp_path / "models"
+    (models / "blobs").mkdir(parents=True)
+    blob = write_gguf(models / "blobs" / "sha256-abc")
+    manifest = models / "manifests/registry.ollama.ai/library/tiny/1b"
+    manifest.parent.mkdir(parents=True)
+    manifest.write_text(json.dumps({"layers": [
+        {"mediaType": "application/vnd.ollama.image.template", "digest": "sha256:def"},
+        {"mediaType": "application/vnd.ollama.image.model", "digest": "sha256:abc"}]}))
+    assert find_model_file("tiny:1b", [str(models)]) == blob
+    with pytest.raises(FileNotFoundError):
+        find_model_file("tiny", [str(models)])
+
+
+def test_fit_command_reports_targets(tmp_path, monkeypatch):
+    monkeypatch.setattr(fit_module, "detect_hardware", lambda: HardwareInfo("Test CPU", 4, 16.0, os="Linux"))
+    result = CliRunner().invoke(app, ["fit", write_gguf(tmp_path / "m.gguf"), "--num-ctx", "4096", "--json"])
+    assert result.exit_code == 0, result.output
+    report = json.loads(result.stdout)
+    assert [t["target"] for t in report["targets"]] == ["RAM"] and report["targets"][0]["fits"]
+    assert report["estimate"]["kv_cache"] == 1024 * 4096
@@ -0,0 +1,115 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from solo_server.gateway import Gateway, request_key
+from solo_server.utils.scheduler import Scheduler
+from solo_server.utils.usage import UsageTotals
+
+
+@pytest.fixture
+def gateway_url(fake_ollama):
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    gateway = Gateway(fake_ollama.url)
+    ready = asyncio.Event()
+    serving = asyncio.run_coroutine_threadsafe(gateway.serve("127.0.0.1", 0, ready), loop)
+    while not ready.is_set():
+        time.sleep(0.01)
+    yield f"http://127.0.0.1:{gateway.sockets[0].getsockname()[1]}", gateway
+    loop.call_soon_threadsafe(serving.cancel)
+    time.sleep(0.05)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=2)
+    loop.close()
+
+
+def test_request_key_canonicalises_json():
+    assert request_key("/v1/embeddings", b'{"a": 1, "b": 2}') == request_key("/v1/embeddings", b'{"b":2,"a":1}')
+    assert request_key("/v1/embeddings", b'{"a": 1}') != request_key("/v1/chat/completions", b'{"a": 1}')
+
+
+def test_identical_inflight_requests_share_one_generation(fake_ollama, gateway_url):
+    url, gateway = gateway_url
+    fake_ollama.delay = 0.3
+    body = {"model": "llama3.2", "messages": [{"role": "user", "content": "refresh"}]}
+
+    def call(_):
+        return requests.post(f"{url}/v1/chat/completions", json=body, timeout=5).json()
+
+    with ThreadPoolExecutor(max_workers=10) as pool:
+        replies = list(pool.map(call, range(10)))
+    assert all(r["choices"][0]["message"]["content"] == "refresh" for r in replies)
+    upstream = [p for p, _ in fake_ollama.requests if p == "/v1/chat/completions"]
+    assert len(upstream) == 1
+    assert gateway.stats()["coalesced"] == 9
+    usage = UsageTotals().refresh()["llama3.2"]
+    assert usage["requests"] == 1 and usage["output_tokens"] == 1
+
+
+def test_distinct_requests_and_unknown_routes(fake_ollama, gateway_url):
+    url, _ = gateway_url
+    with requests.Session() as session:
+        for word in ("a", "b"):
+            reply = session.post(f"{url}/v1/chat/completions",
+                                 json={"model": "m", "messages": [{"role": "user", "content": word}]})
+            assert reply.json()["choices"][0]["message"]["content"] == word
+        assert session.get(f"{url}/nope").status_code == 404
+        assert session.get(f"{url}/health").json() == {"status": "ok"}
+    assert len([p for p, _ in fake_ollama.requests if p == "/v1/chat/completions"]) == 2
+
+
+def test_rate_limited_tenant_gets_429(fake_ollama, gateway_url):
+    url, gateway = gateway_url
+    gateway.scheduler = Scheduler(rate=0.001, burst=300)
+    body = {"model": "m", "messages": [{"role": "user", "content": "x" * 8}], "max_tokens": 100}
+    first = requests.post(f"{url}/v1/chat/completions", json=body, headers={"Authorization": "Bearer k1"})
+    second = requests.post(f"{url}/v1/chat/completions", json=body, headers={"Authorization": "Bearer k1"})
+    other = requests.post(f"{url}/v1/chat/completions", json=body, headers={"Authorization": "Bearer k2"})
+    assert first.status_code == 200 and other.status_code == 200
+    assert second.status_code == 429 and int(second.headers["Retry-After"]) >= 1
+    assert requests.get(f"{url}/solo/scheduler").json()["rate_limited"] == 1
+
+
+def test_upstream_call_is_cancelled_when_every_caller_disconnects():
+    upstream_closed = asyncio.Event()
+
+    async def stream_forever(reader, writer):
+        head = await reader.readuntil(b"\r\n\r\n")
+        length = int(head.lower().split(b"content-length:")[1].split(b"\r\n")[0])
+        await reader.readexactly(length)
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nTransfer-Encoding: chunked\r\n\r\n")
+        while True:
+            writer.write(b"5\r\ntoken\r\n")
+            await writer.drain()
+            try:
+                if await asyncio.wait_for(reader.read(1), 0.02) == b"":
+                    break
+            except asyncio.TimeoutError:
+                pass
+        upstream_closed.set()
+
+    async def main():
+        upstream = await asyncio.start_server(stream_forever, "127.0.0.1", 0)
+        gateway = Gateway(f"http://127.0.0.1:{upstream.sockets[0].getsockname()[1]}")
+        ready = asyncio.Event()
+        serving = asyncio.ensure_future(gateway.serve("127.0.0.1", 0, ready))
+        await ready.wait()
+        reader, writer = await asyncio.open_connection("127.0.0.1", gateway.sockets[0].getsockname()[1])
+        body = b'{"model": "m", "stream": true, "messages": [{"role": "user", "content": "hi"}]}'
+        writer.write(b"POST /v1/chat/completions HTTP/1.1\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body))
+        await reader.readuntil(b"token")
+        writer.close()
+        await asyncio.wait_for(upstream_closed.wait(), 5)
+        stats = gateway.stats()
+        serving.cancel()
+        upstream.close()
+        return stats
+
+    stats = asyncio.run(main())
+    assert stats["abandoned"] == 1 and stats["inflight"] == 0
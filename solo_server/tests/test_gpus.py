@@ -0,0 +1,82 @@
+import pytest
+
+from solo_server import start as start_module
+from solo_server.start import assign_gpus, build_run_command
+from solo_server.utils import gpus
+from solo_server.utils.gpus import GPUDevice, gpu_inventory, gpu_run_args, plan_gpu_placement, split_devices
+from solo_server.utils.hardware import GPUInfo, HardwareInfo
+
+GIB = 1024 ** 3
+
+
+def inventory(*sizes_gb, used_gb=0):
+    return [GPUDevice(i, "NVIDIA", "Test GPU", size * GIB, used_gb * GIB) for i, size in enumerate(sizes_gb)]
+
+
+def test_best_fit_packs_models_onto_fewest_devices():
+    plan = plan_gpu_placement({"a": 10 * GIB, "b": 6 * GIB, "c": 5 * GIB, "d": 3 * GIB}, inventory(16, 16, 8))
+    assert plan["unplaced"] == []
+    placed = {tuple(g["devices"]): sorted(g["models"]) for g in plan["groups"]}
+    assert placed == {(0,): ["a", "b"], (2,): ["c", "d"]}
+    assert [g["free_bytes"] for g in plan["groups"]] == [0, 0]
+
+
+def test_oversized_model_spans_free_devices_and_leftovers_are_reported():
+    plan = plan_gpu_placement({"big": 30 * GIB, "small": 2 * GIB, "huge": 100 * GIB}, inventory(24, 24, 8))
+    big = next(g for g in plan["groups"] if "big" in g["models"])
+    assert big["devices"] == [0, 1] and big["free_bytes"] == 18 * GIB
+    assert plan["unplaced"] == ["huge"]
+
+
+def test_used_memory_and_fraction_shrink_capacity():
+    devices = inventory(24, 24, used_gb=12)
+    assert plan_gpu_placement({"m": 22 * GIB}, devices, fraction=0.9)["unplaced"] == ["m"]
+    assert plan_gpu_placement({"m": 11 * GIB}, devices, fraction=0.9)["groups"][0]["devices"] == [0, 1]
+    assert plan_gpu_placement({"m": 10 * GIB}, devices, fraction=0.9)["groups"][0]["devices"] == [0]
+
+
+def test_devices_are_dealt_to_replicas_and_become_run_args():
+    assert split_devices(inventory(8, 8, 8, 8), 2) == [[0, 2], [1, 3]]
+    assert split_devices(inventory(8, 8), 4) == [[0], [1], [0], [1]]
+    assert gpu_run_args("NVIDIA", [0, 2]) == ["--gpus", '"device=0,2"']
+    assert gpu_run_args("AMD", [1]) == ["-e", "ROCR_VISIBLE_DEVICES=1"]
+
+    cmd = build_run_command({"name": "solo-1", "port": 11435, "gpus": [1]}, "NVIDIA", True)
+    assert cmd[cmd.index("--gpus") + 1] == '"device=1"'
+    cmd = build_run_command({"name": "solo", "port": 11434}, "NVIDIA", True)
+    assert cmd[cmd.index("--gpus") + 1] == "all"
+
+
+def test_start_gives_each_device_group_its_own_replica(monkeypatch):
+    monkeypatch.setattr(start_module, "known_model_sizes",
+                        lambda: {"llama3.2:latest": 15 * GIB, "qwen:latest": 15 * GIB})
+    groups = assign_gpus(inventory(24, 24), 1, ["llama3.2", "qwen"])
+    assert sorted(g["gpus"][0] for g in groups) == [0, 1]
+    assert all(len(g["models"]) == 1 and g["budget"] == pytest.approx(24 * GIB * 0.8, rel=1e-6) for g in groups)
+    assert assign_gpus(inventory(24), 1, ["llama3.2"]) == []
+    assert [g["gpus"] for g in assign_gpus(inventory(24, 24, 24), 3, [])] == [[0], [1], [2]]
+
+
+def test_unsized_models_and_extra_replicas_never_leave_a_replica_unpinned(monkeypatch):
+    monkeypatch.setattr(start_module, "known_model_sizes", lambda: {})
+    monkeypatch.setattr(start_module, "estimate_model_bytes", lambda model: None)
+    assert assign_gpus(inventory(24, 24), 1, ["llama3.2", "qwen"]) == []
+
+    groups = assign_gpus(inventory(24, 24), 3, [])
+    assert [g["gpus"] for g in groups] == [[0], [1], [0]]
+    assert groups[0]["budget"] == pytest.approx(12 * GIB * 0.8, rel=1e-6)
+    assert groups[1]["budget"] == pytest.approx(24 * GIB * 0.8, rel=1e-6)
+
+
+def test_nvidia_usage_is_matched_by_bus_id_and_solo_replicas_count_as_free(fake_ollama, monkeypatch):
+    # nvidia-smi lists the cards in its own order, not the inventory's.
+    monkeypatch.setattr(gpus, "nvidia_readings", lambda field: {"0000:02:00.0": 12 * 1024, "0000:01:00.0": 2 * 1024})
+    monkeypatch.setattr(gpus, "gpu_loads", lambda devices: [0.0] * len(devices))
+    hardware = HardwareInfo("Test CPU", 8, 64.0, "NVIDIA", gpus=[GPUInfo("NVIDIA", "Test GPU", 24.0, "0000:01:00.0"),
+                                                                 GPUInfo("NVIDIA", "Test GPU", 24.0, "0000:02:00.0")])
+    assert [d.used_bytes for d in gpu_inventory(hardware)] == [2 * GIB, 12 * GIB]
+
+    fake_ollama.loaded = {"llama3.2:latest": 10 * GIB}
+    port = int(fake_ollama.url.rsplit(":", 1)[1])
+    replicas = [{"name": "solo", "port": port, "gpus": [1]}, {"name": "solo-1", "port": 1}]
+    assert [d.used_bytes for d in gpu_inventory(hardware, replicas=replicas)] == [2 * GIB, 2 * GIB]
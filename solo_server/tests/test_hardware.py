@@ -0,0 +1,107 @@
+import json
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from solo_server.utils import hardware
+from solo_server.utils.hardware import HardwareInfo, detect_hardware, hardware_fingerprint, probe_hardware
+from solo_server.utils.nvidia import check_nvidia_toolkit
+
+
+def _write(root, relative, text):
+    path = root / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+@pytest.fixture
+def fake_root(tmp_path, monkeypatch):
+    """A /proc and /sys tree for a 2-core/4-thread host with an AMD card and an iGPU."""
+    monkeypatch.setattr(hardware.platform, "system", lambda: "Linux")
+    monkeypatch.setattr(hardware, "_nvidia_smi", lambda: [])
+    root = tmp_path / "root"
+    _write(root, "proc/cpuinfo", "processor\t: 0\nmodel name\t: Test CPU @ 3.0GHz\n\nprocessor\t: 1\n")
+    _write(root, "proc/meminfo", "MemTotal:       16777216 kB\nMemFree:  1 kB\n")
+    for cpu, core in enumerate([0, 0, 1, 1]):
+        _write(root, f"sys/devices/system/cpu/cpu{cpu}/topology/core_id", f"{core}\n")
+        _write(root, f"sys/devices/system/cpu/cpu{cpu}/topology/physical_package_id", "0\n")
+    _write(root, "sys/class/drm/card0/device/vendor", "0x8086\n")
+    _write(root, "sys/class/drm/card1/device/vendor", "0x1002\n")
+    _write(root, "sys/class/drm/card1/device/product_name", "Radeon Test\n")
+    _write(root, "sys/class/drm/card1/device/mem_info_vram_total", str(24 * 1024 ** 3))
+    _write(root, "sys/class/drm/card1-DP-1/status", "connected\n")
+    return str(root)
+
+
+def test_probe_reads_proc_and_sys(fake_root):
+    info = probe_hardware(fake_root)
+    assert (info.cpu_model, info.cpu_cores, info.logical_cores, info.memory_gb) == ("Test CPU @ 3.0GHz", 2, 4, 16.0)
+    assert [gpu.vendor for gpu in info.gpus] == ["Intel", "AMD"]
+    assert (info.gpu_vendor, info.gpu_model, info.gpu_memory, info.compute_backend) == ("AMD", "Radeon Test", 24.0, "HIP")
+    cpu_model, cpu_cores, memory_gb, gpu_vendor, gpu_model, gpu_memory, backend, os_name = info
+    assert (gpu_vendor, os_name) == ("AMD", "Linux")
+
+
+def test_nvidia_cards_without_drm_are_found_and_matched_by_bus_id(fake_root, monkeypatch):
+    for bus_id, model in (("0000:02:00.0", "Test A100"), ("0000:01:00.0", "Test L4")):
+        _write(Path(fake_root), f"proc/driver/nvidia/gpus/{bus_id}/information", f"Model: \t {model}\nIRQ: 1\n")
+    monkeypatch.setattr(hardware, "_nvidia_smi", lambda: [
+        hardware.GPUInfo("NVIDIA", "Test A100", 80.0, "0000:02:00.0"),
+        hardware.GPUInfo("NVIDIA", "Test L4", 24.0, "0000:01:00.0"),
+    ])
+    info = probe_hardware(fake_root)
+    nvidia = [(gpu.model, gpu.memory_gb, gpu.device) for gpu in info.gpus if gpu.vendor == "NVIDIA"]
+    assert nvidia == [("Test L4", 24.0, "0000:01:00.0"), ("Test A100", 80.0, "0000:02:00.0")]
+    assert info.gpu_vendor == "NVIDIA" and info.compute_backend == "CUDA"
+    assert hardware._pci_bus_id("00000000:0A:00.0") == "0000:0a:00.0"
+
+
+def test_cards_are_listed_in_numeric_order(fake_root):
+    for card, name in (("card10", "Radeon Ten"), ("card2", "Radeon Two")):
+        _write(Path(fake_root), f"sys/class/drm/{card}/device/vendor", "0x1002\n")
+        _write(Path(fake_root), f"sys/class/drm/{card}/device/product_name", name + "\n")
+    info = probe_hardware(fake_root)
+    assert [gpu.model for gpu in info.gpus if gpu.vendor == "AMD"] == ["Radeon Test", "Radeon Two", "Radeon Ten"]
+
+
+def test_nvidia_readings_are_keyed_by_bus_id_and_index(monkeypatch):
+    output = "1, 00000000:02:00.0, 7000\n0, 00000000:01:00.0, 500\n2, 00000000:03:00.0, [N/A]\n"
+    monkeypatch.setattr(hardware.shutil, "which", lambda name: "/usr/bin/" + name)
+    monkeypatch.setattr(subprocess, "run", lambda cmd, **kwargs: subprocess.CompletedProcess(cmd, 0, stdout=output))
+    readings = hardware.nvidia_readings("memory.used")
+    assert readings == {"0": 500.0, "0000:01:00.0": 500.0, "1": 7000.0, "0000:02:00.0": 7000.0}
+
+
+def test_cache_is_reused_until_boot_or_kernel_changes(fake_root, tmp_path, monkeypatch):
+    path = str(tmp_path / "hardware.json")
+    probes = []
+    monkeypatch.setattr(hardware, "probe_hardware", lambda: probes.append(1) or probe_hardware(fake_root))
+    monkeypatch.setattr(hardware, "boot_id", lambda: "boot-1")
+    monkeypatch.setattr(hardware.platform, "release", lambda: "6.1.0")
+
+    first = detect_hardware(path=path)
+    assert detect_hardware(path=path) == first and len(probes) == 1
+    with open(path) as f:
+        assert json.load(f)["hardware"]["gpus"][1]["model"] == "Radeon Test"
+
+    monkeypatch.setattr(hardware, "boot_id", lambda: "boot-2")
+    assert detect_hardware(path=path) == first and len(probes) == 2
+    monkeypatch.setattr(hardware.platform, "release", lambda: "6.2.0")
+    detect_hardware(path=path)
+    detect_hardware(path=path, refresh=True)
+    assert len(probes) == 4
+    assert hardware_fingerprint(first) == hardware_fingerprint(HardwareInfo.from_dict(first.to_dict()))
+
+
+def test_nvidia_toolkit_check_reads_docker_runtimes(monkeypatch):
+    def docker_info(runtimes):
+        def run(cmd, **kwargs):
+            assert cmd[:2] == ["docker", "info"] and not kwargs.get("shell")
+            return subprocess.CompletedProcess(cmd, 0, stdout=json.dumps(runtimes))
+        return run
+
+    monkeypatch.setattr(subprocess, "run", docker_info({"runc": {}, "nvidia": {"path": "nvidia-container-runtime"}}))
+    assert check_nvidia_toolkit("Linux")
+    monkeypatch.setattr(subprocess, "run", docker_info({"runc": {}}))
+    assert not check_nvidia_toolkit("Linux")
@@ -0,0 +1,187 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from typer.testing import CliRunner
+
+from solo_server.cli import app
+from solo_server.utils import pull as pull_module
+from solo_server.utils.fit import blob_path, find_model_file, manifest_path
+from solo_server.utils.pull import ModelPuller, PullError, import_model
+
+CHUNK = 64 * 1024
+
+
+def _digest(data):
+    return "sha256:" + hashlib.sha256(data).hexdigest()
+
+
+class RegistryHandler(BaseHTTPRequestHandler):
+    """A stand-in for registry.ollama.ai: manifests, and blobs behind a redirect with Range support."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, data=b"", headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        server = self.server
+        match = re.fullmatch(r"/v2/(.+)/manifests/([^/]+)", self.path)
+        if match:
+            manifest = server.manifests.get(f"{match.group(1)}:{match.group(2)}")
+            return self._send(200, manifest) if manifest else self._send(404, b'{"errors":[]}')
+        match = re.fullmatch(r"/v2/.+/blobs/(sha256:[0-9a-f]+)", self.path)
+        if match:  # the real registry redirects blob downloads to a CDN
+            return self._send(307, headers={"Location": f"/cdn/{match.group(1)}"})
+        match = re.fullmatch(r"/cdn/(sha256:[0-9a-f]+)", self.path)
+        if not match or match.group(1) not in server.blobs:
+            return self._send(404)
+        data = server.blobs[match.group(1)]
+        start, end = 0, len(data) - 1
+        ranged = re.fullmatch(r"bytes=(\d+)-(\d+)", self.headers.get("Range", ""))
+        if ranged:
+            start, end = int(ranged.group(1)), min(int(ranged.group(2)), len(data) - 1)
+        body = data[start:end + 1]
+        with server.lock:
+            server.blob_requests.append((match.group(1), start, end))
+            drop = server.drop_chunks > 0 and start > 0
+            if drop:
+                server.drop_chunks -= 1
+        self.send_response(206 if ranged else 200)
+        self.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if drop:  # connection drops halfway through the chunk
+            self.wfile.write(body[:len(body) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def registry():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RegistryHandler)
+    server.daemon_threads = True
+    server.handle_error = lambda request, client_address: None
+    server.manifests, server.blobs, server.blob_requests = {}, {}, []
+    server.drop_chunks = 0
+    server.lock = threading.Lock()
+
+    def publish(name, model_bytes, extra=b"{{ .Prompt }}"):
+        layers = []
+        for media_type, data in (("application/vnd.ollama.image.model", model_bytes),
+                                 ("application/vnd.ollama.image.template", extra)):
+            server.blobs[_digest(data)] = data
+            layers.append({"mediaType": media_type, "digest": _digest(data), "size": len(data)})
+        config = json.dumps({"model_format": "gguf"}).encode()
+        server.blobs[_digest(config)] = config
+        manifest = {"schemaVersion": 2, "config": {"digest": _digest(config), "size": len(config)},
+                    "layers": layers}
+        server.manifests[name] = json.dumps(manifest).encode()
+
+    server.publish = publish
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _model(size, seed=0):
+    return bytes((i * 31 + seed) % 251 for i in range(size))
+
+
+def test_pull_downloads_ranged_chunks_and_verifies(registry, tmp_path):
+    weights = _model(5 * CHUNK + 123)
+    registry.publish("library/llama3.2:latest", weights)
+    puller = ModelPuller(str(tmp_path / "store"), registry.url, connections=4, chunk_size=CHUNK)
+    stats = puller.pull("llama3.2")
+
+    assert stats["downloaded"] == stats["size"] and stats["reused"] == 0 and stats["blobs"] == 3
+    with open(blob_path(puller.store, _digest(weights)), "rb") as f:
+        assert f.read() == weights
+    ranges = sorted((s, e) for d, s, e in registry.blob_requests if d == _digest(weights))
+    assert ranges[0] == (0, CHUNK - 1) and len(ranges) == 6
+    assert not [n for n in os.listdir(os.path.join(puller.store, "blobs")) if n.endswith((".partial", ".json"))]
+
+    models_dir = str(tmp_path / "ollama")
+    assert import_model("llama3.2", puller.store, models_dir) == 3
+    assert import_model("llama3.2", puller.store, models_dir) == 0
+    assert find_model_file("llama3.2", [models_dir]) == blob_path(models_dir, _digest(weights))
+
+
+def test_interrupted_pull_resumes_missing_chunks(registry, tmp_path):
+    weights = _model(8 * CHUNK)
+    registry.publish("library/llama3.2:latest", weights)
+    registry.drop_chunks = 1
+    store = str(tmp_path / "store")
+    with pytest.raises(PullError):
+        ModelPuller(store, registry.url, connections=1, chunk_size=CHUNK).pull("llama3.2")
+    assert os.path.exists(blob_path(store, _digest(weights)) + ".partial")
+
+    registry.blob_requests.clear()
+    stats = ModelPuller(store, registry.url, connections=4, chunk_size=CHUNK).pull("llama3.2")
+    assert stats["resumed"] > 0 and stats["downloaded"] < len(weights)
+    refetched = {s for d, s, e in registry.blob_requests if d == _digest(weights)}
+    assert 0 not in refetched  # the first chunk finished before the drop
+    with open(blob_path(store, _digest(weights)), "rb") as f:
+        assert f.read() == weights
+
+
+def test_shared_blobs_are_downloaded_once(registry, tmp_path):
+    weights = _model(3 * CHUNK)
+    registry.publish("library/base:latest", weights)
+    registry.publish("library/chat:latest", weights, extra=b"{{ .System }} {{ .Prompt }}")
+    store = str(tmp_path / "store")
+    ModelPuller(store, registry.url, chunk_size=CHUNK).pull("base")
+    registry.blob_requests.clear()
+    stats = ModelPuller(store, registry.url, chunk_size=CHUNK).pull("chat")
+    assert stats["reused"] >= len(weights) and stats["blobs"] == 1
+    assert all(d != _digest(weights) for d, _, _ in registry.blob_requests)
+
+
+def test_corrupt_blob_fails_verification(registry, tmp_path):
+    weights = _model(2 * CHUNK)
+    registry.publish("library/llama3.2:latest", weights)
+    registry.blobs[_digest(weights)] = _model(2 * CHUNK, seed=7)
+    store = str(tmp_path / "store")
+    with pytest.raises(PullError, match="hashes to"):
+        ModelPuller(store, registry.url, chunk_size=CHUNK).pull("llama3.2")
+    assert not os.path.exists(blob_path(store, _digest(weights)))
+    assert not os.path.exists(blob_path(store, _digest(weights)) + ".partial")
+
+
+def test_unknown_model_and_bad_digests(registry, tmp_path):
+    with pytest.raises(PullError, match="not found"):
+        ModelPuller(str(tmp_path), registry.url).pull("missing")
+    registry.manifests["library/evil:latest"] = json.dumps(
+        {"layers": [{"digest": "sha256:../../etc/passwd", "size": 1}]}).encode()
+    with pytest.raises(PullError, match="invalid digest"):
+        ModelPuller(str(tmp_path), registry.url).pull("evil")
+
+
+def test_pull_command_imports_into_models_dir(registry, tmp_path, monkeypatch):
+    weights = _model(CHUNK + 1)
+    registry.publish("library/llama3.2:1b", weights)
+    monkeypatch.setattr(pull_module, "SOLO_MODELS_DIR", str(tmp_path / "store"))
+    models_dir = tmp_path / "ollama"
+    result = CliRunner().invoke(app, ["pull", "llama3.2:1b", "--registry", registry.url,
+                                      "--models-dir", str(models_dir)])
+    assert result.exit_code == 0, result.output
+    assert "Imported into" in result.output
+    assert os.path.exists(manifest_path("llama3.2:1b", str(models_dir)))
+    assert os.path.exists(manifest_path("llama3.2:1b", str(tmp_path / "store")))
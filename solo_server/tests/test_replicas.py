@@ -0,0 +1,47 @@
+from solo_server.start import build_run_command
+from solo_server.utils.balancer import LeastOutstandingBalancer
+from solo_server.utils.replicas import format_cpuset, load_replicas, plan_replicas, save_replicas
+
+
+def test_plan_pins_disjoint_cpusets_on_consecutive_ports():
+    plan = plan_replicas(3, cpus=list(range(8)))
+    assert [r["name"] for r in plan] == ["solo", "solo-1", "solo-2"]
+    assert [r["port"] for r in plan] == [11434, 11435, 11436]
+    assert [r["cpuset"] for r in plan] == ["0-2", "3-5", "6-7"]
+    assert plan_replicas(1) == [{"name": "solo", "port": 11434, "cpuset": None}]
+
+
+def test_format_cpuset_compacts_ranges():
+    assert format_cpuset([0, 1, 2, 3, 8, 9, 11]) == "0-3,8-9,11"
+
+
+def test_replica_set_round_trips(tmp_path):
+    path = str(tmp_path / "replicas.json")
+    assert load_replicas(path)[0]["name"] == "solo"
+    save_replicas(plan_replicas(2, cpus=[0, 1]), path)
+    assert [r["cpuset"] for r in load_replicas(path)] == ["0", "1"]
+
+
+def test_run_command_maps_replica_port_and_cpuset():
+    cmd = build_run_command({"name": "solo-1", "port": 11435, "cpuset": "4-7"}, "None", False)
+    assert cmd[cmd.index("-p") + 1] == "11435:11434"
+    assert cmd[cmd.index("--cpuset-cpus") + 1] == "4-7"
+    assert cmd[-1] == "ollama/ollama"
+
+
+def test_balancer_prefers_warm_replica_until_it_is_much_busier():
+    balancer = LeastOutstandingBalancer(3, spill_threshold=2)
+    balancer.update_loaded(2, ["llama3.2:latest"])
+    assert balancer.acquire("llama3.2") == 2
+    assert balancer.acquire("llama3.2") == 2
+    assert balancer.acquire("llama3.2") == 0  # warm replica is 2 ahead: spill
+    balancer.release(0, "llama3.2")
+    assert "llama3.2:latest" in balancer.loaded[0]
+    assert balancer.acquire("other") == 0
+
+
+def test_balancer_skips_unhealthy_replicas():
+    balancer = LeastOutstandingBalancer(2)
+    balancer.update_loaded(0, [], healthy=False)
+    assert balancer.acquire() == 1
+    assert balancer.acquire() == 1
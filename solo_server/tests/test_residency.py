@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+from solo_server.client import SoloClient
+from solo_server.utils.residency import (ResidencyError, ResidencyManager, parse_expiry, parse_keep_alive,
+                                        residency_summary)
+
+
+@pytest.fixture
+def manager(fake_ollama, tmp_path):
+    fake_ollama.local_models = {"a:latest": 40, "b:latest": 40, "c:latest": 40, "huge:latest": 500}
+    client = SoloClient(fake_ollama.url)
+    yield ResidencyManager(client, budget=100, state_path=str(tmp_path / "residency.json"))
+    client.close()
+
+
+def test_preload_records_cold_loads(manager, fake_ollama):
+    results = manager.preload(["a", "b"])
+    assert [r["cold"] for r in results] == [True, True]
+    assert set(fake_ollama.loaded) == {"a:latest", "b:latest"}
+    assert results[0]["load_seconds"] == pytest.approx(0.25)
+
+    assert manager.ensure("a")["cold"] is False
+    with open(manager.state_path) as f:
+        state = json.load(f)["models"]
+    assert state["a:latest"]["cold_loads"] == 1
+    assert state["a:latest"]["size"] == 40
+
+
+def test_evicts_least_recently_used_to_stay_in_budget(manager, fake_ollama):
+    manager.preload(["a", "b"])
+    manager.ensure("a")  # b is now the least recently used
+    result = manager.ensure("c")
+    assert result["evicted"] == ["b:latest"]
+    assert set(fake_ollama.loaded) == {"a:latest", "c:latest"}
+    assert sum(fake_ollama.loaded.values()) <= manager.budget
+
+
+def test_requests_from_other_clients_count_as_use(manager, fake_ollama):
+    manager.preload(["a", "b"])
+    # Traffic that bypasses the manager, as through `solo serve` or the gateway.
+    with SoloClient(fake_ollama.url) as client:
+        client.chat("a", [{"role": "user", "content": "hi"}])
+    assert manager.ensure("c")["evicted"] == ["b:latest"]
+    assert set(fake_ollama.loaded) == {"a:latest", "c:latest"}
+
+
+def test_longer_keep_alive_does_not_look_more_recent(manager, fake_ollama):
+    with SoloClient(fake_ollama.url) as client:
+        ResidencyManager(client, 100, keep_alive="2h", state_path=manager.state_path).ensure("a")
+        short = ResidencyManager(client, 100, keep_alive="5m", state_path=manager.state_path)
+        short.ensure("b")
+        assert short.ensure("c")["evicted"] == ["a:latest"]
+
+
+def test_parse_keep_alive_reads_ollama_durations():
+    assert parse_keep_alive("30m") == parse_keep_alive(1800) == parse_keep_alive("1800") == 1800
+    assert parse_keep_alive("1h30m") == 5400 and parse_keep_alive("1.5s") == 1.5
+    assert parse_keep_alive(-1) == parse_keep_alive("-1m") == float("inf")
+    assert parse_keep_alive("soon") == 300
+
+
+def test_parse_expiry_handles_ollama_timestamps():
+    assert parse_expiry("2024-06-04T14:38:31.837530123-07:00") == pytest.approx(1717537111.83753)
+    assert parse_expiry("2024-06-04T21:38:31Z") == 1717537111.0
+    assert parse_expiry(None) == parse_expiry("soon") == 0.0
+
+
+def test_refuses_model_larger_than_budget(manager, fake_ollama):
+    manager.ensure("a")
+    with pytest.raises(ResidencyError):
+        manager.ensure("huge")
+    assert set(fake_ollama.loaded) == {"a:latest"}
+
+
+def test_residency_summary_rows(manager, fake_ollama):
+    manager.preload(["a"])
+    rows = residency_summary(manager.state_path, resident=manager.resident())
+    assert rows == [["a:latest", "yes", "0.00 GiB", 1, "0.25s", "0.25s"]]
@@ -0,0 +1,69 @@
+import builtins
+
+import pytest
+
+from solo_server.client import SoloClient
+from solo_server.commands import run as run_module
+from solo_server.utils import residency
+
+
+@pytest.fixture(autouse=True)
+def isolated_residency(tmp_path, monkeypatch):
+    monkeypatch.setattr(residency, "RESIDENCY_FILE", str(tmp_path / "residency.json"))
+    monkeypatch.setattr(run_module, "memory_budget", lambda: 8 * residency.GIB)
+
+
+def _feed(monkeypatch, lines):
+    answers = iter(lines)
+
+    def fake_input(prompt=""):
+        try:
+            return next(answers)
+        except StopIteration:
+            raise EOFError
+
+    monkeypatch.setattr(builtins, "input", fake_input)
+
+
+def test_repl_persists_and_resumes_session(fake_ollama, tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(run_module, "SESSIONS_DIR", str(tmp_path))
+    monkeypatch.setattr(run_module, "SoloClient", lambda: SoloClient(fake_ollama.url))
+    _feed(monkeypatch, ["hello there", "/bye"])
+    run_module.run("llama3.2", resume=None, keep_alive="10m")
+    out = capsys.readouterr().out
+    assert "hello there" in out and "tok/s" in out
+    session_id = out.strip().rsplit("--resume ", 1)[1]
+
+    _feed(monkeypatch, ["second turn"])
+    run_module.run("ignored", resume=session_id, keep_alive=None)
+    session = run_module.load_session(session_id)
+    assert [m["role"] for m in session["messages"]] == ["user", "assistant", "user", "assistant"]
+    chats = [p for path, p in fake_ollama.requests if path == "/api/chat"]
+    assert chats[0]["keep_alive"] == "10m" and chats[1]["model"] == "llama3.2"
+    assert len(chats[1]["messages"]) == 3
+
+
+def test_missing_model_is_pulled_then_retried(fake_ollama, tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(run_module, "SESSIONS_DIR", str(tmp_path))
+    monkeypatch.setattr(run_module, "SoloClient", lambda: SoloClient(fake_ollama.url))
+    fake_ollama.missing_models.add("fresh")
+    _feed(monkeypatch, ["hi"])
+    run_module.run("fresh", resume=None, keep_alive="5m")
+    paths = [path for path, _ in fake_ollama.requests if path != "/api/generate"]
+    assert paths == ["/api/chat", "/api/pull", "/api/chat"]
+
+
+def test_run_makes_model_resident_first(fake_ollama, tmp_path, monkeypatch):
+    monkeypatch.setattr(run_module, "SESSIONS_DIR", str(tmp_path))
+    monkeypatch.setattr(run_module, "SoloClient", lambda: SoloClient(fake_ollama.url))
+    fake_ollama.local_models = {"llama3.2:latest": 1024}
+    _feed(monkeypatch, [])
+    run_module.run("llama3.2", resume=None, keep_alive="10m")
+    assert fake_ollama.loaded == {"llama3.2:latest": 1024}
+    assert residency.residency_summary()[0][:4] == ["llama3.2:latest", "?", "0.00 GiB", 1]
+
+
+def test_turn_stats_flag_cold_loads():
+    line = run_module.format_turn_stats({"server_tokens_per_s": 42.0, "ttft_ms": 120, "load_ms": 2300})
+    assert "42.0 tok/s" in line and "cold load" in line
+    assert "cold" not in run_module.format_turn_stats({"load_ms": 12})
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from solo_server.utils.scheduler import Overloaded, Scheduler, TokenBucket, estimate_cost
+
+
+def test_estimate_cost_scales_with_prompt_and_output():
+    short = {"messages": [{"role": "user", "content": "x" * 40}], "max_tokens": 10}
+    long = {"messages": [{"role": "user", "content": "x" * 4000}], "options": {"num_predict": 10}}
+    assert estimate_cost(short) == 100
+    assert estimate_cost(long) == 10000
+    assert estimate_cost({"input": "y" * 400}) == 100
+
+
+def test_token_bucket_refills_over_time():
+    bucket = TokenBucket(rate=10, capacity=20)
+    assert bucket.consume(20, now=bucket.updated) == 0
+    assert bucket.consume(5, now=bucket.updated) == pytest.approx(0.5)
+    assert bucket.consume(5, now=bucket.updated + 0.5) == 0
+
+
+def test_rate_limit_is_per_tenant():
+    scheduler = Scheduler(rate=1, burst=100, tenant_limits={"big": (1, 10_000)})
+    scheduler.check_rate("a", 100)
+    with pytest.raises(Overloaded):
+        scheduler.check_rate("a", 100)
+    scheduler.check_rate("b", 100)
+    scheduler.check_rate("big", 5000)
+    assert scheduler.snapshot()["rate_limited"] == 1
+
+
+def test_queue_budget_sheds_waiting_requests():
+    async def main():
+        scheduler = Scheduler(max_concurrent=1, budgets={"interactive": 1.0, "batch": 0.05})
+        order = []
+        await scheduler.acquire()
+
+        async def waiter(name, priority):
+            try:
+                await scheduler.acquire(priority)
+            except Overloaded:
+                order.append(f"{name}-shed")
+                return
+            order.append(name)
+            scheduler.release()
+
+        batch = asyncio.ensure_future(waiter("batch", "batch"))
+        await asyncio.sleep(0)
+        late_batch = asyncio.ensure_future(waiter("late-batch", "batch"))
+        interactive = asyncio.ensure_future(waiter("interactive", "interactive"))
+        await asyncio.sleep(0.1)  # both batch waiters blow their budget
+        scheduler.release()
+        await asyncio.gather(batch, late_batch, interactive)
+        return order, scheduler.snapshot()
+
+    order, snapshot = asyncio.run(main())
+    assert order == ["batch-shed", "late-batch-shed", "interactive"]
+    assert snapshot["shed"] == 2 and snapshot["active"] == 0
+    assert snapshot["queue_depth"] == {"interactive": 0, "batch": 0}
+    assert snapshot["wait_seconds"]["interactive"]["count"] == 2
+
+
+def test_interactive_jumps_ahead_of_queued_batch():
+    async def main():
+        scheduler = Scheduler(max_concurrent=1)
+        order = []
+        await scheduler.acquire()
+
+        async def waiter(name, priority):
+            await scheduler.acquire(priority)
+            order.append(name)
+            await asyncio.sleep(0)
+            scheduler.release()
+
+        tasks = [asyncio.ensure_future(waiter("batch", "batch"))]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.ensure_future(waiter("interactive", "interactive")))
+        await asyncio.sleep(0)
+        scheduler.release()
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(main()) == ["interactive", "batch"]
@@ -0,0 +1,77 @@
+import numpy as np
+
+from solo_server.client import SoloClient
+from solo_server.utils import semantic_cache
+from solo_server.utils.semantic_cache import SemanticCache, semantic_cache_summary
+
+
+def test_lookup_returns_nearest_above_threshold(tmp_path):
+    cache = SemanticCache("m", directory=str(tmp_path / "m"), threshold=0.9)
+    cache.add([1.0, 0.0, 0.0], {"message": {"content": "x"}})
+    cache.add([0.0, 1.0, 0.0], {"message": {"content": "y"}})
+    assert cache.lookup([0.05, 1.0, 0.0])["message"]["content"] == "y"
+    assert cache.lookup([1.0, 1.0, 0.0]) is None
+    cache.flush()
+
+    reopened = SemanticCache("m", directory=str(tmp_path / "m"), threshold=0.9)
+    assert reopened.meta["count"] == 2
+    assert reopened.lookup([2.0, 0.0, 0.0])["message"]["content"] == "x"
+
+
+def test_index_grows_past_initial_capacity(tmp_path, monkeypatch):
+    monkeypatch.setattr(semantic_cache, "INITIAL_CAPACITY", 4)
+    cache = SemanticCache("m", directory=str(tmp_path), threshold=0.99)
+    vectors = np.eye(10)
+    for i, vector in enumerate(vectors):
+        cache.add(vector, {"row": i})
+    assert cache.meta["capacity"] == 16
+    assert cache.lookup(vectors[7]) == {"row": 7}
+
+
+def test_lookup_sees_rows_added_after_the_float32_copy(tmp_path, monkeypatch):
+    monkeypatch.setattr(semantic_cache, "INITIAL_CAPACITY", 4)
+    cache = SemanticCache("m", directory=str(tmp_path), threshold=0.99)
+    vectors = np.eye(8)
+    for i, vector in enumerate(vectors):
+        cache.add(vector, {"row": i})
+        assert cache.lookup(vector) == {"row": i}
+    assert cache._dense.dtype == np.float32
+    assert [cache.lookup(v)["row"] for v in vectors] == list(range(8))
+
+
+def test_client_answers_near_duplicates(fake_ollama, tmp_path, monkeypatch):
+    monkeypatch.setattr(semantic_cache, "SEMANTIC_DIR", str(tmp_path))
+    monkeypatch.setattr(semantic_cache, "DEFAULT_THRESHOLD", 0.98)
+    with SoloClient(fake_ollama.url, semantic=True) as client:
+        first = client.chat("llama3.2", [{"role": "user", "content": "How do I reset my password"}])
+        again = client.chat("llama3.2", [{"role": "user", "content": "how do I reset my password?"}])
+        other = client.chat("llama3.2", [{"role": "user", "content": "zebra quiz"}])
+    chats = [path for path, _ in fake_ollama.requests if path == "/api/chat"]
+    assert again == first
+    assert other["message"]["content"] == "zebra quiz"
+    assert len(chats) == 2
+    rows = semantic_cache_summary(str(tmp_path))
+    assert rows[0][0] == "llama3.2" and rows[0][1] == 2 and rows[0][3] == "33.3%"
+
+
+def test_replies_are_not_shared_across_generation_settings(fake_ollama, tmp_path, monkeypatch):
+    monkeypatch.setattr(semantic_cache, "SEMANTIC_DIR", str(tmp_path))
+    messages = [{"role": "user", "content": "How do I reset my password"}]
+    with SoloClient(fake_ollama.url, semantic=True) as client:
+        client.chat("llama3.2", messages)
+        client.chat("llama3.2", messages, {"num_predict": 4})
+        client.chat("llama3.2", messages, format="json")
+        client.chat("llama3.2", messages, {"num_predict": 4})
+    assert len([path for path, _ in fake_ollama.requests if path == "/api/chat"]) == 3
+    assert len(semantic_cache_summary(str(tmp_path))) == 3
+
+
+def test_failed_or_truncated_replies_are_not_remembered(tmp_path):
+    cache = SemanticCache("m", directory=str(tmp_path), threshold=0.9)
+    client = SoloClient("http://127.0.0.1:9")
+    client._remember(None, cache, [1.0, 0.0], [{"message": {"content": "par"}}, {"error": "model crashed"}])
+    client._remember(None, cache, [1.0, 0.0], [{"message": {"content": "cut"}, "done": False}])
+    assert cache.lookup([1.0, 0.0]) is None
+    client._remember(None, cache, [1.0, 0.0], [{"message": {"content": "ok"}, "done": True}])
+    assert cache.lookup([1.0, 0.0])["message"]["content"] == "ok"
+    client.close()
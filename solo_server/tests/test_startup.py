@@ -0,0 +1,151 @@
+import socket
+import time
+
+import pytest
+
+from solo_server.start import ensure_image, record_startup
+from solo_server.utils import bench_store, docker_api, startup
+from solo_server.utils.docker_api import DockerError
+from solo_server.utils.hardware import HardwareInfo
+from solo_server.utils.startup import PhaseTimer, PullProgress, port_in_use, run_steps, wait_for, wait_until_ready
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_port_in_use_detects_listeners():
+    with socket.socket() as listener:
+        listener.bind(("0.0.0.0", 0))
+        listener.listen()
+        assert port_in_use(listener.getsockname()[1])
+    assert not port_in_use(_free_port())
+
+
+def test_port_in_use_ignores_time_wait_sockets():
+    with socket.socket() as listener:
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)  # as Go listeners (docker-proxy) do
+        listener.bind(("0.0.0.0", 0))
+        listener.listen()
+        port = listener.getsockname()[1]
+        client = socket.create_connection(("127.0.0.1", port))
+        accepted, _ = listener.accept()
+        accepted.close()  # the server side closes first and lingers in TIME_WAIT
+        client.close()
+    assert not port_in_use(port)
+
+
+def test_wait_for_backs_off_up_to_the_cap(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(startup.time, "sleep", sleeps.append)
+    calls = iter([False] * 7 + [True])
+    assert wait_for(lambda: next(calls), timeout=60, initial=0.05, cap=0.4)
+    assert sleeps == [0.05, 0.1, 0.2, 0.4, 0.4, 0.4, 0.4]
+
+
+def test_wait_for_gives_up_at_the_timeout():
+    began = time.monotonic()
+    assert not wait_for(lambda: False, timeout=0.2, initial=0.05, cap=0.1)
+    assert time.monotonic() - began < 1
+
+
+def test_wait_until_ready_polls_the_ollama_root(fake_ollama):
+    dead = f"http://127.0.0.1:{_free_port()}"
+    assert wait_until_ready([fake_ollama.url], timeout=2) == []
+    assert wait_until_ready([fake_ollama.url, dead], timeout=0.3) == [dead]
+
+
+def test_phase_timer_accumulates_repeated_phases(monkeypatch):
+    clock = iter([0.0, 1.0, 1.5, 2.0, 2.25, 3.0])
+    monkeypatch.setattr(startup.time, "perf_counter", lambda: next(clock))
+    timer = PhaseTimer()
+    with timer.phase("image"):
+        pass
+    with timer.phase("image"):
+        pass
+    assert timer.phases == {"image": 0.75}
+    assert timer.report()[-1].split() == ["total", "3000.0", "ms"]
+
+
+def test_run_steps_overlaps_independent_steps():
+    order = []
+
+    def step(name, seconds):
+        def run(done):
+            time.sleep(seconds)
+            order.append(name)
+            return name
+        return run
+
+    timer = PhaseTimer()
+    began = time.perf_counter()
+    results = run_steps({
+        "engine": (step("engine", 0.2), ()),
+        "hardware": (step("hardware", 0.2), ()),
+        "image": (lambda done: f"pulled after {done['engine']}", ("engine", "hardware")),
+    }, timer)
+    assert time.perf_counter() - began < 0.35
+    assert results["image"] == "pulled after engine" and set(order) == {"engine", "hardware"}
+    assert set(timer.phases) == {"engine", "hardware", "image"}
+
+    with pytest.raises(ValueError):
+        run_steps({"a": (lambda done: 1, ("b",)), "b": (lambda done: 2, ("a",))})
+
+    def fail(done):
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        run_steps({"a": (fail, ()), "b": (lambda done: 1, ("a",))})
+
+
+def test_pull_progress_reports_layer_changes_and_totals():
+    progress = PullProgress("ollama/ollama", interval=0)
+    lines = []
+    for event in [
+        {"status": "Pulling from ollama/ollama", "id": "latest"},
+        {"status": "Pulling fs layer", "id": "aaa"},
+        {"status": "Already exists", "id": "bbb"},
+        {"status": "Downloading", "id": "aaa", "progressDetail": {"current": 5_000_000, "total": 10_000_000}},
+        {"status": "Downloading", "id": "aaa", "progressDetail": {"current": 10_000_000, "total": 10_000_000}},
+        {"status": "Download complete", "id": "aaa"},
+        {"status": "Pull complete", "id": "aaa"},
+        {"status": "Status: Downloaded newer image for ollama/ollama:latest"},
+    ]:
+        lines += progress.feed(event)
+    assert lines[:2] == ["   aaa: Pulling fs layer", "   bbb: Already exists"]
+    assert "5.0 / 10.0 MB" in lines[2] and "1/2 layers" in lines[2]
+    assert lines[-3:] == ["   aaa: Download complete", "   aaa: Pull complete",
+                          "Status: Downloaded newer image for ollama/ollama:latest"]
+    assert progress.summary().endswith("2/2 layers complete")
+
+
+def test_ensure_image_skips_present_images_unless_always(fake_docker):
+    fake_docker.pull_events = [{"status": "Pulling fs layer", "id": "aaa"}, {"status": "Pull complete", "id": "aaa"}]
+    assert ensure_image("ollama/ollama") is True  # missing: pulled through the API
+    assert "ollama/ollama:latest" in fake_docker.images
+    assert ensure_image("ollama/ollama") is False
+    assert ensure_image("ollama/ollama", pull="always") is True
+    assert ensure_image("ollama/ollama:rocm", pull="never") is False
+    pulls = [q for method, path, q in fake_docker.requests if path == "/images/create"]
+    assert pulls == [{"fromImage": "ollama/ollama", "tag": "latest"}] * 2
+
+
+def test_pull_errors_arrive_in_band(fake_docker):
+    fake_docker.pull_events = [{"status": "Pulling fs layer", "id": "aaa"}, {"error": "manifest unknown"}]
+    with pytest.raises(DockerError, match="manifest unknown"):
+        docker_api.pull_image("ollama/ollama:nope")
+
+
+def test_startup_history_is_recorded(tmp_path, monkeypatch):
+    monkeypatch.setattr(bench_store, "BENCH_DB", str(tmp_path / "bench.db"))
+    timer = PhaseTimer()
+    with timer.phase("ready"):
+        pass
+    record_startup(timer, HardwareInfo("cpu", 4, 16.0), replicas=2, created=1, pulled=True)
+    store = bench_store.BenchStore()
+    [row] = store.startups()
+    store.close()
+    assert row["replicas"] == 2 and row["containers_created"] == 1 and row["image_pulled"] == 1
+    assert set(row["phases"]) == {"ready"} and row["total_ms"] >= row["phases"]["ready"]
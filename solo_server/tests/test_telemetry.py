@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from solo_server.commands.status import watch_status
+from solo_server.utils.hardware import GPUInfo, HardwareInfo
+from solo_server.utils.telemetry import (RingBuffer, TelemetrySampler, gpu_loads, load_dump, percentile,
+                                         render_watch, sparkline)
+
+HARDWARE = HardwareInfo("Test CPU", 2, 8.0, os="Linux")
+
+
+def test_ring_buffer_keeps_the_newest_rows_in_order():
+    buffer = RingBuffer(4, 2)
+    for i in range(6):
+        buffer.append([i, -i])
+    assert len(buffer) == 4
+    assert buffer.values()[:, 0].tolist() == [2, 3, 4, 5]
+
+
+def test_sampler_fills_buffers_and_dumps(tmp_path):
+    sampler = TelemetrySampler(interval=0.01, capacity=3, hardware=HARDWARE)
+    for _ in range(5):
+        sampler.sample()
+    snapshot = sampler.snapshot()
+    assert snapshot["cpu"].shape == (3,) and snapshot["cpu_cores"].shape == (3, sampler.cores)
+    assert np.all(np.diff(snapshot["time"]) >= 0) and (snapshot["disk_read"] >= 0).all()
+    assert "gpu" not in snapshot
+
+    path = str(tmp_path / "telemetry.npz")
+    sampler.dump(path)
+    dumped = load_dump(path)
+    assert dumped["interval"] == pytest.approx(0.01)
+    assert np.array_equal(dumped["memory"], snapshot["memory"])
+
+
+def test_sparkline_and_dashboard():
+    assert sparkline(np.array([0, 50, 100]), low=0, high=100) == "▁▅█"
+    assert sparkline(np.array([3.0, np.nan, 3.0])) == "▁ ▁"
+    assert percentile(np.array([np.nan] + list(range(101)))) == pytest.approx(95.0)
+    snapshot = {name: np.array([10.0, 20.0]) for name in ("cpu", "memory", "swap", "disk_read",
+                                                          "disk_write", "net_recv", "net_sent")}
+    snapshot["cpu_cores"] = np.array([[0.0, 100.0], [50.0, 100.0]])
+    snapshot["gpu"] = np.array([[30.0], [40.0]])
+    lines = render_watch(snapshot, width=10)
+    assert any(line.startswith("gpu0") and "40.0%" in line for line in lines)
+    assert lines[-1].endswith("▅█")
+
+
+def test_gpu_load_is_read_from_sysfs(tmp_path):
+    device = tmp_path / "sys/class/drm/card0/device"
+    device.mkdir(parents=True)
+    (device / "gpu_busy_percent").write_text("37\n")
+    gpus = [GPUInfo("AMD", "Radeon Test", 24.0, "device")]
+    assert gpu_loads(gpus, str(tmp_path)) == [37.0]
+
+
+def test_watch_dumps_on_exit(tmp_path, monkeypatch):
+    from solo_server.commands import status as status_module
+    monkeypatch.setattr(status_module, "detect_hardware", lambda: HARDWARE)
+    path = str(tmp_path / "watch.npz")
+    watch_status(interval=0.01, dump=path, frames=3)
+    assert len(load_dump(path)["cpu"]) >= 1
@@ -0,0 +1,118 @@
+from solo_server.start import build_run_command, replica_drift
+from solo_server.utils import replicas as replicas_module
+from solo_server.utils.replicas import plan_replicas
+from solo_server.utils.topology import parse_cpulist, physical_cores, plan_placement, read_topology
+
+
+def _write(root, relative, text):
+    path = root / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+def dual_socket(tmp_path):
+    """2 sockets x 4 cores x 2 threads; siblings are n and n+8, socket 1 holds cores 4-7."""
+    root = tmp_path / "dual"
+    system = "sys/devices/system"
+    _write(root, f"{system}/cpu/online", "0-15\n")
+    for cpu in range(16):
+        core = cpu % 8
+        package = core // 4
+        _write(root, f"{system}/cpu/cpu{cpu}/topology/core_id", str(core))
+        _write(root, f"{system}/cpu/cpu{cpu}/topology/physical_package_id", str(package))
+        _write(root, f"{system}/cpu/cpu{cpu}/cache/index3/level", "3")
+        _write(root, f"{system}/cpu/cpu{cpu}/cache/index3/id", str(package))
+    _write(root, f"{system}/node/node0/cpulist", "0-3,8-11")
+    _write(root, f"{system}/node/node1/cpulist", "4-7,12-15")
+    _write(root, f"{system}/node/node0/meminfo", "Node 0 MemTotal:       67108864 kB\n")
+    return str(root)
+
+
+def test_parse_cpulist():
+    assert parse_cpulist("0-3,8,10-11\n") == [0, 1, 2, 3, 8, 10, 11]
+
+
+def test_reads_sockets_nodes_and_smt(tmp_path):
+    topo = read_topology(dual_socket(tmp_path))
+    assert topo.sockets == [0, 1] and topo.nodes == [0, 1] and topo.l3_domains == [0, 1]
+    assert topo.smt and not topo.hybrid and physical_cores(topo.cpus) == 8
+    assert topo.node_memory_gb == {0: 64.0}
+
+
+def test_replicas_are_pinned_to_one_node_each(tmp_path):
+    placement = plan_placement(read_topology(dual_socket(tmp_path)), 2)
+    assert [(p["cpuset"], p["cpuset_mems"], p["num_thread"]) for p in placement] == [
+        ("0-3,8-11", "0", 4), ("4-7,12-15", "1", 4)]
+
+    four = plan_placement(read_topology(dual_socket(tmp_path)), 4)
+    assert [p["cpuset"] for p in four] == ["0-1,8-9", "4-5,12-13", "2-3,10-11", "6-7,14-15"]
+    assert [p["num_thread"] for p in four] == [2, 2, 2, 2]
+
+    single = plan_placement(read_topology(dual_socket(tmp_path)), 1)[0]
+    assert single["cpuset"] == "0-3,8-11" and single["cpuset_mems"] == "0"
+
+
+def test_hybrid_parts_use_performance_cores(tmp_path):
+    root = tmp_path / "hybrid"
+    _write(root, "sys/devices/system/cpu/online", "0-5")
+    for cpu in range(6):
+        _write(root, f"sys/devices/system/cpu/cpu{cpu}/topology/core_id", str(cpu // 2 if cpu < 4 else cpu))
+    _write(root, "sys/devices/cpu_core/cpus", "0-3")
+    _write(root, "sys/devices/cpu_atom/cpus", "4-5")
+    topo = read_topology(str(root))
+    assert topo.hybrid
+    placement = plan_placement(topo, 1)[0]
+    assert placement["cpuset"] == "0-3" and placement["num_thread"] == 2
+    assert placement["cpuset_mems"] is None
+
+
+def test_run_command_carries_placement(tmp_path):
+    replica = plan_replicas(2, placement=plan_placement(read_topology(dual_socket(tmp_path)), 2))[1]
+    cmd = build_run_command(replica, "None", False)
+    assert cmd[cmd.index("--cpuset-mems") + 1] == "1"
+    assert cmd[cmd.index("--shm-size") + 1] == "1g"
+    assert "memlock=-1:-1" in cmd and cmd[-1] == "ollama/ollama"
+
+
+def test_client_uses_replica_thread_count(fake_ollama, tmp_path, monkeypatch):
+    from solo_server.client import SoloClient
+    port = int(fake_ollama.url.rsplit(":", 1)[1])
+    monkeypatch.setattr(replicas_module, "REPLICAS_FILE", str(tmp_path / "replicas.json"))
+    replicas_module.save_replicas([{"name": "solo", "port": port, "cpuset": "0-3", "num_thread": 4}])
+    url = fake_ollama.url.replace("127.0.0.1", "localhost")
+    with SoloClient(url) as client:
+        client.chat("llama3.2", [{"role": "user", "content": "hi"}])
+        client.chat("llama3.2", [{"role": "user", "content": "hi"}], options={"num_thread": 2})
+    first, second = [p for path, p in fake_ollama.requests if path == "/api/chat"]
+    assert first["options"] == {"num_thread": 4} and second["options"] == {"num_thread": 2}
+
+
+def test_load_sends_the_same_options_as_chat(fake_ollama, tmp_path, monkeypatch):
+    from solo_server.client import SoloClient
+    port = int(fake_ollama.url.rsplit(":", 1)[1])
+    monkeypatch.setattr(replicas_module, "REPLICAS_FILE", str(tmp_path / "replicas.json"))
+    replicas_module.save_replicas([{"name": "solo", "port": port, "cpuset": "0-3", "num_thread": 4}])
+    fake_ollama.local_models = {"llama3.2:latest": 2_019_000_000}
+    url = fake_ollama.url.replace("127.0.0.1", "localhost")
+    with SoloClient(url) as client:
+        client.load("llama3.2")
+        client.chat("llama3.2", [{"role": "user", "content": "hi"}])
+    (_, load), (_, chat) = fake_ollama.requests
+    assert load["keep_alive"] == "30m" and load["options"] == chat["options"] == {"num_thread": 4}
+
+
+def test_existing_replicas_are_checked_against_the_plan():
+    details = {"Config": {"Env": ["OLLAMA_NUM_PARALLEL=2"]},
+               "HostConfig": {"CpusetCpus": "", "CpusetMems": "",
+                              "DeviceRequests": [{"Count": -1, "Capabilities": [["gpu"]]}]}}
+    # An unpinned `solo` from a single-replica start, now one of two pinned replicas.
+    replica = {"name": "solo", "port": 11434, "cpuset": "0-3", "cpuset_mems": "0", "gpus": [0]}
+    assert replica_drift(details, replica, "NVIDIA", True) == ["CPU set", "memory nodes", "GPUs"]
+    assert replica_drift(details, {"name": "solo", "port": 11434}, "NVIDIA", True) == []
+    assert replica_drift(details, {"name": "solo", "port": 11434}, "NVIDIA", True,
+                         {"OLLAMA_NUM_PARALLEL": "4"}) == ["tuned settings"]
+
+    pinned = {"Config": {"Env": ["ROCR_VISIBLE_DEVICES=1"]},
+              "HostConfig": {"CpusetCpus": "0-3", "CpusetMems": "0"}}
+    assert replica_drift(pinned, {**replica, "gpus": [1]}, "AMD", False) == []
+    assert replica_drift(pinned, replica, "AMD", False) == ["GPUs"]
@@ -0,0 +1,111 @@
+import pytest
+from typer.testing import CliRunner
+
+from solo_server import client as client_module
+from solo_server import config
+from solo_server.cli import app
+from solo_server.client import SoloClient
+from solo_server.commands import tune as tune_module
+from solo_server.start import build_run_command
+from solo_server.utils import tuner
+from solo_server.utils.hardware import HardwareInfo
+
+HARDWARE = HardwareInfo("Test CPU", 4, 16.0, os="Linux")
+
+
+@pytest.fixture(autouse=True)
+def isolated_config(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "SOLO_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "CONFIG_FILE", str(tmp_path / "solo.conf"))
+
+
+def test_successive_halving_keeps_the_best_and_grows_the_budget():
+    candidates = [{"num_batch": b} for b in (64, 128, 256, 512, 1024, 2048, 4096, 8192)]
+    calls = []
+
+    def evaluate(rung, budget):
+        calls.append((len(rung), budget))
+        return [-abs(c["num_batch"] - 512) for c in rung]
+
+    best, score, history = tuner.successive_halving(candidates, evaluate, min_budget=2, eta=2)
+    assert best == {"num_batch": 512} and score == 0
+    assert calls == [(8, 2), (4, 4), (2, 8), (1, 16)]
+    assert len(history) == 15
+
+
+def test_grid_sampling_and_split():
+    space = tuner.default_space(8)
+    grid = tuner.candidate_grid(space, max_candidates=10, seed=1)
+    assert len(grid) == 10 and grid == tuner.candidate_grid(space, max_candidates=10, seed=1)
+    options, env = tuner.split_candidate(grid[0])
+    assert set(options) == set(tuner.OPTION_KNOBS) and set(env) == set(tuner.ENV_KNOBS)
+    assert all(isinstance(v, str) for v in env.values())
+
+
+def test_profiles_round_trip_through_solo_conf():
+    tuner.save_profile("llama3.2", "fp1", {"num_thread": 4, "OLLAMA_NUM_PARALLEL": 2}, 42.0)
+    tuner.save_profile("qwen2.5", "fp1", {"num_thread": 8, "OLLAMA_NUM_PARALLEL": 4}, 40.0)
+    assert tuner.load_profile("llama3.2:latest", "fp1") == {"num_thread": 4, "OLLAMA_NUM_PARALLEL": 2}
+    assert tuner.load_profile("llama3.2", "other-host") is None
+    assert tuner.tuned_env("fp1", ["llama3.2"]) == {"OLLAMA_NUM_PARALLEL": "2"}
+    assert tuner.tuned_env("fp2") == {}
+
+
+def test_clients_merge_tuned_options(fake_ollama, monkeypatch):
+    monkeypatch.setattr(client_module, "hardware_fingerprint", lambda: "fp1")
+    tuner.save_profile("llama3.2", "fp1", {"num_thread": 6, "num_ctx": 4096, "OLLAMA_NUM_PARALLEL": 2}, 1.0)
+    with SoloClient(fake_ollama.url) as client:
+        client.chat("llama3.2", [{"role": "user", "content": "hi"}], options={"num_ctx": 2048})
+        client.chat("other", [{"role": "user", "content": "hi"}])
+    tuned, untouched = [p for path, p in fake_ollama.requests if path == "/api/chat"]
+    assert tuned["options"] == {"num_thread": 6, "num_ctx": 2048}
+    assert "options" not in untouched
+
+
+def test_run_command_carries_tuned_environment():
+    cmd = build_run_command({"name": "solo", "port": 11434}, "None", False,
+                            {"OLLAMA_NUM_PARALLEL": "4", "OLLAMA_FLASH_ATTENTION": "1"})
+    assert cmd[cmd.index("-e") + 1] == "OLLAMA_FLASH_ATTENTION=1"
+    assert "OLLAMA_NUM_PARALLEL=4" in cmd and cmd[-1] == "ollama/ollama"
+
+
+def test_tune_command_saves_the_winner(fake_ollama, monkeypatch):
+    monkeypatch.setattr(tune_module, "detect_hardware", lambda: HARDWARE)
+    result = CliRunner().invoke(app, ["tune", "llama3.2", "--url", fake_ollama.url,
+                                      "--max-candidates", "4", "--min-requests", "1"])
+    assert result.exit_code == 0, result.output
+    profile = tuner.load_profile("llama3.2", tune_module.hardware_fingerprint(HARDWARE))
+    assert set(profile) == set(tuner.OPTION_KNOBS)
+
+
+def test_tune_restart_is_confirmed_and_refuses_replica_sets(fake_ollama, tmp_path, monkeypatch):
+    from solo_server.utils import replicas as replicas_module
+    monkeypatch.setattr(replicas_module, "REPLICAS_FILE", str(tmp_path / "replicas.json"))
+    relaunched = []
+    monkeypatch.setattr(tune_module, "relaunch_server", lambda *args: relaunched.append(args))
+    args = ["tune", "llama3.2", "--url", fake_ollama.url, "--restart"]
+
+    result = CliRunner().invoke(app, args, input="n\n")
+    assert result.exit_code == 1 and "recreate the solo container" in result.output
+    replicas_module.save_replicas(replicas_module.plan_replicas(2))
+    result = CliRunner().invoke(app, args + ["--yes"])
+    assert result.exit_code == 1 and "2 replicas are running" in result.output
+    assert relaunched == []
+
+
+def test_tune_restart_restores_the_container_when_the_sweep_fails(tmp_path, monkeypatch):
+    from solo_server.utils import replicas as replicas_module
+    monkeypatch.setattr(replicas_module, "REPLICAS_FILE", str(tmp_path / "replicas.json"))
+    monkeypatch.setattr(tune_module, "detect_hardware", lambda: HARDWARE)
+    monkeypatch.setattr(tune_module, "container_env", lambda name: {"OLLAMA_NUM_PARALLEL": "1", "PATH": "/bin"})
+    relaunched = []
+    monkeypatch.setattr(tune_module, "relaunch_server", lambda env, *args: relaunched.append(env))
+
+    async def crashing_load(*args, **kwargs):
+        raise RuntimeError("server crashed")
+
+    monkeypatch.setattr(tune_module, "run_load", crashing_load)
+    result = CliRunner().invoke(app, ["tune", "llama3.2", "--restart", "--yes", "--max-candidates", "4",
+                                      "--min-requests", "1"])
+    assert result.exit_code == 1 and "Tuning failed" in result.output
+    assert len(relaunched) == 2 and relaunched[-1] == {"OLLAMA_NUM_PARALLEL": "1"}
@@ -0,0 +1,67 @@
+from typing import Dict, Iterable, List, Optional, Set
+
+
+def normalize_model(name: str) -> str:
+    """Ollama treats "llama3.2" and "llama3.2:latest" as the same model."""
+    return name if ":" in name.rsplit("/", 1)[-1] else f"{name}:latest"
+
+
+class LeastOutstandingBalancer:
+    """
+    Picks a replica for each request by model affinity, then by load.
+
+    Replicas that already have the requested model loaded are preferred so
+    requests do not trigger a cold load elsewhere. Among the candidates the
+    one with the fewest outstanding requests wins; if every warm replica is
+    ``spill_threshold`` requests busier than the idlest replica overall,
+    the request spills over to that idle replica instead.
+    """
+
+    def __init__(self, count: int, spill_threshold: int = 2):
+        self.outstanding = [0] * count
+        self.loaded: List[Set[str]] = [set() for _ in range(count)]
+        self.healthy = [True] * count
+        self.spill_threshold = spill_threshold
+        self.routed = [0] * count
+
+    def _least(self, indexes: Iterable[int]) -> Optional[int]:
+        best = None
+        for index in indexes:
+            if self.healthy[index] and (best is None or self.outstanding[index] < self.outstanding[best]):
+                best = index
+        return best
+
+    def choose(self, model: Optional[str] = None) -> int:
+        model = normalize_model(model) if model else None
+        indexes = range(len(self.outstanding))
+        idlest = self._least(indexes)
+        if idlest is None:
+            idlest = min(indexes, key=lambda i: self.outstanding[i])  # all unhealthy: try anyway
+        if model:
+            warm = self._least(i for i in indexes if model in self.loaded[i])
+            if warm is not None and self.outstanding[warm] - self.outstanding[idlest] < self.spill_threshold:
+                return warm
+        return idlest
+
+    def acquire(self, model: Optional[str] = None) -> int:
+        index = self.choose(model)
+        self.outstanding[index] += 1
+        self.routed[index] += 1
+        return index
+
+    def release(self, index: int, model: Optional[str] = None, ok: bool = True):
+        self.outstanding[index] -= 1
+        if ok and model:
+            self.loaded[index].add(normalize_model(model))
+
+    def update_loaded(self, index: int, models: Iterable[str], healthy: bool = True):
+        """Replaces a replica's loaded-model set, e.g. from its /api/ps."""
+        self.loaded[index] = {normalize_model(m) for m in models}
+        self.healthy[index] = healthy
+
+    def snapshot(self) -> List[Dict]:
+        return [
+            {"outstanding": self.outstanding[i], "routed": self.routed[i],
+             "healthy": self.healthy[i], "loaded": sorted(self.loaded[i])}
+            for i in range(len(self.outstanding))
+        ]
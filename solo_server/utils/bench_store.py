@@ -0,0 +1,235 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from solo_server.config import SOLO_DIR
+from solo_server.utils.bootstrap import bootstrap_change
+
+BENCH_DB = os.path.join(SOLO_DIR, "bench.db")
+DEFAULT_TOLERANCE = 0.05
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created REAL NOT NULL,
+    model TEXT NOT NULL,
+    quantization TEXT,
+    solo_version TEXT,
+    config TEXT NOT NULL,
+    config_hash TEXT NOT NULL,
+    hardware TEXT NOT NULL,
+    report TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_key ON runs (model, quantization, solo_version, config_hash, hardware);
+CREATE TABLE IF NOT EXISTS samples (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    ttft_ms REAL,
+    e2e_ms REAL NOT NULL,
+    tokens INTEGER
+);
+CREATE INDEX IF NOT EXISTS samples_run ON samples (run_id);
+CREATE TABLE IF NOT EXISTS knees (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created REAL NOT NULL,
+    model TEXT NOT NULL,
+    quantization TEXT,
+    solo_version TEXT,
+    hardware TEXT NOT NULL,
+    slo_p99_ttft_ms REAL NOT NULL,
+    max_concurrency INTEGER NOT NULL,
+    max_requests_per_s REAL NOT NULL,
+    max_tokens_per_s REAL NOT NULL,
+    curve TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS knees_key ON knees (hardware, model);
+CREATE TABLE IF NOT EXISTS startups (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created REAL NOT NULL,
+    solo_version TEXT,
+    hardware TEXT NOT NULL,
+    replicas INTEGER NOT NULL,
+    containers_created INTEGER NOT NULL,
+    image_pulled INTEGER NOT NULL,
+    total_ms REAL NOT NULL,
+    phases TEXT NOT NULL
+);
+"""
+
+# name, sample column(s), higher_is_better
+METRICS = (
+    ("throughput_tok_s", "throughput", True),
+    ("ttft_p99_ms", "ttft_ms", False),
+    ("e2e_p99_ms", "e2e_ms", False),
+)
+
+
+def solo_version() -> str:
+    try:
+        from importlib.metadata import version
+        return version("solo-server")
+    except Exception:
+        return "unknown"
+
+
+def config_hash(config: Dict) -> str:
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()[:12]
+
+
+class BenchStore:
+    """
+    SQLite history of benchmark runs in ``~/.solo/bench.db``.
+
+    Each run is keyed by model, quantization, solo version, a hash of the
+    load configuration and the hardware fingerprint; its per-request
+    samples are kept so runs can be compared statistically later.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or BENCH_DB
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def record(self, report: Dict, samples: List[Dict], quantization: str, hardware: str,
+               version: Optional[str] = None) -> int:
+        config = report.get("config", {})
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO runs (created, model, quantization, solo_version, config, config_hash, hardware, report)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (time.time(), report["model"], quantization, version or solo_version(),
+                 json.dumps(config, sort_keys=True), config_hash(config), hardware, json.dumps(report)),
+            )
+            run_id = cursor.lastrowid
+            self.conn.executemany(
+                "INSERT INTO samples (run_id, ttft_ms, e2e_ms, tokens) VALUES (?, ?, ?, ?)",
+                [(run_id, s.get("ttft_ms"), s["e2e_ms"], s.get("tokens")) for s in samples],
+            )
+        return run_id
+
+    def get(self, run_id: int) -> Optional[Dict]:
+        row = self.conn.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+        if row is None:
+            return None
+        run = dict(row)
+        run["config"] = json.loads(run["config"])
+        run["report"] = json.loads(run["report"])
+        return run
+
+    def samples(self, run_id: int) -> np.ndarray:
+        """Per-request ``(ttft_ms, e2e_ms, tokens)`` rows; missing TTFTs are NaN."""
+        rows = self.conn.execute(
+            "SELECT ttft_ms, e2e_ms, tokens FROM samples WHERE run_id = ? ORDER BY rowid", (run_id,)
+        ).fetchall()
+        return np.array([[np.nan if r[0] is None else r[0], r[1], r[2] or 0] for r in rows],
+                        dtype=np.float64).reshape(-1, 3)
+
+    def list_runs(self, model: Optional[str] = None, limit: int = 20) -> List[Dict]:
+        query = "SELECT id, created, model, quantization, solo_version, config_hash, hardware, report FROM runs"
+        params = ()
+        if model:
+            query += " WHERE model = ?"
+            params = (model,)
+        query += " ORDER BY id DESC LIMIT ?"
+        runs = []
+        for row in self.conn.execute(query, params + (limit,)):
+            run = dict(row)
+            run["report"] = json.loads(run["report"])
+            runs.append(run)
+        return runs
+
+    def record_knee(self, model: str, knee: Dict, quantization: str, hardware: str,
+                    version: Optional[str] = None) -> int:
+        """Stores a saturation curve from :func:`find_knee` under the hardware fingerprint."""
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO knees (created, model, quantization, solo_version, hardware, slo_p99_ttft_ms,"
+                " max_concurrency, max_requests_per_s, max_tokens_per_s, curve)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (time.time(), model, quantization, version or solo_version(), hardware,
+                 knee["slo_p99_ttft_ms"], knee["max_concurrency"], knee["max_requests_per_s"],
+                 knee["max_tokens_per_s"], json.dumps(knee["curve"])),
+            )
+        return cursor.lastrowid
+
+    def knees(self, model: Optional[str] = None) -> List[Dict]:
+        """Latest saturation point per (hardware, model, quantization)."""
+        query = "SELECT * FROM knees WHERE id IN (SELECT MAX(id) FROM knees GROUP BY hardware, model, quantization)"
+        params = ()
+        if model:
+            query += " AND model = ?"
+            params = (model,)
+        rows = []
+        for row in self.conn.execute(query + " ORDER BY model, max_requests_per_s DESC", params):
+            knee = dict(row)
+            knee["curve"] = json.loads(knee["curve"])
+            rows.append(knee)
+        return rows
+
+    def record_startup(self, total_ms: float, phases: Dict[str, float], hardware: str, replicas: int,
+                       containers_created: int, image_pulled: bool, version: Optional[str] = None) -> int:
+        """Stores one `solo start` cold-to-ready time with its per-phase breakdown (ms)."""
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO startups (created, solo_version, hardware, replicas, containers_created,"
+                " image_pulled, total_ms, phases) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (time.time(), version or solo_version(), hardware, replicas, containers_created,
+                 int(image_pulled), total_ms, json.dumps(phases)),
+            )
+        return cursor.lastrowid
+
+    def startups(self, limit: int = 20) -> List[Dict]:
+        rows = []
+        for row in self.conn.execute("SELECT * FROM startups ORDER BY id DESC LIMIT ?", (limit,)):
+            startup = dict(row)
+            startup["phases"] = json.loads(startup["phases"])
+            rows.append(startup)
+        return rows
+
+    def close(self):
+        self.conn.close()
+
+
+def _statistic(metric: str):
+    if metric == "throughput":
+        # Decode throughput per stream: generated tokens over time spent streaming.
+        return lambda s: s[..., 2].sum(axis=-1) / s[..., 1].sum(axis=-1) * 1000
+    column = {"ttft_ms": 0, "e2e_ms": 1}[metric]
+    return lambda s: np.nanpercentile(s[..., column], 99, axis=-1)
+
+
+def compare_samples(baseline: np.ndarray, candidate: np.ndarray, tolerance: float = DEFAULT_TOLERANCE,
+                    resamples: int = 2000, confidence: float = 0.95) -> List[Dict]:
+    """
+    Relative change of each metric from ``baseline`` to ``candidate``.
+
+    A metric regresses when the whole bootstrap confidence interval lies on
+    the worse side of zero and the point estimate is worse than
+    ``tolerance``, so noise and trivial shifts do not trip the gate.
+    """
+    results = []
+    for name, metric, higher_is_better in METRICS:
+        statistic = _statistic(metric)
+        if metric == "ttft_ms" and (np.isnan(baseline[:, 0]).all() or np.isnan(candidate[:, 0]).all()):
+            continue
+        point, low, high = bootstrap_change(baseline, candidate, statistic, resamples, confidence)
+        worse = -point if higher_is_better else point
+        significant = high < 0 or low > 0
+        regression = significant and worse > tolerance and (high < 0 if higher_is_better else low > 0)
+        results.append({
+            "metric": name,
+            "baseline": float(statistic(baseline[np.newaxis])[0]),
+            "candidate": float(statistic(candidate[np.newaxis])[0]),
+            "change": point,
+            "ci_low": low,
+            "ci_high": high,
+            "significant": bool(significant),
+            "regression": bool(regression),
+        })
+    return results
@@ -0,0 +1,52 @@
+from typing import Callable, Tuple
+
+import numpy as np
+
+DEFAULT_RESAMPLES = 2000
+# Resamples are drawn in blocks so memory stays bounded for large runs.
+BLOCK = 200
+
+
+def _resampled(values: np.ndarray, statistic: Callable, resamples: int,
+               rng: np.random.Generator) -> np.ndarray:
+    out = np.empty(resamples)
+    n = len(values)
+    for start in range(0, resamples, BLOCK):
+        count = min(BLOCK, resamples - start)
+        out[start:start + count] = statistic(values[rng.integers(0, n, size=(count, n))])
+    return out
+
+
+def bootstrap_ci(values, statistic: Callable, resamples: int = DEFAULT_RESAMPLES,
+                 confidence: float = 0.95, seed: int = 0) -> Tuple[float, float, float]:
+    """
+    Percentile bootstrap confidence interval of ``statistic``.
+
+    ``values`` is an array of per-sample rows; ``statistic`` receives a
+    ``(resamples, n, ...)`` block and must reduce axis 1. Returns
+    ``(point, low, high)``.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    point = float(statistic(values[np.newaxis])[0])
+    dist = _resampled(values, statistic, resamples, rng)
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(dist, [tail, 100 - tail])
+    return point, float(low), float(high)
+
+
+def bootstrap_change(baseline, candidate, statistic: Callable, resamples: int = DEFAULT_RESAMPLES,
+                     confidence: float = 0.95, seed: int = 0) -> Tuple[float, float, float]:
+    """
+    Relative change ``candidate / baseline - 1`` of ``statistic`` with a
+    bootstrap confidence interval, resampling both runs independently.
+    """
+    baseline = np.asarray(baseline, dtype=np.float64)
+    candidate = np.asarray(candidate, dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    point = float(statistic(candidate[np.newaxis])[0] / statistic(baseline[np.newaxis])[0] - 1)
+    ratios = (_resampled(candidate, statistic, resamples, rng)
+              / _resampled(baseline, statistic, resamples, rng)) - 1
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(ratios, [tail, 100 - tail])
+    return point, float(low), float(high)
@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional
+
+from solo_server.config import SOLO_DIR, get_config_value
+
+CACHE_DIR = os.path.join(SOLO_DIR, "cache")
+DEFAULT_CACHE_MAX_MB = 512
+
+# Request fields that change what the model generates. Anything else
+# (stream, keep_alive, ...) is transport detail and must not split the key.
+KEY_FIELDS = ("model", "messages", "options", "format", "tools", "template", "system")
+
+
+def is_deterministic(options: Optional[Dict]) -> bool:
+    """Only temperature-0 or fixed-seed requests are safe to replay."""
+    if not options:
+        return False
+    return options.get("temperature") == 0 or options.get("seed") is not None
+
+
+def cache_key(payload: Dict) -> str:
+    """Content address of a chat request: sha256 over its canonical JSON."""
+    material = {field: payload[field] for field in KEY_FIELDS if payload.get(field) is not None}
+    blob = json.dumps(material, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def is_complete(chunks: List[Dict]) -> bool:
+    """A reply worth keeping: the stream finished and no chunk carried an error."""
+    return bool(chunks) and chunks[-1].get("done") is True and not any("error" in c for c in chunks)
+
+
+def chunks_to_reply(chunks: List[Dict]) -> Dict:
+    """Collapses cached stream chunks into a single non-streaming reply."""
+    if len(chunks) == 1:
+        return chunks[0]
+    reply = dict(chunks[-1])
+    message = dict(reply.get("message") or {"role": "assistant"})
+    message["content"] = "".join(c.get("message", {}).get("content", "") for c in chunks)
+    reply["message"] = message
+    return reply
+
+
+class ResponseCache:
+    """
+    On-disk, content-addressed store of chat responses.
+
+    Each entry is the list of chunks the server sent, stored as JSONL so a
+    streamed answer replays chunk-for-chunk. File mtimes track recency and
+    the least recently used entries are evicted once the directory grows
+    past ``max_bytes`` (``cache_max_mb`` in solo.conf).
+    """
+
+    def __init__(self, directory: str = CACHE_DIR, max_bytes: Optional[int] = None):
+        self.directory = directory
+        if max_bytes is None:
+            max_bytes = int(float(get_config_value("cache_max_mb", DEFAULT_CACHE_MAX_MB)) * 1024 * 1024)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._bytes = None  # running size of the directory, scanned on first write
+
+    def key_for(self, payload: Dict) -> Optional[str]:
+        """Returns the cache key, or None when the request must not be cached."""
+        if not is_deterministic(payload.get("options")):
+            return None
+        return cache_key(payload)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.jsonl")
+
+    def get(self, key: str) -> Optional[List[Dict]]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                chunks = [json.loads(line) for line in f if line.strip()]
+            os.utime(path)  # mark as recently used
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return chunks
+
+    def put(self, key: str, chunks: List[Dict]):
+        if not is_complete(chunks):
+            return  # never store a truncated or failed stream
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if self._bytes is None:
+            self._bytes = sum(size for _, size, _ in self._entries())
+        try:
+            self._bytes -= os.path.getsize(path)
+        except OSError:
+            pass
+        data = "".join(json.dumps(chunk, ensure_ascii=False) + "\n" for chunk in chunks).encode("utf-8")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        self._bytes += len(data)
+        if self._bytes > self.max_bytes:
+            self.evict()
+
+    def _entries(self):
+        entries = []
+        if not os.path.isdir(self.directory):
+            return entries
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(".jsonl"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def evict(self):
+        """Deletes least recently used entries until the cache fits its bound."""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        self._bytes = total
+        if total <= self.max_bytes:
+            return 0
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        self._bytes = total
+        return removed
+
+    def stats(self) -> Dict:
+        entries = self._entries()
+        return {
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
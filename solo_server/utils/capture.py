@@ -0,0 +1,130 @@
+import json
+import math
+import os
+import struct
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional
+
+from solo_server.utils.scheduler import CHARS_PER_TOKEN
+from solo_server.utils.stream import StreamStats
+
+MAGIC = b"SOLOCAP2"
+# arrival (unix s), e2e ms, ttft ms (NaN if unknown), prompt tokens, output tokens,
+# status, flags, then the lengths of the model, options and prompt blobs that follow.
+RECORD = struct.Struct("<dffIIHBBII")
+FLAG_PROMPT = 1
+FLAG_STREAM = 2
+
+
+@dataclass
+class CaptureRecord:
+    arrival: float
+    model: str
+    prompt_tokens: int
+    output_tokens: int
+    e2e_ms: float
+    ttft_ms: Optional[float] = None
+    status: int = 200
+    stream: bool = False
+    options: Dict = field(default_factory=dict)
+    messages: Optional[List[Dict]] = None
+
+
+def estimate_prompt_tokens(messages: List[Dict]) -> int:
+    chars = sum(len(m.get("content") or "") for m in messages if isinstance(m.get("content"), str))
+    return max(1, chars // CHARS_PER_TOKEN)
+
+
+def encode_record(record: CaptureRecord) -> bytes:
+    # Cut long names on a character boundary so the record still decodes.
+    model = record.model.encode()[:255].decode("utf-8", "ignore").encode()
+    options = json.dumps(record.options, separators=(",", ":")).encode() if record.options else b""
+    prompt = b""
+    flags = FLAG_STREAM if record.stream else 0
+    if record.messages is not None:
+        prompt = json.dumps(record.messages, separators=(",", ":"), ensure_ascii=False).encode()
+        flags |= FLAG_PROMPT
+    ttft = math.nan if record.ttft_ms is None else record.ttft_ms
+    head = RECORD.pack(record.arrival, record.e2e_ms, ttft, record.prompt_tokens, record.output_tokens,
+                       record.status, flags, len(model), len(options), len(prompt))
+    return head + model + options + prompt
+
+
+class CaptureWriter:
+    """
+    Appends request records to a capture file for later replay.
+
+    Each record is a fixed-size header followed by the model name, the
+    options and (with ``include_prompts``) the messages, written with a
+    single ``O_APPEND`` write so concurrent writers never interleave.
+    """
+
+    def __init__(self, path: str, include_prompts: bool = False):
+        self.path = path
+        self.include_prompts = include_prompts
+        self._lock = threading.Lock()
+        self.fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        if os.fstat(self.fd).st_size == 0:
+            os.write(self.fd, MAGIC)
+
+    def record(self, arrival: float, model: str, messages: List[Dict], options: Optional[Dict],
+               stats: StreamStats, ok: bool = True, stream: bool = False):
+        summary = stats.summary()
+        record = CaptureRecord(
+            arrival=arrival,
+            model=model,
+            prompt_tokens=stats.server.get("prompt_eval_count") or estimate_prompt_tokens(messages),
+            output_tokens=stats.server.get("eval_count") or stats.tokens,
+            e2e_ms=summary.get("e2e_ms", 0.0),
+            ttft_ms=summary.get("ttft_ms"),
+            status=200 if ok else 0,
+            stream=stream,
+            options=options or {},
+            messages=messages if self.include_prompts else None,
+        )
+        try:
+            data = encode_record(record)
+            with self._lock:
+                os.write(self.fd, data)
+        except (OSError, TypeError, ValueError, struct.error):
+            pass  # capturing must never fail a request
+
+    def close(self):
+        os.close(self.fd)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_capture(path: str) -> Iterator[CaptureRecord]:
+    """Yields the records of a capture file; a torn final record is ignored."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a solo capture file")
+        while True:
+            head = f.read(RECORD.size)
+            if len(head) < RECORD.size:
+                return
+            (arrival, e2e_ms, ttft_ms, prompt_tokens, output_tokens, status, flags,
+             model_len, options_len, prompt_len) = RECORD.unpack(head)
+            body = f.read(model_len + options_len + prompt_len)
+            if len(body) < model_len + options_len + prompt_len:
+                return
+            options = body[model_len:model_len + options_len]
+            prompt = body[model_len + options_len:]
+            yield CaptureRecord(
+                arrival=arrival,
+                model=body[:model_len].decode(),
+                prompt_tokens=prompt_tokens,
+                output_tokens=output_tokens,
+                e2e_ms=e2e_ms,
+                ttft_ms=None if math.isnan(ttft_ms) else ttft_ms,
+                status=status,
+                stream=bool(flags & FLAG_STREAM),
+                options=json.loads(options) if options else {},
+                messages=json.loads(prompt) if flags & FLAG_PROMPT else None,
+            )
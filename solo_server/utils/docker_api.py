@@ -0,0 +1,281 @@
+import asyncio
+import json
+import os
+import subprocess
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+from solo_server.config import get_config_value
+from solo_server.utils.http import AsyncConnectionPool
+from solo_server.utils.stream import NDJSONDecoder
+
+DOCKER_SOCKETS = ["/var/run/docker.sock", "~/.docker/run/docker.sock", "~/.docker/desktop/docker.sock"]
+
+
+class DockerError(Exception):
+    """Raised when the Docker Engine API answers with an error status."""
+
+    def __init__(self, status: int, message: str):
+        self.status = status
+        super().__init__(f"Docker API {status}: {message}")
+
+
+def docker_socket() -> Optional[str]:
+    """The Docker Engine unix socket: DOCKER_HOST, solo.conf, then the usual locations."""
+    host = os.environ.get("DOCKER_HOST", "")
+    if host.startswith("unix://"):
+        return host[len("unix://"):]
+    if host:
+        return None  # tcp:// or npipe:// hosts are left to the docker CLI
+    configured = get_config_value("docker_socket")
+    for path in ([configured] if configured else []) + DOCKER_SOCKETS:
+        path = os.path.expanduser(path)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def split_reference(reference: str) -> Tuple[str, str]:
+    """``ollama/ollama:rocm`` -> (``ollama/ollama``, ``rocm``); the tag defaults to ``latest``."""
+    image, sep, tag = reference.rpartition(":")
+    if not sep or "/" in tag:  # no tag, or the colon belonged to a registry port
+        return reference, "latest"
+    return image, tag
+
+
+def normalize_container(raw: Dict) -> Dict:
+    """Engine API container summary -> the fields solo shows."""
+    ports = ", ".join(
+        f"{p.get('IP', '')}:{p['PublicPort']}->{p['PrivatePort']}/{p.get('Type', 'tcp')}"
+        if p.get("PublicPort") else f"{p['PrivatePort']}/{p.get('Type', 'tcp')}"
+        for p in raw.get("Ports") or []
+    )
+    return {
+        "id": raw.get("Id", "")[:12],
+        "name": (raw.get("Names") or ["/"])[0].lstrip("/"),
+        "image": raw.get("Image", ""),
+        "state": raw.get("State", ""),
+        "status": raw.get("Status", ""),
+        "ports": ports,
+    }
+
+
+class AsyncDockerClient:
+    """
+    Docker Engine API client over the unix socket.
+
+    Requests share a small keep-alive pool, so concurrent probes cost no
+    process forks and no connection setup after the first.
+    """
+
+    def __init__(self, socket_path: Optional[str] = None, max_connections: int = 4,
+                 timeout: Optional[float] = 10.0):
+        self.socket_path = socket_path or docker_socket()
+        if not self.socket_path:
+            raise FileNotFoundError("Docker socket not found")
+        self.pool = AsyncConnectionPool("localhost", 80, max_connections, timeout, unix_path=self.socket_path)
+
+    async def _call(self, method: str, path: str, body: Optional[Dict] = None):
+        data = json.dumps(body).encode() if body is not None else None
+        headers = {"Content-Type": "application/json"} if data else None
+        async with self.pool.request(method, path, data, headers) as response:
+            payload = await response.read()
+        if response.status == 304:  # already started / stopped
+            return None
+        if not 200 <= response.status < 300:
+            try:
+                message = json.loads(payload).get("message", "")
+            except ValueError:
+                message = payload.decode("utf-8", "replace")
+            raise DockerError(response.status, message)
+        return json.loads(payload) if payload.strip() else None
+
+    async def ping(self) -> bool:
+        async with self.pool.request("GET", "/_ping") as response:
+            return response.status == 200 and (await response.read()).strip() == b"OK"
+
+    async def info(self) -> Dict:
+        return await self._call("GET", "/info")
+
+    async def containers(self, name: Optional[str] = None, all: bool = True) -> List[Dict]:
+        """Containers whose name matches the regex ``name``, normalised."""
+        query = f"?all={int(all)}"
+        if name:
+            query += "&filters=" + quote(json.dumps({"name": [name]}))
+        return [normalize_container(c) for c in await self._call("GET", f"/containers/json{query}")]
+
+    async def inspect(self, name: str) -> Dict:
+        return await self._call("GET", f"/containers/{quote(name)}/json")
+
+    async def start(self, name: str):
+        await self._call("POST", f"/containers/{quote(name)}/start")
+
+    async def stop(self, name: str, timeout: int = 10):
+        await self._call("POST", f"/containers/{quote(name)}/stop?t={timeout}")
+
+    async def remove(self, name: str, force: bool = False):
+        await self._call("DELETE", f"/containers/{quote(name)}?force={int(force)}")
+
+    async def image_exists(self, reference: str) -> bool:
+        try:
+            await self._call("GET", f"/images/{quote(reference, safe='')}/json")
+            return True
+        except DockerError as e:
+            if e.status == 404:
+                return False
+            raise
+
+    async def volume(self, name: str) -> Dict:
+        return await self._call("GET", f"/volumes/{quote(name)}")
+
+    async def pull(self, reference: str) -> AsyncIterator[Dict]:
+        """Pulls an image, yielding the daemon's per-layer progress events."""
+        image, tag = split_reference(reference)
+        path = f"/images/create?fromImage={quote(image, safe='')}&tag={quote(tag, safe='')}"
+        async with self.pool.request("POST", path) as response:
+            if not 200 <= response.status < 300:
+                payload = await response.read()
+                try:
+                    message = json.loads(payload).get("message", "")
+                except ValueError:
+                    message = payload.decode("utf-8", "replace")
+                raise DockerError(response.status, message)
+            decoder = NDJSONDecoder()
+            async for raw in response.iter_chunks():
+                for event in decoder.feed(raw):
+                    if "error" in event:  # failures arrive in-band after a 200
+                        raise DockerError(500, event["error"])
+                    yield event
+            for event in decoder.close():
+                yield event
+
+    async def close(self):
+        await self.pool.close()
+
+
+async def _with_client(action):
+    client = AsyncDockerClient()
+    try:
+        return await action(client)
+    finally:
+        await client.close()
+
+
+def _api(action):
+    """Runs ``action(client)`` against the socket; None means "use the docker CLI instead"."""
+    if not docker_socket():
+        return None
+    try:
+        return ("ok", asyncio.run(_with_client(action)))
+    except (OSError, asyncio.TimeoutError):
+        return None  # no permission on the socket, or the daemon is down
+
+
+# Synchronous helpers for start/stop, falling back to the docker CLI where
+# there is no usable unix socket (Windows, remote DOCKER_HOST).
+
+def engine_running() -> bool:
+    result = _api(lambda c: c.ping())
+    if result:
+        return result[1]
+    return subprocess.run(["docker", "info"], capture_output=True).returncode == 0
+
+
+def list_containers(name: Optional[str] = None, all: bool = True) -> List[Dict]:
+    result = _api(lambda c: c.containers(name, all))
+    if result:
+        return result[1]
+    cmd = ["docker", "ps", "--format", "{{json .}}"] + (["-a"] if all else [])
+    if name:
+        cmd += ["-f", f"name={name}"]
+    output = subprocess.run(cmd, capture_output=True, text=True).stdout
+    containers = []
+    for line in output.splitlines():
+        if line.strip():
+            raw = json.loads(line)
+            containers.append({"id": raw.get("ID", ""), "name": raw.get("Names", ""), "image": raw.get("Image", ""),
+                               "state": raw.get("State", ""), "status": raw.get("Status", ""),
+                               "ports": raw.get("Ports", "")})
+    return containers
+
+
+def inspect_container(name: str) -> Dict:
+    """`docker inspect` of an existing container; empty when it cannot be read."""
+    try:
+        result = _api(lambda client: client.inspect(name))
+    except DockerError:
+        return {}
+    if result:
+        return result[1]
+    cli = subprocess.run(["docker", "inspect", name], capture_output=True, text=True)
+    if cli.returncode != 0:
+        return {}
+    details = json.loads(cli.stdout or "[]") or [{}]
+    return details[0]
+
+
+def container_env(name: str, details: Optional[Dict] = None) -> Dict[str, str]:
+    """Environment variables of an existing container."""
+    if details is None:
+        details = inspect_container(name)
+    items = (details.get("Config") or {}).get("Env") or []
+    return dict(item.split("=", 1) for item in items if "=" in item)
+
+
+def start_container(name: str):
+    if not _api(lambda c: c.start(name)):
+        subprocess.run(["docker", "start", name], check=True, capture_output=True)
+
+
+def remove_container(name: str):
+    async def remove(client):
+        try:
+            await client.remove(name, force=True)
+        except DockerError as e:
+            if e.status != 404:
+                raise
+
+    if not _api(remove):
+        subprocess.run(["docker", "rm", "-f", name], check=False, capture_output=True)
+
+
+def stop_containers(names: List[str]):
+    """Stops ``names`` concurrently; unknown containers are an error."""
+    async def stop_all(client):
+        await asyncio.gather(*(client.stop(name) for name in names))
+
+    if not _api(stop_all):
+        subprocess.run(["docker", "stop", *names], check=True, capture_output=True, text=True)
+
+
+def image_exists(reference: str) -> bool:
+    result = _api(lambda c: c.image_exists(reference))
+    if result:
+        return result[1]
+    return subprocess.run(["docker", "image", "inspect", reference], capture_output=True).returncode == 0
+
+
+def pull_image(reference: str, on_event: Optional[Callable[[Dict], None]] = None):
+    """
+    Pulls ``reference``, passing each progress event to ``on_event``. The
+    CLI fallback prints docker's own per-layer progress instead.
+    """
+    async def pull(client):
+        async for event in client.pull(reference):
+            if on_event is not None:
+                on_event(event)
+
+    if not _api(pull):
+        subprocess.run(["docker", "pull", reference], check=True)
+
+
+def volume_mountpoint(name: str) -> Optional[str]:
+    """Host path of a named volume, or None if it does not exist (yet)."""
+    try:
+        result = _api(lambda c: c.volume(name))
+    except DockerError:
+        return None
+    if result:
+        return result[1].get("Mountpoint")
+    cli = subprocess.run(["docker", "volume", "inspect", "-f", "{{.Mountpoint}}", name], capture_output=True, text=True)
+    return cli.stdout.strip() or None if cli.returncode == 0 else None
@@ -0,0 +1,165 @@
+import json
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from solo_server.config import SOLO_DIR, get_config_value
+from solo_server.utils.gguf import GGUFReader
+
+DEFAULT_REGISTRY = "registry.ollama.ai"
+MODEL_MEDIA_TYPE = "application/vnd.ollama.image.model"
+# Models fetched by `solo pull`, laid out like an Ollama models directory.
+SOLO_MODELS_DIR = os.path.join(SOLO_DIR, "models")
+MODELS_DIRS = ["~/.ollama/models", "/var/lib/docker/volumes/ollama/_data/models", "/usr/share/ollama/.ollama/models"]
+# CUDA/Metal context and compute buffers on top of weights and KV cache.
+RUNTIME_OVERHEAD = 512 * 1024 ** 2
+CONTEXT_STEP = 1024
+DEFAULT_NUM_CTX = 2048  # Ollama's default context
+# Bytes per KV cache element for OLLAMA_KV_CACHE_TYPE.
+KV_CACHE_TYPES = {"f16": 2.0, "q8_0": 34 / 32, "q4_0": 18 / 32}
+# Average bits per weight of common quantizations, best first, to size variants not on disk.
+QUANT_BPW = {"Q8_0": 8.5, "Q6_K": 6.56, "Q5_K_M": 5.69, "Q4_K_M": 4.85, "Q3_K_M": 3.91, "Q2_K": 3.35}
+
+
+def models_dirs() -> List[str]:
+    configured = [os.environ.get("OLLAMA_MODELS"), get_config_value("ollama_models_dir")]
+    return [os.path.expanduser(d) for d in configured + MODELS_DIRS + [SOLO_MODELS_DIR] if d]
+
+
+def parse_model_name(name: str) -> Tuple[str, str, str]:
+    """``llama3.2`` -> (``registry.ollama.ai``, ``library/llama3.2``, ``latest``)."""
+    base, sep, tag = name.rpartition(":")
+    if not sep or "/" in tag:  # no tag, or the colon belonged to a registry port
+        base, tag = name, "latest"
+    parts = base.split("/")
+    if len(parts) == 1:
+        parts = [DEFAULT_REGISTRY, "library"] + parts
+    elif len(parts) == 2:
+        parts = [DEFAULT_REGISTRY] + parts
+    return parts[0], "/".join(parts[1:]), tag
+
+
+def manifest_path(name: str, models_dir: str) -> str:
+    """Path of an Ollama manifest, e.g. ``llama3.2`` -> manifests/registry.ollama.ai/library/llama3.2/latest."""
+    registry, repository, tag = parse_model_name(name)
+    return os.path.join(models_dir, "manifests", registry, *repository.split("/"), tag)
+
+
+def blob_path(models_dir: str, digest: str) -> str:
+    """Blobs are stored by digest, ``sha256:<hex>`` as ``blobs/sha256-<hex>``."""
+    return os.path.join(models_dir, "blobs", digest.replace(":", "-"))
+
+
+def find_model_file(name: str, dirs: Optional[List[str]] = None) -> str:
+    """The GGUF blob of a pulled model, or ``name`` itself if it is a file."""
+    if os.path.isfile(name):
+        return name
+    for models_dir in dirs or models_dirs():
+        try:
+            with open(manifest_path(name, models_dir), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for layer in manifest.get("layers", []):
+            if layer.get("mediaType") == MODEL_MEDIA_TYPE:
+                blob = blob_path(models_dir, layer["digest"])
+                if os.path.isfile(blob):
+                    return blob
+    raise FileNotFoundError(f"{name} is not pulled into any of: {', '.join(dirs or models_dirs())}")
+
+
+@dataclass
+class ModelShape:
+    path: str
+    architecture: str
+    file_type: str
+    parameters: int
+    weights_bytes: int
+    layers: int
+    embedding: int
+    context_length: int
+    kv_heads: int
+    key_dim: int
+    value_dim: int
+    quantization_types: Dict[str, int]
+
+    @property
+    def bits_per_weight(self) -> float:
+        return self.weights_bytes * 8 / max(1, self.parameters)
+
+    def kv_bytes_per_token(self, cache_type: str = "f16") -> float:
+        return self.layers * self.kv_heads * (self.key_dim + self.value_dim) * KV_CACHE_TYPES[cache_type]
+
+
+def read_shape(path: str) -> ModelShape:
+    with GGUFReader(path) as reader:
+        embedding = int(reader.field("embedding_length", 0))
+        heads = int(reader.field("attention.head_count", 1) or 1)
+        head_dim = embedding // heads if embedding else 0
+        return ModelShape(
+            path=path,
+            architecture=reader.architecture,
+            file_type=reader.file_type,
+            parameters=reader.parameter_count(),
+            weights_bytes=reader.weights_bytes(),
+            layers=int(reader.field("block_count", 0)),
+            embedding=embedding,
+            context_length=int(reader.field("context_length", 2048)),
+            kv_heads=int(reader.field("attention.head_count_kv", heads) or heads),
+            key_dim=int(reader.field("attention.key_length", head_dim)),
+            value_dim=int(reader.field("attention.value_length", head_dim)),
+            quantization_types=reader.quantization_types(),
+        )
+
+
+def estimate(shape: ModelShape, num_ctx: int, parallel: int = 1, cache_type: str = "f16",
+             weights_bytes: Optional[int] = None) -> Dict[str, int]:
+    """Bytes needed to hold the model with ``parallel`` slots of ``num_ctx`` tokens each."""
+    weights = shape.weights_bytes if weights_bytes is None else weights_bytes
+    kv_cache = int(shape.kv_bytes_per_token(cache_type) * num_ctx * parallel)
+    return {"weights": weights, "kv_cache": kv_cache, "overhead": RUNTIME_OVERHEAD,
+            "total": weights + kv_cache + RUNTIME_OVERHEAD}
+
+
+def max_context(shape: ModelShape, budget: int, parallel: int = 1, cache_type: str = "f16",
+                weights_bytes: Optional[int] = None) -> int:
+    """Largest ``num_ctx`` (a multiple of 1024, at most the trained context) that fits ``budget``."""
+    weights = shape.weights_bytes if weights_bytes is None else weights_bytes
+    free = budget - weights - RUNTIME_OVERHEAD
+    per_token = shape.kv_bytes_per_token(cache_type) * parallel
+    if free <= 0 or per_token <= 0:
+        return 0
+    return min(shape.context_length, int(free // per_token) // CONTEXT_STEP * CONTEXT_STEP)
+
+
+def recommend(shape: ModelShape, budgets: Dict[str, int], num_ctx: int, parallel: int = 1,
+              cache_type: str = "f16") -> List[Dict]:
+    """
+    For each memory pool (e.g. GPU, RAM): whether the model fits at
+    ``num_ctx``, the largest context that does, and otherwise the best
+    quantization that fits at ``num_ctx``.
+    """
+    rows = []
+    for target, budget in budgets.items():
+        needed = estimate(shape, num_ctx, parallel, cache_type)["total"]
+        row = {"target": target, "budget": budget, "needed": needed, "fits": needed <= budget,
+               "max_ctx": max_context(shape, budget, parallel, cache_type),
+               "quantization": None, "quantization_needed": None}
+        if not row["fits"]:
+            for quant, bpw in QUANT_BPW.items():
+                if bpw >= shape.bits_per_weight:
+                    continue
+                total = estimate(shape, num_ctx, parallel, cache_type, int(shape.parameters * bpw / 8))["total"]
+                if total <= budget:
+                    row["quantization"], row["quantization_needed"] = quant, total
+                    break
+        rows.append(row)
+    return rows
+
+
+def estimate_model_bytes(name: str, num_ctx: int = DEFAULT_NUM_CTX, parallel: int = 1) -> Optional[int]:
+    """Footprint of a pulled model from its GGUF header, or None if it is not on disk."""
+    try:
+        return estimate(read_shape(find_model_file(name)), num_ctx, parallel)["total"]
+    except (OSError, ValueError):
+        return None
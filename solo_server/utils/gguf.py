@@ -0,0 +1,206 @@
+import mmap
+import struct
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+GGUF_MAGIC = b"GGUF"
+DEFAULT_ALIGNMENT = 32
+
+# Fixed-size metadata value types, as struct formats and NumPy dtypes.
+_SCALARS = {0: "<B", 1: "<b", 2: "<H", 3: "<h", 4: "<I", 5: "<i", 6: "<f", 7: "<?", 10: "<Q", 11: "<q", 12: "<d"}
+_NUMPY = {0: np.uint8, 1: np.int8, 2: np.uint16, 3: np.int16, 4: np.uint32, 5: np.int32, 6: np.float32,
+          7: np.bool_, 10: np.uint64, 11: np.int64, 12: np.float64}
+STRING, ARRAY = 8, 9
+
+# ggml tensor types: name, elements per block, bytes per block.
+GGML_TYPES = {
+    0: ("F32", 1, 4), 1: ("F16", 1, 2), 2: ("Q4_0", 32, 18), 3: ("Q4_1", 32, 20),
+    6: ("Q5_0", 32, 22), 7: ("Q5_1", 32, 24), 8: ("Q8_0", 32, 34), 9: ("Q8_1", 32, 36),
+    10: ("Q2_K", 256, 84), 11: ("Q3_K", 256, 110), 12: ("Q4_K", 256, 144), 13: ("Q5_K", 256, 176),
+    14: ("Q6_K", 256, 210), 15: ("Q8_K", 256, 292), 16: ("IQ2_XXS", 256, 66), 17: ("IQ2_XS", 256, 74),
+    18: ("IQ3_XXS", 256, 98), 19: ("IQ1_S", 256, 50), 20: ("IQ4_NL", 32, 18), 21: ("IQ3_S", 256, 110),
+    22: ("IQ2_S", 256, 82), 23: ("IQ4_XS", 256, 136), 24: ("I8", 1, 1), 25: ("I16", 1, 2),
+    26: ("I32", 1, 4), 27: ("I64", 1, 8), 28: ("F64", 1, 8), 29: ("IQ1_M", 256, 56), 30: ("BF16", 1, 2),
+}
+# general.file_type, as printed by llama.cpp
+FILE_TYPES = {
+    0: "F32", 1: "F16", 2: "Q4_0", 3: "Q4_1", 7: "Q8_0", 8: "Q5_0", 9: "Q5_1", 10: "Q2_K",
+    11: "Q3_K_S", 12: "Q3_K_M", 13: "Q3_K_L", 14: "Q4_K_S", 15: "Q4_K_M", 16: "Q5_K_S",
+    17: "Q5_K_M", 18: "Q6_K", 19: "IQ2_XXS", 20: "IQ2_XS", 21: "Q2_K_S", 22: "IQ3_XS",
+    23: "IQ3_XXS", 24: "IQ1_S", 25: "IQ4_NL", 26: "IQ3_S", 27: "IQ3_M", 28: "IQ2_S",
+    29: "IQ2_M", 30: "IQ4_XS", 31: "IQ1_M", 32: "BF16",
+}
+
+
+class GGUFError(ValueError):
+    """Raised for files that are not (supported) GGUF."""
+
+
+@dataclass
+class TensorInfo:
+    name: str
+    shape: Tuple[int, ...]
+    type: int
+    offset: int
+
+    @property
+    def elements(self) -> int:
+        return int(np.prod(self.shape, dtype=np.int64)) if self.shape else 1
+
+    @property
+    def type_name(self) -> str:
+        return GGML_TYPES.get(self.type, (f"type{self.type}",))[0]
+
+    @property
+    def nbytes(self) -> int:
+        _, block, size = GGML_TYPES.get(self.type, ("", 1, 0))
+        return -(-self.elements // block) * size
+
+
+@dataclass
+class StringArray:
+    """A string array left undecoded (e.g. a 128k-entry vocabulary); only its size is kept."""
+    count: int
+    offset: int
+
+
+class GGUFReader:
+    """
+    Reads the header of a GGUF file through ``mmap`` without copying it.
+
+    Numeric arrays are NumPy views into the mapping and large string
+    arrays are skipped, so opening a multi-GB model touches only the
+    few pages that hold the header.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            try:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:  # empty files cannot be mapped
+                raise GGUFError(f"{path} is empty") from e
+        self.buffer = memoryview(self._mmap)
+        self.metadata: Dict[str, Any] = {}
+        self.tensors: List[TensorInfo] = []
+        try:
+            self._parse()
+        except GGUFError:
+            self.close()
+            raise
+        except (struct.error, IndexError, UnicodeDecodeError) as e:
+            self.close()
+            raise GGUFError(f"{path}: truncated or corrupt GGUF header ({e})") from e
+
+    def _unpack(self, fmt: str, offset: int):
+        return struct.unpack_from(fmt, self.buffer, offset)[0], offset + struct.calcsize(fmt)
+
+    def _string(self, offset: int, decode: bool = True):
+        length, offset = self._unpack(self._len_fmt, offset)
+        end = offset + length
+        if end > len(self.buffer):
+            raise IndexError("string runs past the end of the file")
+        return (bytes(self.buffer[offset:end]).decode("utf-8") if decode else None), end
+
+    def _value(self, kind: int, offset: int):
+        if kind in _SCALARS:
+            return self._unpack(_SCALARS[kind], offset)
+        if kind == STRING:
+            return self._string(offset)
+        if kind != ARRAY:
+            raise GGUFError(f"unknown metadata type {kind}")
+        item, offset = self._unpack("<I", offset)
+        count, offset = self._unpack(self._len_fmt, offset)
+        if item in _NUMPY:
+            dtype = np.dtype(_NUMPY[item]).newbyteorder("<")
+            end = offset + count * dtype.itemsize
+            if end > len(self.buffer):
+                raise IndexError("array runs past the end of the file")
+            return np.frombuffer(self.buffer, dtype=dtype, count=count, offset=offset), end
+        if item == STRING:
+            start = offset
+            for _ in range(count):
+                _, offset = self._string(offset, decode=False)
+            return StringArray(count, start), offset
+        values = []
+        for _ in range(count):
+            value, offset = self._value(item, offset)
+            values.append(value)
+        return values, offset
+
+    def _parse(self):
+        if bytes(self.buffer[:4]) != GGUF_MAGIC:
+            raise GGUFError(f"{self.path} is not a GGUF file")
+        self.version, offset = self._unpack("<I", 4)
+        if self.version not in (1, 2, 3):
+            raise GGUFError(f"unsupported GGUF version {self.version}")
+        # Version 1 used 32-bit counts and string lengths.
+        self._len_fmt = "<I" if self.version == 1 else "<Q"
+        tensor_count, offset = self._unpack(self._len_fmt, offset)
+        kv_count, offset = self._unpack(self._len_fmt, offset)
+
+        for _ in range(kv_count):
+            key, offset = self._string(offset)
+            kind, offset = self._unpack("<I", offset)
+            self.metadata[key], offset = self._value(kind, offset)
+
+        for _ in range(tensor_count):
+            name, offset = self._string(offset)
+            n_dims, offset = self._unpack("<I", offset)
+            dims = struct.unpack_from(f"<{n_dims}{self._len_fmt[1]}", self.buffer, offset)
+            offset += n_dims * struct.calcsize(self._len_fmt)
+            kind, offset = self._unpack("<I", offset)
+            tensor_offset, offset = self._unpack("<Q", offset)
+            self.tensors.append(TensorInfo(name, tuple(dims), kind, tensor_offset))
+
+        self.alignment = int(self.metadata.get("general.alignment", DEFAULT_ALIGNMENT))
+        self.data_offset = -(-offset // self.alignment) * self.alignment
+
+    @property
+    def architecture(self) -> str:
+        return self.metadata.get("general.architecture", "llama")
+
+    def field(self, name: str, default=None):
+        """An architecture-scoped key such as ``block_count`` or ``attention.head_count``."""
+        value = self.metadata.get(f"{self.architecture}.{name}", default)
+        if isinstance(value, np.ndarray):  # per-layer values, e.g. head_count_kv on some models
+            return int(value.max()) if value.size else default
+        return value
+
+    @property
+    def file_type(self) -> str:
+        kind = self.metadata.get("general.file_type")
+        if kind is not None:
+            return FILE_TYPES.get(int(kind), f"type{kind}")
+        counts = self.quantization_types()
+        return max(counts, key=counts.get) if counts else "unknown"
+
+    def weights_bytes(self) -> int:
+        return sum(t.nbytes for t in self.tensors)
+
+    def parameter_count(self) -> int:
+        return sum(t.elements for t in self.tensors)
+
+    def quantization_types(self) -> Dict[str, int]:
+        """Bytes of tensor data per ggml type."""
+        counts = Counter()
+        for tensor in self.tensors:
+            counts[tensor.type_name] += tensor.nbytes
+        return dict(counts)
+
+    def close(self):
+        self.metadata, self.tensors = {}, []
+        try:
+            self.buffer.release()
+            self._mmap.close()
+        except BufferError:
+            pass  # a caller still holds an array view; the mapping closes when it is collected
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
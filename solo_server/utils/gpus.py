@@ -0,0 +1,157 @@
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import requests
+
+from solo_server.utils.hardware import GIB, HardwareInfo, detect_hardware, nvidia_readings
+from solo_server.utils.telemetry import gpu_loads
+
+
+@dataclass
+class GPUDevice:
+    index: int  # as numbered by the vendor runtime (CUDA / ROCm)
+    vendor: str
+    model: str
+    memory_bytes: int
+    used_bytes: int = 0
+    load: float = 0.0
+    bus_id: str = ""
+
+    @property
+    def free_bytes(self) -> int:
+        return max(0, self.memory_bytes - self.used_bytes)
+
+
+def _used_bytes(gpus, root: str = "/") -> List[int]:
+    """VRAM in use per GPU: sysfs for AMD, nvidia-smi for NVIDIA."""
+    nvidia = nvidia_readings("memory.used") if any(gpu.vendor == "NVIDIA" for gpu in gpus) else {}
+    used = []
+    for gpu in gpus:
+        if gpu.vendor == "NVIDIA":
+            used.append(int(nvidia.get(gpu.device, 0) * 1024 ** 2))  # MiB
+            continue
+        path = os.path.join(root, "sys/bus/pci/devices", gpu.device, "mem_info_vram_used")
+        try:
+            with open(path, "r") as f:
+                used.append(int(f.read().strip()))
+        except (OSError, ValueError):
+            used.append(0)
+    return used
+
+
+def solo_used_bytes(replicas: List[Dict], count: int) -> List[int]:
+    """
+    VRAM held by the models loaded in solo's own replicas, per GPU. Each
+    replica's ``size_vram`` from /api/ps is split evenly over the GPUs it
+    is pinned to, or over every GPU when it is not pinned.
+    """
+    owned = [0] * count
+    for replica in replicas:
+        try:
+            response = requests.get(f"http://localhost:{replica['port']}/api/ps", timeout=2)
+            models = response.json().get("models", []) if response.ok else []
+        except (requests.RequestException, ValueError):
+            continue  # not running, so holding nothing
+        vram = sum(int(model.get("size_vram") or 0) for model in models)
+        pinned = [i for i in replica.get("gpus") or range(count) if 0 <= i < count]
+        for index in pinned:
+            owned[index] += vram // len(pinned)
+    return owned
+
+
+def gpu_inventory(hardware: Optional[HardwareInfo] = None, live: bool = True,
+                  replicas: Optional[List[Dict]] = None) -> List[GPUDevice]:
+    """
+    Every GPU on the host with its runtime index and memory; with ``live``,
+    also current VRAM use and utilisation. Only the primary vendor's cards
+    are listed, as those are the ones the container runtime can use.
+
+    VRAM held by ``replicas`` (solo's own containers, which `solo start`
+    is about to reuse or recreate) is not counted as used.
+    """
+    hardware = hardware or detect_hardware()
+    gpus = [gpu for gpu in hardware.gpus if gpu.vendor == hardware.gpu_vendor]
+    used = _used_bytes(gpus) if live else [0] * len(gpus)
+    if live and replicas:
+        owned = solo_used_bytes(replicas, len(gpus))
+        used = [max(0, u - o) for u, o in zip(used, owned)]
+    loads = gpu_loads(gpus) if live else [0.0] * len(gpus)
+    return [GPUDevice(index, gpu.vendor, gpu.model, int(gpu.memory_gb * GIB), used[index],
+                      0.0 if loads[index] != loads[index] else loads[index], gpu.device)
+            for index, gpu in enumerate(gpus)]
+
+
+def plan_gpu_placement(models: Dict[str, int], devices: List[GPUDevice],
+                       fraction: float = 1.0) -> Dict:
+    """
+    Bin-packs models onto GPUs by estimated footprint (bytes).
+
+    Models are placed largest first on the device with the least room
+    that still fits them (best fit). A model larger than any single
+    device gets a group of fully free devices, which Ollama splits the
+    layers across. Returns ``{"groups": [{"devices", "models", "free_bytes"}],
+    "unplaced": [...]}``; each group becomes one container.
+    """
+    capacity = {d.index: int(d.free_bytes * fraction) for d in devices}
+    groups: List[Dict] = []
+    by_device: Dict[int, Dict] = {}
+    unplaced = []
+
+    for model, size in sorted(models.items(), key=lambda item: (-item[1], item[0])):
+        fits = [i for i, room in capacity.items() if room >= size]
+        if fits:
+            index = min(fits, key=lambda i: (capacity[i], i))
+            group = by_device.get(index)
+            if group is None:
+                group = by_device[index] = {"devices": [index], "models": []}
+                groups.append(group)
+            group["models"].append(model)
+            capacity[index] -= size
+            continue
+
+        free = sorted((i for i in capacity if i not in by_device), key=lambda i: (-capacity[i], i))
+        chosen, total = [], 0
+        for index in free:
+            if total >= size:
+                break
+            chosen.append(index)
+            total += capacity[index]
+        if total < size or not chosen:
+            unplaced.append(model)
+            continue
+        group = {"devices": sorted(chosen), "models": [model]}
+        groups.append(group)
+        remaining = total - size
+        for index in chosen:
+            by_device[index] = group
+            capacity[index] = 0
+        # Whatever is left on the group can still take small models.
+        capacity[chosen[0]] = remaining
+
+    for group in groups:
+        group["free_bytes"] = sum(capacity[i] for i in group["devices"])
+    return {"groups": groups, "unplaced": unplaced}
+
+
+def split_devices(devices: List[GPUDevice], count: int) -> List[List[int]]:
+    """
+    Deals devices round-robin to ``count`` replicas. With more replicas
+    than devices, replicas share devices so that every one is pinned.
+    """
+    count = max(1, count)
+    if count >= len(devices):
+        return [[devices[i % len(devices)].index] for i in range(count)]
+    return [[d.index for d in devices[i::count]] for i in range(count)]
+
+
+def gpu_run_args(vendor: str, devices: Optional[List[int]]) -> List[str]:
+    """`docker run` arguments restricting a container to ``devices``."""
+    if not devices:
+        return []
+    ids = ",".join(str(i) for i in devices)
+    if vendor == "NVIDIA":
+        return ["--gpus", f'"device={ids}"']
+    if vendor == "AMD":
+        return ["-e", f"ROCR_VISIBLE_DEVICES={ids}"]
+    return []
@@ -1,73 +1,313 @@
+import glob
+import hashlib
+import json
+import os
 import platform
-import psutil
-import GPUtil
+import re
+import shutil
 import subprocess
-from typing import Tuple
-
-def detect_hardware() -> Tuple[str, int, float, str, str, float, str, str]:
-    #OS Info
-    os = platform.system()
-    
-    # CPU Info
-    cpu_model = "Unknown"
-    cpu_cores = psutil.cpu_count(logical=False)
-    
-    if os == "Windows":
-        cpu_model = platform.processor()
-    elif os == "Linux":
+from dataclasses import asdict, dataclass, field, fields
+from typing import Dict, List, Optional
+
+import psutil
+
+from solo_server.config import SOLO_DIR
+
+HARDWARE_FILE = os.path.join(SOLO_DIR, "hardware.json")
+BOOT_ID_FILE = "/proc/sys/kernel/random/boot_id"
+# PCI vendor IDs as exposed in /sys/class/drm/card*/device/vendor
+PCI_VENDORS = {"0x10de": "NVIDIA", "0x1002": "AMD", "0x8086": "Intel"}
+BACKENDS = {"NVIDIA": "CUDA", "AMD": "HIP", "Intel": "OpenCL", "Apple Silicon": "Metal"}
+# Discrete cards win over integrated ones when picking the primary GPU.
+VENDOR_PRIORITY = ["NVIDIA", "AMD", "Intel"]
+GIB = 1024 ** 3
+
+_cached: Optional["HardwareInfo"] = None
+
+
+@dataclass
+class GPUInfo:
+    vendor: str
+    model: str
+    memory_gb: float = 0.0
+    device: str = ""
+
+
+@dataclass
+class HardwareInfo:
+    cpu_model: str
+    cpu_cores: int
+    memory_gb: float
+    gpu_vendor: str = "None"
+    gpu_model: str = "None"
+    gpu_memory: float = 0.0
+    compute_backend: str = "CPU"
+    os: str = ""
+    logical_cores: int = 0
+    gpus: List[GPUInfo] = field(default_factory=list)
+
+    def __iter__(self):
+        """Unpacks like the tuple ``detect_hardware`` used to return."""
+        return iter((self.cpu_model, self.cpu_cores, self.memory_gb, self.gpu_vendor, self.gpu_model,
+                     self.gpu_memory, self.compute_backend, self.os))
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "HardwareInfo":
+        known = {f.name for f in fields(cls)}
+        data = {k: v for k, v in data.items() if k in known}
+        data["gpus"] = [GPUInfo(**gpu) for gpu in data.get("gpus", [])]
+        return cls(**data)
+
+
+def _read(path: str) -> str:
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+
+def boot_id(root: str = "/") -> str:
+    """Changes on every reboot; falls back to the boot time off Linux."""
+    return _read(os.path.join(root, BOOT_ID_FILE.lstrip("/"))) or str(int(psutil.boot_time()))
+
+
+def read_cpu(root: str = "/"):
+    """CPU model, physical and logical cores from /proc/cpuinfo and /sys/devices/system/cpu."""
+    cpuinfo = _read(os.path.join(root, "proc/cpuinfo"))
+    cpu_model = ""
+    for key in ("model name", "Model", "Hardware", "cpu model"):
+        match = re.search(rf"^{key}\s*:\s*(.+)$", cpuinfo, re.MULTILINE)
+        if match:
+            cpu_model = match.group(1).strip()
+            break
+
+    cores, logical = set(), 0
+    for cpu in glob.glob(os.path.join(root, "sys/devices/system/cpu/cpu[0-9]*")):
+        logical += 1
+        core_id = _read(os.path.join(cpu, "topology/core_id"))
+        package = _read(os.path.join(cpu, "topology/physical_package_id"))
+        if core_id:
+            cores.add((package, core_id))
+    logical = logical or cpuinfo.count("processor\t:") or psutil.cpu_count() or 1
+    return cpu_model or "Unknown Linux CPU", len(cores) or logical, logical
+
+
+def read_memory_gb(root: str = "/") -> float:
+    match = re.search(r"^MemTotal:\s*(\d+) kB", _read(os.path.join(root, "proc/meminfo")), re.MULTILINE)
+    total = int(match.group(1)) * 1024 if match else psutil.virtual_memory().total
+    return round(total / GIB, 2)
+
+
+def _nvidia_models(root: str) -> Dict[str, str]:
+    """PCI bus id -> model name, from the driver's /proc entries."""
+    models = {}
+    for info in glob.glob(os.path.join(root, "proc/driver/nvidia/gpus/*/information")):
+        match = re.search(r"^Model:\s*(.+)$", _read(info), re.MULTILINE)
+        if match:
+            models[os.path.basename(os.path.dirname(info)).lower()] = match.group(1).strip()
+    return models
+
+
+def read_gpus(root: str = "/") -> List[GPUInfo]:
+    """
+    GPUs listed under /sys/class/drm, plus NVIDIA cards known only to the
+    driver's /proc entries (headless servers without nvidia-drm loaded).
+
+    AMD cards expose their VRAM in sysfs; NVIDIA cards do not, so their
+    memory is left at 0 for :func:`detect_hardware` to fill in.
+    """
+    gpus = []
+    nvidia_models = None
+    # Skips connectors such as card0-HDMI-A-1; card10 sorts after card2.
+    cards = [card for card in glob.glob(os.path.join(root, "sys/class/drm/card[0-9]*"))
+             if re.fullmatch(r"card\d+", os.path.basename(card))]
+    for card in sorted(cards, key=lambda card: int(os.path.basename(card)[4:])):
+        device = os.path.join(card, "device")
+        vendor = PCI_VENDORS.get(_read(os.path.join(device, "vendor")).lower())
+        if not vendor:
+            continue
+        bus_id = os.path.basename(os.path.realpath(device)).lower()
+        model = _read(os.path.join(device, "product_name"))
+        if vendor == "NVIDIA":
+            if nvidia_models is None:
+                nvidia_models = _nvidia_models(root)
+            model = nvidia_models.get(bus_id, model)
+        model = model or f"{vendor} GPU {_read(os.path.join(device, 'device'))}".strip()
+        vram = _read(os.path.join(device, "mem_info_vram_total"))
+        memory_gb = round(int(vram) / GIB, 2) if vram.isdigit() else 0.0
+        gpus.append(GPUInfo(vendor, model, memory_gb, bus_id))
+    if not any(gpu.vendor == "NVIDIA" for gpu in gpus):
+        for bus_id, model in sorted(_nvidia_models(root).items()):
+            gpus.append(GPUInfo("NVIDIA", model, 0.0, bus_id))
+    return gpus
+
+
+def _pci_bus_id(bus_id: str) -> str:
+    """nvidia-smi prints an 8-digit PCI domain (00000000:01:00.0); sysfs uses 4."""
+    domain, _, rest = bus_id.strip().lower().partition(":")
+    try:
+        return f"{int(domain, 16):04x}:{rest}" if rest else domain
+    except ValueError:
+        return bus_id.strip().lower()
+
+
+def _nvidia_smi() -> List[GPUInfo]:
+    """NVIDIA cards as nvidia-smi reports them, the only source of their VRAM."""
+    if not shutil.which("nvidia-smi"):
+        return []
+    try:
+        output = subprocess.run(
+            ["nvidia-smi", "--query-gpu=pci.bus_id,name,memory.total", "--format=csv,noheader,nounits"],
+            capture_output=True, text=True, check=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return []
+    gpus = []
+    for line in output.splitlines():
+        parts = [part.strip() for part in line.split(",")]
+        if len(parts) == 3 and parts[2].isdigit():
+            gpus.append(GPUInfo("NVIDIA", parts[1], round(int(parts[2]) / 1024, 2), _pci_bus_id(parts[0])))  # MiB
+    return gpus
+
+
+def nvidia_readings(field: str) -> Dict[str, float]:
+    """
+    One numeric nvidia-smi ``field`` per card, keyed by PCI bus id (as
+    sysfs writes it) and by nvidia-smi index (the ids GPUtil reports).
+    """
+    if not shutil.which("nvidia-smi"):
+        return {}
+    try:
+        output = subprocess.run(
+            ["nvidia-smi", f"--query-gpu=index,pci.bus_id,{field}", "--format=csv,noheader,nounits"],
+            capture_output=True, text=True, check=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return {}
+    readings = {}
+    for line in output.splitlines():
+        parts = [part.strip() for part in line.split(",")]
         try:
-            cpu_model = subprocess.check_output("lscpu | grep 'Model name'", shell=True, text=True).split(":")[1].strip()
-        except:
-            cpu_model = "Unknown Linux CPU"
-    elif platform.system() == "Darwin":
+            value = float(parts[2])
+        except (IndexError, ValueError):
+            continue  # "[N/A]" on cards that do not report the field
+        readings[parts[0]] = readings[_pci_bus_id(parts[1])] = value
+    return readings
+
+
+def _nvidia_memory(gpus: List[GPUInfo]):
+    """Fills in the VRAM of NVIDIA cards, matched to nvidia-smi by PCI bus id."""
+    reported = {probe.device: probe.memory_gb for probe in _nvidia_smi()}
+    for gpu in gpus:
+        if gpu.vendor == "NVIDIA" and gpu.device in reported:
+            gpu.memory_gb = reported[gpu.device]
+
+
+def _probe_other() -> HardwareInfo:
+    """Windows and macOS have no /proc or /sys to read."""
+    os_name = platform.system()
+    cpu_model = platform.processor() or "Unknown CPU"
+    if os_name == "Darwin":
         try:
-            cpu_model = subprocess.check_output("sysctl -n machdep.cpu.brand_string", shell=True, text=True).strip()
-        except:
+            cpu_model = subprocess.check_output(["sysctl", "-n", "machdep.cpu.brand_string"], text=True).strip()
+        except (OSError, subprocess.CalledProcessError):
             cpu_model = "Unknown Mac CPU"
-    
-    # Memory Info
-    memory_gb = round(psutil.virtual_memory().total / (1024**3), 2)
-    
-    # GPU Info
-    gpu_vendor = "None"
-    gpu_model = "None"
-    compute_backend = "CPU"
-    gpu_memory = 0
-
-    gpus = GPUtil.getGPUs()
-    if gpus:
-        gpu = gpus[0]  # Get first GPU
-        gpu_model = gpu.name
-        gpu_memory = round(gpu.memoryTotal, 2)  # GPU memory in GB
-        if "NVIDIA" in gpu_model:
-            gpu_vendor = "NVIDIA"
-            compute_backend = "CUDA"
-        elif "AMD" in gpu_model:
-            gpu_vendor = "AMD"
-            compute_backend = "HIP"
-        elif "Intel" in gpu_model:
-            gpu_vendor = "Intel"
-            compute_backend = "OpenCL"
-        elif "Apple Silicon" in gpu_model:
-            gpu_vendor = "Apple Silicon"
-            compute_backend = "Metal"
-        else:
-            gpu_vendor = "Unknown"
-            compute_backend = "CPU"
-
-    return cpu_model, cpu_cores, memory_gb, gpu_vendor, gpu_model, gpu_memory, compute_backend, os
-
-def display_hardware_info(typer):
-    cpu_model, cpu_cores, memory_gb, gpu_vendor, gpu_model, gpu_memory, compute_backend, os = detect_hardware()
-    
+    info = HardwareInfo(cpu_model, psutil.cpu_count(logical=False) or 1,
+                        round(psutil.virtual_memory().total / GIB, 2), os=os_name,
+                        logical_cores=psutil.cpu_count() or 1)
+    try:
+        import GPUtil
+        for gpu in GPUtil.getGPUs():
+            vendor = next((v for v in BACKENDS if v in gpu.name), "Unknown")
+            info.gpus.append(GPUInfo(vendor, gpu.name, round(gpu.memoryTotal / 1024, 2), str(gpu.id)))
+    except Exception:
+        pass
+    return info
+
+
+def probe_hardware(root: str = "/") -> HardwareInfo:
+    """Reads the hardware without spawning processes (bar nvidia-smi for NVIDIA VRAM)."""
+    if platform.system() != "Linux":
+        info = _probe_other()
+    else:
+        cpu_model, cpu_cores, logical = read_cpu(root)
+        gpus = read_gpus(root)
+        if any(gpu.vendor == "NVIDIA" and not gpu.memory_gb for gpu in gpus):
+            _nvidia_memory(gpus)
+        elif not any(gpu.vendor == "NVIDIA" for gpu in gpus):
+            gpus += _nvidia_smi()  # WSL2 exposes neither drm cards nor /proc/driver/nvidia
+        info = HardwareInfo(cpu_model, cpu_cores, read_memory_gb(root), os="Linux",
+                            logical_cores=logical, gpus=gpus)
+
+    ranked = sorted(info.gpus, key=lambda g: VENDOR_PRIORITY.index(g.vendor)
+                    if g.vendor in VENDOR_PRIORITY else len(VENDOR_PRIORITY))
+    if ranked:
+        primary = ranked[0]
+        info.gpu_vendor, info.gpu_model, info.gpu_memory = primary.vendor, primary.model, primary.memory_gb
+        info.compute_backend = BACKENDS.get(primary.vendor, "CPU")
+    return info
+
+
+def detect_hardware(refresh: bool = False, path: Optional[str] = None) -> HardwareInfo:
+    """
+    Hardware of this host, probed once and cached in ``~/.solo/hardware.json``.
+
+    The cache is keyed by boot ID and kernel release, so it is refreshed
+    after a reboot or kernel upgrade (when GPUs are most likely to change).
+    """
+    global _cached
+    if _cached is not None and not refresh and path is None:
+        return _cached
+    path = path or HARDWARE_FILE
+    key = {"boot_id": boot_id(), "kernel": platform.release()}
+    info = None
+    if not refresh:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            if all(cached.get(k) == v for k, v in key.items()):
+                info = HardwareInfo.from_dict(cached["hardware"])
+        except (OSError, ValueError, KeyError, TypeError):
+            info = None
+    if info is None:
+        info = probe_hardware()
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({**key, "hardware": info.to_dict()}, f, indent=2)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+    _cached = info
+    return info
+
+
+def hardware_fingerprint(hardware: Optional[HardwareInfo] = None) -> str:
+    """
+    Short stable hash of the detected hardware, so benchmark results and
+    tuned profiles are only applied between like machines.
+    """
+    cpu_model, cpu_cores, memory_gb, gpu_vendor, gpu_model, gpu_memory, compute_backend, os_name = hardware or detect_hardware()
+    identity = [os_name, cpu_model, cpu_cores, round(memory_gb), gpu_vendor, gpu_model, round(gpu_memory), compute_backend]
+    return hashlib.sha256(json.dumps(identity).encode()).hexdigest()[:12]
+
+
+def display_hardware_info(typer, hardware: Optional[HardwareInfo] = None):
+    hardware = hardware or detect_hardware()
+
     typer.echo("------------------------------->")
     typer.echo("🖥️  System Information")
-    typer.echo(f"Operating System: {os}")
-    typer.echo(f"CPU: {cpu_model}")
-    typer.echo(f"CPU Cores: {cpu_cores}")
-    typer.echo(f"Memory: {memory_gb}GB")
-    typer.echo(f"GPU: {gpu_vendor}")
-    typer.echo(f"GPU Model: {gpu_model}")
-    typer.echo(f'GPU Memory: {gpu_memory}GB')
-    typer.echo(f"Compute Backend: {compute_backend}")
-    
\ No newline at end of file
+    typer.echo(f"Operating System: {hardware.os}")
+    typer.echo(f"CPU: {hardware.cpu_model}")
+    typer.echo(f"CPU Cores: {hardware.cpu_cores}")
+    typer.echo(f"Memory: {hardware.memory_gb}GB")
+    typer.echo(f"GPU: {hardware.gpu_vendor}")
+    typer.echo(f"GPU Model: {hardware.gpu_model}")
+    typer.echo(f'GPU Memory: {hardware.gpu_memory}GB')
+    typer.echo(f"Compute Backend: {hardware.compute_backend}")
+    if len(hardware.gpus) > 1:
+        for index, gpu in enumerate(hardware.gpus):
+            typer.echo(f"  [{index}] {gpu.vendor} {gpu.model} ({gpu.memory_gb}GB)")
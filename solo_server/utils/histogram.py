@@ -0,0 +1,85 @@
+import math
+from typing import Dict, Iterable, Optional
+
+DEFAULT_PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+
+class LatencyHistogram:
+    """
+    HDR-style latency histogram with bounded relative error.
+
+    Values are recorded as integer microseconds. Below ``2 * 10**digits``
+    every value has its own bucket; above that, each power of two is split
+    into the same number of linear sub-buckets, so any recorded value is
+    reported within ``10**-digits`` of its true value no matter how large
+    it is, while memory stays proportional to the number of distinct
+    buckets actually hit.
+    """
+
+    def __init__(self, significant_digits: int = 3):
+        self.sub_bits = math.ceil(math.log2(2 * 10 ** significant_digits))
+        self.sub_count = 1 << self.sub_bits
+        self.half = self.sub_count >> 1
+        self.counts: Dict[int, int] = {}
+        self.total = 0
+        self.sum = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+
+    def _index(self, value: int) -> int:
+        if value < self.sub_count:
+            return value
+        shift = value.bit_length() - self.sub_bits
+        return self.sub_count + (shift - 1) * self.half + (value >> shift) - self.half
+
+    def _highest_equivalent(self, index: int) -> int:
+        if index < self.sub_count:
+            return index
+        shift, offset = divmod(index - self.sub_count, self.half)
+        shift += 1
+        return ((offset + self.half + 1) << shift) - 1
+
+    def record(self, seconds: float, count: int = 1):
+        value = max(0, int(round(seconds * 1e6)))
+        index = self._index(value)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.total += count
+        self.sum += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def record_all(self, values: Iterable[float]):
+        for seconds in values:
+            self.record(seconds)
+
+    def merge(self, other: "LatencyHistogram"):
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total += other.total
+        self.sum += other.sum
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+
+    def value_at(self, percentile: float) -> float:
+        """Seconds at or below which ``percentile`` percent of values fall."""
+        if not self.total:
+            return 0.0
+        target = max(1, math.ceil(round(percentile / 100 * self.total, 9)))
+        running = 0
+        for index in sorted(self.counts):
+            running += self.counts[index]
+            if running >= target:
+                return min(self._highest_equivalent(index), self.max) / 1e6
+        return self.max / 1e6
+
+    def summary(self, percentiles=DEFAULT_PERCENTILES) -> Dict[str, float]:
+        """Percentiles, mean and max in milliseconds."""
+        if not self.total:
+            return {"count": 0}
+        result = {"count": self.total, "mean": round(self.sum / self.total / 1e3, 3)}
+        for pct in percentiles:
+            result[f"p{pct:g}"] = round(self.value_at(pct) * 1e3, 3)
+        result["max"] = round(self.max / 1e3, 3)
+        return result
@@ -0,0 +1,235 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+class HTTPError(Exception):
+    """Raised when the server answers with a non-2xx status."""
+
+    def __init__(self, status: int, body: bytes = b""):
+        self.status = status
+        self.body = body
+        super().__init__(f"HTTP {status}: {body[:200].decode('utf-8', 'replace')}")
+
+
+def split_url(url: str) -> Tuple[str, int, str]:
+    """
+    Splits an http:// URL into (host, port, path-prefix).
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", ""):
+        raise ValueError(f"Only plain http:// URLs are supported, got {url!r}")
+    return parts.hostname or "localhost", parts.port or 80, parts.path.rstrip("/")
+
+
+async def _read_headers(reader: asyncio.StreamReader) -> Dict[str, str]:
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            return headers
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+
+class AsyncResponse:
+    """
+    Response whose body is read incrementally from a pooled connection.
+    ``timeout`` bounds each read, so a stalled stream fails instead of
+    hanging; the body as a whole may take longer.
+    """
+
+    def __init__(self, reader, status: int, reason: str, headers: Dict[str, str],
+                 timeout: Optional[float] = None):
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self._reader = reader
+        self._timeout = timeout
+        self._chunked = headers.get("transfer-encoding", "").lower() == "chunked"
+        length = headers.get("content-length")
+        self._remaining = int(length) if length is not None else None
+        self.keep_alive = headers.get("connection", "").lower() != "close" and (
+            self._chunked or self._remaining is not None
+        )
+        self.complete = False
+
+    async def iter_chunks(self):
+        """Yields raw body chunks exactly as they arrive on the socket."""
+        reader = self._reader
+        if self.complete:
+            return
+        timeout = self._timeout
+        if self._chunked:
+            while True:
+                size_line = await asyncio.wait_for(reader.readline(), timeout)
+                if not size_line:
+                    raise ConnectionResetError("Connection closed mid-body")
+                size = int(size_line.split(b";")[0].strip(), 16)
+                if size == 0:
+                    await asyncio.wait_for(_read_headers(reader), timeout)  # trailers
+                    break
+                data = await asyncio.wait_for(reader.readexactly(size + 2), timeout)
+                yield data[:-2]
+        elif self._remaining is not None:
+            while self._remaining > 0:
+                data = await asyncio.wait_for(reader.read(min(self._remaining, 65536)), timeout)
+                if not data:
+                    raise ConnectionResetError("Connection closed mid-body")
+                self._remaining -= len(data)
+                yield data
+        else:
+            while True:
+                data = await asyncio.wait_for(reader.read(65536), timeout)
+                if not data:
+                    break
+                yield data
+        self.complete = True
+
+    async def read(self) -> bytes:
+        return b"".join([chunk async for chunk in self.iter_chunks()])
+
+    async def json(self):
+        return json.loads(await self.read())
+
+    async def raise_for_status(self):
+        if not 200 <= self.status < 300:
+            raise HTTPError(self.status, await self.read())
+
+
+class AsyncConnectionPool:
+    """
+    Keep-alive HTTP/1.1 connection pool for a single host (or unix socket).
+
+    At most ``max_connections`` requests are in flight at once; idle
+    connections are reused instead of paying TCP setup per request.
+    """
+
+    def __init__(self, host: str, port: int, max_connections: int = 10,
+                 timeout: Optional[float] = None, unix_path: Optional[str] = None):
+        self.host = host
+        self.port = port
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.unix_path = unix_path
+        self._idle = []
+        self._semaphore = None
+        self.connections_opened = 0
+
+    async def _connect(self):
+        self.connections_opened += 1
+        if self.unix_path:
+            return await asyncio.wait_for(asyncio.open_unix_connection(self.unix_path), self.timeout)
+        return await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout
+        )
+
+    @staticmethod
+    def _discard(conn):
+        conn[1].close()
+
+    async def _send(self, conn, payload: bytes) -> bytes:
+        """Writes the request and returns the status line."""
+        reader, writer = conn
+        writer.write(payload)
+        await writer.drain()
+        status_line = await asyncio.wait_for(reader.readline(), self.timeout)
+        if not status_line:
+            raise ConnectionResetError("Server closed the connection")
+        return status_line
+
+    @asynccontextmanager
+    async def request(self, method: str, path: str, body: Optional[bytes] = None,
+                      headers: Optional[Dict[str, str]] = None):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_connections)
+        body = body or b""
+        head = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}",
+                f"Content-Length: {len(body)}", "Connection: keep-alive"]
+        for name, value in (headers or {}).items():
+            head.append(f"{name}: {value}")
+        payload = ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+
+        async with self._semaphore:
+            reused = bool(self._idle)
+            conn = self._idle.pop() if reused else await self._connect()
+            try:
+                try:
+                    status_line = await self._send(conn, payload)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    if not reused:
+                        raise
+                    # A stale keep-alive connection gets one retry on a fresh socket;
+                    # other idle connections are likely just as stale.
+                    self._discard(conn)
+                    conn = await self._connect()
+                    status_line = await self._send(conn, payload)
+                reader = conn[0]
+                parts = status_line.decode("latin-1").rstrip("\r\n").split(" ", 2)
+                reason = parts[2] if len(parts) > 2 else ""
+                headers = await asyncio.wait_for(_read_headers(reader), self.timeout)
+                response = AsyncResponse(reader, int(parts[1]), reason, headers, self.timeout)
+            except BaseException:
+                # Timeouts and malformed replies leave the connection unusable.
+                self._discard(conn)
+                raise
+            try:
+                yield response
+            finally:
+                if response.complete and response.keep_alive:
+                    self._idle.append(conn)
+                else:
+                    self._discard(conn)
+
+    async def close(self):
+        while self._idle:
+            self._discard(self._idle.pop())
+
+
+# Server side helpers used by the gateway
+
+STATUS_REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    411: "Length Required", 429: "Too Many Requests", 500: "Internal Server Error",
+    502: "Bad Gateway", 503: "Service Unavailable",
+}
+
+
+async def read_request(reader: asyncio.StreamReader):
+    """
+    Reads one HTTP/1.1 request. Returns (method, path, headers, body), or
+    None once the client has closed the connection.
+    """
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+    method, path, _ = request_line.decode("latin-1").split(" ", 2)
+    headers = await _read_headers(reader)
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        raise HTTPError(411, b"Chunked request bodies are not supported")
+    length = int(headers.get("content-length") or 0)
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), path, headers, body
+
+
+def format_head(status: int, headers: Dict[str, str]) -> bytes:
+    lines = [f"HTTP/1.1 {status} {STATUS_REASONS.get(status, 'Unknown')}"]
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+def format_chunk(data: bytes) -> bytes:
+    """Frames ``data`` for a chunked response; empty data ends the body."""
+    if not data:
+        return b"0\r\n\r\n"
+    return b"%x\r\n%s\r\n" % (len(data), data)
+
+
+async def write_json(writer: asyncio.StreamWriter, status: int, body, extra_headers=None):
+    data = json.dumps(body).encode()
+    headers = {"Content-Type": "application/json", "Content-Length": str(len(data))}
+    headers.update(extra_headers or {})
+    writer.write(format_head(status, headers) + data)
+    await writer.drain()
@@ -0,0 +1,180 @@
+import asyncio
+import math
+from typing import Dict, List, Optional, Tuple
+
+import psutil
+
+from solo_server.utils.docker_api import AsyncDockerClient, list_containers
+from solo_server.utils.gpus import gpu_inventory
+from solo_server.utils.hardware import HardwareInfo
+from solo_server.utils.http import AsyncConnectionPool, split_url
+from solo_server.utils.replicas import BASE_NAME
+from solo_server.utils.usage import UsageTotals
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+PROBE_TIMEOUT = 2.0
+
+# name, type, help
+FAMILIES = [
+    ("solo_host_cpu_percent", "gauge", "Host CPU utilisation"),
+    ("solo_host_memory_used_bytes", "gauge", "Host memory in use"),
+    ("solo_host_memory_total_bytes", "gauge", "Host memory installed"),
+    ("solo_gpu_memory_used_bytes", "gauge", "GPU memory in use"),
+    ("solo_gpu_memory_total_bytes", "gauge", "GPU memory installed"),
+    ("solo_gpu_utilization_ratio", "gauge", "GPU utilisation from 0 to 1"),
+    ("solo_container_up", "gauge", "1 if the container is running"),
+    ("solo_container_restarts_total", "counter", "Restarts of the container by the Docker daemon"),
+    ("solo_model_loaded", "gauge", "1 for every model a replica holds in memory"),
+    ("solo_model_memory_bytes", "gauge", "Memory held by a loaded model"),
+    ("solo_model_vram_bytes", "gauge", "Part of a loaded model's memory on the GPU"),
+    ("solo_requests_total", "counter", "Chat requests answered by Ollama"),
+    ("solo_prompt_tokens_total", "counter", "Prompt tokens evaluated (prompt_eval_count)"),
+    ("solo_output_tokens_total", "counter", "Tokens generated (eval_count)"),
+    ("solo_prompt_eval_seconds_total", "counter", "Time spent evaluating prompts (prompt_eval_duration)"),
+    ("solo_eval_seconds_total", "counter", "Time spent generating (eval_duration)"),
+    ("solo_load_seconds_total", "counter", "Time spent loading models (load_duration)"),
+    ("solo_request_seconds_total", "counter", "Server-side request time (total_duration)"),
+    ("solo_probe_up", "gauge", "1 if the last refresh reached the source"),
+    ("solo_exporter_refresh_seconds", "gauge", "Duration of the last refresh"),
+    ("solo_exporter_last_refresh_timestamp_seconds", "gauge", "Unix time of the last refresh"),
+]
+USAGE_METRICS = {
+    "requests": "solo_requests_total", "prompt_tokens": "solo_prompt_tokens_total",
+    "output_tokens": "solo_output_tokens_total", "prompt_eval_seconds": "solo_prompt_eval_seconds_total",
+    "eval_seconds": "solo_eval_seconds_total", "load_seconds": "solo_load_seconds_total",
+    "total_seconds": "solo_request_seconds_total",
+}
+
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render_metrics(samples: List[Sample]) -> bytes:
+    """Prometheus text exposition (0.0.4) of ``samples``, grouped by family."""
+    by_name: Dict[str, List[Sample]] = {}
+    for sample in samples:
+        by_name.setdefault(sample[0], []).append(sample)
+    lines = []
+    for name, kind, help_text in FAMILIES:
+        if name not in by_name:
+            continue
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for _, labels, value in by_name[name]:
+            label_text = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+            lines.append(f"{name}{{{label_text}}} {_format_value(value)}" if label_text
+                         else f"{name} {_format_value(value)}")
+    return ("\n".join(lines) + "\n").encode()
+
+
+def host_samples(hardware: Optional[HardwareInfo]) -> List[Sample]:
+    """CPU, memory and per-GPU gauges; blocking (nvidia-smi), so run off the event loop."""
+    memory = psutil.virtual_memory()
+    samples = [
+        ("solo_host_cpu_percent", {}, psutil.cpu_percent(interval=None)),
+        ("solo_host_memory_used_bytes", {}, memory.total - memory.available),
+        ("solo_host_memory_total_bytes", {}, memory.total),
+    ]
+    if hardware is not None and hardware.gpus:
+        for device in gpu_inventory(hardware, live=True):
+            labels = {"gpu": str(device.index), "model": device.model}
+            samples += [
+                ("solo_gpu_memory_used_bytes", labels, device.used_bytes),
+                ("solo_gpu_memory_total_bytes", labels, device.memory_bytes),
+                ("solo_gpu_utilization_ratio", labels, device.load),
+            ]
+    return samples
+
+
+class MetricsCollector:
+    """
+    Gathers host, container, model and usage metrics in one concurrent pass.
+
+    The Docker client and the per-replica keep-alive pools live as long as
+    the collector, so a refresh costs a handful of requests on open
+    connections and no process forks.
+    """
+
+    def __init__(self, replicas: List[Dict], hardware: Optional[HardwareInfo] = None,
+                 usage: Optional[UsageTotals] = None):
+        self.hardware = hardware
+        self.usage = usage or UsageTotals()
+        self.replicas = []
+        for replica in replicas:
+            host, port, prefix = split_url(f"http://localhost:{replica['port']}")
+            self.replicas.append((replica["name"], prefix,
+                                  AsyncConnectionPool(host, port, max_connections=1, timeout=PROBE_TIMEOUT)))
+        self.docker = None
+        try:
+            self.docker = AsyncDockerClient(timeout=PROBE_TIMEOUT)
+        except FileNotFoundError:
+            pass  # no unix socket: container state via the docker CLI, without restart counts
+        psutil.cpu_percent(interval=None)  # primes the CPU counter for the first refresh
+
+    async def _containers(self) -> List[Sample]:
+        if self.docker is None:
+            containers = await asyncio.to_thread(list_containers, BASE_NAME)
+            return [("solo_container_up", {"name": c["name"], "image": c["image"]},
+                     float(c["state"] == "running")) for c in containers]
+        containers = await self.docker.containers(BASE_NAME)
+        details = await asyncio.gather(*(self.docker.inspect(c["name"]) for c in containers),
+                                       return_exceptions=True)
+        samples = []
+        for container, detail in zip(containers, details):
+            labels = {"name": container["name"], "image": container["image"]}
+            samples.append(("solo_container_up", labels, float(container["state"] == "running")))
+            if isinstance(detail, dict):
+                samples.append(("solo_container_restarts_total", {"name": container["name"]},
+                                detail.get("RestartCount", 0)))
+        return samples
+
+    @staticmethod
+    async def _models(name: str, prefix: str, pool: AsyncConnectionPool) -> List[Sample]:
+        async with pool.request("GET", f"{prefix}/api/ps") as response:
+            await response.raise_for_status()
+            models = (await response.json()).get("models", [])
+        samples = []
+        for model in models:
+            labels = {"replica": name, "model": model.get("name", "")}
+            samples += [("solo_model_loaded", labels, 1),
+                        ("solo_model_memory_bytes", labels, model.get("size", 0))]
+            if "size_vram" in model:
+                samples.append(("solo_model_vram_bytes", labels, model["size_vram"]))
+        return samples
+
+    def _usage(self) -> List[Sample]:
+        samples = []
+        for model, totals in sorted(self.usage.refresh().items()):
+            for counter, metric in USAGE_METRICS.items():
+                samples.append((metric, {"model": model}, totals[counter]))
+        return samples
+
+    async def collect(self) -> List[Sample]:
+        sources = ["host", "docker"] + [name for name, _, _ in self.replicas] + ["usage"]
+        probes = [asyncio.to_thread(host_samples, self.hardware), self._containers()]
+        probes += [self._models(name, prefix, pool) for name, prefix, pool in self.replicas]
+        probes.append(asyncio.to_thread(self._usage))
+        results = await asyncio.gather(*probes, return_exceptions=True)
+        samples = []
+        for source, result in zip(sources, results):
+            failed = isinstance(result, BaseException)
+            samples.append(("solo_probe_up", {"source": source}, float(not failed)))
+            if not failed:
+                samples.extend(result)
+        return samples
+
+    async def close(self):
+        await asyncio.gather(*(pool.close() for _, _, pool in self.replicas))
+        if self.docker is not None:
+            await self.docker.close()
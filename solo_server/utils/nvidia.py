@@ -1,3 +1,4 @@
+import json
 import subprocess
 import typer
 import sys
@@ -10,13 +11,13 @@ def check_nvidia_toolkit(os_name) -> bool:
     """
     if os_name == "Linux":
         try:
-            result = subprocess.run("docker info | grep -i nvidia", 
-                                 shell=True, 
-                                 check=True, 
-                                 capture_output=True, 
+            result = subprocess.run(["docker", "info", "--format", "{{json .Runtimes}}"],
+                                 check=True,
+                                 capture_output=True,
                                  text=True)
-            return bool(result.stdout.strip())
-        except subprocess.CalledProcessError:
+            runtimes = json.loads(result.stdout or "{}") or {}
+            return any("nvidia" in name.lower() for name in runtimes)
+        except (subprocess.CalledProcessError, OSError, ValueError):
             return False
     elif os_name == "Windows":
         try:
@@ -0,0 +1,288 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+from solo_server.config import get_config_value
+from solo_server.utils.fit import SOLO_MODELS_DIR, blob_path, manifest_path, parse_model_name
+
+MANIFEST_ACCEPT = "application/vnd.docker.distribution.manifest.v2+json"
+CHUNK_SIZE = 32 * 1024 ** 2
+READ_SIZE = 1024 ** 2
+DEFAULT_CONNECTIONS = 4
+OLLAMA_VOLUME = "ollama"
+DIGEST = re.compile(r"sha256:[0-9a-f]{64}")
+
+
+class PullError(Exception):
+    """Raised when a manifest or blob cannot be fetched or fails verification."""
+
+
+def sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(READ_SIZE), b""):
+            digest.update(block)
+    return f"sha256:{digest.hexdigest()}"
+
+
+def manifest_blobs(manifest: Dict) -> List[Dict]:
+    """The config and layer descriptors of a manifest (digest, size, mediaType)."""
+    blobs = ([manifest["config"]] if manifest.get("config") else []) + list(manifest.get("layers", []))
+    for blob in blobs:
+        if not DIGEST.fullmatch(str(blob.get("digest", ""))):
+            raise PullError(f"Manifest lists an invalid digest: {blob.get('digest')!r}")
+    return blobs
+
+
+class _BlobDownload:
+    """
+    One blob being fetched as ranged chunks into ``<blob>.partial``.
+
+    Finished chunk indexes are kept in ``<blob>.partial.json`` so an
+    interrupted pull resumes with only the missing chunks.
+    """
+
+    def __init__(self, digest: str, size: int, path: str, chunk_size: int):
+        self.digest, self.size, self.path, self.chunk_size = digest, size, path, chunk_size
+        self.partial = path + ".partial"
+        self.state_path = self.partial + ".json"
+        self.chunks = [(start, min(start + chunk_size, size) - 1) for start in range(0, size, chunk_size)] or [(0, -1)]
+        self.done = set()
+        self.lock = threading.Lock()
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("size") == size and state.get("chunk_size") == chunk_size and os.path.exists(self.partial):
+                self.done = set(state.get("done", []))
+        except (OSError, ValueError):
+            pass
+        if not self.done:
+            with open(self.partial, "wb") as f:
+                f.truncate(size)
+
+    @property
+    def resumed_bytes(self) -> int:
+        return sum(self.chunks[i][1] - self.chunks[i][0] + 1 for i in self.done)
+
+    def pending(self) -> List[int]:
+        return [i for i in range(len(self.chunks)) if i not in self.done]
+
+    def chunk_done(self, index: int) -> bool:
+        """Records a finished chunk; True once every chunk is on disk."""
+        with self.lock:
+            self.done.add(index)
+            tmp_path = f"{self.state_path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"size": self.size, "chunk_size": self.chunk_size, "done": sorted(self.done)}, f)
+            os.replace(tmp_path, self.state_path)
+            return len(self.done) == len(self.chunks)
+
+    def finish(self):
+        """Verifies the sha256 of the assembled blob and moves it into the store."""
+        actual = sha256_file(self.partial)
+        if actual != self.digest:
+            self.discard()
+            raise PullError(f"{self.digest}: downloaded data hashes to {actual}")
+        os.replace(self.partial, self.path)
+        try:
+            os.remove(self.state_path)
+        except OSError:
+            pass
+
+    def discard(self):
+        for path in (self.partial, self.state_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class ModelPuller:
+    """
+    Fetches Ollama models from an OCI-style registry into a
+    content-addressed store (``~/.solo/models`` by default).
+
+    Blobs are downloaded as parallel ranged chunks over ``connections``
+    keep-alive connections, resumed chunk by chunk after an interruption,
+    and verified against their sha256 digest. A blob already in the store
+    is never fetched again, whichever model it belongs to.
+    """
+
+    def __init__(self, store: Optional[str] = None, registry_url: Optional[str] = None,
+                 connections: Optional[int] = None, chunk_size: int = CHUNK_SIZE, timeout: float = 30.0,
+                 on_progress: Optional[Callable[[int, int], None]] = None):
+        self.store = store or get_config_value("solo_models_dir") or SOLO_MODELS_DIR
+        self.store = os.path.expanduser(self.store)
+        self.registry_url = (registry_url or get_config_value("registry_url") or "").rstrip("/") or None
+        self.connections = max(1, connections or int(get_config_value("pull_connections", DEFAULT_CONNECTIONS)))
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self.on_progress = on_progress
+        self.downloaded = 0
+        self.total = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def _base_url(self, name: str) -> str:
+        registry, repository, _ = parse_model_name(name)
+        return f"{self.registry_url or 'https://' + registry}/v2/{repository}"
+
+    def fetch_manifest(self, name: str) -> bytes:
+        _, _, tag = parse_model_name(name)
+        try:
+            response = self._session().get(f"{self._base_url(name)}/manifests/{tag}",
+                                           headers={"Accept": MANIFEST_ACCEPT}, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise PullError(f"Could not reach the registry for {name}: {e}") from e
+        if response.status_code == 404:
+            raise PullError(f"{name} was not found in the registry")
+        if response.status_code != 200:
+            raise PullError(f"Registry answered {response.status_code} for {name}")
+        return response.content
+
+    def _count(self, size: int):
+        with self._lock:
+            self.downloaded += size
+        if self.on_progress is not None:
+            self.on_progress(self.downloaded, self.total)
+
+    def _fetch_chunk(self, name: str, blob: _BlobDownload, index: int) -> bool:
+        start, end = blob.chunks[index]
+        if end < start:  # empty blob
+            return blob.chunk_done(index)
+        url = f"{self._base_url(name)}/blobs/{blob.digest}"
+        with self._session().get(url, headers={"Range": f"bytes={start}-{end}"}, stream=True,
+                                 timeout=self.timeout) as response:
+            whole = response.status_code == 200 and start == 0 and end == blob.size - 1
+            if response.status_code != 206 and not whole:
+                raise PullError(f"{blob.digest}: registry answered {response.status_code} to a ranged request")
+            length, written = end - start + 1, 0
+            with open(blob.partial, "r+b") as f:
+                f.seek(start)
+                for data in response.iter_content(READ_SIZE):
+                    data = data[:length - written]
+                    f.write(data)
+                    written += len(data)
+                    self._count(len(data))
+            if written < length:
+                raise PullError(f"{blob.digest}: connection closed {length - written} bytes early")
+        return blob.chunk_done(index)
+
+    def download_blobs(self, name: str, blobs: List[Dict]) -> Dict[str, int]:
+        """Fetches whichever of ``blobs`` are not in the store yet, all chunks sharing one pool."""
+        downloads, reused = [], 0
+        for descriptor in blobs:
+            path = blob_path(self.store, descriptor["digest"])
+            if os.path.exists(path):
+                reused += descriptor["size"]
+                continue
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            downloads.append(_BlobDownload(descriptor["digest"], descriptor["size"], path, self.chunk_size))
+        resumed = sum(blob.resumed_bytes for blob in downloads)
+        self.total = sum(blob.size for blob in downloads)
+        self.downloaded = resumed
+
+        failed = threading.Event()
+
+        def run(blob, index):
+            if failed.is_set():
+                return  # left for the next attempt to resume
+            try:
+                if self._fetch_chunk(name, blob, index):
+                    blob.finish()
+            except Exception:
+                failed.set()
+                raise
+
+        with ThreadPoolExecutor(max_workers=self.connections) as pool:
+            futures = [pool.submit(run, blob, index) for blob in downloads for index in blob.pending()]
+            errors = [f.exception() for f in futures if f.exception() is not None]
+        # A blob whose chunks were all present before this run only needs verifying.
+        for blob in downloads:
+            if not blob.pending() and os.path.exists(blob.partial):
+                blob.finish()
+        if errors:
+            error = errors[0]
+            raise error if isinstance(error, PullError) else PullError(f"Download interrupted: {error}")
+        return {"blobs": len(downloads), "downloaded": self.downloaded - resumed, "resumed": resumed,
+                "reused": reused}
+
+    def pull(self, name: str) -> Dict:
+        """Fetches ``name`` into the store; returns what was downloaded, resumed and reused."""
+        raw = self.fetch_manifest(name)
+        try:
+            manifest = json.loads(raw)
+        except ValueError as e:
+            raise PullError(f"Registry returned an invalid manifest for {name}") from e
+        stats = self.download_blobs(name, manifest_blobs(manifest))
+        path = manifest_path(name, self.store)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(raw)
+        os.replace(tmp_path, path)
+        stats.update(model=name, manifest=path, size=sum(b["size"] for b in manifest_blobs(manifest)))
+        return stats
+
+
+def import_model(name: str, store: str, models_dir: str) -> int:
+    """
+    Places a stored model into an Ollama models directory: blobs are
+    hard-linked when on the same filesystem and copied otherwise, then the
+    manifest is written. Returns the number of blobs added.
+    """
+    source = manifest_path(name, store)
+    with open(source, "rb") as f:
+        raw = f.read()
+    added = 0
+    for descriptor in manifest_blobs(json.loads(raw)):
+        target = blob_path(models_dir, descriptor["digest"])
+        if os.path.exists(target) and os.path.getsize(target) == descriptor["size"]:
+            continue
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp_path = f"{target}.{os.getpid()}.tmp"
+        try:
+            os.link(blob_path(store, descriptor["digest"]), tmp_path)
+        except OSError:
+            shutil.copyfile(blob_path(store, descriptor["digest"]), tmp_path)
+        os.replace(tmp_path, target)
+        added += 1
+    target = manifest_path(name, models_dir)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    shutil.copyfile(source, target)
+    return added
+
+
+def import_into_volume(name: str, store: str, volume: str = OLLAMA_VOLUME, image: str = "ollama/ollama"):
+    """
+    Copies a stored model into a Docker volume through a short-lived
+    container, for hosts (Docker Desktop, rootless) whose volumes are not
+    reachable from the host filesystem.
+    """
+    with open(manifest_path(name, store), "rb") as f:
+        manifest = json.load(f)
+    relative_manifest = os.path.relpath(manifest_path(name, store), store).replace(os.sep, "/")
+    commands = ["mkdir -p /root/.ollama/models/blobs"]
+    for descriptor in manifest_blobs(manifest):
+        blob = descriptor["digest"].replace(":", "-")
+        commands.append(f"[ -e /root/.ollama/models/blobs/{blob} ] || "
+                        f"cp /solo-store/blobs/{blob} /root/.ollama/models/blobs/{blob}")
+    commands.append(f"mkdir -p \"$(dirname '/root/.ollama/models/{relative_manifest}')\"")
+    commands.append(f"cp '/solo-store/{relative_manifest}' '/root/.ollama/models/{relative_manifest}'")
+    subprocess.run(["docker", "run", "--rm", "--entrypoint", "sh", "-v", f"{volume}:/root/.ollama",
+                    "-v", f"{os.path.abspath(store)}:/solo-store:ro", image, "-c", " && ".join(commands)],
+                   check=True, capture_output=True)
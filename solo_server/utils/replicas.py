@@ -0,0 +1,87 @@
+import json
+import os
+from typing import Dict, List, Optional
+
+from solo_server.config import SOLO_DIR
+
+REPLICAS_FILE = os.path.join(SOLO_DIR, "replicas.json")
+BASE_NAME = "solo"
+BASE_PORT = 11434
+
+
+def replica_name(index: int) -> str:
+    """The first replica keeps the historical container name ``solo``."""
+    return BASE_NAME if index == 0 else f"{BASE_NAME}-{index}"
+
+
+def split_cpus(cpus: List[int], count: int) -> List[str]:
+    """
+    Splits ``cpus`` into ``count`` disjoint, contiguous ``--cpuset-cpus``
+    strings of near-equal size.
+    """
+    count = max(1, min(count, len(cpus)))
+    size, extra = divmod(len(cpus), count)
+    sets, start = [], 0
+    for index in range(count):
+        end = start + size + (1 if index < extra else 0)
+        sets.append(format_cpuset(cpus[start:end]))
+        start = end
+    return sets
+
+
+def format_cpuset(cpus: List[int]) -> str:
+    """Formats CPU ids as the compact range list docker expects, e.g. 0-3,8-11."""
+    ranges, run = [], []
+    for cpu in sorted(cpus):
+        if run and cpu != run[-1] + 1:
+            ranges.append(run)
+            run = []
+        run.append(cpu)
+    if run:
+        ranges.append(run)
+    return ",".join(f"{r[0]}-{r[-1]}" if len(r) > 1 else str(r[0]) for r in ranges)
+
+
+def plan_replicas(count: int, cpus: Optional[List[int]] = None,
+                  placement: Optional[List[Dict]] = None) -> List[Dict]:
+    """
+    Names, ports and CPU pins for ``count`` replicas on consecutive ports.
+    A topology-aware ``placement`` (see ``plan_placement``) replaces the even CPU split.
+    """
+    if placement:
+        return [{"name": replica_name(i), "port": BASE_PORT + i, **placement[i]} for i in range(count)]
+    if count <= 1:
+        return [{"name": BASE_NAME, "port": BASE_PORT, "cpuset": None}]
+    if cpus is None:
+        cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count() or 1))
+    cpusets = split_cpus(cpus, count)
+    if len(cpusets) < count:
+        cpusets += [None] * (count - len(cpusets))
+    return [
+        {"name": replica_name(i), "port": BASE_PORT + i, "cpuset": cpusets[i]}
+        for i in range(count)
+    ]
+
+
+def save_replicas(replicas: List[Dict], path: Optional[str] = None):
+    path = path or REPLICAS_FILE
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(replicas, f, indent=2)
+
+
+def load_replicas(path: Optional[str] = None) -> List[Dict]:
+    """The recorded replica set, or the single default container."""
+    try:
+        path = path or REPLICAS_FILE
+        with open(path, "r", encoding="utf-8") as f:
+            replicas = json.load(f)
+        if replicas:
+            return replicas
+    except (OSError, ValueError):
+        pass
+    return plan_replicas(1)
+
+
+def replica_urls(replicas: Optional[List[Dict]] = None) -> List[str]:
+    return [f"http://localhost:{r['port']}" for r in (replicas or load_replicas())]
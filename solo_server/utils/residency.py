@@ -0,0 +1,241 @@
+import calendar
+import json
+import os
+import re
+import time
+from datetime import datetime
+from typing import Collection, Dict, List, Optional, Tuple
+
+from solo_server.config import SOLO_DIR, get_config_value
+from solo_server.utils.balancer import normalize_model
+from solo_server.utils.hardware import detect_hardware
+
+RESIDENCY_FILE = os.path.join(SOLO_DIR, "residency.json")
+DEFAULT_BUDGET_FRACTION = 0.8
+# Loaded models need room for the KV cache and runtime on top of the weights.
+LOAD_OVERHEAD = 1.2
+GIB = 1024 ** 3
+# Ollama's keep_alive for requests that do not set one (OLLAMA_KEEP_ALIVE unset).
+SERVER_KEEP_ALIVE = 300.0
+KEEP_ALIVE_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+class ResidencyError(Exception):
+    """Raised when a model cannot be made resident within the memory budget."""
+
+
+def memory_budget() -> int:
+    """
+    Bytes of model memory Solo may keep resident.
+
+    ``residency_budget_gb`` in solo.conf wins; otherwise a fraction
+    (``residency_budget_fraction``) of VRAM on GPU hosts or of RAM on CPU hosts.
+    """
+    override = get_config_value("residency_budget_gb")
+    if override:
+        return int(float(override) * GIB)
+    fraction = float(get_config_value("residency_budget_fraction", DEFAULT_BUDGET_FRACTION))
+    hardware = detect_hardware()
+    if hardware.compute_backend != "CPU" and hardware.gpu_memory:
+        return int(hardware.gpu_memory * GIB * fraction)
+    return int(hardware.memory_gb * GIB * fraction)
+
+
+def parse_expiry(value: Optional[str]) -> float:
+    """
+    Unix time of an ``/api/ps`` ``expires_at`` (RFC 3339, with up to
+    nanosecond precision); 0.0 when it is missing or unparsable.
+    """
+    match = re.fullmatch(r"(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d)(?:\.(\d+))?(Z|[+-]\d\d:\d\d)", value or "")
+    if not match:
+        return 0.0
+    stamp = calendar.timegm(datetime.strptime(match.group(1), "%Y-%m-%dT%H:%M:%S").timetuple())
+    zone = match.group(3)
+    if zone != "Z":
+        offset = int(zone[1:3]) * 3600 + int(zone[4:6]) * 60
+        stamp -= offset if zone[0] == "+" else -offset
+    return stamp + float(f"0.{match.group(2) or 0}")
+
+
+def parse_keep_alive(value) -> float:
+    """
+    Seconds of an Ollama ``keep_alive`` (``300``, ``"30m"``, ``"1h30m"``);
+    infinite when negative (kept forever) and the server default when unparsable.
+    """
+    try:
+        seconds = float(value)
+    except (TypeError, ValueError):
+        text = str(value).strip()
+        if not re.fullmatch(r"-?(?:\d+(?:\.\d+)?(?:ms|s|m|h))+", text):
+            return SERVER_KEEP_ALIVE
+        seconds = sum(float(n) * KEEP_ALIVE_UNITS[u] for n, u in re.findall(r"(\d+(?:\.\d+)?)(ms|s|m|h)", text))
+        seconds = -seconds if text.startswith("-") else seconds
+    return float("inf") if seconds < 0 else seconds
+
+
+class ResidencyManager:
+    """
+    Decides which models stay loaded in the Ollama server.
+
+    Loaded models and their sizes come from ``/api/ps``. Before a model is
+    loaded, least-recently-used models are unloaded (``keep_alive: 0``)
+    until it fits in ``budget`` bytes. Recency is the last use implied by
+    the ``expires_at`` Ollama pushes forward on every request, so traffic
+    through ``solo serve``, the gateway or any other client counts, not
+    just calls to :meth:`ensure`. Cold loads and load times per model
+    are kept in ``~/.solo/residency.json`` for host sizing.
+    """
+
+    def __init__(self, client, budget: int, keep_alive: str = "30m", state_path: Optional[str] = None):
+        self.client = client
+        self.budget = budget
+        self.keep_alive = keep_alive
+        self.state_path = state_path or RESIDENCY_FILE
+        self.state = self._load_state()
+        self.expires: Dict[str, float] = {}
+
+    def _load_state(self) -> Dict:
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"models": {}}
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        tmp_path = f"{self.state_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def _record(self, model: str) -> Dict:
+        return self.state["models"].setdefault(model, {
+            "size": 0, "last_used": 0.0, "cold_loads": 0,
+            "load_seconds_total": 0.0, "load_seconds_max": 0.0,
+        })
+
+    def resident(self) -> Dict[str, int]:
+        """Loaded models mapped to the bytes they occupy."""
+        models = self.client.ps()
+        self.expires = {normalize_model(m["name"]): parse_expiry(m.get("expires_at")) for m in models}
+        return {normalize_model(m["name"]): int(m.get("size", 0)) for m in models}
+
+    def _recency(self, model: str) -> Tuple[float, float]:
+        """
+        When ``model`` was last used, then its ``expires_at`` as a tie-breaker.
+
+        ``expires_at`` is the last request's time plus that request's
+        keep_alive: the one we loaded the model with, or the server default
+        for clients that send none. The first that puts the request between
+        our own last use and now is taken; older Ollama releases report no
+        ``expires_at`` at all, leaving only our own bookkeeping.
+        """
+        record = self.state["models"].get(model, {})
+        last_used = record.get("last_used", 0.0)
+        expires = self.expires.get(model, 0.0)
+        if expires:
+            now = time.time()
+            for keep_alive in (parse_keep_alive(record.get("keep_alive", self.keep_alive)), SERVER_KEEP_ALIVE):
+                used = expires - keep_alive
+                if last_used - 1 <= used <= now + 1:
+                    return used, expires
+        return last_used, expires
+
+    def estimate_size(self, model: str) -> int:
+        known = self.state["models"].get(model, {}).get("size")
+        if known:
+            return known
+        for entry in self.client.tags():
+            if normalize_model(entry.get("name", "")) == model:
+                return int(entry.get("size", 0) * LOAD_OVERHEAD)
+        return 0
+
+    def _evict_until(self, resident: Dict[str, int], needed: int, keep: str) -> List[str]:
+        used = sum(resident.values())
+        evicted = []
+        victims = sorted((m for m in resident if m != keep), key=self._recency)
+        for victim in victims:
+            if used + needed <= self.budget:
+                break
+            self.client.unload(victim)
+            used -= resident[victim]
+            evicted.append(victim)
+        return evicted
+
+    def ensure(self, model: str) -> Dict:
+        """
+        Makes ``model`` resident, evicting LRU models first if needed.
+        Returns whether it was a cold load, how long it took and what was evicted.
+        """
+        model = normalize_model(model)
+        record = self._record(model)
+        record["last_used"] = time.time()
+        record["keep_alive"] = self.keep_alive
+        resident = self.resident()
+        if model in resident:
+            record["size"] = resident[model] or record["size"]
+            self.client.load(model, self.keep_alive)  # pushes its expiry forward, marking it used
+            self.save()
+            return {"model": model, "cold": False, "load_seconds": 0.0, "evicted": []}
+
+        needed = self.estimate_size(model)
+        if needed > self.budget:
+            self.save()
+            raise ResidencyError(
+                f"{model} needs ~{needed / GIB:.1f} GiB but the budget is {self.budget / GIB:.1f} GiB"
+            )
+        evicted = self._evict_until(resident, needed, model)
+
+        started = time.perf_counter()
+        reply = self.client.load(model, self.keep_alive)
+        load_seconds = reply.get("load_duration", 0) / 1e9 or time.perf_counter() - started
+
+        # Re-check with the real footprint; never stay above the budget.
+        resident = self.resident()
+        record["size"] = resident.get(model, needed)
+        if sum(resident.values()) > self.budget:
+            evicted += self._evict_until(resident, 0, model)
+            if resident.get(model, 0) > self.budget:
+                self.client.unload(model)
+                self.save()
+                raise ResidencyError(f"{model} does not fit in the {self.budget / GIB:.1f} GiB budget")
+
+        record["cold_loads"] += 1
+        record["load_seconds_total"] += load_seconds
+        record["load_seconds_max"] = max(record["load_seconds_max"], load_seconds)
+        self.save()
+        return {"model": model, "cold": True, "load_seconds": load_seconds, "evicted": evicted}
+
+    def preload(self, models: List[str]) -> List[Dict]:
+        return [self.ensure(model) for model in models if model.strip()]
+
+
+def known_model_sizes(state_path: Optional[str] = None) -> Dict[str, int]:
+    """Loaded footprint (bytes) of every model seen so far."""
+    try:
+        with open(state_path or RESIDENCY_FILE, "r", encoding="utf-8") as f:
+            models = json.load(f).get("models", {})
+    except (OSError, ValueError):
+        return {}
+    return {name: record["size"] for name, record in models.items() if record.get("size")}
+
+
+def residency_summary(state_path: Optional[str] = None, resident: Optional[Collection[str]] = None) -> List[List]:
+    """Rows of [model, resident, size, cold loads, mean/max load] for `solo status`."""
+    try:
+        with open(state_path or RESIDENCY_FILE, "r", encoding="utf-8") as f:
+            models = json.load(f).get("models", {})
+    except (OSError, ValueError):
+        return []
+    rows = []
+    for name, record in sorted(models.items()):
+        cold = record.get("cold_loads", 0)
+        rows.append([
+            name,
+            "yes" if resident and name in resident else "no" if resident is not None else "?",
+            f"{record.get('size', 0) / GIB:.2f} GiB",
+            cold,
+            f"{record.get('load_seconds_total', 0.0) / cold:.2f}s" if cold else "-",
+            f"{record.get('load_seconds_max', 0.0):.2f}s" if cold else "-",
+        ])
+    return rows
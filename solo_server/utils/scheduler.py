@@ -0,0 +1,211 @@
+import asyncio
+import bisect
+import heapq
+import itertools
+import time
+from typing import Dict, Optional
+
+from solo_server.config import get_config_value, load_config
+
+PRIORITY_CLASSES = ("interactive", "batch")
+DEFAULT_NUM_PREDICT = 256
+CHARS_PER_TOKEN = 4
+
+# Upper bounds (seconds) of the queue-wait histogram buckets.
+WAIT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Overloaded(Exception):
+    """Raised when a request cannot be admitted; maps to HTTP 429."""
+
+    def __init__(self, reason: str, retry_after: float = 1.0):
+        super().__init__(reason)
+        self.retry_after = retry_after
+
+
+def _text_length(content) -> int:
+    if isinstance(content, str):
+        return len(content)
+    if isinstance(content, list):
+        return sum(_text_length(part.get("text", "") if isinstance(part, dict) else part)
+                   for part in content)
+    return 0
+
+
+def estimate_cost(payload: Dict) -> int:
+    """
+    Estimated work of a request: prompt tokens × tokens to generate.
+
+    Every generated token attends over the whole prompt, so a long prompt
+    with a long completion is weighted far above either alone. Prompt tokens
+    are approximated from character counts.
+    """
+    chars = sum(_text_length(m.get("content")) for m in payload.get("messages") or [])
+    chars += _text_length(payload.get("input")) + _text_length(payload.get("prompt"))
+    prompt_tokens = max(1, chars // CHARS_PER_TOKEN)
+    options = payload.get("options") or {}
+    num_predict = (options.get("num_predict") or payload.get("max_completion_tokens")
+                   or payload.get("max_tokens"))
+    if num_predict is None:
+        num_predict = 1 if "input" in payload else DEFAULT_NUM_PREDICT
+    return prompt_tokens * max(1, int(num_predict))
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at ``rate`` per second."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def consume(self, cost: float, now: Optional[float] = None) -> float:
+        """
+        Takes ``cost`` tokens if available and returns 0, otherwise returns
+        the seconds until enough tokens will have accumulated.
+        """
+        self._refill(time.monotonic() if now is None else now)
+        cost = min(cost, self.capacity)  # oversized requests still get through when full
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate if self.rate > 0 else 3600.0
+
+
+class WaitHistogram:
+    """Cumulative histogram of queue wait times, Prometheus-style."""
+
+    def __init__(self, bounds=WAIT_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.total += seconds
+
+    def to_dict(self) -> Dict:
+        buckets, running = {}, 0
+        for bound, count in zip(list(self.bounds) + ["+Inf"], self.counts):
+            running += count
+            buckets[str(bound)] = running
+        return {"buckets": buckets, "count": running, "sum": round(self.total, 6)}
+
+
+class Scheduler:
+    """
+    Admission control in front of the upstream chat endpoint.
+
+    Each API key has a token bucket denominated in :func:`estimate_cost`
+    units. Admitted requests wait for one of ``max_concurrent`` upstream
+    slots; interactive requests are always dequeued before batch ones and
+    a request that waits longer than its class's queue budget is shed.
+    """
+
+    def __init__(self, max_concurrent: int = 4, rate: float = 2_000_000, burst: float = 16_000_000,
+                 budgets: Optional[Dict[str, float]] = None,
+                 tenant_limits: Optional[Dict[str, tuple]] = None):
+        self.max_concurrent = max_concurrent
+        self.rate = rate
+        self.burst = burst
+        self.budgets = budgets or {"interactive": 5.0, "batch": 60.0}
+        self.tenant_limits = tenant_limits or {}
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.active = 0
+        self._queue = []
+        self._seq = itertools.count()
+        self.waits = {name: WaitHistogram() for name in PRIORITY_CLASSES}
+        self.depth = {name: 0 for name in PRIORITY_CLASSES}
+        self.counters = {"admitted": 0, "rate_limited": 0, "shed": 0}
+
+    @classmethod
+    def from_config(cls) -> "Scheduler":
+        """Builds a scheduler from solo.conf; ``[tenant:<api key>]`` sections override limits."""
+        rate = float(get_config_value("rate_limit_per_s", 2_000_000))
+        burst = float(get_config_value("rate_limit_burst", 16_000_000))
+        tenant_limits = {}
+        config = load_config()
+        if config is not None:
+            for section in config.sections():
+                if section.startswith("tenant:"):
+                    tenant_limits[section[len("tenant:"):]] = (
+                        config[section].getfloat("rate_limit_per_s", rate),
+                        config[section].getfloat("rate_limit_burst", burst),
+                    )
+        return cls(
+            max_concurrent=int(get_config_value("scheduler_max_concurrent", 4)),
+            rate=rate,
+            burst=burst,
+            budgets={
+                "interactive": float(get_config_value("queue_budget_interactive", 5.0)),
+                "batch": float(get_config_value("queue_budget_batch", 60.0)),
+            },
+            tenant_limits=tenant_limits,
+        )
+
+    def check_rate(self, tenant: str, cost: float):
+        """Charges ``cost`` to the tenant's bucket or raises :class:`Overloaded`."""
+        bucket = self.buckets.get(tenant)
+        if bucket is None:
+            rate, burst = self.tenant_limits.get(tenant, (self.rate, self.burst))
+            bucket = self.buckets[tenant] = TokenBucket(rate, burst)
+        retry_after = bucket.consume(cost)
+        if retry_after:
+            self.counters["rate_limited"] += 1
+            raise Overloaded(f"Rate limit exceeded for tenant {tenant!r}", retry_after)
+
+    async def acquire(self, priority: str = "interactive") -> float:
+        """Waits for an upstream slot and returns the time spent queued."""
+        if priority not in PRIORITY_CLASSES:
+            priority = "interactive"
+        started = time.monotonic()
+        while self._queue and self._queue[0][2].done():
+            heapq.heappop(self._queue)  # waiters that already gave up
+        if self.active < self.max_concurrent and not self._queue:
+            self.active += 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._queue, (PRIORITY_CLASSES.index(priority), next(self._seq), future))
+            self.depth[priority] += 1
+            try:
+                await asyncio.wait_for(asyncio.shield(future), self.budgets[priority])
+            except asyncio.TimeoutError:
+                if not future.done():
+                    future.cancel()
+                    self.counters["shed"] += 1
+                    raise Overloaded(f"Queue-time budget for {priority} requests exceeded",
+                                     self.budgets[priority])
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    self.release()  # the slot was handed over just as we gave up
+                future.cancel()
+                raise
+            finally:
+                self.depth[priority] -= 1
+        waited = time.monotonic() - started
+        self.waits[priority].observe(waited)
+        self.counters["admitted"] += 1
+        return waited
+
+    def release(self):
+        """Frees a slot and hands it to the highest-priority live waiter."""
+        while self._queue:
+            _, _, future = heapq.heappop(self._queue)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    def snapshot(self) -> Dict:
+        return {
+            "active": self.active,
+            "max_concurrent": self.max_concurrent,
+            "queue_depth": dict(self.depth),
+            "wait_seconds": {name: hist.to_dict() for name, hist in self.waits.items()},
+            **self.counters,
+        }
@@ -0,0 +1,102 @@
+import re
+import string
+from typing import List, Sequence
+
+import numpy as np
+
+CHOICE_LETTERS = string.ascii_uppercase
+_ARTICLES = re.compile(r"\b(a|an|the)\b")
+_PUNCTUATION = str.maketrans("", "", string.punctuation)
+_CHOICE = re.compile(r"(?:^|[^A-Za-z])\(?([A-Z])[).:]?(?![A-Za-z])")
+# Lowercase letters only count when they cannot be an ordinary word: "(c)" or a bare "c".
+_LOWER_CHOICE = re.compile(r"^\(?([a-z])[).:]?$|\(([a-z])\)")
+
+
+def normalize_answer(text: str) -> str:
+    """SQuAD-style normalisation: lowercase, no punctuation, articles or extra spaces."""
+    text = _ARTICLES.sub(" ", str(text).lower().translate(_PUNCTUATION))
+    return " ".join(text.split())
+
+
+def _flatten(golds: Sequence[Sequence[str]]):
+    """Pairs every prediction row with each of its gold answers."""
+    rows = np.repeat(np.arange(len(golds)), [max(1, len(g)) for g in golds])
+    flat = [answer for g in golds for answer in (g or [""])]
+    return rows, flat
+
+
+def _best_per_row(rows: np.ndarray, scores: np.ndarray, n: int) -> np.ndarray:
+    best = np.zeros(n)
+    np.maximum.at(best, rows, scores)
+    return best
+
+
+def exact_match(predictions: Sequence[str], golds: Sequence[Sequence[str]]) -> np.ndarray:
+    """1.0 where the normalised prediction equals any normalised gold answer."""
+    rows, flat = _flatten(golds)
+    pred = np.array([normalize_answer(p) for p in predictions], dtype=object)
+    gold = np.array([normalize_answer(g) for g in flat], dtype=object)
+    return _best_per_row(rows, (pred[rows] == gold).astype(np.float64), len(predictions))
+
+
+def extract_choice(response: str, n_choices: int) -> int:
+    """Index of the first standalone choice letter in ``response``, or -1."""
+    valid = CHOICE_LETTERS[:n_choices]
+    response = response.strip()
+    for match in _CHOICE.finditer(response):
+        if match.group(1) in valid:
+            return valid.index(match.group(1))
+    for match in _LOWER_CHOICE.finditer(response):
+        letter = (match.group(1) or match.group(2)).upper()
+        if letter in valid:
+            return valid.index(letter)
+    return -1
+
+
+def multiple_choice(responses: Sequence[str], answers: Sequence[int], n_choices: Sequence[int]) -> np.ndarray:
+    """1.0 where the letter picked in the response is the gold choice."""
+    picked = np.array([extract_choice(r, n) for r, n in zip(responses, n_choices)])
+    return (picked == np.asarray(answers)).astype(np.float64)
+
+
+def token_f1(predictions: Sequence[str], golds: Sequence[Sequence[str]]) -> np.ndarray:
+    """
+    Token-level F1 against the best-matching gold answer.
+
+    Tokens are mapped to integer ids and each (pair, token) is encoded as a
+    single key, so overlap counts for the whole batch come from one
+    ``np.unique``/``np.intersect1d`` pass instead of a Python loop per pair.
+    """
+    rows, flat = _flatten(golds)
+    pred_tokens = [normalize_answer(p).split() for p in predictions]
+    pairs_pred = [pred_tokens[row] for row in rows]
+    pairs_gold = [normalize_answer(g).split() for g in flat]
+    vocab = {}
+
+    def encode(tokens):
+        return [vocab.setdefault(t, len(vocab)) for t in tokens]
+
+    pred_ids = [encode(t) for t in pairs_pred]
+    gold_ids = [encode(t) for t in pairs_gold]
+    n_pairs, width = len(pairs_gold), max(1, len(vocab))
+
+    def keyed(ids: List[List[int]]):
+        lengths = np.array([len(t) for t in ids])
+        pair = np.repeat(np.arange(n_pairs), lengths)
+        tokens = np.fromiter((t for row in ids for t in row), dtype=np.int64, count=int(lengths.sum()))
+        keys, counts = np.unique(pair * width + tokens, return_counts=True)
+        return keys, counts, lengths
+
+    pred_keys, pred_counts, pred_len = keyed(pred_ids)
+    gold_keys, gold_counts, gold_len = keyed(gold_ids)
+    common_keys, pi, gi = np.intersect1d(pred_keys, gold_keys, assume_unique=True, return_indices=True)
+    overlap = np.bincount(common_keys // width, weights=np.minimum(pred_counts[pi], gold_counts[gi]),
+                          minlength=n_pairs)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(pred_len > 0, overlap / pred_len, 0.0)
+        recall = np.where(gold_len > 0, overlap / gold_len, 0.0)
+        f1 = np.where(overlap > 0, 2 * precision * recall / (precision + recall), 0.0)
+    # Both empty counts as a match, as in the SQuAD scorer.
+    f1 = np.where((pred_len == 0) & (gold_len == 0), 1.0, f1)
+    return _best_per_row(rows, f1, len(predictions))
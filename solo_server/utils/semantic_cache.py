@@ -0,0 +1,186 @@
+import hashlib
+import json
+import os
+import re
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from solo_server.config import SOLO_DIR, get_config_value
+from solo_server.utils.cache import KEY_FIELDS
+
+SEMANTIC_DIR = os.path.join(SOLO_DIR, "semantic")
+DEFAULT_EMBED_MODEL = "nomic-embed-text"
+DEFAULT_THRESHOLD = 0.95
+INITIAL_CAPACITY = 1024
+
+
+def prompt_text(messages: List[Dict]) -> str:
+    """Text that gets embedded for a conversation."""
+    return "\n".join(f"{m.get('role', 'user')}: {m.get('content', '')}" for m in messages)
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", name)
+
+
+def generation_settings(payload: Dict) -> Dict:
+    """
+    The request fields besides the prompt that change the answer (options,
+    format, tools, ...); replies are only shared between equal settings.
+    """
+    return {field: payload[field] for field in KEY_FIELDS
+            if field not in ("model", "messages") and payload.get(field) is not None}
+
+
+def partition_name(model: str, settings: Optional[Dict] = None) -> str:
+    """Directory of the cache partition for ``model`` under ``settings``."""
+    if not settings:
+        return _slug(model)
+    blob = json.dumps(settings, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return f"{_slug(model)}-{hashlib.sha256(blob.encode('utf-8')).hexdigest()[:12]}"
+
+
+def _read_json(path: str, default: Dict) -> Dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return dict(default)
+
+
+def _write_json(path: str, data: Dict):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+class SemanticCache:
+    """
+    Embedding-similarity cache for one chat model and set of generation
+    settings (see :func:`generation_settings`).
+
+    Unit-normalised prompt embeddings live in a float16 matrix that is
+    memory-mapped from ``~/.solo/semantic/<model>/embeddings.f16``, so a
+    lookup is one float32 matrix-vector product against an in-memory
+    upcast copy (NumPy has no BLAS path for float16). Answers are stored per row.
+    A stored answer is returned when cosine similarity reaches
+    ``semantic_threshold`` from solo.conf.
+    """
+
+    def __init__(self, model: str, directory: Optional[str] = None,
+                 threshold: Optional[float] = None, embed_model: Optional[str] = None,
+                 settings: Optional[Dict] = None):
+        self.model = model
+        self.directory = directory or os.path.join(SEMANTIC_DIR, partition_name(model, settings))
+        if threshold is None:
+            threshold = float(get_config_value("semantic_threshold", DEFAULT_THRESHOLD))
+        self.threshold = threshold
+        self.embed_model = embed_model or get_config_value("embed_model", DEFAULT_EMBED_MODEL)
+        self._meta_path = os.path.join(self.directory, "index.json")
+        self._matrix_path = os.path.join(self.directory, "embeddings.f16")
+        self._answers_dir = os.path.join(self.directory, "answers")
+        self.meta = _read_json(self._meta_path, {"dim": 0, "count": 0, "capacity": 0})
+        self._matrix = None
+        self._dense = None  # float32 copy of the first ``_dense_rows`` rows
+        self._dense_rows = 0
+        self._pending = {"lookups": 0, "hits": 0, "lookup_seconds": 0.0}
+
+    def _map(self):
+        if self._matrix is None and self.meta["capacity"]:
+            self._matrix = np.memmap(self._matrix_path, dtype=np.float16, mode="r+",
+                                     shape=(self.meta["capacity"], self.meta["dim"]))
+        return self._matrix
+
+    def _grow(self, dim: int):
+        capacity = max(INITIAL_CAPACITY, self.meta["capacity"] * 2)
+        os.makedirs(self._answers_dir, exist_ok=True)
+        if self._matrix is not None:
+            self._matrix.flush()
+            self._matrix = None
+        self._dense, self._dense_rows = None, 0
+        with open(self._matrix_path, "ab") as f:
+            f.truncate(capacity * dim * 2)
+        self.meta.update(dim=dim, capacity=capacity)
+
+    @staticmethod
+    def _normalise(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _upcast(self, count: int) -> np.ndarray:
+        """float32 view of the first ``count`` rows, converting only rows added since the last call."""
+        if self._dense is None:
+            self._dense = np.empty((self.meta["capacity"], self.meta["dim"]), dtype=np.float32)
+        if self._dense_rows < count:
+            self._dense[self._dense_rows:count] = self._map()[self._dense_rows:count]
+            self._dense_rows = count
+        return self._dense[:count]
+
+    def lookup(self, vector) -> Optional[Dict]:
+        """Returns the stored reply most similar to ``vector`` above the threshold."""
+        started = time.perf_counter()
+        reply = None
+        count = self.meta["count"]
+        query = self._normalise(vector)
+        if count and query.shape[0] == self.meta["dim"]:
+            scores = self._upcast(count) @ query
+            best = int(np.argmax(scores))
+            if float(scores[best]) >= self.threshold:
+                reply = _read_json(os.path.join(self._answers_dir, f"{best}.json"), {}) or None
+        self._pending["lookups"] += 1
+        self._pending["hits"] += reply is not None
+        self._pending["lookup_seconds"] += time.perf_counter() - started
+        return reply
+
+    def add(self, vector, reply: Dict):
+        query = self._normalise(vector)
+        if self.meta["dim"] and query.shape[0] != self.meta["dim"]:
+            return  # embedding model changed; keep the index consistent
+        if self.meta["count"] >= self.meta["capacity"]:
+            self._grow(query.shape[0])
+        row = self.meta["count"]
+        _write_json(os.path.join(self._answers_dir, f"{row}.json"), reply)
+        self._map()[row] = query
+        self.meta["count"] = row + 1
+        _write_json(self._meta_path, self.meta)
+
+    def flush(self):
+        """Persists the mapped matrix and folds pending counters into stats.json."""
+        if self._matrix is not None:
+            self._matrix.flush()
+        if not self._pending["lookups"]:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        stats_path = os.path.join(self.directory, "stats.json")
+        stats = _read_json(stats_path, {"lookups": 0, "hits": 0, "lookup_seconds": 0.0})
+        for key, value in self._pending.items():
+            stats[key] = stats.get(key, 0) + value
+        _write_json(stats_path, stats)
+        self._pending = {"lookups": 0, "hits": 0, "lookup_seconds": 0.0}
+
+
+def semantic_cache_summary(directory: str = SEMANTIC_DIR) -> List[List]:
+    """Rows of [model, entries, index size, hit rate, mean lookup] for `solo status`."""
+    rows = []
+    if not os.path.isdir(directory):
+        return rows
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        meta = _read_json(os.path.join(path, "index.json"), {})
+        if not meta:
+            continue
+        stats = _read_json(os.path.join(path, "stats.json"), {"lookups": 0, "hits": 0, "lookup_seconds": 0.0})
+        lookups = stats.get("lookups", 0)
+        size = os.path.getsize(os.path.join(path, "embeddings.f16")) if meta.get("capacity") else 0
+        rows.append([
+            name,
+            meta.get("count", 0),
+            f"{size / (1024 ** 2):.2f} MB",
+            f"{stats.get('hits', 0) / lookups:.1%}" if lookups else "-",
+            f"{stats.get('lookup_seconds', 0.0) / lookups * 1e6:.0f} µs" if lookups else "-",
+        ])
+    return rows
@@ -0,0 +1,175 @@
+import socket
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import requests
+
+from solo_server.utils.docker_api import split_reference
+
+READY_TIMEOUT = 30.0
+ENGINE_TIMEOUT = 60.0
+# Readiness polls start fast and back off to at most once a second.
+INITIAL_DELAY = 0.05
+MAX_DELAY = 1.0
+
+
+def port_in_use(port: int, host: str = "127.0.0.1") -> bool:
+    """
+    Whether ``port`` is taken on this host: something accepts connections
+    on it, or it cannot be bound on all interfaces (as `docker run -p` would).
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as probe:
+        probe.settimeout(0.2)
+        if probe.connect_ex((host, port)) == 0:
+            return True
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as probe:
+        # Ports held only by TIME_WAIT sockets of a removed container are free to reuse.
+        probe.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            probe.bind(("0.0.0.0", port))
+        except OSError:
+            return True
+    return False
+
+
+def wait_for(check: Callable[[], bool], timeout: float, initial: float = INITIAL_DELAY,
+             cap: float = MAX_DELAY) -> bool:
+    """Calls ``check`` with capped exponential backoff until it passes or ``timeout`` elapses."""
+    deadline = time.monotonic() + timeout
+    delay = initial
+    while True:
+        if check():
+            return True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, cap)
+
+
+def ollama_ready(url: str) -> bool:
+    """Ollama answers 200 on its root once the API is listening."""
+    try:
+        return requests.get(url, timeout=1).status_code == 200
+    except requests.RequestException:
+        return False
+
+
+def wait_until_ready(urls: List[str], timeout: float = READY_TIMEOUT) -> List[str]:
+    """Polls every replica's root until it answers; returns the ones that never did."""
+    pending = list(urls)
+
+    def check():
+        pending[:] = [url for url in pending if not ollama_ready(url)]
+        return not pending
+
+    wait_for(check, timeout)
+    return pending
+
+
+class PhaseTimer:
+    """Wall-clock time per startup phase; a phase entered twice accumulates."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str):
+        began = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - began
+            with self._lock:
+                self.phases[name] = self.phases.get(name, 0.0) + elapsed
+
+    def total(self) -> float:
+        return time.perf_counter() - self.started
+
+    def report(self, total: Optional[float] = None) -> List[str]:
+        lines = [f"{name:<18} {seconds * 1000:9.1f} ms" for name, seconds in self.phases.items()]
+        lines.append(f"{'total':<18} {(self.total() if total is None else total) * 1000:9.1f} ms")
+        return lines
+
+
+def run_steps(steps: Dict[str, Tuple[Callable[[Dict[str, Any]], Any], Sequence[str]]],
+              timer: Optional[PhaseTimer] = None) -> Dict[str, Any]:
+    """
+    Runs a dependency graph of startup steps, each as soon as the steps it
+    depends on have finished, so independent steps overlap.
+
+    ``steps`` maps a name to ``(function, dependencies)``; each function is
+    called in a worker thread with the results so far and its return value
+    is stored under its name. The first failure is re-raised once the
+    steps already running have finished.
+    """
+    results: Dict[str, Any] = {}
+    pending = dict(steps)
+    running = {}
+
+    def timed(name, function, done):
+        if timer is None:
+            return function(done)
+        with timer.phase(name):
+            return function(done)
+
+    with ThreadPoolExecutor(max_workers=max(1, len(steps))) as pool:
+        while pending or running:
+            for name, (function, deps) in list(pending.items()):
+                if all(dep in results for dep in deps):
+                    running[pool.submit(timed, name, function, dict(results))] = name
+                    del pending[name]
+            if not running:
+                raise ValueError(f"Startup steps with unmet dependencies: {', '.join(pending)}")
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                results[name] = future.result()
+    return results
+
+
+class PullProgress:
+    """
+    Turns Docker pull events into short progress lines: one per layer state
+    change, plus a download total at most every ``interval`` seconds.
+    """
+
+    STATES = ("Pulling fs layer", "Already exists", "Download complete", "Pull complete")
+
+    def __init__(self, reference: str, interval: float = 1.0):
+        self.reference = reference
+        self.interval = interval
+        self.layers: Dict[str, Dict] = {}
+        self._last_total = 0.0
+
+    def feed(self, event: Dict) -> List[str]:
+        layer, status = event.get("id"), event.get("status", "")
+        if not layer or layer == split_reference(self.reference)[1]:
+            return [status] if status and not status.startswith(("Pulling from", "Digest")) else []
+        state = self.layers.setdefault(layer, {"status": "", "current": 0, "total": 0})
+        lines = []
+        if status in self.STATES and state["status"] != status:
+            lines.append(f"   {layer}: {status}")
+        state["status"] = status
+        detail = event.get("progressDetail") or {}
+        if status == "Downloading" and detail.get("total"):
+            state["current"], state["total"] = detail.get("current", 0), detail["total"]
+            now = time.monotonic()
+            if now - self._last_total >= self.interval:
+                self._last_total = now
+                lines.append(self.summary())
+        elif status in ("Download complete", "Pull complete", "Already exists"):
+            state["current"] = state["total"]
+        return lines
+
+    def summary(self) -> str:
+        current = sum(layer["current"] for layer in self.layers.values())
+        total = sum(layer["total"] for layer in self.layers.values())
+        done = sum(layer["status"] in ("Pull complete", "Already exists") for layer in self.layers.values())
+        return (f"   ⬇️  {current / 1e6:.1f} / {total / 1e6:.1f} MB, "
+                f"{done}/{len(self.layers)} layers complete")
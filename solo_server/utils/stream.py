@@ -0,0 +1,127 @@
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+
+class NDJSONDecoder:
+    """
+    Incremental decoder for newline-delimited JSON streams.
+
+    Raw socket chunks are fed in as they arrive; complete lines are decoded
+    in place and only the trailing partial line is carried over.
+    """
+
+    def __init__(self):
+        self._tail = b""
+
+    def feed(self, chunk: bytes) -> List[Dict]:
+        data = self._tail + chunk if self._tail else chunk
+        objects = []
+        start = 0
+        while True:
+            end = data.find(b"\n", start)
+            if end < 0:
+                break
+            if end > start and not data[start:end].isspace():
+                objects.append(json.loads(data[start:end]))
+            start = end + 1
+        self._tail = data[start:]
+        return objects
+
+    def close(self) -> List[Dict]:
+        """Decodes whatever is left once the stream has ended."""
+        tail, self._tail = self._tail, b""
+        return [json.loads(tail)] if tail.strip() else []
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+@dataclass
+class StreamStats:
+    """
+    Client-side timing for one chat response.
+
+    Wall-clock times come from ``time.perf_counter``; the ``eval_*``,
+    ``prompt_eval_*`` and ``load_duration`` fields are copied from Ollama's
+    final chunk (nanoseconds) so client overhead can be told apart from
+    model latency.
+
+    Streams are observed one socket read at a time, and every chunk of a
+    read shares its timestamp. The inter-token gaps are therefore the gaps
+    between reads: tokens that arrived in the same read add no zero gaps.
+    """
+
+    started_at: Optional[float] = None
+    first_token_at: Optional[float] = None
+    last_token_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    tokens: int = 0
+    gaps: List[float] = field(default_factory=list)
+    server: Dict[str, int] = field(default_factory=dict)
+
+    SERVER_FIELDS = ("eval_count", "eval_duration", "prompt_eval_count",
+                     "prompt_eval_duration", "load_duration", "total_duration")
+
+    def begin(self):
+        self.started_at = time.perf_counter()
+
+    def observe(self, chunk: Dict, now: Optional[float] = None):
+        now = time.perf_counter() if now is None else now
+        if self.started_at is None:
+            self.started_at = now
+        if chunk.get("message", {}).get("content"):
+            if self.first_token_at is None:
+                self.first_token_at = now
+            elif now != self.last_token_at:
+                self.gaps.append(now - self.last_token_at)
+            self.last_token_at = now
+            self.tokens += 1
+        if chunk.get("done"):
+            self.finished_at = now
+            for key in self.SERVER_FIELDS:
+                if key in chunk:
+                    self.server[key] = chunk[key]
+
+    @property
+    def ttft(self) -> Optional[float]:
+        if self.first_token_at is None or self.started_at is None:
+            return None
+        return self.first_token_at - self.started_at
+
+    @property
+    def elapsed(self) -> Optional[float]:
+        end = self.finished_at or self.last_token_at
+        if end is None or self.started_at is None:
+            return None
+        return end - self.started_at
+
+    def summary(self) -> Dict[str, float]:
+        """Returns the headline numbers in milliseconds and tokens/s."""
+        result = {"tokens": self.tokens}
+        if self.ttft is not None:
+            result["ttft_ms"] = round(self.ttft * 1000, 2)
+        if self.elapsed is not None:
+            result["e2e_ms"] = round(self.elapsed * 1000, 2)
+        if self.gaps:
+            result["itl_mean_ms"] = round(sum(self.gaps) / len(self.gaps) * 1000, 2)
+            result["itl_p50_ms"] = round(_percentile(self.gaps, 50) * 1000, 2)
+            result["itl_p99_ms"] = round(_percentile(self.gaps, 99) * 1000, 2)
+        eval_count = self.server.get("eval_count")
+        eval_duration = self.server.get("eval_duration")
+        if eval_count and eval_duration:
+            result["eval_count"] = eval_count
+            result["server_tokens_per_s"] = round(eval_count / (eval_duration / 1e9), 2)
+        if self.server.get("load_duration") is not None:
+            result["load_ms"] = round(self.server["load_duration"] / 1e6, 2)
+        if self.elapsed is not None and self.server.get("total_duration"):
+            result["client_overhead_ms"] = round(
+                self.elapsed * 1000 - self.server["total_duration"] / 1e6, 2
+            )
+        return result
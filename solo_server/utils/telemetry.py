@@ -0,0 +1,216 @@
+import glob
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+import psutil
+
+from solo_server.config import get_config_value
+from solo_server.utils.hardware import HardwareInfo, detect_hardware, nvidia_readings
+
+DEFAULT_INTERVAL = 1.0
+DEFAULT_WINDOW = 300
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+# Scalar series and their units; per-core CPU and per-GPU load are added as 2-D series.
+METRICS = {
+    "cpu": "%",
+    "memory": "%",
+    "swap": "%",
+    "disk_read": "B/s",
+    "disk_write": "B/s",
+    "net_recv": "B/s",
+    "net_sent": "B/s",
+}
+VECTOR_METRICS = ("cpu_cores", "gpu")
+
+
+class RingBuffer:
+    """Fixed-size buffer of the last ``capacity`` rows of ``width`` floats."""
+
+    def __init__(self, capacity: int, width: int = 1):
+        self.data = np.full((capacity, width), np.nan)
+        self.capacity = capacity
+        self.index = 0
+        self.count = 0
+
+    def append(self, row):
+        self.data[self.index] = row
+        self.index = (self.index + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def values(self) -> np.ndarray:
+        """Rows from oldest to newest."""
+        if self.count < self.capacity:
+            return self.data[:self.count].copy()
+        return np.concatenate((self.data[self.index:], self.data[:self.index]))
+
+    def __len__(self):
+        return self.count
+
+
+def gpu_loads(gpus, root: str = "/") -> List[float]:
+    """
+    Utilisation (%) per detected GPU, in inventory order.
+
+    AMD cards report it in sysfs; NVIDIA cards need nvidia-smi.
+    """
+    busy = {}
+    for card in glob.glob(os.path.join(root, "sys/class/drm/card[0-9]*/device/gpu_busy_percent")):
+        device = os.path.dirname(card)
+        try:
+            with open(card, "r") as f:
+                busy[os.path.basename(os.path.realpath(device)).lower()] = float(f.read().strip())
+        except (OSError, ValueError):
+            pass
+    nvidia = nvidia_readings("utilization.gpu") if any(gpu.vendor == "NVIDIA" for gpu in gpus) else {}
+    loads = []
+    for gpu in gpus:
+        if gpu.vendor == "NVIDIA":
+            loads.append(nvidia.get(gpu.device, np.nan))
+        else:
+            loads.append(busy.get(gpu.device, np.nan))
+    return loads
+
+
+class TelemetrySampler(threading.Thread):
+    """
+    Samples host metrics into NumPy ring buffers from a daemon thread.
+
+    Counters (disk and network bytes) are stored as rates over the last
+    interval. Readers get copies via :meth:`series`, so rendering never
+    re-probes the host.
+    """
+
+    def __init__(self, interval: Optional[float] = None, capacity: Optional[int] = None,
+                 hardware: Optional[HardwareInfo] = None):
+        super().__init__(daemon=True, name="solo-telemetry")
+        self.interval = float(interval or get_config_value("telemetry_interval", DEFAULT_INTERVAL))
+        self.capacity = int(capacity or get_config_value("telemetry_window", DEFAULT_WINDOW))
+        self.gpus = (hardware or detect_hardware()).gpus
+        self.cores = psutil.cpu_count() or 1
+        self.buffers = {name: RingBuffer(self.capacity) for name in ("time", *METRICS)}
+        self.buffers["cpu_cores"] = RingBuffer(self.capacity, self.cores)
+        if self.gpus:
+            self.buffers["gpu"] = RingBuffer(self.capacity, len(self.gpus))
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._last = None
+        psutil.cpu_percent(percpu=True)  # the first call only primes the counters
+
+    def _counters(self):
+        disk = psutil.disk_io_counters()
+        net = psutil.net_io_counters()
+        return (time.time(),
+                disk.read_bytes if disk else 0, disk.write_bytes if disk else 0,
+                net.bytes_recv if net else 0, net.bytes_sent if net else 0)
+
+    def sample(self):
+        """Takes one sample of every metric."""
+        cores = psutil.cpu_percent(percpu=True)
+        counters = self._counters()
+        if self._last is None:
+            rates = [0.0] * 4
+        else:
+            elapsed = max(counters[0] - self._last[0], 1e-9)
+            rates = [max(0.0, (now - before) / elapsed) for now, before in zip(counters[1:], self._last[1:])]
+        self._last = counters
+        row = {
+            "time": counters[0],
+            "cpu": float(np.mean(cores)),
+            "memory": psutil.virtual_memory().percent,
+            "swap": psutil.swap_memory().percent,
+            "disk_read": rates[0],
+            "disk_write": rates[1],
+            "net_recv": rates[2],
+            "net_sent": rates[3],
+            "cpu_cores": cores[:self.cores] + [np.nan] * (self.cores - len(cores)),
+        }
+        if self.gpus:
+            row["gpu"] = gpu_loads(self.gpus)
+        with self._lock:
+            for name, value in row.items():
+                self.buffers[name].append(value)
+
+    def run(self):
+        while not self._stop_event.is_set():
+            started = time.monotonic()
+            self.sample()
+            self._stop_event.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def stop(self):
+        self._stop_event.set()
+
+    def series(self, name: str) -> np.ndarray:
+        """Values of ``name`` from oldest to newest; 1-D for scalar metrics."""
+        with self._lock:
+            values = self.buffers[name].values()
+        return values if name in VECTOR_METRICS else values[:, 0]
+
+    def snapshot(self) -> Dict[str, np.ndarray]:
+        return {name: self.series(name) for name in self.buffers}
+
+    def dump(self, path: str):
+        """Writes every buffer to a compressed ``.npz`` for later inspection."""
+        np.savez_compressed(path, interval=self.interval, **self.snapshot())
+
+
+def load_dump(path: str) -> Dict[str, np.ndarray]:
+    with np.load(path) as data:
+        return {name: data[name] for name in data.files}
+
+
+def percentile(values: np.ndarray, q: float = 95) -> float:
+    values = values[~np.isnan(values)]
+    return float(np.percentile(values, q)) if values.size else float("nan")
+
+
+def sparkline(values: np.ndarray, width: int = 40, low: Optional[float] = None,
+              high: Optional[float] = None) -> str:
+    """Block-character sparkline of the last ``width`` values."""
+    values = np.asarray(values, dtype=float)[-width:]
+    if not values.size:
+        return ""
+    finite = values[~np.isnan(values)]
+    if low is None:
+        low = float(finite.min()) if finite.size else 0.0
+    if high is None:
+        high = float(finite.max()) if finite.size else 0.0
+    span = high - low
+    if span <= 0:
+        levels = np.zeros(values.size, dtype=int)
+    else:
+        levels = np.clip(((values - low) / span * (len(SPARK_CHARS) - 1)).round(), 0, len(SPARK_CHARS) - 1)
+    return "".join(" " if np.isnan(v) else SPARK_CHARS[int(level)] for v, level in
+                   zip(values, np.nan_to_num(levels)))
+
+
+def _format(value: float, unit: str) -> str:
+    if np.isnan(value):
+        return "-"
+    if unit == "B/s":
+        for suffix in ("B/s", "KB/s", "MB/s", "GB/s"):
+            if value < 1024 or suffix == "GB/s":
+                return f"{value:.1f}{suffix}"
+            value /= 1024
+    return f"{value:.1f}{unit}"
+
+
+def render_watch(snapshot: Dict[str, np.ndarray], width: int = 40) -> List[str]:
+    """Lines of the ``solo status --watch`` dashboard: sparkline, latest value and p95."""
+    lines = [f"{'METRIC':<12} {'HISTORY':<{width}} {'NOW':>11} {'P95':>11}"]
+    rows = [(name, unit, snapshot[name]) for name, unit in METRICS.items()]
+    gpu = snapshot.get("gpu")
+    if gpu is not None:
+        rows += [(f"gpu{i}", "%", gpu[:, i]) for i in range(gpu.shape[1])]
+    for name, unit, values in rows:
+        percent = unit == "%"
+        line = sparkline(values, width, 0.0 if percent else None, 100.0 if percent else None)
+        latest = values[-1] if values.size else np.nan
+        lines.append(f"{name:<12} {line:<{width}} {_format(latest, unit):>11} {_format(percentile(values), unit):>11}")
+    cores = snapshot["cpu_cores"]
+    if cores.size:
+        bars = sparkline(cores[-1], cores.shape[1], 0.0, 100.0)
+        lines.append(f"{'cores':<12} {bars}")
+    return lines
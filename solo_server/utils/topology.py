@@ -0,0 +1,175 @@
+import glob
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from solo_server.config import get_config_value
+from solo_server.utils.replicas import format_cpuset
+
+DEFAULT_SHM_SIZE = "1g"
+# Let llama.cpp mlock model weights and keep plenty of sockets/files open.
+DEFAULT_ULIMITS = ["memlock=-1:-1", "nofile=65536:65536"]
+
+
+@dataclass
+class CPU:
+    id: int
+    core: int
+    package: int = 0
+    node: int = 0
+    l3: int = 0
+    kind: str = ""  # "P" or "E" on hybrid parts, empty otherwise
+
+
+@dataclass
+class Topology:
+    cpus: List[CPU]
+    node_memory_gb: Dict[int, float] = field(default_factory=dict)
+
+    @property
+    def sockets(self) -> List[int]:
+        return sorted({cpu.package for cpu in self.cpus})
+
+    @property
+    def nodes(self) -> List[int]:
+        return sorted({cpu.node for cpu in self.cpus})
+
+    @property
+    def l3_domains(self) -> List[int]:
+        return sorted({cpu.l3 for cpu in self.cpus})
+
+    @property
+    def hybrid(self) -> bool:
+        return {cpu.kind for cpu in self.cpus} >= {"P", "E"}
+
+    @property
+    def smt(self) -> bool:
+        return physical_cores(self.cpus) < len(self.cpus)
+
+
+def physical_cores(cpus: List[CPU]) -> int:
+    return len({(cpu.package, cpu.core) for cpu in cpus})
+
+
+def parse_cpulist(text: str) -> List[int]:
+    """Expands a kernel CPU list such as ``0-3,8,10-11``."""
+    cpus = []
+    for part in text.strip().split(","):
+        if not part:
+            continue
+        low, _, high = part.partition("-")
+        cpus.extend(range(int(low), int(high or low) + 1))
+    return cpus
+
+
+def _read(path: str) -> str:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+
+def _read_int(path: str, default: int = 0) -> int:
+    value = _read(path)
+    return int(value) if value.lstrip("-").isdigit() else default
+
+
+def read_topology(root: str = "/") -> Topology:
+    """
+    Sockets, NUMA nodes, L3 domains, SMT siblings and hybrid core types
+    from /sys/devices/system. Hosts without sysfs get a flat topology.
+    """
+    system = os.path.join(root, "sys/devices/system")
+    online = _read(os.path.join(system, "cpu/online"))
+    ids = parse_cpulist(online) if online else sorted(
+        int(m.group(1)) for m in (re.search(r"cpu(\d+)$", p) for p in glob.glob(os.path.join(system, "cpu/cpu[0-9]*"))) if m)
+    if not ids:
+        ids = list(range(os.cpu_count() or 1))
+
+    node_of, node_memory = {}, {}
+    for node_dir in glob.glob(os.path.join(system, "node/node[0-9]*")):
+        node = int(re.search(r"node(\d+)$", node_dir).group(1))
+        for cpu in parse_cpulist(_read(os.path.join(node_dir, "cpulist"))):
+            node_of[cpu] = node
+        match = re.search(r"MemTotal:\s*(\d+) kB", _read(os.path.join(node_dir, "meminfo")))
+        if match:
+            node_memory[node] = round(int(match.group(1)) / 1024 ** 2, 2)
+
+    kinds = {}
+    for kind, name in (("P", "cpu_core"), ("E", "cpu_atom")):
+        for cpu in parse_cpulist(_read(os.path.join(root, f"sys/devices/{name}/cpus"))):
+            kinds[cpu] = kind
+
+    cpus = []
+    for cpu_id in ids:
+        base = os.path.join(system, f"cpu/cpu{cpu_id}")
+        l3 = None
+        for index in glob.glob(os.path.join(base, "cache/index*")):
+            if _read(os.path.join(index, "level")) == "3":
+                shared = parse_cpulist(_read(os.path.join(index, "shared_cpu_list")))
+                l3 = _read_int(os.path.join(index, "id"), min(shared) if shared else 0)
+        package = _read_int(os.path.join(base, "topology/physical_package_id"))
+        cpus.append(CPU(
+            id=cpu_id,
+            core=_read_int(os.path.join(base, "topology/core_id"), cpu_id),
+            package=package,
+            node=node_of.get(cpu_id, 0),
+            l3=package if l3 is None else l3,
+            kind=kinds.get(cpu_id, ""),
+        ))
+    return Topology(cpus, node_memory)
+
+
+def _split_by_core(cpus: List[CPU], count: int) -> List[List[CPU]]:
+    """Splits ``cpus`` into ``count`` groups of whole cores, keeping L3 domains together."""
+    cores: Dict[tuple, List[CPU]] = {}
+    for cpu in sorted(cpus, key=lambda c: (c.l3, c.package, c.core, c.id)):
+        cores.setdefault((cpu.package, cpu.core), []).append(cpu)
+    groups = list(cores.values())
+    count = max(1, min(count, len(groups)))
+    size, extra = divmod(len(groups), count)
+    parts, start = [], 0
+    for index in range(count):
+        end = start + size + (1 if index < extra else 0)
+        parts.append([cpu for core in groups[start:end] for cpu in core])
+        start = end
+    return parts
+
+
+def plan_placement(topology: Topology, count: int) -> List[Dict]:
+    """
+    CPU/memory pinning for ``count`` containers.
+
+    Replicas are spread round-robin over NUMA nodes, and each one is
+    pinned to CPUs and memory of a single node. On hybrid parts only the
+    performance cores are used. ``num_thread`` is the number of physical
+    cores in the pin, since SMT siblings add little to matmul throughput.
+    """
+    by_node: Dict[int, List[CPU]] = {}
+    for cpu in topology.cpus:
+        if not topology.hybrid or cpu.kind == "P":
+            by_node.setdefault(cpu.node, []).append(cpu)
+    nodes = sorted(by_node)
+    per_node = {node: [i for i in range(count) if nodes[i % len(nodes)] == node] for node in nodes}
+    multi_node = len(nodes) > 1
+    shm_size = get_config_value("shm_size", DEFAULT_SHM_SIZE)
+
+    placements: List[Optional[Dict]] = [None] * count
+    for node, replicas in per_node.items():
+        if not replicas:
+            continue
+        parts = _split_by_core(by_node[node], len(replicas))
+        for slot, replica in enumerate(replicas):
+            cpus = parts[slot % len(parts)]
+            pinned = multi_node or count > 1 or topology.hybrid
+            placements[replica] = {
+                "cpuset": format_cpuset([cpu.id for cpu in cpus]) if pinned else None,
+                "cpuset_mems": str(node) if multi_node else None,
+                "num_thread": physical_cores(cpus),
+                "node": node,
+                "shm_size": shm_size,
+                "ulimits": list(DEFAULT_ULIMITS),
+            }
+    return placements
@@ -0,0 +1,130 @@
+import configparser
+import itertools
+import random
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from solo_server.config import load_config, save_config
+from solo_server.utils.balancer import normalize_model
+
+# Sent with every request as Ollama options.
+OPTION_KNOBS = ("num_thread", "num_batch", "num_ctx")
+# Read by the Ollama server at startup, so changing them means a container restart.
+ENV_KNOBS = ("OLLAMA_NUM_PARALLEL", "OLLAMA_FLASH_ATTENTION")
+SECTION_PREFIX = "tune:"
+
+
+def default_space(cpu_cores: int) -> Dict[str, List]:
+    """Values swept by `solo tune`, scaled to the number of physical cores."""
+    cores = max(1, cpu_cores or 1)
+    threads = sorted({max(1, cores // 2), cores, max(1, cores - 1)})
+    return {
+        "num_thread": threads,
+        "num_batch": [128, 256, 512],
+        "num_ctx": [2048, 4096],
+        "OLLAMA_NUM_PARALLEL": [1, 2, 4],
+        "OLLAMA_FLASH_ATTENTION": [0, 1],
+    }
+
+
+def candidate_grid(space: Dict[str, Sequence], max_candidates: Optional[int] = None,
+                   seed: int = 0) -> List[Dict]:
+    """Cartesian product of ``space``, randomly thinned to ``max_candidates``."""
+    keys = list(space)
+    grid = [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+    if max_candidates and len(grid) > max_candidates:
+        grid = random.Random(seed).sample(grid, max_candidates)
+    return grid
+
+
+def split_candidate(candidate: Dict) -> Tuple[Dict, Dict[str, str]]:
+    """Separates request options from server environment variables."""
+    options = {k: v for k, v in candidate.items() if k in OPTION_KNOBS}
+    env = {k: str(v) for k, v in candidate.items() if k in ENV_KNOBS}
+    return options, env
+
+
+def successive_halving(candidates: List[Dict], evaluate: Callable[[List[Dict], int], List[float]],
+                       min_budget: int = 4, eta: int = 2):
+    """
+    Keeps the best ``1/eta`` of the candidates after each rung and gives the
+    survivors ``eta`` times the budget, until one is left.
+
+    ``evaluate(candidates, budget)`` returns one score per candidate (higher
+    is better); taking the whole rung at once lets the caller order the work,
+    e.g. to restart the server once per environment. Returns the winner, its
+    last score and the ``(rung, budget, candidate, score)`` history.
+    """
+    survivors, budget, rung = list(candidates), min_budget, 0
+    history = []
+    while True:
+        scores = evaluate(survivors, budget)
+        history.extend((rung, budget, c, s) for c, s in zip(survivors, scores))
+        ranked = sorted(zip(scores, range(len(survivors))), key=lambda pair: -pair[0])
+        if len(survivors) == 1:
+            return survivors[0], scores[0], history
+        keep = max(1, len(survivors) // eta)
+        survivors = [survivors[i] for _, i in ranked[:keep]]
+        budget *= eta
+        rung += 1
+
+
+def section_name(model: str, fingerprint: str) -> str:
+    return f"{SECTION_PREFIX}{normalize_model(model)}@{fingerprint}"
+
+
+def save_profile(model: str, fingerprint: str, candidate: Dict, score: float):
+    """Writes the winning configuration to a ``[tune:<model>@<fingerprint>]`` section."""
+    config = load_config() or configparser.ConfigParser()
+    section = section_name(model, fingerprint)
+    if config.has_section(section):
+        config.remove_section(section)
+    config.add_section(section)
+    for key, value in candidate.items():
+        config[section][key.lower()] = str(value)
+    config[section]["tokens_per_s"] = f"{score:.2f}"
+    config[section]["tuned_at"] = str(int(time.time()))
+    save_config(config)
+
+
+def _read_section(config, section: str) -> Dict:
+    profile = {}
+    for key in OPTION_KNOBS + ENV_KNOBS:
+        value = config.get(section, key.lower(), fallback=None)
+        if value is not None:
+            profile[key] = int(value) if value.lstrip("-").isdigit() else value
+    return profile
+
+
+def load_profile(model: str, fingerprint: str) -> Optional[Dict]:
+    config = load_config()
+    section = section_name(model, fingerprint)
+    if config is None or not config.has_section(section):
+        return None
+    return _read_section(config, section)
+
+
+def has_profiles() -> bool:
+    config = load_config()
+    return bool(config and any(s.startswith(SECTION_PREFIX) for s in config.sections()))
+
+
+def tuned_env(fingerprint: str, models: Sequence[str] = ()) -> Dict[str, str]:
+    """
+    Server environment for this host: the profile of the first of
+    ``models`` that has one, else the most recently tuned profile.
+    """
+    config = load_config()
+    if config is None:
+        return {}
+    for model in models:
+        section = section_name(model, fingerprint)
+        if config.has_section(section):
+            return split_candidate(_read_section(config, section))[1]
+    latest, latest_at = None, -1
+    for section in config.sections():
+        if section.startswith(SECTION_PREFIX) and section.endswith(f"@{fingerprint}"):
+            tuned_at = config.getint(section, "tuned_at", fallback=0)
+            if tuned_at > latest_at:
+                latest, latest_at = section, tuned_at
+    return split_candidate(_read_section(config, latest))[1] if latest else {}
@@ -0,0 +1,110 @@
+import json
+import os
+import struct
+import threading
+from typing import Dict, Optional
+
+from solo_server.config import SOLO_DIR
+
+USAGE_FILE = os.path.join(SOLO_DIR, "usage.log")
+# unix time, prompt tokens, output tokens, then Ollama's prompt eval, eval,
+# load and total durations (ns), followed by the model name.
+RECORD = struct.Struct("<dIIQQQQB")
+COUNTERS = ("requests", "prompt_tokens", "output_tokens", "prompt_eval_seconds",
+            "eval_seconds", "load_seconds", "total_seconds")
+
+_fds: Dict[str, int] = {}
+_lock = threading.Lock()
+
+
+def encode_usage(reply: Dict, timestamp: float) -> Optional[bytes]:
+    """The usage record of a final Ollama reply, or None if it carries no counts."""
+    if not reply.get("done") or "eval_count" not in reply:
+        return None
+    # Cut long names on a character boundary so the record still decodes.
+    model = str(reply.get("model", "")).encode()[:255].decode("utf-8", "ignore").encode()
+    head = RECORD.pack(timestamp, int(reply.get("prompt_eval_count") or 0), int(reply.get("eval_count") or 0),
+                       int(reply.get("prompt_eval_duration") or 0), int(reply.get("eval_duration") or 0),
+                       int(reply.get("load_duration") or 0), int(reply.get("total_duration") or 0), len(model))
+    return head + model
+
+
+def openai_usage(body: bytes) -> Optional[Dict]:
+    """
+    The counts of an OpenAI-compatible chat completion (a JSON body or an
+    SSE stream) as a final Ollama reply, or None if it reports no usage.
+    """
+    body = body.strip()
+    if body.startswith(b"data:"):
+        # Only the last event before [DONE] carries usage.
+        events = [line[5:].strip() for line in body.splitlines() if line.startswith(b"data:")]
+        body = next((e for e in reversed(events) if e != b"[DONE]"), b"")
+    try:
+        reply = json.loads(body)
+    except ValueError:
+        return None
+    usage = reply.get("usage") if isinstance(reply, dict) else None
+    if not isinstance(usage, dict):
+        return None
+    return {"model": reply.get("model", ""), "done": True,
+            "prompt_eval_count": usage.get("prompt_tokens"), "eval_count": usage.get("completion_tokens")}
+
+
+def record_usage(reply: Dict, timestamp: float, path: Optional[str] = None):
+    """
+    Appends the token counts and durations of ``reply`` to the usage log
+    read by `solo exporter`. One ``O_APPEND`` write per request, so
+    concurrent clients in other processes never interleave records.
+    """
+    data = encode_usage(reply, timestamp)
+    if data is None:
+        return
+    path = path or USAGE_FILE
+    try:
+        with _lock:
+            fd = _fds.get(path)
+            if fd is None:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                fd = _fds[path] = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        os.write(fd, data)
+    except OSError:
+        pass  # usage accounting must never fail a request
+
+
+class UsageTotals:
+    """
+    Per-model running sums of the usage log.
+
+    Each :meth:`refresh` reads only the bytes appended since the last one,
+    so keeping the totals current costs nothing while traffic is idle.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or USAGE_FILE
+        self.offset = 0
+        self.models: Dict[str, Dict[str, float]] = {}
+
+    def refresh(self) -> Dict[str, Dict[str, float]]:
+        try:
+            with open(self.path, "rb") as f:
+                if os.fstat(f.fileno()).st_size < self.offset:  # truncated or replaced
+                    self.offset, self.models = 0, {}
+                f.seek(self.offset)
+                data = f.read()
+        except OSError:
+            return self.models
+        position = 0
+        while position + RECORD.size <= len(data):
+            (_, prompt_tokens, output_tokens, prompt_eval_ns, eval_ns, load_ns, total_ns,
+             model_len) = RECORD.unpack_from(data, position)
+            end = position + RECORD.size + model_len
+            if end > len(data):
+                break  # a record still being written
+            model = data[position + RECORD.size:end].decode("utf-8", "replace")
+            totals = self.models.setdefault(model, dict.fromkeys(COUNTERS, 0))
+            for name, value in zip(COUNTERS, (1, prompt_tokens, output_tokens, prompt_eval_ns / 1e9,
+                                              eval_ns / 1e9, load_ns / 1e9, total_ns / 1e9)):
+                totals[name] += value
+            position = end
+        self.offset += position
+        return self.models